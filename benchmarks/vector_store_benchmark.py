@@ -0,0 +1,124 @@
+"""
+Benchmark the vector store backends.
+
+For each collection size, clustered unit vectors (topics plus noise, closer
+to real embeddings than uniform random ones) are written to both backends
+through the same client API, then the benchmark measures:
+
+- build: writing the collection in batches of 5000 (and, for the faiss and
+  hnswlib backends, building their index)
+- cold start: opening the collection in a fresh process and answering one
+  query, after imports
+- query p50/p99: single-query latency once loaded
+- batch: queries per second when 100 queries are sent in one call
+- recall@k of ChromaDB's approximate HNSW search against the NumPy store's exact results
+
+Usage:
+    python benchmarks/vector_store_benchmark.py --sizes 10000 100000 500000 --dimension 384
+    python benchmarks/vector_store_benchmark.py --backends numpy faiss hnswlib
+"""
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from testteller.core.vector_store.numpy_store import open_local_client  # noqa: E402
+
+BACKENDS = ("chromadb", "numpy", "faiss", "hnswlib")
+WRITE_BATCH = 5000
+
+COLD_START = """
+import sys, time
+sys.path.insert(0, {root!r})
+import chromadb
+from testteller.core.vector_store.numpy_store import open_local_client
+start = time.perf_counter()
+collection = open_local_client({path!r}, {backend!r}).get_collection("bench")
+collection.query(query_embeddings=[[1.0] * {dimension}], n_results={k})
+print(time.perf_counter() - start)
+"""
+
+
+def unit_vectors(rng: np.random.Generator, centroids: np.ndarray, count: int) -> np.ndarray:
+    topics = rng.integers(len(centroids), size=count)
+    dimension = centroids.shape[1]
+    noise = rng.normal(scale=0.5 / np.sqrt(dimension), size=(count, dimension)).astype(np.float32)
+    vectors = centroids[topics] + noise
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def run(backend: str, path: str, vectors: np.ndarray, queries: np.ndarray, k: int) -> dict:
+    collection = open_local_client(path, backend).create_collection("bench", metadata={"hnsw:space": "cosine"})
+    start = time.perf_counter()
+    for offset in range(0, len(vectors), WRITE_BATCH):
+        batch = vectors[offset:offset + WRITE_BATCH]
+        collection.add(ids=[str(offset + i) for i in range(len(batch))], embeddings=batch.tolist(),
+                       metadatas=[{"source": f"file{(offset + i) % 100}"} for i in range(len(batch))])
+    # Index backends build their index on the first query
+    collection.query(query_embeddings=[vectors[0].tolist()], n_results=k, include=[])
+    build = time.perf_counter() - start
+
+    cold = float(subprocess.run(
+        [sys.executable, "-c", COLD_START.format(root=str(Path(__file__).resolve().parents[1]), path=path,
+                                                 backend=backend, dimension=vectors.shape[1], k=k)],
+        capture_output=True, text=True, check=True).stdout.strip().splitlines()[-1])
+
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(collection.query(query_embeddings=[query.tolist()], n_results=k, include=[])["ids"][0])
+        latencies.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    collection.query(query_embeddings=queries.tolist(), n_results=k, include=[])
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        "build_s": build, "cold_start_s": cold,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000), "p99_ms": float(np.percentile(latencies, 99) * 1000),
+        "batch_qps": len(queries) / batch_seconds, "ids": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 500000])
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=["chromadb", "numpy"])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centroids = rng.normal(size=(1000, args.dimension)).astype(np.float32) / np.sqrt(args.dimension)
+    print(f"{'vectors':>8} {'backend':>9} {'build s':>8} {'cold s':>7} {'p50 ms':>7} {'p99 ms':>7} "
+          f"{'batch q/s':>9} {'recall':>6}")
+    for size in args.sizes:
+        vectors = unit_vectors(rng, centroids, size)
+        queries = unit_vectors(rng, centroids, args.queries)
+        reports = {}
+        # The NumPy store's exact results are the ground truth for recall
+        for backend in ["numpy"] + [b for b in args.backends if b != "numpy"]:
+            path = tempfile.mkdtemp(prefix=f"bench-{backend}-")
+            try:
+                reports[backend] = run(backend, path, vectors, queries, args.k)
+            finally:
+                shutil.rmtree(path, ignore_errors=True)
+        exact = reports["numpy"]["ids"]
+        for backend, report in ((b, reports[b]) for b in args.backends):
+            recall = np.mean([len(set(found) & set(truth)) / args.k for found, truth in zip(report.pop("ids"), exact)])
+            print(f"{size:>8} {backend:>9} {report['build_s']:>8.1f} {report['cold_start_s']:>7.2f} "
+                  f"{report['p50_ms']:>7.2f} {report['p99_ms']:>7.2f} {report['batch_qps']:>9.0f} {recall:>6.3f}")
+            report["recall"] = recall
+        print(json.dumps({"vectors": size, "dimension": args.dimension, **reports}), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
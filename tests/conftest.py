@@ -11,6 +11,9 @@ from typing import Generator, Dict, Any, Optional
 
 import asyncio
 from testteller.generator_agent.agent.testteller_agent import TestTellerAgent
+from testteller.core.data_ingestion.ingest_state import IngestJournal, IngestStateStore
+from testteller.core.data_ingestion.near_duplicates import NearDuplicateIndex
+from testteller.generator_agent.agent.generation_cache import GenerationCache
 from testteller.core.llm.llm_manager import LLMManager
 from testteller.core.vector_store.chromadb_manager import ChromaDBManager
 from testteller.config import settings
@@ -218,6 +221,7 @@ def mock_chromadb_manager(test_collection_name: str) -> Mock:
     }
     mock_manager.get_collection_count.return_value = 2
     mock_manager.clear_collection.return_value = None
+    mock_manager.iter_documents.return_value = []
     return mock_manager
 
 
@@ -242,14 +246,19 @@ def mock_llm_manager(mock_llm_response: str, mock_embedding: list[float]) -> Moc
 def mock_testteller_agent(
     mock_llm_manager: Mock,
     mock_chromadb_manager: Mock,
-    test_collection_name: str
+    test_collection_name: str,
+    tmp_path: Path
 ) -> TestTellerAgent:
-    """Create a TestTellerAgent with mocked dependencies."""
+    """Create a TestTellerAgent with mocked dependencies and ingestion state in a temp directory."""
     with patch('testteller.generator_agent.agent.testteller_agent.LLMManager') as mock_llm_class:
-        with patch('testteller.generator_agent.agent.testteller_agent.ChromaDBManager') as mock_chroma_class:
+        with patch('testteller.generator_agent.agent.testteller_agent.create_vector_store') as mock_chroma_class:
             mock_llm_class.return_value = mock_llm_manager
             mock_chroma_class.return_value = mock_chromadb_manager
             agent = TestTellerAgent(collection_name=test_collection_name)
+            agent.ingest_state = IngestStateStore(test_collection_name, persist_directory=str(tmp_path))
+            agent.ingest_journal = IngestJournal(test_collection_name, persist_directory=str(tmp_path))
+            agent.near_duplicate_index = NearDuplicateIndex(test_collection_name, persist_directory=str(tmp_path))
+            agent.generation_cache = GenerationCache(test_collection_name, persist_directory=str(tmp_path))
             return agent
 
 
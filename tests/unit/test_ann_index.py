@@ -0,0 +1,104 @@
+"""
+Unit tests for the approximate indexes of the NumPy vector store.
+"""
+import json
+
+import numpy as np
+import pytest
+
+from testteller.core.vector_store import ann_index, numpy_store
+from testteller.core.vector_store.ann_index import AnnIndex
+from testteller.core.vector_store.numpy_store import NumpyVectorClient
+
+
+class ExactIndex(AnnIndex):
+    """Brute-force stand-in for an index library, exercising the store's index handling."""
+
+    backend = "exact"
+
+    def __init__(self, dimension, params, vectors=None):
+        super().__init__(dimension, params)
+        self.loaded = vectors is not None
+        self.vectors = np.zeros((0, dimension), dtype=np.float32) if vectors is None else vectors
+
+    @property
+    def rows(self):
+        return len(self.vectors)
+
+    def add(self, vectors):
+        self.vectors = np.concatenate([self.vectors, vectors])
+
+    def search(self, queries, k):
+        return np.argsort(-(queries @ self.vectors.T), axis=1, kind='stable')[:, :k]
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            np.save(f, self.vectors)
+
+    @classmethod
+    def load(cls, path, dimension, params):
+        return cls(dimension, params, np.load(path))
+
+
+def _fill(collection, start, count, dimension=8, seed=0):
+    embeddings = np.random.default_rng(seed).normal(size=(count, dimension)).astype(np.float32)
+    collection.add(ids=[f"id{i}" for i in range(start, start + count)], embeddings=embeddings.tolist(),
+                   metadatas=[{"source": f"file{i % 4}.md"} for i in range(start, start + count)])
+    return embeddings
+
+
+def _assert_same_results(actual, expected):
+    assert actual["ids"] == expected["ids"]
+    np.testing.assert_allclose(actual["distances"], expected["distances"], atol=1e-5)
+
+
+class TestAnnIndex:
+    """Test cases for NumpyCollection searches through an approximate index."""
+
+    @pytest.mark.unit
+    def test_index_is_saved_extended_and_skips_deleted_rows(self, tmp_path, monkeypatch):
+        """Test the index is built once, extended with appended rows, reloaded, and deleted rows are skipped."""
+        monkeypatch.setitem(ann_index.ANN_INDEX_TYPES, "exact", ExactIndex)
+        monkeypatch.setattr(numpy_store, "ANN_MIN_ROWS", 50)
+        indexed = NumpyVectorClient(str(tmp_path), index_backend="exact").create_collection("docs")
+        exact = NumpyVectorClient(str(tmp_path)).get_collection("docs")
+        embeddings = _fill(indexed, 0, 100)
+        queries = (embeddings[[3, 50]] + 0.01).tolist()
+
+        _assert_same_results(indexed.query(query_embeddings=queries, n_results=5),
+                             exact.query(query_embeddings=queries, n_results=5))
+        sidecar = json.loads((indexed.path / "index.0.json").read_text())
+        assert (sidecar["backend"], sidecar["rows"]) == ("exact", 100)
+
+        _fill(indexed, 100, 10, seed=1)
+        indexed.delete(ids=["id3", "id50"])
+        _assert_same_results(indexed.query(query_embeddings=queries, n_results=5),
+                             exact.query(query_embeddings=queries, n_results=5))
+        assert indexed._ann.rows == 110
+
+        reopened = NumpyVectorClient(str(tmp_path), index_backend="exact").get_collection("docs")
+        _assert_same_results(reopened.query(query_embeddings=queries, n_results=5),
+                             exact.query(query_embeddings=queries, n_results=5))
+        assert reopened._ann.loaded
+
+        where = {"source": "file1.md"}
+        _assert_same_results(indexed.query(query_embeddings=queries, n_results=5, where=where),
+                             exact.query(query_embeddings=queries, n_results=5, where=where))
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("backend,module", [("faiss", "faiss"), ("hnswlib", "hnswlib")])
+    def test_index_backends_find_nearest_neighbours(self, tmp_path, monkeypatch, backend, module):
+        """Test the FAISS and hnswlib indexes return the exact nearest neighbours on a small collection."""
+        pytest.importorskip(module)
+        monkeypatch.setattr(numpy_store, "ANN_MIN_ROWS", 100)
+        indexed = NumpyVectorClient(str(tmp_path), index_backend=backend).create_collection("docs")
+        exact = NumpyVectorClient(str(tmp_path)).get_collection("docs")
+        embeddings = _fill(indexed, 0, 2000, dimension=16)
+        queries = (embeddings[:20] + 0.01).tolist()
+
+        actual = indexed.query(query_embeddings=queries, n_results=5)
+        expected = exact.query(query_embeddings=queries, n_results=5)
+        recall = np.mean([len(set(a) & set(e)) / 5 for a, e in zip(actual["ids"], expected["ids"])])
+        assert recall >= 0.9
+        assert [ids[0] for ids in actual["ids"]] == [f"id{i}" for i in range(20)]
+        assert list((tmp_path / "numpy_store" / "docs").glob(f"index.0.{backend}"))
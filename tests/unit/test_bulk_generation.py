@@ -0,0 +1,77 @@
+"""
+Unit tests for bulk generation helpers and request rate limiting.
+"""
+import asyncio
+import json
+import time
+
+import pytest
+
+from testteller.core.utils.rate_limiter import AsyncRateLimiter
+from testteller.generator_agent.agent.bulk_generation import (
+    BulkGenerationReport, GenerationResult, read_queries_file
+)
+
+
+class TestBulkGeneration:
+    """Test cases for query files and bulk generation reports."""
+
+    @pytest.mark.unit
+    def test_read_text_and_jsonl_queries(self, tmp_path):
+        """Test comments and blank lines are skipped and every query gets a unique output name."""
+        text_file = tmp_path / "stories.txt"
+        text_file.write_text("# release 42\nAs a user I can log in\n\nAs a user I can log in\n")
+        jsonl_file = tmp_path / "stories.jsonl"
+        jsonl_file.write_text("\n".join([
+            json.dumps({"id": "US-1", "query": "Checkout with coupon"}),
+            json.dumps("Refund an order"),
+            json.dumps({"id": "US-1", "query": "Checkout without coupon"}),
+        ]))
+
+        assert [(q.query, q.name) for q in read_queries_file(str(text_file))] == [
+            ("As a user I can log in", "001-as-a-user-i-can-log-in"),
+            ("As a user I can log in", "002-as-a-user-i-can-log-in"),
+        ]
+        assert [q.name for q in read_queries_file(str(jsonl_file))] == ["us-1", "002-refund-an-order", "us-1-2"]
+
+        jsonl_file.write_text(json.dumps({"id": "US-2"}))
+        with pytest.raises(ValueError, match="stories.jsonl:1"):
+            read_queries_file(str(jsonl_file))
+
+    @pytest.mark.unit
+    def test_report_throughput_and_percentiles(self):
+        """Test failed queries are excluded from throughput and latency figures."""
+        report = BulkGenerationReport(
+            results=[GenerationResult("q", "cases", seconds=s, cached=s == 1.0) for s in (1.0, 2.0, 3.0, 4.0)]
+            + [GenerationResult("q", seconds=9.0, error="boom")],
+            wall_seconds=30.0)
+
+        assert (report.succeeded, report.failed, report.cached) == (4, 1, 1)
+        assert report.queries_per_minute == pytest.approx(8.0)
+        assert report.latency_percentiles()[50] == pytest.approx(2.5)
+        assert report.latency_percentiles()[99] < 4.0 + 1e-9
+
+
+class TestAsyncRateLimiter:
+    """Test cases for AsyncRateLimiter."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_requests_are_spaced_by_the_limit(self):
+        """Test concurrent requests start one interval apart and no limit means no waiting."""
+        limiter = AsyncRateLimiter(requests_per_minute=1200)  # one request per 0.05s
+        starts = []
+
+        async def request():
+            async with limiter:
+                starts.append(time.monotonic())
+
+        await asyncio.gather(*(request() for _ in range(4)))
+
+        gaps = [b - a for a, b in zip(starts, starts[1:])]
+        assert min(gaps) >= 0.04
+        unlimited = AsyncRateLimiter()
+        begin = time.monotonic()
+        for _ in range(100):
+            await unlimited.acquire()
+        assert time.monotonic() - begin < 0.05
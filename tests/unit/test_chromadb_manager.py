@@ -0,0 +1,251 @@
+"""
+Unit tests for ChromaDBManager against a local persistent collection.
+"""
+import numpy as np
+import pytest
+from unittest.mock import Mock
+
+from testteller.core.llm.llm_manager import LLMManager
+from testteller.core.utils.exceptions import EmbeddingGenerationError
+from testteller.core.vector_store import chromadb_manager
+from testteller.core.vector_store.chromadb_manager import ChromaDBManager
+
+
+@pytest.fixture
+def embedding_llm_manager() -> Mock:
+    """LLM manager whose embeddings are derived from the text length."""
+    manager = Mock(spec=LLMManager)
+    manager.provider = "gemini"
+    manager.get_embeddings_array.side_effect = lambda texts: np.array(
+        [[float(len(t)), 1.0, 0.5] for t in texts], dtype=np.float32)
+    return manager
+
+
+@pytest.fixture
+def vector_store(embedding_llm_manager, tmp_path) -> ChromaDBManager:
+    """ChromaDBManager persisting to a temporary directory."""
+    manager = ChromaDBManager(
+        llm_manager=embedding_llm_manager,
+        collection_name="test_chromadb_manager",
+        persist_directory=str(tmp_path / "chroma"),
+        use_remote=False
+    )
+    yield manager
+    manager.close()
+
+
+class TestChromaDBManager:
+    """Test cases for ChromaDBManager."""
+
+    @pytest.mark.unit
+    def test_add_documents_only_embeds_new_ids(self, vector_store, embedding_llm_manager):
+        """Test stored and repeated ids are skipped before embeddings are requested."""
+        vector_store.add_documents(["first", "second"], [{"source": "a"}, {"source": "a"}], ["id1", "id2"])
+        embedding_llm_manager.get_embeddings_array.reset_mock()
+
+        vector_store.add_documents(
+            ["first", "second", "third", "third"],
+            [{"source": "a"}] * 4,
+            ["id1", "id2", "id3", "id3"]
+        )
+
+        embedding_llm_manager.get_embeddings_array.assert_called_once_with(["third"])
+        assert vector_store.get_collection_count() == 3
+
+        embedding_llm_manager.get_embeddings_array.reset_mock()
+        vector_store.add_documents(["first"], [{"source": "a"}], ["id1"])
+        embedding_llm_manager.get_embeddings_array.assert_not_called()
+
+    @pytest.mark.unit
+    def test_refresh_metadata_and_prune_source(self, vector_store):
+        """Test kept documents get new metadata and a source's dropped documents are pruned."""
+        vector_store.add_documents(
+            ["kept", "dropped", "other"],
+            [{"source": "a", "chunk_index": 0}, {"source": "a", "chunk_index": 1}, {"source": "b", "chunk_index": 0}],
+            ["keep", "drop", "other"]
+        )
+
+        vector_store.add_documents(["kept"], [{"source": "a", "chunk_index": 5}], ["keep"], refresh_metadata=True)
+        removed = vector_store.prune_source("a", ["keep"])
+
+        assert removed == 1
+        stored = vector_store.collection.get(ids=["keep", "drop", "other"])
+        assert sorted(stored["ids"]) == ["keep", "other"]
+        assert stored["metadatas"][stored["ids"].index("keep")]["chunk_index"] == 5
+
+    @pytest.mark.unit
+    def test_upsert_documents_only_embeds_changed_texts(self, vector_store, embedding_llm_manager):
+        """Test upserting replaces changed documents, keeps unchanged ones and merges metadata."""
+        vector_store.upsert_documents(
+            ["same", "old text"], [{"source": "a", "n": 0}, {"source": "a", "n": 1}], ["id1", "id2"])
+        embedding_llm_manager.get_embeddings_array.reset_mock()
+
+        written = vector_store.upsert_documents(
+            ["same", "new text!", "added", "added"],
+            [{"source": "a", "n": 5}, {"source": "a"}, {"source": "a", "n": 2}, {"source": "a", "n": 3}],
+            ["id1", "id2", "id3", "id3"]
+        )
+
+        assert written == 2
+        embedding_llm_manager.get_embeddings_array.assert_called_once_with(["new text!", "added"])
+        stored = vector_store.collection.get(ids=["id1", "id2", "id3"], include=["documents", "metadatas", "embeddings"])
+        by_id = {doc_id: i for i, doc_id in enumerate(stored["ids"])}
+        assert stored["documents"][by_id["id2"]] == "new text!"
+        assert stored["embeddings"][by_id["id2"]][0] == len("new text!")
+        assert [stored["metadatas"][by_id[i]]["n"] for i in ("id1", "id2", "id3")] == [5, 1, 2]
+
+    @pytest.mark.unit
+    def test_delete_by_source_reports_batched_count(self, vector_store, monkeypatch):
+        """Test deleting a source's documents removes them in bounded batches and returns how many."""
+        monkeypatch.setattr(chromadb_manager, "CHROMA_DELETE_BATCH_SIZE", 2)
+        vector_store.add_documents(
+            ["a", "bb", "ccc", "dddd"], [{"source": "x.md"}] * 3 + [{"source": "y.md"}], ["x0", "x1", "x2", "y0"])
+        collection_class = type(vector_store.collection)
+        batches = []
+        original_delete = collection_class.delete
+
+        def delete(collection, ids=None, **kwargs):
+            batches.append(ids)
+            return original_delete(collection, ids=ids, **kwargs)
+        monkeypatch.setattr(collection_class, "delete", delete)
+
+        assert vector_store.delete_by_source("x.md") == 3
+        assert [len(batch) for batch in batches] == [2, 1]
+        assert vector_store.delete_where({"source": {"$in": ["x.md", "z.md"]}}) == 0
+        assert vector_store.collection.get()["ids"] == ["y0"]
+
+    @pytest.mark.unit
+    def test_add_documents_in_slices_from_float32_matrix(self, vector_store, monkeypatch):
+        """Test a batch embedded as one matrix is stored in bounded slices with the right vectors."""
+        monkeypatch.setattr(chromadb_manager, "CHROMA_ADD_BATCH_SIZE", 2)
+        texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+
+        vector_store.add_documents(texts, [{"source": "a"}] * 5, [f"id{i}" for i in range(5)])
+
+        stored = vector_store.collection.get(ids=["id4", "id0"], include=["embeddings"])
+        vectors = dict(zip(stored["ids"], stored["embeddings"]))
+        assert vector_store.get_collection_count() == 5
+        assert vectors["id4"] == pytest.approx([5.0, 1.0, 0.5])
+        assert vectors["id0"] == pytest.approx([1.0, 1.0, 0.5])
+
+    @pytest.mark.unit
+    def test_failed_embedding_rows_raise(self, vector_store, embedding_llm_manager):
+        """Test NaN rows from the provider abort the add without storing anything."""
+        embedding_llm_manager.get_embeddings_array.side_effect = lambda texts: np.array(
+            [[1.0, 1.0, 0.5], [np.nan, np.nan, np.nan]], dtype=np.float32)
+
+        with pytest.raises(EmbeddingGenerationError, match="1 out of 2"):
+            vector_store.add_documents(["ok", "failed"], [{"source": "a"}] * 2, ["ok", "failed"])
+
+        assert vector_store.get_collection_count() == 0
+
+    @pytest.mark.unit
+    def test_repeated_queries_embed_once(self, vector_store, embedding_llm_manager):
+        """Test identical query texts are embedded once and served from the query cache after that."""
+        embedding_llm_manager.get_embedding_sync.side_effect = lambda text: [float(len(text)), 1.0, 0.5]
+        vector_store.add_documents(["first", "second"], [{"source": "a"}] * 2, ["id1", "id2"])
+
+        for _ in range(3):
+            results = vector_store.query_similar("second", n_results=1)
+
+        assert results["ids"] == [["id2"]]
+        embedding_llm_manager.get_embedding_sync.assert_called_once_with("second")
+        assert (vector_store.query_cache.stats.hits, vector_store.query_cache.stats.misses) == (2, 1)
+
+    @pytest.mark.unit
+    def test_query_similar_batch_matches_single_queries(self, vector_store, embedding_llm_manager):
+        """Test a batch query embeds all texts in one call and returns one result per query."""
+        embedding_llm_manager.get_embedding_sync.side_effect = lambda text: [float(len(text)), 1.0, 0.5]
+        vector_store.add_documents(["a", "bbbb", "cccccccc"], [{"source": "a"}] * 3, ["id1", "id2", "id3"])
+        embedding_llm_manager.get_embeddings_array.reset_mock()
+
+        results = vector_store.query_similar_batch(["bbbb", "cccccccc"], n_results=1)
+
+        embedding_llm_manager.get_embeddings_array.assert_called_once_with(["bbbb", "cccccccc"])
+        assert [r["ids"] for r in results] == [[["id2"]], [["id3"]]]
+        assert results[1]["documents"] == vector_store.query_similar("cccccccc", n_results=1)["documents"]
+        embedding_llm_manager.get_embedding_sync.assert_not_called()
+
+    @pytest.mark.unit
+    def test_query_similar_batch_keeps_result_wide_fields(self, vector_store, monkeypatch):
+        """Test fields that are not per query, like chromadb 0.5's ``included``, are passed through unsplit."""
+        vector_store.add_documents(["a", "bb", "ccc", "dddd"], [{"source": "a"}] * 4, ["id1", "id2", "id3", "id4"])
+        original_query = type(vector_store.collection).query
+
+        def query(collection, *args, **kwargs):
+            results = dict(original_query(collection, *args, **kwargs))
+            results.update(included=["metadatas", "documents", "distances"], uris=None)
+            return results
+        monkeypatch.setattr(type(vector_store.collection), "query", query)
+
+        results = vector_store.query_similar_batch(["a", "bb", "ccc", "dddd"], n_results=1)
+
+        assert [r["ids"] for r in results] == [[["id1"]], [["id2"]], [["id3"]], [["id4"]]]
+        assert all(r["included"] == ["metadatas", "documents", "distances"] and r["uris"] is None for r in results)
+
+    @pytest.mark.unit
+    def test_precomputed_embeddings_are_stored_and_queried(self, vector_store, embedding_llm_manager):
+        """Test documents added with their embeddings need no provider call and are found by filtered queries."""
+        embeddings = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]], dtype=np.float32)
+        vector_store.add_documents(
+            ["login", "logout", "other"],
+            [{"type": "generated_test_case"}, {"type": "generated_test_case"}, {"type": "document"}],
+            ["id1", "id2", "id3"],
+            embeddings=embeddings
+        )
+
+        results = vector_store.query_by_embeddings(
+            np.array([[0.2, 0.0, 1.0], [1.0, 0.0, 0.0]], dtype=np.float32), n_results=1, where={"type": "generated_test_case"}, include=["documents"])
+
+        embedding_llm_manager.get_embeddings_array.assert_not_called()
+        assert results["ids"] == [["id1"], ["id1"]]
+        assert results["documents"][1] == ["login"]
+
+    @pytest.mark.unit
+    def test_open_collection_checks_existence_by_listing(self, vector_store, monkeypatch):
+        """Test a missing collection is created whatever get_collection raises, with names listed as strings."""
+        client = vector_store.client
+        original_get = client.get_collection
+
+        class NotFoundError(Exception):
+            pass
+
+        def get_collection(name, **kwargs):
+            if name not in [c.name for c in type(client).list_collections(client)]:
+                raise NotFoundError(name)
+            return original_get(name=name, **kwargs)
+        monkeypatch.setattr(client, "get_collection", get_collection)
+        monkeypatch.setattr(client, "list_collections", lambda: [c.name for c in type(client).list_collections(client)])
+
+        created = vector_store.open_collection("docs__v1", {"source": "test"})
+        again = vector_store.open_collection("docs__v1", {"source": "other"})
+
+        assert created.id == again.id
+        assert again.metadata["source"] == "test"
+        assert sorted(vector_store.list_collections()) == ["docs__v1", "test_chromadb_manager"]
+
+    @pytest.mark.unit
+    def test_delete_ids_in_batches(self, vector_store, monkeypatch):
+        """Test ids are deleted in bounded batches and metadata can be listed by filter."""
+        monkeypatch.setattr(chromadb_manager, "CHROMA_DELETE_BATCH_SIZE", 2)
+        vector_store.add_documents(
+            ["a", "bb", "ccc", "dddd"],
+            [{"type": "generated_test_case", "n": i} for i in range(3)] + [{"type": "document", "n": 3}],
+            ["g0", "g1", "g2", "d3"]
+        )
+        collection_class = type(vector_store.collection)
+        batches = []
+        original_delete = collection_class.delete
+
+        def delete(collection, ids=None, **kwargs):
+            batches.append(ids)
+            return original_delete(collection, ids=ids, **kwargs)
+        monkeypatch.setattr(collection_class, "delete", delete)
+
+        ids, metadatas = vector_store.get_metadatas_where({"type": "generated_test_case"})
+        deleted = vector_store.delete_ids(ids)
+
+        assert sorted(m["n"] for m in metadatas) == [0, 1, 2]
+        assert deleted == 3
+        assert [len(batch) for batch in batches] == [2, 1]
+        assert vector_store.collection.get()["ids"] == ["d3"]
@@ -80,7 +80,7 @@ class TestRAGEnhancedCLIFunctions:
         assert get_framework(None, "python") == "pytest"
         
     @patch('testteller.automator_agent.cli.LLMManager')
-    @patch('testteller.automator_agent.cli.ChromaDBManager')
+    @patch('testteller.automator_agent.cli.create_vector_store')
     def test_initialize_vector_store(self, mock_chroma, mock_llm):
         """Test vector store initialization."""
         mock_vector_store = Mock()
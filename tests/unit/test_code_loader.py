@@ -0,0 +1,413 @@
+"""
+Unit tests for CodeLoader
+
+Tests the persistent clone cache, git-aware incremental loading and the
+filtered concurrent file reader, using local repositories as clone sources.
+"""
+
+import pytest
+from pathlib import Path
+
+from git import Actor, Repo
+
+from testteller.core.data_ingestion.code_loader import CodeLoader, CodeChanges
+from testteller.core.data_ingestion.ingest_state import IngestJournal, IngestStateStore, get_collection_state_dir
+from testteller.core.data_ingestion.ignore_rules import IgnoreRules
+
+AUTHOR = Actor("Test", "test@example.com")
+
+
+def _commit(repo: Repo, message: str) -> str:
+    repo.git.add(A=True)
+    return repo.index.commit(message, author=AUTHOR, committer=AUTHOR).hexsha
+
+
+@pytest.fixture
+def origin_repo(tmp_path):
+    """A small source repository to clone from."""
+    origin_path = tmp_path / "origin"
+    origin_path.mkdir()
+    repo = Repo.init(str(origin_path))
+    (origin_path / "app.py").write_text("def app():\n    return 1\n")
+    (origin_path / "utils.py").write_text("def helper():\n    return 2\n")
+    (origin_path / "old_name.py").write_text("def moved():\n    return 3\n")
+    (origin_path / "README.txt").write_text("not code")
+    _commit(repo, "initial")
+    return repo
+
+
+@pytest.fixture
+def code_loader(tmp_path):
+    return CodeLoader(clone_dir_base=str(tmp_path / "clones"))
+
+
+class TestCodeLoaderCache:
+    """Test suite for the persistent clone cache"""
+
+    @pytest.mark.unit
+    def test_cache_path_is_stable_and_unique_per_url(self, code_loader):
+        """Each repository URL maps to its own stable cache directory."""
+        first = code_loader._get_local_repo_path("https://github.com/a/repo.git")
+        again = code_loader._get_local_repo_path("https://github.com/a/repo.git")
+        other = code_loader._get_local_repo_path("https://github.com/b/repo.git")
+
+        assert first == again
+        assert first != other
+        assert first.parent == code_loader.clone_dir_base
+        assert first.name.startswith("repo-")
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_load_code_from_repo_records_commit(self, code_loader, origin_repo):
+        """A cloned repository stays cached and reports its HEAD commit."""
+        repo_url = f"file://{origin_repo.working_dir}"
+
+        code_files = await code_loader.load_code_from_repo(repo_url)
+
+        assert sorted(p for p, _ in code_files) == [
+            f"{repo_url}:app.py", f"{repo_url}:old_name.py", f"{repo_url}:utils.py"]
+        assert await code_loader.get_repo_commit(repo_url) == origin_repo.head.commit.hexsha
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_failed_pull_keeps_cached_clone(self, code_loader, origin_repo, tmp_path):
+        """A cached clone survives a failed update, while a failed fresh clone is removed."""
+        repo_url = f"file://{origin_repo.working_dir}"
+        local_path = await code_loader.clone_or_pull_repo(repo_url)
+        Path(origin_repo.working_dir).rename(tmp_path / "moved")
+
+        assert await code_loader.clone_or_pull_repo(repo_url) is None
+        assert (local_path / "app.py").exists()
+
+        missing_url = f"file://{tmp_path / 'missing'}"
+        assert await code_loader.clone_or_pull_repo(missing_url) is None
+        assert not code_loader._get_local_repo_path(missing_url).exists()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_load_code_changes_from_repo(self, code_loader, origin_repo):
+        """Only added, modified, renamed and deleted code files are reported."""
+        repo_url = f"file://{origin_repo.working_dir}"
+        await code_loader.load_code_from_repo(repo_url)
+        first_commit = await code_loader.get_repo_commit(repo_url)
+
+        origin_path = Path(origin_repo.working_dir)
+        (origin_path / "app.py").write_text("def app():\n    return 42\n")
+        (origin_path / "new_module.py").write_text("def new():\n    pass\n")
+        (origin_path / "utils.py").unlink()
+        (origin_path / "old_name.py").rename(origin_path / "new_name.py")
+        (origin_path / "README.txt").write_text("still not code")
+        second_commit = _commit(origin_repo, "second")
+
+        changes = await code_loader.load_code_changes_from_repo(repo_url, first_commit)
+
+        assert changes.commit == second_commit
+        assert dict(changes.changed) == {
+            f"{repo_url}:app.py": "def app():\n    return 42\n",
+            f"{repo_url}:new_module.py": "def new():\n    pass\n",
+            f"{repo_url}:new_name.py": "def moved():\n    return 3\n",
+        }
+        assert sorted(changes.deleted) == [f"{repo_url}:old_name.py", f"{repo_url}:utils.py"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_load_code_changes_unchanged_repo(self, code_loader, origin_repo):
+        """Re-ingesting at the same commit reports no work."""
+        repo_url = f"file://{origin_repo.working_dir}"
+        await code_loader.load_code_from_repo(repo_url)
+        commit = await code_loader.get_repo_commit(repo_url)
+
+        changes = await code_loader.load_code_changes_from_repo(repo_url, commit)
+
+        assert changes == CodeChanges(commit=commit)
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_load_code_changes_unknown_commit(self, code_loader, origin_repo):
+        """An unknown recorded commit asks the caller for a full ingest."""
+        repo_url = f"file://{origin_repo.working_dir}"
+
+        assert await code_loader.load_code_changes_from_repo(repo_url, "0" * 40) is None
+
+
+class TestIngestStateStore:
+    """Test suite for per-collection ingestion state and the resume journal"""
+
+    @pytest.mark.unit
+    def test_code_state_round_trip(self, tmp_path):
+        """Recorded commits survive a new store instance and can be cleared."""
+        store = IngestStateStore("my_project", persist_directory=str(tmp_path))
+        assert store.get_code_state("https://example.com/repo.git") is None
+
+        store.set_code_state("https://example.com/repo.git", "abc123")
+
+        reloaded = IngestStateStore("my_project", persist_directory=str(tmp_path))
+        assert reloaded.get_code_state("https://example.com/repo.git")["commit"] == "abc123"
+        assert store.state_dir == get_collection_state_dir("my_project", str(tmp_path))
+
+        reloaded.clear()
+        assert store.get_code_state("https://example.com/repo.git") is None
+
+    @pytest.mark.unit
+    def test_journal_resume_and_compaction(self, tmp_path):
+        """An interrupted run resumes from its journal; a finished run leaves nothing behind."""
+        journal = IngestJournal("my_project", persist_directory=str(tmp_path))
+        run = journal.start_run("docs:/corpus")
+        run.record_file("/corpus/a.md", "10:1")
+        run.record_file("/corpus/b.md", "20:1")
+        run.record_batch("/corpus/c.pdf", "30:1", 64)
+        other = journal.start_run("code:/src")
+        with open(journal.path, "a") as f:
+            f.write('{"event": "file", "source": "docs:/cor')  # torn by a crash
+
+        run.record_file("/corpus/d.md", "40:1")
+
+        resumed = journal.start_run("docs:/corpus", resume=True)
+
+        assert resumed.resumed
+        assert resumed.is_completed("/corpus/a.md", "10:1")
+        assert not resumed.is_completed("/corpus/b.md", "20:2")  # changed since
+        assert resumed.resume_offset("/corpus/c.pdf", "30:1") == 64
+        assert resumed.resume_offset("/corpus/c.pdf", "30:2") == 0
+        assert resumed.is_completed("/corpus/d.md", "40:1")
+        assert resumed.skipped_files == ["/corpus/a.md", "/corpus/d.md"]
+
+        resumed.complete()
+        assert not journal.start_run("docs:/corpus", resume=True).completed
+        other.complete()
+        journal.start_run("docs:/corpus").complete()
+        assert journal.path.read_text() == ""
+
+
+@pytest.fixture
+def bare_origin(tmp_path, origin_repo):
+    """A bare mirror of the source repository that allows partial clones."""
+    bare = Repo.clone_from(origin_repo.working_dir, str(tmp_path / "origin.git"), bare=True)
+    with bare.config_writer() as config:
+        config.set_value("uploadpack", "allowFilter", "true")
+        config.set_value("uploadpack", "allowAnySHA1InWant", "true")
+    return bare
+
+
+def _change_origin(origin_repo: Repo) -> str:
+    origin_path = Path(origin_repo.working_dir)
+    (origin_path / "app.py").write_text("def app():\n    return 42\n")
+    (origin_path / "utils.py").unlink()
+    (origin_path / "pkg").mkdir()
+    (origin_path / "pkg" / "service.py").write_text("class Service:\n    pass\n")
+    return _commit(origin_repo, "second")
+
+
+class TestCodeLoaderCloneModes:
+    """Test suite for shallow and blob-level repository reading"""
+
+    @pytest.mark.unit
+    def test_invalid_clone_mode(self, tmp_path):
+        """Unknown clone modes are rejected."""
+        with pytest.raises(ValueError, match="Unsupported code clone mode"):
+            CodeLoader(clone_dir_base=str(tmp_path), clone_mode="mirror")
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("clone_mode", ["full", "shallow", "blobs"])
+    async def test_modes_read_same_code_from_bare_repo(self, tmp_path, origin_repo, bare_origin, clone_mode):
+        """Every clone mode yields the same code files and incremental changes."""
+        repo_url = f"file://{bare_origin.git_dir}"
+        loader = CodeLoader(clone_dir_base=str(tmp_path / "clones"), clone_mode=clone_mode)
+
+        code_files = dict(await loader.load_code_from_repo(repo_url))
+
+        assert code_files == {
+            f"{repo_url}:app.py": "def app():\n    return 1\n",
+            f"{repo_url}:utils.py": "def helper():\n    return 2\n",
+            f"{repo_url}:old_name.py": "def moved():\n    return 3\n",
+        }
+        first_commit = await loader.get_repo_commit(repo_url)
+        assert first_commit == origin_repo.head.commit.hexsha
+
+        second_commit = _change_origin(origin_repo)
+        origin_repo.git.push(bare_origin.git_dir, "HEAD:refs/heads/" + origin_repo.active_branch.name)
+
+        changes = await loader.load_code_changes_from_repo(repo_url, first_commit)
+
+        assert changes.commit == second_commit
+        assert dict(changes.changed) == {
+            f"{repo_url}:app.py": "def app():\n    return 42\n",
+            f"{repo_url}:pkg/service.py": "class Service:\n    pass\n",
+        }
+        assert changes.deleted == [f"{repo_url}:utils.py"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_shallow_mode_checks_out_only_code(self, tmp_path, bare_origin):
+        """Shallow clones keep one commit and a sparse, code-only worktree."""
+        repo_url = f"file://{bare_origin.git_dir}"
+        loader = CodeLoader(clone_dir_base=str(tmp_path / "clones"), clone_mode="shallow")
+
+        local_path = await loader.clone_or_pull_repo(repo_url)
+
+        assert (local_path / "app.py").exists()
+        assert not (local_path / "README.txt").exists()
+        assert Repo(str(local_path)).git.rev_list("--count", "HEAD") == "1"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_blobs_mode_has_no_worktree(self, tmp_path, bare_origin):
+        """Blob mode keeps a bare repository and never checks files out."""
+        repo_url = f"file://{bare_origin.git_dir}"
+        loader = CodeLoader(clone_dir_base=str(tmp_path / "clones"), clone_mode="blobs")
+
+        local_path = await loader.clone_or_pull_repo(repo_url)
+
+        assert Repo(str(local_path)).bare
+        assert not (local_path / "app.py").exists()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("clone_mode", ["full", "blobs"])
+    async def test_modes_read_git_bundle(self, tmp_path, origin_repo, clone_mode):
+        """Git bundles can be ingested like remote repositories."""
+        bundle_path = str(tmp_path / "snapshot.bundle")
+        origin_repo.git.bundle("create", bundle_path, "--all")
+        loader = CodeLoader(clone_dir_base=str(tmp_path / "clones"), clone_mode=clone_mode)
+
+        assert CodeLoader.is_repository_source(bundle_path)
+        code_files = dict(await loader.load_code_from_repo(bundle_path))
+
+        assert f"{bundle_path}:app.py" in code_files
+        assert f"{bundle_path}:README.txt" not in code_files
+
+
+class TestIgnoreRules:
+    """Test suite for gitignore-style path filtering"""
+
+    @pytest.mark.unit
+    def test_patterns(self):
+        """Anchoring, directory-only, wildcard and negation rules behave like gitignore."""
+        rules = IgnoreRules()
+        rules.add_patterns([
+            "# comment", "", "*.gen.py", "/build_tools", "cache/", "docs/**/*.py", "!keep.gen.py"])
+
+        assert rules.is_ignored("models.gen.py")
+        assert rules.is_ignored("pkg/models.gen.py")
+        assert not rules.is_ignored("keep.gen.py")
+        assert rules.is_ignored("build_tools", is_dir=True)
+        assert not rules.is_ignored("pkg/build_tools", is_dir=True)
+        assert rules.is_ignored("pkg/cache", is_dir=True)
+        assert not rules.is_ignored("pkg/cache")
+        assert rules.is_ignored("docs/a/b/conf.py")
+        assert not rules.is_ignored("src/conf.py")
+
+    @pytest.mark.unit
+    def test_nested_rules_apply_below_their_directory(self):
+        """Rules from a nested ignore file only match under that directory."""
+        rules = IgnoreRules()
+        rules.add_patterns(["*.py"], base="legacy")
+
+        assert rules.is_ignored("legacy/old.py")
+        assert not rules.is_ignored("old.py")
+
+
+@pytest.fixture
+def filtered_tree(tmp_path):
+    """A source tree with ignored, vendored, binary and oversized files."""
+    root = tmp_path / "project"
+    (root / "src" / "generated").mkdir(parents=True)
+    (root / "node_modules" / "lib").mkdir(parents=True)
+    (root / "legacy").mkdir()
+    (root / ".gitignore").write_text("generated/\n*.tmp.py\n")
+    (root / ".testtellerignore").write_text("/legacy/\n")
+    (root / "src" / ".gitignore").write_text("*.py\n!main.py\n")
+    (root / "app.py").write_text("def app():\n    return 1\n")
+    (root / "scratch.tmp.py").write_text("x = 1\n")
+    (root / "src" / "main.py").write_text("def main():\n    pass\n")
+    (root / "src" / "helper.py").write_text("def helper():\n    pass\n")
+    (root / "src" / "generated" / "api.py").write_text("API = 1\n")
+    (root / "node_modules" / "lib" / "index.js").write_text("module.exports = 1;\n")
+    (root / "legacy" / "old.py").write_text("def old():\n    pass\n")
+    (root / "blob.py").write_bytes(b"\x00\x01\x02binary")
+    (root / "big.py").write_text("x = 1\n" * 100)
+    return root
+
+
+class TestCodeFileFilters:
+    """Test suite for the concurrent, filtered code file reader"""
+
+    @pytest.fixture
+    def loader(self, tmp_path):
+        loader = CodeLoader(clone_dir_base=str(tmp_path / "clones"))
+        loader.max_file_size = 200
+        loader.read_workers = 2
+        return loader
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_iter_code_files_applies_filters(self, loader, filtered_tree):
+        """Ignored, vendored, binary and oversized files are never yielded."""
+        seen = {}
+        async for identifier, content in loader.iter_code_files(filtered_tree, "local"):
+            seen[identifier] = content
+
+        assert seen == {
+            "local:app.py": "def app():\n    return 1\n",
+            "local:src/main.py": "def main():\n    pass\n",
+        }
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_iter_code_files_streams_many_files(self, loader, tmp_path):
+        """Trees larger than one walk batch are read completely."""
+        root = tmp_path / "many"
+        for number in range(150):
+            package = root / f"pkg{number % 7}"
+            package.mkdir(parents=True, exist_ok=True)
+            (package / f"mod{number}.py").write_text(f"VALUE = {number}\n")
+
+        code_files = await loader.load_code_from_local_folder(str(root))
+
+        assert len(code_files) == 150
+        assert len({identifier for identifier, _ in code_files}) == 150
+
+    @pytest.mark.unit
+    def test_read_code_file_normalizes_newlines(self, loader, tmp_path):
+        """Windows line endings read the same as they did in text mode."""
+        path = tmp_path / "win.py"
+        path.write_bytes(b"a = 1\r\nb = 2\r\n")
+
+        assert loader._read_code_file(path) == "a = 1\nb = 2\n"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("clone_mode", ["full", "blobs"])
+    async def test_repository_modes_apply_filters(self, tmp_path, filtered_tree, clone_mode):
+        """Committed ignore files and vendored directories filter repository reads too."""
+        repo = Repo.init(str(filtered_tree))
+        repo.git.add(A=True, force=True)
+        repo.index.commit("initial", author=AUTHOR, committer=AUTHOR)
+        repo_url = f"file://{filtered_tree}"
+        loader = CodeLoader(clone_dir_base=str(tmp_path / "clones"), clone_mode=clone_mode)
+        loader.max_file_size = 200
+
+        code_files = dict(await loader.load_code_from_repo(repo_url))
+
+        assert sorted(code_files) == [f"{repo_url}:app.py", f"{repo_url}:src/main.py"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_changes_in_ignored_paths_are_dropped(self, code_loader, origin_repo):
+        """Incremental loads report newly ignored files as deleted and skip vendored ones."""
+        repo_url = f"file://{origin_repo.working_dir}"
+        await code_loader.load_code_from_repo(repo_url)
+        first_commit = await code_loader.get_repo_commit(repo_url)
+
+        origin_path = Path(origin_repo.working_dir)
+        (origin_path / ".testtellerignore").write_text("utils.py\n")
+        (origin_path / "utils.py").write_text("def helper():\n    return 20\n")
+        (origin_path / "vendor").mkdir()
+        (origin_path / "vendor" / "dep.py").write_text("DEP = 1\n")
+        _commit(origin_repo, "ignore utils")
+
+        changes = await code_loader.load_code_changes_from_repo(repo_url, first_commit)
+
+        assert changes.changed == []
+        assert sorted(changes.deleted) == [f"{repo_url}:utils.py", f"{repo_url}:vendor/dep.py"]
@@ -0,0 +1,269 @@
+"""
+Unit tests for DocumentLoader
+
+Tests document extraction backends, including the optional process pool
+used for PDF, DOCX and XLSX files, streaming extraction and bounded
+directory loading.
+"""
+
+import asyncio
+import pytest
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import docx
+import fitz
+import openpyxl
+
+from testteller.core.data_ingestion.document_loader import DocumentLoader, ProcessExtractionPool
+
+
+def _read_upper(file_path):
+    """Module-level extractor so it can be pickled into worker processes."""
+    return Path(file_path).read_text().upper()
+
+
+def _sleep_forever(file_path):
+    time.sleep(60)
+    return file_path
+
+
+class TestProcessExtractionPool:
+    """Test suite for ProcessExtractionPool"""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_run_extracts_in_worker_process(self, tmp_path):
+        """Extraction functions run in the pool and return their result."""
+        sample = tmp_path / "sample.txt"
+        sample.write_text("hello")
+
+        pool = ProcessExtractionPool(max_workers=1, timeout=30)
+        try:
+            assert await pool.run(_read_upper, str(sample)) == "HELLO"
+        finally:
+            pool.shutdown()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_run_timeout_terminates_pool(self, tmp_path):
+        """A file that exceeds the timeout raises and the pool is replaced."""
+        sample = tmp_path / "sample.txt"
+        sample.write_text("hello")
+
+        pool = ProcessExtractionPool(max_workers=1, timeout=0.5)
+        try:
+            with pytest.raises(TimeoutError):
+                await pool.run(_sleep_forever, str(sample))
+            assert pool._executor is None
+
+            # A fresh pool is started for the next file
+            assert await pool.run(_read_upper, str(sample)) == "HELLO"
+        finally:
+            pool.shutdown()
+
+
+class TestDocumentLoaderBackends:
+    """Test suite for DocumentLoader extraction backends"""
+
+    @pytest.fixture(autouse=True)
+    def reset_pool(self):
+        DocumentLoader.shutdown_extraction_pool()
+        yield
+        DocumentLoader.shutdown_extraction_pool()
+
+    @pytest.fixture
+    def docx_file(self, tmp_path):
+        path = tmp_path / "spec.docx"
+        document = docx.Document()
+        document.add_paragraph("Login requirements")
+        document.save(str(path))
+        return str(path)
+
+    @pytest.mark.unit
+    def test_thread_backend_has_no_pool(self):
+        """The default thread backend never starts worker processes."""
+        with patch.object(DocumentLoader, '_get_extraction_pool', return_value=None):
+            assert DocumentLoader.get_binary_concurrency() == 3
+        assert DocumentLoader._extraction_pool is None
+
+    @pytest.mark.unit
+    def test_process_backend_concurrency_matches_workers(self):
+        """Directory concurrency follows the configured worker count."""
+        DocumentLoader._extraction_pool = ProcessExtractionPool(max_workers=5, timeout=10)
+        assert DocumentLoader.get_binary_concurrency() == 5
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_load_docx_with_process_backend(self, docx_file):
+        """DOCX extraction produces the same text through the process pool."""
+        threaded = await DocumentLoader.load_document(docx_file)
+
+        DocumentLoader._extraction_pool = ProcessExtractionPool(max_workers=1, timeout=30)
+        pooled = await DocumentLoader.load_document(docx_file)
+
+        assert pooled == threaded
+        assert "Login requirements" in pooled
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_load_document_returns_none_on_timeout(self, docx_file):
+        """A timed-out extraction is logged and the file is skipped."""
+        DocumentLoader._extraction_pool = ProcessExtractionPool(max_workers=1, timeout=0.5)
+        with patch.object(DocumentLoader, '_load_docx_sync', _sleep_forever):
+            assert await DocumentLoader.load_document(docx_file) is None
+
+
+class TestPdfStreaming:
+    """Test suite for page-streaming PDF extraction"""
+
+    @pytest.fixture
+    def pdf_file(self, tmp_path):
+        path = tmp_path / "spec.pdf"
+        document = fitz.open()
+        for number in range(1, 6):
+            page = document.new_page()
+            page.insert_text((72, 72), f"Page {number} requirements")
+        document.save(str(path))
+        document.close()
+        return str(path)
+
+    @pytest.mark.unit
+    def test_iter_pdf_pages_yields_numbered_pages(self, pdf_file):
+        """Pages are yielded one at a time with 1-based numbers."""
+        pages = list(DocumentLoader.iter_pdf_pages(pdf_file))
+
+        assert [number for number, _ in pages] == [1, 2, 3, 4, 5]
+        assert "Page 3 requirements" in pages[2][1]
+
+    @pytest.mark.unit
+    def test_load_pdf_matches_streamed_pages(self, pdf_file):
+        """Full-text loading is the concatenation of the streamed pages."""
+        streamed = "".join(text for _, text in DocumentLoader.iter_pdf_pages(pdf_file))
+        assert DocumentLoader._load_pdf_sync(pdf_file) == streamed
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_stream_pdf_pages_windows(self, pdf_file):
+        """Async streaming groups pages into bounded windows."""
+        windows = [window async for window in DocumentLoader.stream_pdf_pages(pdf_file, window_size=2)]
+
+        assert [[number for number, _ in window] for window in windows] == [[1, 2], [3, 4], [5]]
+
+
+class TestXlsxStreaming:
+    """Test suite for row-batched XLSX extraction"""
+
+    @pytest.fixture
+    def xlsx_file(self, tmp_path):
+        path = tmp_path / "trace.xlsx"
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.title = "Requirements"
+        sheet.append(["ID", "Requirement", "Status", None, None])
+        for number in range(1, 6):
+            sheet.append([f"REQ-{number}", f"Requirement {number}", "Open", None])
+        sheet.append([None, None, None])
+        sheet.append(["REQ-6", "Requirement 6", "Done"])
+        empty = workbook.create_sheet("Empty")
+        empty.append([None, None])
+        workbook.save(str(path))
+        return str(path)
+
+    @pytest.mark.unit
+    def test_iter_xlsx_row_batches_repeats_header(self, xlsx_file):
+        """Each batch carries the sheet header and its sheet row range."""
+        batches = list(DocumentLoader.iter_xlsx_row_batches(xlsx_file, rows_per_chunk=2))
+
+        assert [(sheet, start, end) for sheet, start, end, _ in batches] == [
+            ("Requirements", 2, 3), ("Requirements", 4, 5), ("Requirements", 6, 8)]
+        for _, _, _, text in batches:
+            assert text.startswith("Sheet: Requirements\nID, Requirement, Status\n")
+        assert batches[2][3].endswith("REQ-5, Requirement 5, Open\nREQ-6, Requirement 6, Done")
+
+    @pytest.mark.unit
+    def test_load_xlsx_skips_empty_rows_and_columns(self, xlsx_file):
+        """Full-text loading drops empty trailing cells and blank rows."""
+        content = DocumentLoader._load_xlsx_sync(xlsx_file)
+
+        assert "ID, Requirement, Status\n" in content
+        assert "Status, ," not in content
+        assert "\n, , \n" not in content
+        assert "Sheet: Empty" in content
+
+
+class TestDirectoryLoading:
+    """Test suite for lazy, bounded directory loading"""
+
+    @pytest.fixture
+    def doc_tree(self, tmp_path):
+        (tmp_path / "b_dir" / "nested").mkdir(parents=True)
+        (tmp_path / "a.md").write_text("# A")
+        (tmp_path / "image.png").write_bytes(b"\x89PNG")
+        (tmp_path / "b_dir" / "c.txt").write_text("C")
+        (tmp_path / "b_dir" / "nested" / "d.PDF").write_bytes(b"%PDF")
+        (tmp_path / "e.txt").write_text("")
+        return tmp_path
+
+    @pytest.mark.unit
+    def test_iter_directory_files_is_lazy_and_filtered(self, doc_tree):
+        """Supported files are yielded one at a time in a stable order."""
+        files = DocumentLoader.iter_directory_files(str(doc_tree))
+
+        assert next(files) == str(doc_tree / "a.md")
+        assert [Path(p).relative_to(doc_tree).as_posix() for p in files] == [
+            "e.txt", "b_dir/c.txt", "b_dir/nested/d.PDF"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_load_from_directory_skips_empty_and_failed(self, doc_tree):
+        """Empty files and files that fail to extract are left out."""
+        documents = dict(await DocumentLoader.load_from_directory(str(doc_tree)))
+
+        assert documents == {str(doc_tree / "a.md"): "# A", str(doc_tree / "b_dir" / "c.txt"): "C"}
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_iter_documents_bounds_each_format_class(self):
+        """Text and binary loads never exceed their own concurrency limits."""
+        active = {"text": 0, "binary": 0}
+        peak = {"text": 0, "binary": 0}
+
+        async def fake_load(file_path):
+            kind = "binary" if file_path.endswith(".pdf") else "text"
+            active[kind] += 1
+            peak[kind] = max(peak[kind], active[kind])
+            await asyncio.sleep(0.01)
+            active[kind] -= 1
+            return file_path.upper()
+
+        paths = [f"doc{n}.{'pdf' if n % 3 == 0 else 'txt'}" for n in range(60)]
+        with patch.object(DocumentLoader, 'load_document', side_effect=fake_load):
+            results = [item async for item in DocumentLoader.iter_documents(
+                iter(paths), text_concurrency=4, binary_concurrency=2)]
+
+        assert sorted(path for path, _ in results) == sorted(paths)
+        assert peak == {"text": 4, "binary": 2}
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_iter_documents_reads_paths_lazily(self):
+        """Stopping early leaves most of a lazy path iterator unconsumed."""
+        consumed = []
+
+        def paths():
+            for n in range(10_000):
+                consumed.append(n)
+                yield f"doc{n}.txt"
+
+        async def fake_load(file_path):
+            return file_path
+
+        with patch.object(DocumentLoader, 'load_document', side_effect=fake_load):
+            documents = DocumentLoader.iter_documents(paths(), text_concurrency=2, binary_concurrency=1)
+            async for _ in documents:
+                break
+            await documents.aclose()
+
+        assert len(consumed) < 1000
@@ -0,0 +1,51 @@
+"""
+Unit tests for generated test case retention.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from testteller.generator_agent.agent.feedback_retention import FeedbackRetentionPolicy, select_feedback_to_remove
+
+NOW = datetime(2026, 6, 1)
+
+
+def _chunk(query, quality, days_old):
+    return {"type": "generated_test_case", "generation_query": query, "quality_score": quality,
+            "generation_timestamp": (NOW - timedelta(days=days_old)).isoformat()}
+
+
+class TestFeedbackRetention:
+    """Test cases for select_feedback_to_remove."""
+
+    @pytest.mark.unit
+    def test_limits_keep_best_quality_then_newest(self):
+        """Test expired chunks go first, then the worst chunks beyond the per-query and total caps."""
+        chunks = {
+            "old": _chunk("login", 1.0, 100),
+            "login-best": _chunk("login", 0.9, 5),
+            "login-new": _chunk("login", 0.8, 1),
+            "login-older": _chunk("login", 0.8, 3),
+            "search-best": _chunk("search", 1.0, 2),
+            "search-worst": _chunk("search", 0.7, 2),
+        }
+        policy = FeedbackRetentionPolicy(max_count=3, max_age_days=90, max_per_query=2)
+
+        remove, report = select_feedback_to_remove(list(chunks), list(chunks.values()), policy, NOW.timestamp())
+
+        assert remove == ["old", "login-older", "search-worst"]
+        assert (report.expired, report.over_query_cap, report.over_total_cap) == (1, 1, 1)
+        assert (report.stored, report.kept) == (6, 3)
+
+    @pytest.mark.unit
+    def test_zero_limits_and_missing_metadata_keep_everything(self):
+        """Test disabled limits remove nothing and unreadable timestamps never expire."""
+        policy = FeedbackRetentionPolicy(max_count=0, max_age_days=0, max_per_query=0)
+        remove, _ = select_feedback_to_remove(["a", "b"], [_chunk("q", 0.9, 400), None], policy, NOW.timestamp())
+        assert remove == []
+
+        remove, report = select_feedback_to_remove(
+            ["a", "b"], [{"generation_timestamp": "yesterday"}, _chunk("q", 0.9, 1)],
+            FeedbackRetentionPolicy(max_count=1, max_age_days=1, max_per_query=0), NOW.timestamp())
+        assert remove == ["a"]
+        assert report.over_total_cap == 1
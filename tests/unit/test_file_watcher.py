@@ -0,0 +1,105 @@
+"""
+Unit tests for DirectoryWatcher
+
+Tests debouncing and coalescing of document changes with the polling
+backend and, when watchfiles is installed, native notifications.
+"""
+
+import asyncio
+import os
+import pytest
+
+from testteller.core.data_ingestion.file_watcher import DirectoryWatcher, HAS_WATCHFILES, WatchBatch
+
+
+async def _collect_batches(watcher: DirectoryWatcher, make_changes, expected_batches: int = 1):
+    """Run the watcher, apply make_changes once it is watching, and collect batches."""
+    stop_event = asyncio.Event()
+    batches = []
+
+    async def consume():
+        async for batch in watcher.batches(stop_event):
+            batches.append(batch)
+            if len(batches) >= expected_batches:
+                stop_event.set()
+                break
+
+    consumer = asyncio.create_task(consume())
+    await asyncio.sleep(0.3)
+    await asyncio.to_thread(make_changes)
+    await asyncio.wait_for(consumer, timeout=10)
+    return batches
+
+
+@pytest.fixture
+def docs_dir(tmp_path):
+    docs = tmp_path / "docs"
+    (docs / "guides").mkdir(parents=True)
+    (docs / "login.md").write_text("# Login")
+    (docs / "guides" / "old.md").write_text("# Old")
+    (docs / "notes.bin").write_bytes(b"\x00")
+    return docs
+
+
+class TestDirectoryWatcher:
+    """Test suite for DirectoryWatcher"""
+
+    @pytest.mark.unit
+    def test_backend_selection(self, docs_dir):
+        """Polling is used when forced or when watchfiles is missing."""
+        assert DirectoryWatcher(str(docs_dir), force_polling=True).backend == "polling"
+        expected = "native" if HAS_WATCHFILES else "polling"
+        assert DirectoryWatcher(str(docs_dir)).backend == expected
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_polling_coalesces_changes(self, docs_dir):
+        """Rapid edits become one batch; paths keep the form of the watched directory."""
+        watcher = DirectoryWatcher(str(docs_dir), debounce=0.3, poll_interval=0.05, force_polling=True)
+
+        def make_changes():
+            (docs_dir / "login.md").write_text("# Login v2")
+            (docs_dir / "login.md").write_text("# Login v3, with more text")
+            (docs_dir / "signup.md").write_text("# Signup")
+            (docs_dir / "guides" / "old.md").unlink()
+            (docs_dir / "scratch.txt").write_text("temp")
+            (docs_dir / "scratch.txt").unlink()
+            (docs_dir / "ignored.bin").write_bytes(b"\x01")
+
+        batches = await _collect_batches(watcher, make_changes)
+
+        assert batches == [WatchBatch(
+            changed=[str(docs_dir / "login.md"), str(docs_dir / "signup.md")],
+            deleted=[str(docs_dir / "guides" / "old.md")])]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_stop_event_ends_watch(self, docs_dir):
+        """Setting the stop event ends the batch stream."""
+        watcher = DirectoryWatcher(str(docs_dir), debounce=0.1, poll_interval=0.05, force_polling=True)
+        stop_event = asyncio.Event()
+
+        async def consume():
+            return [batch async for batch in watcher.batches(stop_event)]
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0.2)
+        stop_event.set()
+
+        assert await asyncio.wait_for(consumer, timeout=5) == []
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not HAS_WATCHFILES, reason="watchfiles is not installed")
+    async def test_native_backend_expands_moved_directories(self, docs_dir):
+        """Moving a folder out reports every known document inside it as deleted."""
+        watcher = DirectoryWatcher(str(docs_dir), debounce=0.3)
+
+        def make_changes():
+            os.rename(docs_dir / "guides", docs_dir.parent / "archived_guides")
+            (docs_dir / "login.md").write_text("# Login v2")
+
+        batches = await _collect_batches(watcher, make_changes)
+
+        assert batches[0].deleted == [str(docs_dir / "guides" / "old.md")]
+        assert batches[0].changed == [str(docs_dir / "login.md")]
@@ -0,0 +1,46 @@
+"""
+Unit tests for the on-disk generation cache.
+"""
+import os
+import time
+
+import pytest
+
+from testteller.core.data_ingestion.ingest_state import write_json_atomic
+from testteller.generator_agent.agent.generation_cache import GenerationCache
+
+
+class TestGenerationCache:
+    """Test cases for GenerationCache."""
+
+    @pytest.mark.unit
+    def test_key_covers_every_generation_input(self):
+        """Test the key ignores whitespace in the query but changes with context, order, model and template."""
+        chunks = [("c1", "Login spec"), ("c2", "Token spec")]
+        key = GenerationCache.make_key("Login  tests\n", chunks, "gemini", "gemini-2.0-flash", "1")
+
+        assert key == GenerationCache.make_key(" Login tests", chunks, "gemini", "gemini-2.0-flash", "1")
+        assert len({
+            key,
+            GenerationCache.make_key("Login tests", chunks[::-1], "gemini", "gemini-2.0-flash", "1"),
+            GenerationCache.make_key("Login tests", [("c1", "Login spec!"), chunks[1]], "gemini", "gemini-2.0-flash", "1"),
+            GenerationCache.make_key("Login tests", chunks, "openai", "gpt-4o-mini", "1"),
+            GenerationCache.make_key("Login tests", chunks, "gemini", "gemini-2.0-flash", "2"),
+        }) == 5
+
+    @pytest.mark.unit
+    def test_ttl_and_least_recently_used_eviction(self, tmp_path):
+        """Test expired entries are dropped and the least recently used entry is evicted first."""
+        cache = GenerationCache("docs", persist_directory=str(tmp_path), ttl_seconds=60, max_entries=2)
+        cache.put("a", "cases a", "query a")
+        cache.put("b", "cases b", "query b")
+        os.utime(cache.directory / "a.json", (0, 0))
+        os.utime(cache.directory / "b.json", (1, 1))
+        assert cache.get("a") == "cases a"  # now the most recently used
+
+        cache.put("c", "cases c", "query c")
+
+        assert (cache.get("a"), cache.get("b"), cache.get("c")) == ("cases a", None, "cases c")
+        write_json_atomic(cache.directory / "c.json", {"created": time.time() - 120, "response": "cases c"})
+        assert cache.get("c") is None
+        assert not (cache.directory / "c.json").exists()
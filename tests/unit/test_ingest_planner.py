@@ -0,0 +1,77 @@
+"""
+Unit tests for ingestion dry-run planning.
+"""
+import chromadb
+import pytest
+
+from testteller.core.constants import EMBEDDING_CALL_SECONDS
+from testteller.core.data_ingestion.ingest_planner import DryRunVectorStore, IngestPlan
+
+
+class TestDryRunVectorStore:
+    """Test cases for the recording vector store."""
+
+    @pytest.mark.unit
+    def test_records_only_chunks_missing_from_collection(self, tmp_path):
+        """Test stored and repeated ids are counted as unchanged and nothing is written."""
+        client = chromadb.PersistentClient(
+            path=str(tmp_path), settings=chromadb.config.Settings(anonymized_telemetry=False))
+        collection = client.create_collection("docs")
+        collection.add(ids=["stored"], documents=["kept"], embeddings=[[0.1, 0.2]])
+
+        store = DryRunVectorStore.for_collection("docs", persist_directory=str(tmp_path))
+        store.add_documents(["kept", "new", "new"], [{}] * 3, ["stored", "n1", "n1"])
+        store.add_documents(["new", "other"], [{}] * 2, ["n1", "n2"])
+
+        assert store.batches == [["new"], ["other"]]
+        assert (store.received, store.unchanged) == (5, 3)
+        assert store.get_existing_ids(["stored", "n2", "missing"]) == {"stored", "n2"}
+        assert collection.count() == 1
+
+    @pytest.mark.unit
+    def test_upsert_records_new_and_changed_chunks(self, tmp_path):
+        """Test an upsert would embed new ids and stored ids whose text changed, but not unchanged ones."""
+        client = chromadb.PersistentClient(
+            path=str(tmp_path), settings=chromadb.config.Settings(anonymized_telemetry=False))
+        collection = client.create_collection("docs")
+        collection.add(ids=["same", "edited"], documents=["kept", "old"], embeddings=[[0.1, 0.2], [0.2, 0.1]])
+
+        store = DryRunVectorStore.for_collection("docs", persist_directory=str(tmp_path))
+
+        assert store.upsert_documents(["kept", "new text", "added"], [{}] * 3, ["same", "edited", "n1"]) == 2
+        assert store.batches == [["new text", "added"]]
+        assert (store.received, store.unchanged) == (3, 1)
+        assert store.delete_by_source("a.md") == 0
+        assert collection.get(ids=["edited"])["documents"] == ["old"]
+
+    @pytest.mark.unit
+    def test_missing_collection_is_not_created(self, tmp_path):
+        """Test planning against a collection that does not exist leaves the disk untouched."""
+        store = DryRunVectorStore.for_collection("docs", persist_directory=str(tmp_path / "chroma"))
+
+        assert store.collection is None
+        assert store.get_existing_ids(["a"]) == set()
+        assert not (tmp_path / "chroma").exists()
+
+
+class TestIngestPlan:
+    """Test cases for ingestion estimates."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("provider, calls", [("openai", 2), ("llama", 3)])
+    def test_estimates_from_recording(self, provider, calls):
+        """Test batching providers make one call per batch and per-text providers one per chunk."""
+        store = DryRunVectorStore()
+        store.add_documents(["a" * 400, "b" * 401], ids=["a", "b"])
+        store.add_documents(["c" * 4], ids=["c"])
+
+        plan = IngestPlan.from_dry_run(
+            store, provider, ["x/a.md", "x/b.md", "x/c.PDF"], near_duplicate_chunks=2, parse_seconds=1.5)
+
+        assert plan.files_by_type == {".md": 2, ".pdf": 1}
+        assert (plan.chunks, plan.new_chunks) == (5, 3)
+        assert plan.tokens == 100 + 101 + 1
+        assert plan.provider_calls == calls
+        assert plan.wall_seconds == pytest.approx(1.5 + calls * EMBEDDING_CALL_SECONDS[provider])
+        if provider == "openai":
+            assert plan.cost == pytest.approx(202 / 1_000_000 * 0.02)
@@ -288,3 +288,36 @@ class TestLLMManager:
 
                     manager = LLMManager()
                     assert manager.provider == "claude"
+
+    @pytest.mark.unit
+    def test_embedding_provider_override(self, mock_env_vars):
+        """Test EMBEDDING_PROVIDER routes embeddings to its own client while generation stays."""
+        env_vars = mock_env_vars.copy()
+        env_vars["EMBEDDING_PROVIDER"] = "local"
+
+        with patch.dict(os.environ, env_vars):
+            with patch('testteller.core.llm.llm_manager.settings', None):  # Force use of environment
+                with patch('testteller.core.llm.llm_manager.GeminiClient') as mock_gemini:
+                    mock_client = Mock()
+                    mock_client.generate_text.return_value = "Generated text"
+                    mock_gemini.return_value = mock_client
+
+                    manager = LLMManager()
+
+                    assert (manager.provider, manager.embedding_provider) == ("gemini", "local")
+                    assert manager.generate_text("Test prompt") == "Generated text"
+                    embeddings = manager.get_embeddings_sync(["Text 1", "Text 2"])
+                    assert len(embeddings) == 2 and len(embeddings[0]) == 384
+                    mock_client.get_embeddings_sync.assert_not_called()
+                    assert manager.get_provider_info()["embedding_provider"] == "local"
+
+    @pytest.mark.unit
+    def test_local_provider_needs_no_api_key(self):
+        """Test the local provider initializes without keys and embeds with its own client."""
+        with patch.dict(os.environ, {}, clear=True):
+            manager = LLMManager(provider="local")
+
+            assert manager.embedding_client is manager.client
+            assert manager.get_embedding_sync("Test text") == manager.get_embeddings_sync(["Test text"])[0]
+            with pytest.raises(ValueError, match="only computes embeddings"):
+                manager.generate_text("Test prompt")
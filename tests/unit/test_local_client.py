@@ -0,0 +1,59 @@
+"""
+Unit tests for the local hashing embedding client.
+"""
+import numpy as np
+import pytest
+
+from testteller.core.llm.base_client import embeddings_to_array
+from testteller.core.llm.local_client import LocalEmbeddingClient
+
+
+class TestLocalEmbeddingClient:
+    """Test cases for LocalEmbeddingClient."""
+
+    @pytest.mark.unit
+    def test_embeddings_are_deterministic_unit_vectors(self):
+        """Test batch and single embeddings agree, have the configured dimension and unit length."""
+        client = LocalEmbeddingClient(dimension=64)
+        texts = ["Login locks the account after five failed attempts", "", "Checkout retries payments"]
+
+        batch = client.embed(texts)
+
+        assert batch.shape == (3, 64) and batch.dtype == np.float32
+        np.testing.assert_allclose(np.linalg.norm(batch, axis=1), 1.0, rtol=1e-5)
+        np.testing.assert_allclose(batch[0], client.get_embedding_sync(texts[0]), rtol=1e-6)
+        np.testing.assert_array_equal(batch, LocalEmbeddingClient(dimension=64).embed(texts))
+        assert client.embedding_model == "local-hashing-64"
+        assert client.get_embeddings_array(texts).dtype == np.float32
+
+    @pytest.mark.unit
+    def test_embeddings_to_array_marks_failed_rows(self):
+        """Test missing and wrong-length embeddings become NaN rows of a float32 matrix."""
+        matrix = embeddings_to_array([[1.0, 2.0], None, [3.0]])
+
+        assert matrix.shape == (3, 2) and matrix.dtype == np.float32
+        np.testing.assert_array_equal(matrix[0], [1.0, 2.0])
+        assert np.isnan(matrix[1:]).all()
+
+    @pytest.mark.unit
+    def test_shared_words_give_similar_vectors(self):
+        """Test texts sharing words are closer than unrelated texts."""
+        query, related, unrelated = LocalEmbeddingClient().embed([
+            "account lockout after failed login attempts",
+            "the login page locks the account after three failed attempts",
+            "quarterly revenue forecast for the marketing department",
+        ])
+
+        assert query @ related > 0.25
+        assert query @ related > query @ unrelated + 0.2
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_async_embeddings_and_no_generation(self):
+        """Test async embeddings match sync ones and text generation is refused."""
+        client = LocalEmbeddingClient(dimension=32)
+
+        assert await client.get_embeddings_async(["a b c"]) == client.get_embeddings_sync(["a b c"])
+        assert await client.get_embeddings_async([]) == []
+        with pytest.raises(ValueError, match="only computes embeddings"):
+            await client.generate_text_async("Write test cases")
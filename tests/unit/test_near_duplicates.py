@@ -0,0 +1,68 @@
+"""
+Unit tests for SimHash near-duplicate detection.
+"""
+import pytest
+
+from testteller.core.data_ingestion.near_duplicates import (
+    NearDuplicateIndex, hamming_distances, simhash_signatures, word_jaccard_matrix
+)
+
+LICENSE = ("Licensed under the Apache License, Version 2.0 (the License); you may not use this file "
+           "except in compliance with the License. You may obtain a copy of the License at")
+
+
+class TestSimHash:
+    """Test cases for SimHash signatures."""
+
+    @pytest.mark.unit
+    def test_batch_signatures_match_single_signatures(self):
+        """Test the vectorized batch computation equals signing texts one at a time."""
+        texts = [LICENSE, "too short", LICENSE + " 2024", "The checkout service retries failed payments three times"]
+
+        batch = simhash_signatures(texts)
+
+        assert [int(s) for s in batch] == [int(simhash_signatures([t])[0]) for t in texts]
+        assert batch[1] == 0
+
+    @pytest.mark.unit
+    def test_near_duplicates_are_close(self):
+        """Test small edits give nearby signatures and unrelated text distant ones."""
+        original, edited, unrelated = simhash_signatures([
+            LICENSE + " http://www.apache.org/licenses/LICENSE-2.0",
+            LICENSE + " https://www.apache.org/licenses/LICENSE-2.0",
+            "The checkout service retries failed payments three times before alerting the on call engineer",
+        ])
+
+        assert hamming_distances(int(original), edited.reshape(1))[0] <= 10
+        assert hamming_distances(int(original), unrelated.reshape(1))[0] > 16
+
+
+    @pytest.mark.unit
+    def test_word_jaccard_matrix(self):
+        """Test the similarity matrix matches word-set Jaccard for every pair."""
+        similarity = word_jaccard_matrix(["a b c", "Login works"], ["A b d", "", "login WORKS"])
+
+        assert similarity.shape == (2, 3)
+        assert similarity[0].tolist() == pytest.approx([0.5, 0.0, 0.0])
+        assert similarity[1].tolist() == pytest.approx([0.0, 0.0, 1.0])
+
+class TestNearDuplicateIndex:
+    """Test cases for the persistent LSH index."""
+
+    @pytest.mark.unit
+    def test_find_persist_and_remove(self, tmp_path):
+        """Test indexed signatures are found within the distance, survive a reload and can be removed."""
+        index = NearDuplicateIndex("docs", persist_directory=str(tmp_path), max_distance=3)
+        signature = 0b1011 << 40 | 0xFFFF
+        index.add([signature, 0], ["a", "unsigned"])
+        index.save()
+
+        reloaded = NearDuplicateIndex("docs", persist_directory=str(tmp_path), max_distance=3)
+        assert len(reloaded) == 1
+        assert reloaded.find(signature ^ 0b111) == ["a"]
+        assert reloaded.find(signature ^ 0b1111) == []
+        assert reloaded.find(signature, exclude_id="a") == []
+
+        reloaded.remove(["a"])
+        reloaded.save()
+        assert NearDuplicateIndex("docs", persist_directory=str(tmp_path)).find(signature) == []
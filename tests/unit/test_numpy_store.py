@@ -0,0 +1,117 @@
+"""
+Unit tests for the in-process NumPy vector store.
+"""
+import chromadb
+import numpy as np
+import pytest
+from unittest.mock import Mock
+
+from testteller.core.llm.llm_manager import LLMManager
+from testteller.core.vector_store import numpy_store
+from testteller.core.vector_store.base import VectorStore, create_vector_store
+from testteller.core.vector_store.numpy_store import NumpyVectorClient
+from testteller.core.vector_store.reindex import CollectionReindexer
+
+
+def _fill(collection, count=40, dimension=8, seed=0):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.normal(size=(count, dimension)).astype(np.float32)
+    collection.add(
+        ids=[f"id{i}" for i in range(count)],
+        embeddings=embeddings.tolist(),
+        documents=[f"document {i} {'login' if i % 3 == 0 else 'search'}" for i in range(count)],
+        metadatas=[{"source": f"file{i % 4}.md", "rank": i} for i in range(count)])
+    return embeddings
+
+
+class TestNumpyVectorClient:
+    """Test cases for NumpyVectorClient and NumpyCollection."""
+
+    @pytest.mark.unit
+    def test_results_match_chromadb(self, tmp_path):
+        """Test queries and filtered reads return what ChromaDB returns for the same data."""
+        chroma = chromadb.EphemeralClient().create_collection("parity", metadata={"hnsw:space": "cosine"})
+        local = NumpyVectorClient(str(tmp_path)).create_collection("parity", metadata={"hnsw:space": "cosine"})
+        _fill(chroma)
+        queries = _fill(local)[[1, 7]] + 0.05
+
+        where = {"$and": [{"source": {"$in": ["file1.md", "file3.md"]}}, {"rank": {"$gte": 5}}]}
+        for kwargs in ({}, {"where": where}, {"where_document": {"$contains": "login"}}):
+            expected = chroma.query(query_embeddings=queries.tolist(), n_results=4, **kwargs)
+            actual = local.query(query_embeddings=queries.tolist(), n_results=4, **kwargs)
+            assert actual["ids"] == expected["ids"]
+            assert actual["metadatas"] == expected["metadatas"]
+            np.testing.assert_allclose(actual["distances"], expected["distances"], atol=1e-5)
+
+        assert local.get(where=where, include=[])["ids"] == sorted(
+            chroma.get(where=where, include=[])["ids"], key=lambda doc_id: int(doc_id[2:]))
+        assert local.get(limit=3, offset=2)["ids"] == ["id2", "id3", "id4"]
+        assert local.count() == chroma.count() == 40
+
+    @pytest.mark.unit
+    def test_appends_updates_and_deletes_persist_across_clients(self, tmp_path, monkeypatch):
+        """Test a second client sees appends, merged metadata and tombstones, and compaction keeps results."""
+        monkeypatch.setattr(numpy_store, "COMPACT_MIN_TOMBSTONES", 10)
+        writer = NumpyVectorClient(str(tmp_path)).create_collection("docs")
+        embeddings = _fill(writer)
+        reader = NumpyVectorClient(str(tmp_path)).get_collection("docs")
+        assert reader.count() == 40
+
+        writer.update(ids=["id0"], metadatas=[{"reviewed": True, "rank": None}])
+        writer.delete(where={"source": "file0.md"})
+        writer.add(ids=["id0", "id40"], embeddings=[[1.0] * 8, [2.0] * 8], documents=["new", "newer"])
+
+        assert reader.count() == 32
+        assert reader.get(ids=["id0", "id1"], include=["metadatas"])["metadatas"] == \
+            [None, {"source": "file1.md", "rank": 1}]
+        assert reader.query(query_embeddings=[[1.0] * 8], n_results=1)["ids"] == [["id0"]]
+
+        writer.delete(ids=[f"id{i}" for i in range(1, 20)])  # tombstones now outnumber live rows
+        assert writer._manifest["generation"] == 1
+        assert len(list(tmp_path.rglob("vectors.*.f32"))) == 1
+        result = reader.query(query_embeddings=embeddings[[25]].tolist(), n_results=2, include=["embeddings"])
+        assert result["ids"][0][0] == "id25"
+        np.testing.assert_allclose(result["embeddings"][0][0], embeddings[25])
+        assert reader.count() == writer.count() == 17
+
+    @pytest.mark.unit
+    def test_interrupted_append_is_ignored(self, tmp_path):
+        """Test vector bytes and a log line left by an interrupted add are not read as documents."""
+        collection = NumpyVectorClient(str(tmp_path)).create_collection("docs")
+        _fill(collection, count=4)
+        with open(collection._file("vectors"), 'ab') as f:
+            f.write(np.ones(8, dtype=np.float32).tobytes())
+        with open(collection._file("records"), 'ab') as f:
+            f.write(b'{"op": "add", "ids": ["half')
+
+        reopened = NumpyVectorClient(str(tmp_path)).get_collection("docs")
+        assert reopened.count() == 4
+        reopened.add(ids=["id4"], embeddings=[[3.0] * 8])
+        assert reopened.get(ids=["id4"], include=["embeddings"])["embeddings"] == [[3.0] * 8]
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_chromadb_manager_and_reindex_run_on_numpy_backend(self, tmp_path):
+        """Test the vector store stores, iterates, queries and re-indexes through the NumPy backend."""
+        llm_manager = Mock(spec=LLMManager)
+        llm_manager.provider = "gemini"
+        llm_manager.get_embeddings_array.side_effect = lambda texts: np.array(
+            [[float(len(t)), 1.0, 0.5] for t in texts], dtype=np.float32)
+        llm_manager.get_embedding_sync.side_effect = lambda text: [float(len(text)), 1.0, 0.5]
+        store = create_vector_store(llm_manager, collection_name="docs", persist_directory=str(tmp_path),
+                                    use_remote=False, backend="numpy")
+        store.add_documents(["a", "bbbb", "cccccccc"], [{"source": "x"}] * 3, ["1", "2", "3"])
+
+        assert isinstance(store, VectorStore)
+        assert isinstance(store.client, NumpyVectorClient)
+        assert store.query_similar("dddd", n_results=1)["ids"] == [["2"]]
+        assert [page["ids"] for page in store.iter_documents(batch_size=2)] == [["1", "2"], ["3"]]
+        assert store.upsert_documents(["a", "zz", "eeeeee"], [{"source": "x"}] * 3, ["1", "2", "5"]) == 2
+        assert store.query_similar("yy", n_results=1)["documents"] == [["zz"]]
+        assert store.delete_by_source("x") == 4
+
+        store.add_documents(["a"], [{"source": "y"}], ["4"])
+        report = await CollectionReindexer(store, requests_per_minute=0, reuse_embeddings=True).reindex()
+        assert (report.target, report.documents) == ("docs__v1", 1)
+        assert store.list_collections() == ["docs", "docs__v1"]
+        store.close()
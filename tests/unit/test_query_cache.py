@@ -0,0 +1,104 @@
+"""
+Unit tests for the query embedding cache.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from testteller.core.vector_store import query_cache
+from testteller.core.vector_store.query_cache import QueryEmbeddingCache
+
+
+def _embed(text):
+    return [float(len(text)), 1.0]
+
+
+class TestQueryEmbeddingCache:
+    """Test cases for QueryEmbeddingCache."""
+
+    @pytest.mark.unit
+    def test_lru_eviction_ttl_and_failures(self, monkeypatch):
+        """Test least recently used and expired entries are dropped and failures are not cached."""
+        now = [1000.0]
+        monkeypatch.setattr(query_cache.time, "time", lambda: now[0])
+        cache = QueryEmbeddingCache(max_entries=2, ttl_seconds=60)
+
+        cache.get_or_compute("a", _embed)
+        cache.get_or_compute("bb", _embed)
+        np.testing.assert_array_equal(cache.get_or_compute("a", _embed), [1.0, 1.0])
+        cache.get_or_compute("ccc", _embed)  # evicts "bb", the least recently used
+        assert cache.get_or_compute("broken", lambda text: None) is None
+        assert cache.get_or_compute("broken", lambda text: None) is None
+
+        stats = cache.stats
+        assert (stats.hits, stats.misses, stats.evictions, len(cache)) == (1, 5, 1, 2)
+
+        now[0] += 61
+        cache.get_or_compute("a", _embed)
+        assert (cache.stats.expired, cache.stats.hits) == (1, 1)
+
+    @pytest.mark.unit
+    def test_concurrent_identical_requests_share_one_call(self):
+        """Test callers asking for an in-flight text wait for it instead of calling the provider."""
+        cache = QueryEmbeddingCache(max_entries=10)
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def slow_embed(text):
+            calls.append(text)
+            started.set()
+            release.wait(5)
+            return _embed(text)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            first = pool.submit(cache.get_or_compute, "login", slow_embed)
+            started.wait(5)
+            waiters = [pool.submit(cache.get_or_compute, "login", slow_embed) for _ in range(3)]
+            while cache.stats.coalesced < 3:
+                time.sleep(0.001)
+            release.set()
+            results = [first.result()] + [w.result() for w in waiters]
+
+        assert calls == ["login"]
+        assert all(np.array_equal(r, [5.0, 1.0]) for r in results)
+        assert (cache.stats.misses, cache.stats.coalesced) == (1, 3)
+        assert cache.stats.hit_rate == pytest.approx(0.75)
+        assert cache.stats.saved_seconds == pytest.approx(3 * cache.stats.provider_seconds)
+
+    @pytest.mark.unit
+    def test_persisted_cache_is_reloaded(self, tmp_path):
+        """Test saved embeddings are served by a new cache for the same model without provider calls."""
+        path = QueryEmbeddingCache.path_for_model(tmp_path, "models/text-embedding-004")
+        cache = QueryEmbeddingCache(max_entries=10, path=path)
+        cache.get_or_compute("auth token", _embed)
+        cache.save()
+
+        reloaded = QueryEmbeddingCache(max_entries=10, path=path)
+        vector = reloaded.get_or_compute("auth token", lambda text: pytest.fail("provider called"))
+
+        assert path.name == "models_text-embedding-004.npz"
+        assert vector.dtype == np.float32
+        np.testing.assert_array_equal(vector, [10.0, 1.0])
+        assert reloaded.stats.hits == 1
+
+    @pytest.mark.unit
+    def test_batch_lookup_embeds_only_missing_texts_once(self):
+        """Test a batch lookup embeds all uncached texts in one call and skips failed rows."""
+        cache = QueryEmbeddingCache(max_entries=10)
+        cache.get_or_compute("cached", _embed)
+        batches = []
+
+        def embed_many(texts):
+            batches.append(texts)
+            return np.array([[np.nan, np.nan] if t == "bad" else _embed(t) for t in texts], dtype=np.float32)
+
+        vectors = cache.get_many_or_compute(["cached", "new", "bad", "new"], embed_many)
+
+        assert batches == [["new", "bad"]]
+        np.testing.assert_array_equal(vectors[0], [6.0, 1.0])
+        np.testing.assert_array_equal(vectors[3], [3.0, 1.0])
+        assert vectors[2] is None
+        assert (cache.stats.hits, cache.stats.misses, len(cache)) == (1, 3, 2)
@@ -0,0 +1,152 @@
+"""
+Unit tests for collection aliases and blue-green re-indexing.
+"""
+import numpy as np
+import pytest
+from unittest.mock import Mock
+
+from testteller.core.llm.llm_manager import LLMManager
+from testteller.core.utils.exceptions import EmbeddingGenerationError
+from testteller.core.vector_store.chromadb_manager import ChromaDBManager
+from testteller.core.vector_store.collection_aliases import CollectionAliases, collection_versions
+from testteller.core.vector_store.reindex import CollectionReindexer, EmbeddingMigrator
+
+
+class FakeEmbeddingClient:
+    """Embedding client whose vectors depend on its model; texts in ``failing`` fail once."""
+    failing = set()
+
+    def __init__(self):
+        self.embedding_model = "small"
+
+    def get_embeddings_array(self, texts):
+        if self.failing.intersection(texts):
+            self.failing.clear()
+            return np.full((len(texts), 3), np.nan, dtype=np.float32)
+        scale = 2.0 if self.embedding_model == "large" else 1.0
+        return np.array([[float(len(t)) * scale, 1.0, scale] for t in texts], dtype=np.float32)
+
+    def get_embedding_sync(self, text):
+        return self.get_embeddings_array([text])[0].tolist()
+
+
+@pytest.fixture
+def embedding_llm_manager() -> Mock:
+    """LLM manager whose embeddings are derived from the text length."""
+    manager = Mock(spec=LLMManager)
+    manager.provider = "gemini"
+    manager.get_embeddings_array.side_effect = lambda texts: np.array(
+        [[float(len(t)), 1.0, 0.5] for t in texts], dtype=np.float32)
+    return manager
+
+
+def _store(llm_manager, tmp_path) -> ChromaDBManager:
+    return ChromaDBManager(
+        llm_manager=llm_manager, collection_name="reindexed", persist_directory=str(tmp_path / "chroma"),
+        use_remote=False)
+
+
+class TestCollectionAliases:
+    """Test cases for CollectionAliases."""
+
+    @pytest.mark.unit
+    def test_swap_history_and_versions(self, tmp_path):
+        """Test swaps keep the previous targets, most recent first, and versions sort numerically."""
+        aliases = CollectionAliases(str(tmp_path))
+        assert aliases.resolve("docs") == "docs"
+
+        assert aliases.swap("docs", "docs__v1") == "docs"
+        aliases.swap("docs", "docs__v2")
+
+        assert CollectionAliases(str(tmp_path)).resolve("docs") == "docs__v2"
+        assert aliases.history("docs") == ["docs__v1", "docs"]
+        assert collection_versions("docs", ["docs__v10", "other", "docs__v2", "docs", "docs__vx"]) == \
+            ["docs", "docs__v2", "docs__v10"]
+
+
+class TestCollectionReindexer:
+    """Test cases for CollectionReindexer."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_reindex_swaps_alias_and_keeps_rollback_versions(self, embedding_llm_manager, tmp_path):
+        """Test a rebuilt version is served by new managers, old versions are kept, collected and rolled back to."""
+        store = _store(embedding_llm_manager, tmp_path)
+        store.add_documents(
+            ["alpha", "beta", "gamma"], [{"source": "a"}, {"source": "b"}, {"source": "c"}], ["id1", "id2", "id3"])
+        embedding_llm_manager.get_embeddings_array.reset_mock()
+
+        reindexer = CollectionReindexer(store, batch_size=2, requests_per_minute=0)
+        report = await reindexer.reindex()
+
+        assert (report.source, report.target, report.documents, report.embedded) == \
+            ("reindexed", "reindexed__v1", 3, 3)
+        assert report.validated == 3
+        assert embedding_llm_manager.get_embeddings_array.call_count == 2
+        reopened = _store(embedding_llm_manager, tmp_path)
+        assert reopened.index_name == "reindexed__v1"
+        assert reopened.get_collection_count() == 3
+        assert reopened.collection.get(ids=["id2"])["metadatas"] == [{"source": "b"}]
+
+        second = await CollectionReindexer(store, reuse_embeddings=True).reindex(keep_versions=1)
+        assert (second.target, second.embedded, second.removed_versions) == ("reindexed__v2", 0, ["reindexed"])
+        assert set(store.list_collections()) == {"reindexed__v1", "reindexed__v2"}
+
+        assert reindexer.rollback() == ("reindexed__v2", "reindexed__v1")
+        assert _store(embedding_llm_manager, tmp_path).index_name == "reindexed__v1"
+        store.close()
+        reopened.close()
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_failed_build_leaves_live_collection(self, embedding_llm_manager, tmp_path):
+        """Test a build that fails drops the new version and keeps serving the old one."""
+        store = _store(embedding_llm_manager, tmp_path)
+        store.add_documents(["alpha", "beta"], [{"source": "a"}] * 2, ["id1", "id2"])
+        embedding_llm_manager.get_embeddings_array.side_effect = lambda texts: np.full(
+            (len(texts), 3), np.nan, dtype=np.float32)
+
+        with pytest.raises(EmbeddingGenerationError):
+            await CollectionReindexer(store, requests_per_minute=0).reindex()
+
+        assert store.list_collections() == ["reindexed"]
+        assert store.aliases.resolve("reindexed") == "reindexed"
+        assert store.get_collection_count() == 2
+        store.close()
+
+
+class TestEmbeddingMigrator:
+    """Test cases for EmbeddingMigrator."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_interrupted_migration_resumes_and_switches_query_model(self, monkeypatch, tmp_path):
+        """Test a failed page keeps progress, the rerun embeds only the rest, and reopened stores use the new model."""
+        monkeypatch.setattr(LLMManager, "_initialize_client", lambda self, provider=None: FakeEmbeddingClient())
+        store = _store(LLMManager(provider="gemini", embedding_provider="local"), tmp_path)
+        documents = ["alpha", "beta", "gamma", "delta", "epsilon"]
+        store.add_documents(documents, [{"source": d} for d in documents], [f"id{i}" for i in range(5)])
+
+        FakeEmbeddingClient.failing = {"gamma"}
+        with pytest.raises(EmbeddingGenerationError):
+            await EmbeddingMigrator(store, "local/large", batch_size=2, requests_per_minute=0).migrate()
+
+        assert store.aliases.resolve("reindexed") == "reindexed"
+        assert store.open_collection("reindexed__v1").count() == 2
+        assert store.llm_manager.embedding_spec == "local/small"
+
+        progress = []
+        report = await EmbeddingMigrator(store, "local/large", batch_size=2, requests_per_minute=0).migrate(
+            on_progress=lambda done, total: progress.append(done))
+
+        assert (report.target, report.resumed_from, report.embedded, report.documents) == ("reindexed__v1", 2, 3, 5)
+        assert (report.from_model, report.to_model) == ("local/small", "local/large")
+        assert progress == [4, 5]
+        assert store.llm_manager.embedding_spec == "local/large"
+        reopened = _store(LLMManager(provider="gemini", embedding_provider="local"), tmp_path)
+        assert reopened.index_name == "reindexed__v1"
+        assert reopened.llm_manager.embedding_spec == "local/large"
+        assert reopened.collection.get(ids=["id3"], include=["embeddings"])["embeddings"][0] == [10.0, 1.0, 2.0]
+        assert not list((tmp_path / "chroma").rglob("embedding_migration.json"))
+        store.close()
+        reopened.close()
@@ -0,0 +1,121 @@
+"""
+Unit tests for collection snapshot export and import.
+"""
+import zipfile
+
+import chromadb
+import numpy as np
+import pytest
+
+from testteller.core.data_ingestion.ingest_state import IngestStateStore
+from testteller.core.utils.exceptions import SnapshotError
+from testteller.core.vector_store.chromadb_manager import EMBEDDING_MODEL_METADATA_KEY
+from testteller.core.vector_store.collection_aliases import CollectionAliases
+from testteller.core.vector_store.snapshot import export_snapshot, import_snapshot
+
+
+def _client(path) -> chromadb.ClientAPI:
+    return chromadb.PersistentClient(path=str(path), settings=chromadb.config.Settings(anonymized_telemetry=False))
+
+
+@pytest.fixture
+def source_collection(tmp_path):
+    """Collection of five documents, one of them without metadata."""
+    collection = _client(tmp_path / "source").create_collection("docs__v2", metadata={"hnsw:space": "cosine"})
+    rng = np.random.default_rng(0)
+    collection.add(
+        ids=[f"id{i}" for i in range(5)],
+        documents=[f"document {i}" for i in range(5)],
+        metadatas=[{"source": f"file{i}.md"} for i in range(4)] + [None],
+        embeddings=rng.random((5, 8)).tolist())
+    return collection
+
+
+class TestSnapshot:
+    """Test cases for export_snapshot and import_snapshot."""
+
+    @pytest.mark.unit
+    def test_round_trip_in_pages_without_embedding_calls(self, source_collection, tmp_path):
+        """Test a paged float16 export loads back with its documents, metadata, model and code state."""
+        state = IngestStateStore("docs", str(tmp_path / "source"))
+        state.set_code_state("https://example.com/repo.git", "abc123")
+        path = str(tmp_path / "docs.snapshot")
+        progress = []
+
+        exported = export_snapshot(
+            source_collection, path, name="docs", embedding_model="openai/text-embedding-3-small",
+            state_dir=state.state_dir, page_size=2, dtype="float16",
+            on_progress=lambda done, total: progress.append(done))
+        assert (exported.documents, exported.pages, exported.dimension) == (5, 3, 8)
+        assert progress == [2, 4, 5]
+
+        client = _client(tmp_path / "node")
+        imported = import_snapshot(client, path, persist_directory=str(tmp_path / "node"), batch_size=3)
+
+        collection = client.get_collection("docs")
+        assert (imported.collection, imported.documents, collection.count()) == ("docs", 5, 5)
+        assert collection.metadata[EMBEDDING_MODEL_METADATA_KEY] == "openai/text-embedding-3-small"
+        assert collection.metadata["hnsw:space"] == "cosine"
+        loaded = collection.get(ids=["id1", "id4"], include=["documents", "metadatas", "embeddings"])
+        source = source_collection.get(ids=["id1", "id4"], include=["embeddings"])
+        assert loaded["documents"] == ["document 1", "document 4"]
+        assert loaded["metadatas"] == [{"source": "file1.md"}, None]
+        np.testing.assert_allclose(loaded["embeddings"], source["embeddings"], atol=1e-3)
+        assert IngestStateStore("docs", str(tmp_path / "node")).get_code_state(
+            "https://example.com/repo.git")["commit"] == "abc123"
+
+    @pytest.mark.unit
+    def test_import_refuses_to_overwrite_and_rejects_incomplete_files(self, source_collection, tmp_path):
+        """Test a populated collection is only replaced on request and files without a manifest are rejected."""
+        path = str(tmp_path / "docs.snapshot")
+        export_snapshot(source_collection, path, name="docs")
+        client = _client(tmp_path / "node")
+        import_snapshot(client, path, persist_directory=str(tmp_path / "node"))
+
+        with pytest.raises(SnapshotError, match="--replace"):
+            import_snapshot(client, path, persist_directory=str(tmp_path / "node"))
+        assert import_snapshot(client, path, persist_directory=str(tmp_path / "node"), replace=True).documents == 5
+
+        partial = tmp_path / "partial.snapshot"
+        with zipfile.ZipFile(partial, 'w') as zf:
+            zf.writestr("pages/000000.jsonl", "")
+        with pytest.raises(SnapshotError, match="no manifest"):
+            import_snapshot(client, str(partial), persist_directory=str(tmp_path / "node"))
+
+    @pytest.mark.unit
+    def test_replace_swaps_in_a_new_version_only_after_a_complete_load(self, source_collection, tmp_path):
+        """Test a corrupt snapshot leaves the live collection untouched and a good one is served through the alias."""
+        path = tmp_path / "docs.snapshot"
+        export_snapshot(source_collection, str(path), name="docs", page_size=2)
+        corrupt = tmp_path / "corrupt.snapshot"
+        with zipfile.ZipFile(path) as source, zipfile.ZipFile(corrupt, 'w') as target:
+            for member in source.namelist():
+                data = source.read(member)
+                # The last page loses a record, so it no longer matches its embeddings
+                target.writestr(member, b"" if member == "pages/000002.jsonl" else data)
+        node = str(tmp_path / "node")
+        client = _client(node)
+        import_snapshot(client, str(path), persist_directory=node)
+
+        with pytest.raises(SnapshotError, match="records"):
+            import_snapshot(client, str(corrupt), persist_directory=node, replace=True)
+        assert sorted(c.name for c in client.list_collections()) == ["docs"]
+        assert client.get_collection("docs").count() == 5
+
+        assert import_snapshot(client, str(path), persist_directory=node, replace=True).documents == 5
+        aliases = CollectionAliases(node)
+        assert (aliases.resolve("docs"), aliases.history("docs")) == ("docs__v1", ["docs"])
+        assert client.get_collection("docs__v1").count() == 5
+
+    @pytest.mark.unit
+    def test_failed_export_leaves_no_temporary_file(self, source_collection, tmp_path, monkeypatch):
+        """Test an export that fails part way removes its partial file and keeps the previous snapshot."""
+        path = tmp_path / "docs.snapshot"
+        export_snapshot(source_collection, str(path), name="docs")
+        previous = path.read_bytes()
+        monkeypatch.setattr(type(source_collection), "get", lambda *args, **kwargs: 1 / 0)
+
+        with pytest.raises(ZeroDivisionError):
+            export_snapshot(source_collection, str(path), name="docs")
+        assert [p.name for p in tmp_path.iterdir() if p.is_file()] == ["docs.snapshot"]
+        assert path.read_bytes() == previous
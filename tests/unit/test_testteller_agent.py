@@ -1,11 +1,22 @@
 """
 Unit tests for TestTellerAgent class.
 """
+import asyncio
+import numpy as np
 import pytest
 import os
 from pathlib import Path
 from unittest.mock import Mock, patch, AsyncMock, MagicMock
 from testteller.generator_agent.agent.testteller_agent import TestTellerAgent
+from testteller.core.data_ingestion.ingest_state import file_fingerprint
+
+
+def _iter_code_files(code_files):
+    """Mock for the CodeLoader iterators, streaming the given (source, content) pairs."""
+    async def iterate(*args):
+        for code_file in code_files:
+            yield code_file
+    return MagicMock(side_effect=iterate)
 
 
 class TestTestTellerAgent:
@@ -16,7 +27,7 @@ class TestTestTellerAgent:
         """Test TestTellerAgent initialization with default parameters."""
         with patch.dict(os.environ, mock_env_vars):
             with patch('testteller.generator_agent.agent.testteller_agent.LLMManager') as mock_llm:
-                with patch('testteller.generator_agent.agent.testteller_agent.ChromaDBManager') as mock_chroma:
+                with patch('testteller.generator_agent.agent.testteller_agent.create_vector_store') as mock_chroma:
                     mock_llm.return_value = Mock()
                     mock_chroma.return_value = Mock()
 
@@ -32,7 +43,7 @@ class TestTestTellerAgent:
     def test_init_with_custom_params(self, mock_env_vars, mock_llm_manager):
         """Test TestTellerAgent initialization with custom parameters."""
         with patch.dict(os.environ, mock_env_vars):
-            with patch('testteller.generator_agent.agent.testteller_agent.ChromaDBManager') as mock_chroma:
+            with patch('testteller.generator_agent.agent.testteller_agent.create_vector_store') as mock_chroma:
                 mock_chroma.return_value = Mock()
 
                 agent = TestTellerAgent(
@@ -53,7 +64,7 @@ class TestTestTellerAgent:
                 mock_settings.chromadb = mock_chromadb_settings
 
                 with patch('testteller.generator_agent.agent.testteller_agent.LLMManager'):
-                    with patch('testteller.generator_agent.agent.testteller_agent.ChromaDBManager'):
+                    with patch('testteller.generator_agent.agent.testteller_agent.create_vector_store'):
                         agent = TestTellerAgent()
                         assert agent.collection_name == "settings_collection"
 
@@ -82,7 +93,56 @@ class TestTestTellerAgent:
             str(test_file), 1000)
 
         # Verify vector store was called
-        mock_testteller_agent.vector_store.add_documents.assert_called_once()
+        mock_testteller_agent.vector_store.upsert_documents.assert_called_once()
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_ingest_pdf_streams_chunks_with_pages(self, mock_testteller_agent, temp_dir):
+        """Test PDFs are streamed in batches with page metadata."""
+        from testteller.core.data_ingestion.unified_document_parser import PageChunk
+
+        test_file = temp_dir / "spec.pdf"
+        test_file.write_bytes(b"%PDF-1.4")
+
+        async def fake_stream(file_path, chunk_size):
+            for i in range(70):
+                yield PageChunk(f"Requirement {i}", page_start=i // 10 + 1, page_end=i // 10 + 1)
+
+        mock_testteller_agent.unified_parser.stream_pdf_chunks = fake_stream
+        mock_testteller_agent.unified_parser.parse_for_rag = AsyncMock()
+
+        await mock_testteller_agent.ingest_documents_from_path(str(test_file))
+
+        mock_testteller_agent.unified_parser.parse_for_rag.assert_not_called()
+        calls = mock_testteller_agent.vector_store.upsert_documents.call_args_list
+        assert [len(call.args[0]) for call in calls] == [64, 6]
+        last_metadata = calls[-1].args[1][-1]
+        assert last_metadata["page_start"] == 7
+        assert last_metadata["chunk_index"] == 69
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_ingest_xlsx_streams_row_batches(self, mock_testteller_agent, temp_dir):
+        """Test workbooks are ingested as row batches with sheet metadata."""
+        from testteller.core.data_ingestion.unified_document_parser import RowChunk
+
+        test_file = temp_dir / "trace.xlsx"
+        test_file.write_bytes(b"PK")
+
+        async def fake_stream(file_path, rows_per_chunk):
+            yield RowChunk("Sheet: Reqs\nID, Title\nR1, Login", sheet="Reqs", row_start=2, row_end=2)
+            yield RowChunk("Sheet: Reqs\nID, Title\nR2, Logout", sheet="Reqs", row_start=3, row_end=3)
+
+        mock_testteller_agent.unified_parser.stream_xlsx_chunks = fake_stream
+
+        await mock_testteller_agent.ingest_documents_from_path(str(test_file))
+
+        mock_testteller_agent.vector_store.upsert_documents.assert_called_once()
+        contents, metadatas, ids = mock_testteller_agent.vector_store.upsert_documents.call_args.args
+        assert len(contents) == 2
+        assert metadatas[1]["sheet"] == "Reqs"
+        assert (metadatas[1]["row_start"], metadatas[1]["row_end"]) == (3, 3)
+        assert metadatas[1]["file_type"] == ".xlsx"
 
     @pytest.mark.asyncio
     @pytest.mark.unit
@@ -117,7 +177,7 @@ class TestTestTellerAgent:
         await mock_testteller_agent.ingest_documents_from_path(str(test_file))
 
         # Verify vector store was not called
-        mock_testteller_agent.vector_store.add_documents.assert_not_called()
+        mock_testteller_agent.vector_store.upsert_documents.assert_not_called()
 
     @pytest.mark.asyncio
     @pytest.mark.unit
@@ -144,21 +204,19 @@ class TestTestTellerAgent:
         repo_url = "https://github.com/test/repo.git"
 
         # Mock code loader
-        mock_testteller_agent.code_loader.load_code_from_repo = AsyncMock(
-            return_value=[("def test():\n    pass", "test.py")]
-        )
+        mock_testteller_agent.code_loader.iter_code_from_repo = _iter_code_files([("test.py", "def test():\n    pass")])
         mock_testteller_agent.code_loader.cleanup_repo = AsyncMock()
 
-        await mock_testteller_agent.ingest_code_from_source(repo_url)
+        await mock_testteller_agent.ingest_code_from_source(repo_url, cleanup_github_after=True)
 
         # Verify code loader was called
-        mock_testteller_agent.code_loader.load_code_from_repo.assert_called_once_with(
+        mock_testteller_agent.code_loader.iter_code_from_repo.assert_called_once_with(
             repo_url)
         mock_testteller_agent.code_loader.cleanup_repo.assert_called_once_with(
             repo_url)
 
         # Verify vector store was called
-        mock_testteller_agent.vector_store.add_documents.assert_called_once()
+        mock_testteller_agent.vector_store.upsert_documents.assert_called_once()
 
     @pytest.mark.asyncio
     @pytest.mark.unit
@@ -167,18 +225,16 @@ class TestTestTellerAgent:
         local_path = str(temp_dir)
 
         # Mock code loader
-        mock_testteller_agent.code_loader.load_code_from_local_folder = AsyncMock(
-            return_value=[("def test():\n    pass", "test.py")]
-        )
+        mock_testteller_agent.code_loader.iter_code_from_local_folder = _iter_code_files([("test.py", "def test():\n    pass")])
 
         await mock_testteller_agent.ingest_code_from_source(local_path)
 
         # Verify code loader was called
-        mock_testteller_agent.code_loader.load_code_from_local_folder.assert_called_once_with(
+        mock_testteller_agent.code_loader.iter_code_from_local_folder.assert_called_once_with(
             local_path)
 
         # Verify vector store was called
-        mock_testteller_agent.vector_store.add_documents.assert_called_once()
+        mock_testteller_agent.vector_store.upsert_documents.assert_called_once()
 
     @pytest.mark.asyncio
     @pytest.mark.unit
@@ -187,15 +243,312 @@ class TestTestTellerAgent:
         repo_url = "https://github.com/test/repo.git"
 
         # Mock code loader
-        mock_testteller_agent.code_loader.load_code_from_repo = AsyncMock(
-            return_value=[("def test():\n    pass", "test.py")]
+        mock_testteller_agent.code_loader.iter_code_from_repo = _iter_code_files([("test.py", "def test():\n    pass")])
+        mock_testteller_agent.code_loader.cleanup_repo = AsyncMock()
+
+        await mock_testteller_agent.ingest_code_from_source(repo_url)
+
+        # The clone cache is kept by default
+        mock_testteller_agent.code_loader.cleanup_repo.assert_not_called()
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_ingest_code_from_source_incremental(self, mock_testteller_agent, temp_dir):
+        """Test re-ingesting a repository only touches files changed since the recorded commit."""
+        from testteller.core.data_ingestion.code_loader import CodeChanges
+        from testteller.core.data_ingestion.ingest_state import IngestStateStore
+
+        repo_url = "https://github.com/test/repo.git"
+        mock_testteller_agent.ingest_state = IngestStateStore(
+            mock_testteller_agent.collection_name, persist_directory=str(temp_dir))
+        mock_testteller_agent.ingest_state.set_code_state(repo_url, "a" * 40)
+
+        mock_testteller_agent.code_loader.load_code_changes_from_repo = AsyncMock(
+            return_value=CodeChanges(
+                commit="b" * 40,
+                changed=[(f"{repo_url}:app.py", "def app():\n    return 2")],
+                deleted=[f"{repo_url}:removed.py"]
+            )
         )
+        mock_testteller_agent.code_loader.iter_code_from_repo = MagicMock()
         mock_testteller_agent.code_loader.cleanup_repo = AsyncMock()
 
         await mock_testteller_agent.ingest_code_from_source(repo_url, cleanup_github_after=False)
 
-        # Verify cleanup was not called
-        mock_testteller_agent.code_loader.cleanup_repo.assert_not_called()
+        mock_testteller_agent.code_loader.load_code_changes_from_repo.assert_called_once_with(repo_url, "a" * 40)
+        mock_testteller_agent.code_loader.iter_code_from_repo.assert_not_called()
+        # The modified file keeps its id and is upserted in place; only the removed file is deleted
+        mock_testteller_agent.vector_store.delete_where.assert_called_once_with(
+            {"source": {"$in": [f"{repo_url}:removed.py"]}})
+        contents, metadatas, _ = mock_testteller_agent.vector_store.upsert_documents.call_args.args
+        assert contents == ["def app():\n    return 2"]
+        assert mock_testteller_agent.ingest_state.get_code_state(repo_url)["commit"] == "b" * 40
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_ingest_code_full_reload_prunes_removed_files(self, mock_testteller_agent, tmp_path):
+        """Test a full reload after an unusable recorded commit deletes chunks of files no longer in the tree."""
+        from git import Actor, Repo
+        from testteller.core.data_ingestion.code_loader import CodeLoader
+
+        author = Actor("Test", "test@example.com")
+        origin_path = tmp_path / "origin"
+        origin_path.mkdir()
+        origin = Repo.init(str(origin_path))
+        (origin_path / "app.py").write_text("def app():\n    return 1\n")
+        (origin_path / "utils.py").write_text("def helper():\n    return 2\n")
+        origin.git.add(A=True)
+        origin.index.commit("initial", author=author, committer=author)
+        repo_url = f"file://{origin_path}"
+        mock_testteller_agent.code_loader = CodeLoader(clone_dir_base=str(tmp_path / "clones"))
+        vector_store = mock_testteller_agent.vector_store
+
+        await mock_testteller_agent.ingest_code_from_source(repo_url)
+        _, metadatas, ids = vector_store.upsert_documents.call_args.args
+        vector_store.iter_documents.return_value = [{"ids": list(ids), "metadatas": list(metadatas)}]
+
+        (origin_path / "utils.py").unlink()
+        origin.git.add(A=True)
+        origin.index.commit("remove utils", author=author, committer=author)
+        # The recorded commit no longer exists (e.g. after a force-push), so no diff can be computed
+        mock_testteller_agent.ingest_state.set_code_state(repo_url, "0" * 40)
+        vector_store.upsert_documents.reset_mock()
+
+        await mock_testteller_agent.ingest_code_from_source(repo_url)
+
+        stale_ids = [doc_id for doc_id, metadata in zip(ids, metadatas)
+                     if metadata["source"] == f"{repo_url}:utils.py"]
+        assert stale_ids
+        vector_store.delete_ids.assert_called_once_with(stale_ids)
+        _, metadatas, _ = vector_store.upsert_documents.call_args.args
+        assert [m["source"] for m in metadatas] == [f"{repo_url}:app.py"]
+        assert mock_testteller_agent.ingest_state.get_code_state(repo_url)["commit"] == origin.head.commit.hexsha
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_ingest_code_resume_skips_stored_batches(self, mock_testteller_agent, temp_dir):
+        """Test a resumed code ingest only embeds files the interrupted run did not store."""
+        code_files = [(f"local:mod{i}.py", f"VALUE = {i}") for i in range(100)]
+        mock_testteller_agent.code_loader.iter_code_from_local_folder = _iter_code_files(code_files)
+        upsert_documents = mock_testteller_agent.vector_store.upsert_documents
+        upsert_documents.side_effect = [None, RuntimeError("provider outage")]
+
+        with pytest.raises(RuntimeError):
+            await mock_testteller_agent.ingest_code_from_source(str(temp_dir))
+
+        upsert_documents.reset_mock(side_effect=True)
+        await mock_testteller_agent.ingest_code_from_source(str(temp_dir), resume=True)
+
+        contents = upsert_documents.call_args.args[0]
+        assert upsert_documents.call_count == 1
+        assert contents == [f"VALUE = {i}" for i in range(64, 100)]
+        assert len(mock_testteller_agent.ingest_run.skipped_files) == 64
+
+        # The run completed, so another resume starts over
+        upsert_documents.reset_mock()
+        await mock_testteller_agent.ingest_code_from_source(str(temp_dir), resume=True)
+        assert upsert_documents.call_count == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_ingest_pdf_resume_continues_after_last_batch(self, mock_testteller_agent, temp_dir):
+        """Test a resumed PDF ingest skips both finished files and stored chunk batches."""
+        from testteller.core.data_ingestion.unified_document_parser import PageChunk
+
+        (temp_dir / "done.md").write_text("# Already ingested")
+        test_file = temp_dir / "spec.pdf"
+        test_file.write_bytes(b"%PDF-1.4")
+
+        async def fake_stream(file_path, chunk_size):
+            for i in range(150):
+                yield PageChunk(f"Requirement {i}", page_start=1, page_end=1)
+
+        mock_testteller_agent.unified_parser.stream_pdf_chunks = fake_stream
+        mock_testteller_agent._ingest_document_fallback = AsyncMock(side_effect=RuntimeError("provider outage"))
+        parsed_paths = []
+
+        async def fake_iter_parse(file_paths, *args, **kwargs):
+            parsed_paths.extend(file_paths)
+            return
+            yield
+
+        mock_testteller_agent.unified_parser.iter_parse = fake_iter_parse
+        upsert_documents = mock_testteller_agent.vector_store.upsert_documents
+        upsert_documents.side_effect = [None, RuntimeError("provider outage")]
+
+        with pytest.raises(RuntimeError):
+            await mock_testteller_agent.ingest_documents_from_path(str(temp_dir))
+        # As if an earlier part of the interrupted run had stored the markdown file
+        done_file = str(temp_dir / "done.md")
+        mock_testteller_agent.ingest_run.record_file(done_file, file_fingerprint(done_file))
+
+        upsert_documents.reset_mock(side_effect=True)
+        parsed_paths.clear()
+        await mock_testteller_agent.ingest_documents_from_path(str(temp_dir), resume=True)
+
+        run = mock_testteller_agent.ingest_run
+        assert run.skipped_files == [str(temp_dir / "done.md")]
+        assert run.skipped_chunks == 64
+        metadatas = [m for call in upsert_documents.call_args_list for m in call.args[1]]
+        assert [m["chunk_index"] for m in metadatas] == list(range(64, 150))
+        # The finished file is skipped and the PDF is streamed, so nothing is left to parse
+        assert parsed_paths == []
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_ingest_directory_stores_each_parsed_document(self, mock_testteller_agent, temp_dir):
+        """Test directory documents are stored one by one as parsed, falling back for failed parses."""
+        (temp_dir / "a.md").write_text("# Login\n\nUsers sign in with email.")
+        (temp_dir / "b.md").write_text("# Logout\n\nUsers sign out.")
+        parser = mock_testteller_agent.unified_parser
+        parse_document = parser.parse_document
+
+        async def parse_or_fail(file_path, *args):
+            if file_path.endswith("b.md"):
+                raise ValueError("unparseable")
+            return await parse_document(file_path, *args)
+
+        parser.parse_document = parse_or_fail
+
+        await mock_testteller_agent.ingest_documents_from_path(str(temp_dir))
+
+        upsert_calls = mock_testteller_agent.vector_store.upsert_documents.call_args_list
+        stored = {call.args[1][0]["source"]: call.args[1][0] for call in upsert_calls}
+        assert len(upsert_calls) == 2
+        assert stored[str(temp_dir / "a.md")]["total_chunks"] == 1
+        assert stored[str(temp_dir / "b.md")] == {"source": str(temp_dir / "b.md"), "type": "document"}
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_watch_documents_applies_batches(self, mock_testteller_agent, temp_dir):
+        """Test each watched batch removes stale chunks, then re-ingests changed files together."""
+        from testteller.core.data_ingestion.file_watcher import WatchBatch
+
+        batches = [
+            WatchBatch(changed=[str(temp_dir / "a.md")], deleted=[]),
+            WatchBatch(changed=[str(temp_dir / "b.md")], deleted=[str(temp_dir / "old.md")]),
+        ]
+
+        class FakeWatcher:
+            async def batches(self, stop_event=None):
+                for batch in batches:
+                    yield batch
+
+        mock_testteller_agent._ingest_files = AsyncMock(side_effect=[RuntimeError("provider outage"), None])
+        applied = []
+
+        await mock_testteller_agent.watch_documents(
+            str(temp_dir), chunk_size=500, on_batch=applied.append, watcher=FakeWatcher())
+
+        # The failed first cycle is reported in the log but does not stop watching
+        assert applied == [batches[1]]
+        delete_calls = mock_testteller_agent.vector_store.delete_where.call_args_list
+        assert [call.args[0] for call in delete_calls] == [{"source": {"$in": [str(temp_dir / "old.md")]}}]
+        mock_testteller_agent._ingest_files.assert_called_with(
+            [str(temp_dir / "b.md")], True, 500, "watched changes")
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_content_chunking_keeps_ids_of_unedited_chunks(self, mock_testteller_agent, temp_dir):
+        """Test content chunking gives unchanged chunks the same ids after an edit and prunes the rest."""
+        paragraphs = [f"Requirement {i}. The checkout flow must handle case {i} within two seconds." * 3
+                      for i in range(30)]
+        test_file = temp_dir / "spec.md"
+        test_file.write_text("\n\n".join(paragraphs))
+        upsert_documents = mock_testteller_agent.vector_store.upsert_documents
+
+        await mock_testteller_agent.ingest_documents_from_path(str(test_file), chunk_size=500, chunking_mode="content")
+        first_ids = upsert_documents.call_args.args[2]
+
+        test_file.write_text("\n\n".join(paragraphs[:5] + ["A new requirement about refunds."] + paragraphs[5:]))
+        await mock_testteller_agent.reingest_documents([str(test_file)], [], chunk_size=500)
+        second_ids = upsert_documents.call_args.args[2]
+
+        assert len(set(first_ids) & set(second_ids)) >= len(first_ids) * 3 // 4
+        # Changed files are not deleted up front; only chunks the edit removed are pruned
+        mock_testteller_agent.vector_store.delete_where.assert_not_called()
+        mock_testteller_agent.vector_store.prune_source.assert_called_with(str(test_file), second_ids)
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_reingest_upserts_edited_document_in_fixed_mode(self, mock_testteller_agent, temp_dir):
+        """Test an edited document is upserted under its positional ids and its extra chunks pruned."""
+        test_file = temp_dir / "spec.md"
+        test_file.write_text("Login must lock the account after five failed attempts.")
+        upsert_documents = mock_testteller_agent.vector_store.upsert_documents
+
+        await mock_testteller_agent.ingest_documents_from_path(str(test_file))
+        first_ids = upsert_documents.call_args.args[2]
+        test_file.write_text("Login must lock the account after three failed attempts.")
+        await mock_testteller_agent.reingest_documents([str(test_file)], [])
+
+        contents, _, second_ids = upsert_documents.call_args.args
+        assert second_ids == first_ids
+        assert "three failed attempts" in contents[0]
+        mock_testteller_agent.vector_store.delete_where.assert_not_called()
+        mock_testteller_agent.vector_store.prune_source.assert_called_with(str(test_file), second_ids)
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_near_duplicate_chunks_are_not_embedded(self, mock_testteller_agent, temp_dir):
+        """Test near-duplicates of stored or same-batch chunks are skipped and the savings reported."""
+        boilerplate = (
+            "This document is confidential and intended only for the QA team. Do not distribute it "
+            "outside the organisation without written approval from the compliance office. Test data "
+            "referenced here must be anonymised before use in shared environments, and any defects found "
+            "while executing these cases are tracked in the central issue tracker under the release label. "
+            "Questions about this template go to the quality engineering chapter lead.")
+        edited = boilerplate.replace("compliance", "legal")
+        stored = set()
+        mock_testteller_agent.vector_store.get_existing_ids.side_effect = lambda ids: stored & set(ids)
+        mock_testteller_agent.vector_store.upsert_documents.side_effect = \
+            lambda contents, metadatas, ids: stored.update(ids)
+        (temp_dir / "a.md").write_text("Login must lock the account after five failed attempts in a row today.")
+
+        await mock_testteller_agent.ingest_documents_from_path(str(temp_dir / "a.md"), dedup=True)
+        await mock_testteller_agent._store_chunks(
+            [boilerplate, edited, "Checkout must retry declined card payments once before showing an error."],
+            [{"source": "b.md"}] * 3, ["b0", "b1", "b2"])
+        await mock_testteller_agent._store_chunks([boilerplate + " "], [{"source": "c.md"}], ["c0"])
+
+        stats = mock_testteller_agent.near_duplicate_stats
+        assert stats.skipped == 2
+        assert stats.skipped_chars == len(edited) + len(boilerplate) + 1
+        assert {"b0", "b2"} <= stored
+        assert not {"b1", "c0"} & stored
+        assert len(mock_testteller_agent.near_duplicate_index) == len(stored)
+        assert mock_testteller_agent.near_duplicate_index.path.exists()
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_plan_document_ingestion_stores_nothing(self, mock_testteller_agent, temp_dir):
+        """Test a dry run estimates the ingestion without embedding, storing or journaling anything."""
+        text = " ".join(f"Requirement {i}: checkout retries failed card payments {i % 7} times." for i in range(80))
+        (temp_dir / "a.md").write_text(text)
+        (temp_dir / "b.txt").write_text("Login must lock the account after five failed attempts.")
+        (temp_dir / "c.md").write_text(text)
+
+        plan = await mock_testteller_agent.plan_document_ingestion(str(temp_dir), dedup=True)
+
+        mock_testteller_agent.vector_store.upsert_documents.assert_not_called()
+        assert not mock_testteller_agent.ingest_journal.path.exists()
+        assert not mock_testteller_agent.near_duplicate_index.path.exists()
+        assert plan.files_by_type == {".md": 2, ".txt": 1}
+        assert plan.provider == "gemini"
+        # c.md repeats a.md, so its chunks are near-duplicates that would not be embedded
+        assert plan.near_duplicate_chunks == plan.new_chunks - 1
+        assert plan.chunks == plan.new_chunks + plan.near_duplicate_chunks
+        assert len(text) <= plan.tokens * 4 < len(text) * 2
+        assert 0 < plan.provider_calls <= plan.new_chunks
+
+    @pytest.mark.unit
+    def test_fixed_chunk_ids_are_positional(self, mock_testteller_agent):
+        """Test fixed mode keeps the historical positional chunk ids."""
+        import hashlib
+
+        assert mock_testteller_agent.chunking_mode == "fixed"
+        assert mock_testteller_agent._chunk_id("a.md", "text", 3) == hashlib.sha256(b"doc:a.md:chunk:3").hexdigest()
+        assert mock_testteller_agent._chunk_id("a.md", "text") == hashlib.sha256(b"doc:a.md").hexdigest()
 
     @pytest.mark.asyncio
     @pytest.mark.unit
@@ -204,13 +557,12 @@ class TestTestTellerAgent:
         repo_url = "https://github.com/test/empty-repo.git"
 
         # Mock code loader to return empty list
-        mock_testteller_agent.code_loader.load_code_from_repo = AsyncMock(
-            return_value=[])
+        mock_testteller_agent.code_loader.iter_code_from_repo = _iter_code_files([])
 
         await mock_testteller_agent.ingest_code_from_source(repo_url)
 
         # Verify vector store was not called
-        mock_testteller_agent.vector_store.add_documents.assert_not_called()
+        mock_testteller_agent.vector_store.upsert_documents.assert_not_called()
 
     @pytest.mark.asyncio
     @pytest.mark.unit
@@ -219,7 +571,7 @@ class TestTestTellerAgent:
         repo_url = "https://github.com/test/repo.git"
 
         # Mock code loader to raise exception
-        mock_testteller_agent.code_loader.load_code_from_repo = AsyncMock(
+        mock_testteller_agent.code_loader.iter_code_from_repo = MagicMock(
             side_effect=Exception("Clone error")
         )
 
@@ -325,6 +677,129 @@ class TestTestTellerAgent:
         with pytest.raises(Exception, match="Query error"):
             await mock_testteller_agent.generate_test_cases(code_context)
 
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_generate_test_cases_uses_generation_cache(self, mock_testteller_agent, mock_llm_response):
+        """Test unchanged retrieval reuses the cached generation and changed retrieval or use_cache=False do not."""
+        agent = mock_testteller_agent
+        agent.generation_cache_enabled = True
+        agent.llm_manager.generate_text_async = AsyncMock(return_value=mock_llm_response)
+        retrieval = {"ids": [["c1", "c2"]], "documents": [["Login spec", "Token spec"]], "metadatas": [[{}, {}]]}
+        agent.vector_store.query_similar.return_value = retrieval
+
+        assert await agent.generate_test_cases("Login  tests", n_retrieved_docs=2) == mock_llm_response
+        assert agent.last_generation_cached is False
+        assert await agent.generate_test_cases(" Login tests ", n_retrieved_docs=2) == mock_llm_response
+        assert agent.last_generation_cached is True
+        assert agent.llm_manager.generate_text_async.await_count == 1
+
+        await agent.generate_test_cases("Login tests", n_retrieved_docs=2, use_cache=False)
+        assert agent.llm_manager.generate_text_async.await_count == 2
+
+        retrieval["documents"] = [["Login spec v2", "Token spec"]]
+        await agent.generate_test_cases("Login tests", n_retrieved_docs=2)
+        assert (agent.llm_manager.generate_text_async.await_count, agent.last_generation_cached) == (3, False)
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_generate_test_cases_bulk(self, mock_testteller_agent, mock_llm_response):
+        """Test bulk generation retrieves once, bounds concurrency and isolates failing queries."""
+        agent = mock_testteller_agent
+        agent.generation_cache_enabled = False
+        agent.vector_store.query_similar_batch.side_effect = lambda query_texts, n_results: [
+            {"ids": [[f"c{i}"]], "documents": [[f"context {i}"]], "metadatas": [[{}]]}
+            for i in range(len(query_texts))]
+        in_flight, peak = 0, 0
+
+        async def generate(prompt):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if "story 3" in prompt:
+                raise RuntimeError("provider error")
+            return mock_llm_response
+
+        agent.llm_manager.generate_text_async = AsyncMock(side_effect=generate)
+        finished = []
+
+        async def on_result(index, result):
+            finished.append(index)
+
+        queries = [f"story {i}" for i in range(6)]
+        report = await agent.generate_test_cases_bulk(queries, n_retrieved_docs=1, concurrency=2, on_result=on_result)
+
+        agent.vector_store.query_similar_batch.assert_called_once_with(query_texts=queries, n_results=1)
+        agent.vector_store.query_similar.assert_not_called()
+        assert peak == 2
+        assert sorted(finished) == list(range(6))
+        assert [r.query for r in report.results] == queries
+        assert (report.succeeded, report.failed) == (5, 1)
+        assert report.results[3].error == "provider error"
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_generation_cache_key_ignores_own_stored_output(self, mock_testteller_agent):
+        """Test test cases stored from the same query do not change the cache key."""
+        agent = mock_testteller_agent
+        docs = {"ids": [["c1", "c2"]], "documents": [["Login spec", "Token spec"]], "metadatas": [[{}, {}]]}
+        own = {"type": "generated_test_case", "generation_query": "Login tests"}
+        with_feedback = {"ids": [["g1", "c1", "c2"]], "documents": [["Test Case 1", "Login spec", "Token spec"]],
+                         "metadatas": [[own, {}, {}]]}
+        agent.vector_store.query_similar.return_value = with_feedback
+
+        key = await agent._get_generation_cache_key(
+            "Login tests", {"ids": [["g1", "c1"]], "documents": [["Test Case 1", "Login spec"]],
+                            "metadatas": [[own, {}]]}, 2)
+
+        agent.vector_store.query_similar.assert_called_once_with(query_text="Login tests", n_results=3)
+        assert key == await agent._get_generation_cache_key("Login tests", docs, 2)
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_store_generated_test_cases_batches_dedup_and_write(self, mock_testteller_agent):
+        """Test chunks are embedded, checked for duplicates and stored with one call each."""
+        agent = mock_testteller_agent
+        login = "Verify login succeeds with a valid user name and password"
+        logout = "Verify logout clears the session cookie and redirects home"
+        content = f"Test Case 1: {login}\nTest Case 2: {logout}\nTest Case 3: {logout}"
+        agent.llm_manager.get_embeddings_array = Mock(
+            side_effect=lambda texts: np.ones((len(texts), 3), dtype=np.float32) * np.arange(len(texts))[:, None])
+        agent.vector_store.query_by_embeddings.return_value = {
+            "documents": [[f"Test Case 1: {login}"], [f"Test Case 1: {login}"], []]}
+        agent.vector_store.get_metadatas_where.return_value = (["old"], [{"generation_timestamp": "2000-01-01"}])
+
+        with patch.object(agent, '_calculate_quality_score', return_value=1.0):
+            stored = await agent.store_generated_test_cases(content, "Auth tests")
+
+        assert stored is True
+        agent.llm_manager.get_embeddings_array.assert_called_once()
+        lookup = agent.vector_store.query_by_embeddings.call_args
+        assert lookup.kwargs["where"] == {"$and": [{"type": "generated_test_case"}, {"generation_query": "Auth tests"}]}
+        agent.vector_store.add_documents.assert_called_once()
+        write = agent.vector_store.add_documents.call_args.kwargs
+        assert write["documents"] == [f"Test Case 2: {logout}"]
+        assert write["metadatas"][0]["chunk_index"] == 1
+        np.testing.assert_array_equal(write["embeddings"], [[1.0, 1.0, 1.0]])
+        # Retention is enforced right after the write
+        agent.vector_store.get_metadatas_where.assert_called_once_with({"type": "generated_test_case"})
+        agent.vector_store.delete_ids.assert_called_once_with(["old"])
+
+    @pytest.mark.unit
+    def test_find_duplicate_test_cases_keeps_matches_of_dropped_ones(self, mock_testteller_agent):
+        """Test only kept test cases rule out later matches in the batch."""
+        words = [f"w{i}" for i in range(12)]
+        first = " ".join(words[:10])
+        second = " ".join(words[1:11])  # matches first
+        third = " ".join(words[2:12])  # matches second only
+        mock_testteller_agent.vector_store.query_by_embeddings.return_value = {"documents": [[], [], [], []]}
+
+        duplicates = mock_testteller_agent._find_duplicate_test_cases(
+            [first, second, third, first], np.zeros((4, 3), dtype=np.float32), "Auth tests")
+
+        assert duplicates == [False, True, False, True]
+
     @pytest.mark.unit
     def test_add_test_cases(self, mock_testteller_agent):
         """Test adding test cases to vector store."""
@@ -127,6 +127,82 @@ So that I can access my personal dashboard
         assert 'title' in result.structured_content
         assert 'sections' in result.structured_content
 
+    @pytest.mark.asyncio
+    async def test_stream_pdf_chunks_page_metadata(self, parser, tmp_path):
+        """Test streamed PDF chunks carry the page range they came from"""
+        import fitz
+
+        pdf_path = tmp_path / "spec.pdf"
+        document = fitz.open()
+        for number in range(1, 7):
+            page = document.new_page()
+            page.insert_text((72, 72), f"Requirement {number}: " + "detail " * 10)
+        document.save(str(pdf_path))
+        document.close()
+
+        chunks = [chunk async for chunk in parser.stream_pdf_chunks(pdf_path, chunk_size=150, window_size=2)]
+
+        assert len(chunks) > 1
+        assert chunks[0].page_start == 1
+        assert chunks[-1].page_end == 6
+        for chunk in chunks:
+            assert chunk.text
+            assert chunk.page_start <= chunk.page_end
+        assert "Requirement 6" in chunks[-1].text
+
+    def test_smart_chunks_break_at_size_and_headings(self, parser):
+        """Test smart chunking splits on size and section boundaries"""
+        content = "# Intro\n" + "a" * 40 + "\n" + "b" * 40 + "\n# Next\n" + "c" * 10
+
+        chunks = parser._create_smart_chunks(content, 60)
+
+        assert chunks == ["# Intro\n" + "a" * 40, "b" * 40 + "\n# Next", "c" * 10]
+
+    def test_content_chunks_survive_local_edit(self, parser):
+        """Test content-defined chunks before and after an edit are mostly identical"""
+        paragraphs = [
+            " ".join(f"Requirement {p}.{s} covers login case {p * s} for the checkout flow." for s in range(1, 5))
+            for p in range(1, 41)
+        ]
+        original = "\n\n".join(paragraphs)
+        edited = "\n\n".join(paragraphs[:2] + ["An inserted paragraph about password resets."] + paragraphs[2:])
+
+        before = parser._create_content_chunks(original, 1000)
+        after = parser._create_content_chunks(edited, 1000)
+
+        assert all(len(chunk) <= 1000 for chunk in before + after)
+        assert "".join(before).replace("\n", "").replace(" ", "") == original.replace("\n", "").replace(" ", "")
+        unchanged = set(before) & set(after)
+        assert len(unchanged) >= len(before) - 2
+
+    def test_content_chunks_split_oversized_text(self, parser):
+        """Test content-defined chunking bounds chunks without sentence or line breaks"""
+        chunks = parser._create_content_chunks("word " * 500, 300)
+
+        assert len(chunks) > 1
+        assert all(0 < len(chunk) <= 300 for chunk in chunks)
+
+    @pytest.mark.asyncio
+    async def test_stream_pdf_content_chunks(self, parser, tmp_path):
+        """Test streamed PDFs can use content-defined chunking with page ranges"""
+        import fitz
+
+        pdf_path = tmp_path / "spec.pdf"
+        document = fitz.open()
+        for number in range(1, 7):
+            page = document.new_page()
+            page.insert_text((72, 72), f"Requirement {number}. " + "Detail sentence. " * 5)
+        document.save(str(pdf_path))
+        document.close()
+
+        chunks = [chunk async for chunk in parser.stream_pdf_chunks(
+            pdf_path, chunk_size=200, window_size=2, chunking_mode="content")]
+
+        assert chunks[0].page_start == 1
+        assert chunks[-1].page_end == 6
+        assert all(len(chunk.text) <= 200 and chunk.page_start <= chunk.page_end for chunk in chunks)
+        assert any("Requirement 6" in chunk.text for chunk in chunks if chunk.page_end == 6)
+
     @pytest.mark.asyncio
     async def test_parse_for_automation_mode(self, parser, temp_md_file):
         """Test automation parsing mode"""
@@ -12,7 +12,7 @@ from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from pathlib import Path
 
-from ..core.vector_store.chromadb_manager import ChromaDBManager
+from ..core.vector_store.base import VectorStore
 from ..core.llm.llm_manager import LLMManager
 from .parser.markdown_parser import TestCase
 
@@ -71,7 +71,7 @@ class ApplicationContext:
 class ApplicationKnowledgeExtractor:
     """Extracts real application knowledge from vector store."""
     
-    def __init__(self, vector_store: ChromaDBManager, llm_manager: Optional[LLMManager] = None,
+    def __init__(self, vector_store: VectorStore, llm_manager: Optional[LLMManager] = None,
                  num_context_docs: int = 5):
         self.vector_store = vector_store
         self.llm_manager = llm_manager or LLMManager()
@@ -13,7 +13,8 @@ from typing_extensions import Annotated
 from ..core.utils.loader import with_progress_bar_sync
 from ..core.data_ingestion.unified_document_parser import UnifiedDocumentParser, DocumentType
 from ..core.constants import SUPPORTED_LANGUAGES, SUPPORTED_FRAMEWORKS
-from ..core.vector_store.chromadb_manager import ChromaDBManager
+from ..core.vector_store.base import VectorStore, create_vector_store
+from ..core.vector_store.query_cache import QueryCacheStats
 from ..core.llm.llm_manager import LLMManager
 from ..config import settings
 
@@ -110,7 +111,7 @@ def validate_framework(language: str, framework: str) -> bool:
     return framework in SUPPORTED_FRAMEWORKS.get(language, [])
 
 
-def initialize_vector_store(collection_name: str) -> ChromaDBManager:
+def initialize_vector_store(collection_name: str) -> VectorStore:
     """Initialize vector store using configuration settings."""
     try:
         # Use settings to get ChromaDB configuration
@@ -129,7 +130,7 @@ def initialize_vector_store(collection_name: str) -> ChromaDBManager:
         
         # Initialize vector store with LLM manager
         llm_manager = LLMManager()  # Uses settings configuration
-        vector_store = ChromaDBManager(llm_manager, persist_directory=persist_directory)
+        vector_store = create_vector_store(llm_manager, persist_directory=persist_directory)
         
         # Test connectivity by listing collections
         try:
@@ -334,6 +335,8 @@ def automate_command(
             print(f"   • {file_name} ({file_size:,} chars)")
         
         print(f"\n📁 Output directory: {output_path.absolute()}")
+        print_query_cache_report(vector_store)
+        vector_store.close()
         
         # 7. Next steps
         print_next_steps(language, framework, output_path)
@@ -398,6 +401,15 @@ def parse_selection(selection: str, max_index: int) -> list:
     return sorted(indices)
 
 
+def print_query_cache_report(vector_store):
+    """Print how many context lookups the query embedding cache answered."""
+    stats = getattr(getattr(vector_store, 'query_cache', None), 'stats', None)
+    if not isinstance(stats, QueryCacheStats) or not stats.lookups:
+        return
+    print(f"🔎 Query embedding cache: {stats.hit_rate:.0%} of {stats.lookups} lookups served without a "
+          f"provider call (~{stats.saved_seconds:.1f}s saved)")
+
+
 def print_next_steps(language: str, framework: str, output_dir: Path):
     """Print next steps for generated tests."""
     print("\n📚 Next Steps:")
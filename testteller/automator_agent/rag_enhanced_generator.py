@@ -14,7 +14,7 @@ from pathlib import Path
 from .base_generator import BaseTestGenerator
 from .application_context import ApplicationKnowledgeExtractor, ApplicationContext
 from .parser.markdown_parser import TestCase
-from ..core.vector_store.chromadb_manager import ChromaDBManager
+from ..core.vector_store.base import VectorStore
 from ..core.llm.llm_manager import LLMManager
 
 logger = logging.getLogger(__name__)
@@ -23,7 +23,7 @@ logger = logging.getLogger(__name__)
 class RAGEnhancedTestGenerator(BaseTestGenerator):
     """Test generator that uses RAG to create complete, working test code."""
     
-    def __init__(self, framework: str, output_dir: Path, vector_store: ChromaDBManager,
+    def __init__(self, framework: str, output_dir: Path, vector_store: VectorStore,
                  language: str = 'python', llm_manager: Optional[LLMManager] = None,
                  num_context_docs: int = 5):
         super().__init__(framework, output_dir)
@@ -766,7 +766,7 @@ class TestCodeValidator:
     """Validates and fixes generated test code."""
     __test__ = False  # Tell pytest this is not a test class
     
-    def __init__(self, vector_store: ChromaDBManager, llm_manager: LLMManager):
+    def __init__(self, vector_store: VectorStore, llm_manager: LLMManager):
         self.vector_store = vector_store
         self.llm_manager = llm_manager
     
@@ -20,27 +20,55 @@ from testteller.core.constants import (
     DEFAULT_LOG_LEVEL, DEFAULT_LOG_FORMAT,
     DEFAULT_CHROMA_HOST, DEFAULT_CHROMA_PORT, DEFAULT_CHROMA_USE_REMOTE,
     DEFAULT_CHROMA_PERSIST_DIRECTORY, DEFAULT_COLLECTION_NAME,
+    DEFAULT_QUERY_CACHE_SIZE, DEFAULT_QUERY_CACHE_TTL, DEFAULT_QUERY_CACHE_PERSIST,
+    DEFAULT_VECTOR_STORE_BACKEND, SUPPORTED_VECTOR_STORE_BACKENDS,
+    DEFAULT_FAISS_INDEX_FACTORY, DEFAULT_FAISS_SEARCH_PARAMS,
+    DEFAULT_HNSWLIB_M, DEFAULT_HNSWLIB_EF_CONSTRUCTION, DEFAULT_HNSWLIB_EF_SEARCH,
     DEFAULT_LLM_PROVIDER, SUPPORTED_LLM_PROVIDERS,
     DEFAULT_GEMINI_EMBEDDING_MODEL, DEFAULT_GEMINI_GENERATION_MODEL,
     DEFAULT_OPENAI_EMBEDDING_MODEL, DEFAULT_OPENAI_GENERATION_MODEL,
     DEFAULT_CLAUDE_GENERATION_MODEL, DEFAULT_CLAUDE_EMBEDDING_PROVIDER,
     DEFAULT_LLAMA_EMBEDDING_MODEL, DEFAULT_LLAMA_GENERATION_MODEL, DEFAULT_OLLAMA_BASE_URL,
+    LOCAL_EMBEDDING_PROVIDER, LOCAL_EMBEDDING_MODEL, DEFAULT_LOCAL_EMBEDDING_DIMENSION,
+    DEFAULT_EMBEDDING_PROVIDER, SUPPORTED_EMBEDDING_PROVIDERS,
     DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_OVERLAP,
+    DEFAULT_DOCUMENT_LOADER_BACKEND, SUPPORTED_DOCUMENT_LOADER_BACKENDS,
+    DEFAULT_DOCUMENT_LOADER_WORKERS, DEFAULT_DOCUMENT_EXTRACTION_TIMEOUT, DEFAULT_XLSX_ROWS_PER_CHUNK,
+    DEFAULT_TEXT_LOAD_CONCURRENCY, DEFAULT_BINARY_LOAD_CONCURRENCY,
+    DEFAULT_WATCH_DEBOUNCE_SECONDS, DEFAULT_WATCH_POLL_INTERVAL,
+    DEFAULT_CHUNKING_MODE, SUPPORTED_CHUNKING_MODES,
+    DEFAULT_NEAR_DUPLICATE_DETECTION, DEFAULT_NEAR_DUPLICATE_MAX_DISTANCE,
+    DEFAULT_CODE_CLONE_MODE, SUPPORTED_CODE_CLONE_MODES,
+    DEFAULT_CODE_MAX_FILE_SIZE, DEFAULT_CODE_READ_WORKERS,
     DEFAULT_CODE_EXTENSIONS, DEFAULT_TEMP_CLONE_DIR,
     DEFAULT_OUTPUT_FILE,
-    DEFAULT_API_RETRY_ATTEMPTS, DEFAULT_API_RETRY_WAIT_SECONDS,
+    DEFAULT_GENERATION_CACHE, DEFAULT_GENERATION_CACHE_TTL, DEFAULT_GENERATION_CACHE_MAX_ENTRIES,
+    MAX_GENERATED_TESTS_TO_STORE, GENERATED_TEST_RETENTION_DAYS, MAX_GENERATED_TESTS_PER_QUERY, FEEDBACK_AUTO_COMPACT,
+    DEFAULT_API_RETRY_ATTEMPTS, DEFAULT_API_RETRY_WAIT_SECONDS, DEFAULT_LLM_REQUESTS_PER_MINUTE,
     ENV_GOOGLE_API_KEY, ENV_OPENAI_API_KEY, ENV_CLAUDE_API_KEY, ENV_GITHUB_TOKEN,
     ENV_LLM_PROVIDER, ENV_LOG_LEVEL,
     ENV_CHROMA_DB_HOST, ENV_CHROMA_DB_PORT, ENV_CHROMA_DB_USE_REMOTE,
     ENV_CHROMA_DB_PERSIST_DIRECTORY, ENV_DEFAULT_COLLECTION_NAME,
+    ENV_QUERY_CACHE_SIZE, ENV_QUERY_CACHE_TTL, ENV_QUERY_CACHE_PERSIST, ENV_VECTOR_STORE_BACKEND,
+    ENV_FAISS_INDEX_FACTORY, ENV_FAISS_SEARCH_PARAMS, ENV_HNSWLIB_M, ENV_HNSWLIB_EF_CONSTRUCTION, ENV_HNSWLIB_EF_SEARCH,
     ENV_GEMINI_EMBEDDING_MODEL, ENV_GEMINI_GENERATION_MODEL,
     ENV_OPENAI_EMBEDDING_MODEL, ENV_OPENAI_GENERATION_MODEL,
     ENV_CLAUDE_GENERATION_MODEL, ENV_CLAUDE_EMBEDDING_PROVIDER,
     ENV_LLAMA_EMBEDDING_MODEL, ENV_LLAMA_GENERATION_MODEL, ENV_OLLAMA_BASE_URL,
+    ENV_EMBEDDING_PROVIDER, ENV_LOCAL_EMBEDDING_DIMENSION,
     ENV_CHUNK_SIZE, ENV_CHUNK_OVERLAP,
+    ENV_DOCUMENT_LOADER_BACKEND, ENV_DOCUMENT_LOADER_WORKERS, ENV_DOCUMENT_EXTRACTION_TIMEOUT,
+    ENV_XLSX_ROWS_PER_CHUNK, ENV_CODE_CLONE_MODE,
+    ENV_TEXT_LOAD_CONCURRENCY, ENV_BINARY_LOAD_CONCURRENCY,
+    ENV_WATCH_DEBOUNCE_SECONDS, ENV_WATCH_POLL_INTERVAL, ENV_CHUNKING_MODE,
+    ENV_NEAR_DUPLICATE_DETECTION, ENV_NEAR_DUPLICATE_MAX_DISTANCE, ENV_EMBEDDING_PRICE_PER_MILLION_TOKENS,
+    ENV_CODE_MAX_FILE_SIZE, ENV_CODE_READ_WORKERS,
     ENV_CODE_EXTENSIONS, ENV_TEMP_CLONE_DIR_BASE,
     ENV_OUTPUT_FILE_PATH,
-    ENV_API_RETRY_ATTEMPTS, ENV_API_RETRY_WAIT_SECONDS
+    ENV_GENERATION_CACHE, ENV_GENERATION_CACHE_TTL, ENV_GENERATION_CACHE_MAX_ENTRIES,
+    ENV_MAX_GENERATED_TESTS_TO_STORE, ENV_GENERATED_TEST_RETENTION_DAYS, ENV_MAX_GENERATED_TESTS_PER_QUERY,
+    ENV_FEEDBACK_AUTO_COMPACT,
+    ENV_API_RETRY_ATTEMPTS, ENV_API_RETRY_WAIT_SECONDS, ENV_LLM_REQUESTS_PER_MINUTE
 )
 
 
@@ -155,6 +183,83 @@ class ChromaDBSettings(BaseSettings):
         description="Default collection name for ChromaDB"
     )
 
+    query_cache_size: int = Field(
+        default=DEFAULT_QUERY_CACHE_SIZE,
+        env=ENV_QUERY_CACHE_SIZE,
+        description="Query embeddings kept in the in-memory LRU cache (0 disables it)"
+    )
+
+    query_cache_ttl: float = Field(
+        default=DEFAULT_QUERY_CACHE_TTL,
+        env=ENV_QUERY_CACHE_TTL,
+        description="Seconds a cached query embedding stays valid (0 never expires)"
+    )
+
+    query_cache_persist: bool = Field(
+        default=DEFAULT_QUERY_CACHE_PERSIST,
+        env=ENV_QUERY_CACHE_PERSIST,
+        description="Persist cached query embeddings next to the local ChromaDB data"
+    )
+
+    vector_store_backend: str = Field(
+        default=DEFAULT_VECTOR_STORE_BACKEND,
+        env=ENV_VECTOR_STORE_BACKEND,
+        description="Vector store backend: chromadb, numpy for the in-process memory-mapped store, "
+                    "or faiss/hnswlib for the NumPy store searched through an approximate index"
+    )
+
+    faiss_index_factory: str = Field(
+        default=DEFAULT_FAISS_INDEX_FACTORY,
+        env=ENV_FAISS_INDEX_FACTORY,
+        description="faiss.index_factory string of the faiss backend's index (e.g. HNSW32, IVF1024,PQ48)"
+    )
+
+    faiss_search_params: str = Field(
+        default=DEFAULT_FAISS_SEARCH_PARAMS,
+        env=ENV_FAISS_SEARCH_PARAMS,
+        description="FAISS search parameters of the index (e.g. efSearch=128, nprobe=16)"
+    )
+
+    hnswlib_m: int = Field(
+        default=DEFAULT_HNSWLIB_M,
+        env=ENV_HNSWLIB_M,
+        description="Graph links per node of the hnswlib backend's index"
+    )
+
+    hnswlib_ef_construction: int = Field(
+        default=DEFAULT_HNSWLIB_EF_CONSTRUCTION,
+        env=ENV_HNSWLIB_EF_CONSTRUCTION,
+        description="Candidate list size when building the hnswlib index"
+    )
+
+    hnswlib_ef_search: int = Field(
+        default=DEFAULT_HNSWLIB_EF_SEARCH,
+        env=ENV_HNSWLIB_EF_SEARCH,
+        description="Candidate list size when searching the hnswlib index (higher = better recall, slower)"
+    )
+
+    @validator("query_cache_size", "query_cache_ttl", allow_reuse=True)
+    @classmethod
+    def validate_query_cache_limits(cls, v: float) -> float:
+        if v < 0:
+            raise ValueError("query_cache_size and query_cache_ttl must not be negative")
+        return v
+
+    @validator("vector_store_backend", allow_reuse=True)
+    @classmethod
+    def validate_vector_store_backend(cls, v: str) -> str:
+        if v.lower() not in SUPPORTED_VECTOR_STORE_BACKENDS:
+            raise ValueError(
+                f"Unsupported vector store backend: {v}. Supported backends: {SUPPORTED_VECTOR_STORE_BACKENDS}")
+        return v.lower()
+
+    @validator("hnswlib_m", "hnswlib_ef_construction", "hnswlib_ef_search", allow_reuse=True)
+    @classmethod
+    def validate_hnswlib_params(cls, v: int) -> int:
+        if v < 1:
+            raise ValueError("hnswlib_m, hnswlib_ef_construction and hnswlib_ef_search must be positive")
+        return v
+
 
 class LLMSettings(BaseSettings):
     """LLM configurations."""
@@ -166,7 +271,13 @@ class LLMSettings(BaseSettings):
     provider: str = Field(
         default=DEFAULT_LLM_PROVIDER,
         env=ENV_LLM_PROVIDER,
-        description="LLM provider to use (gemini, openai, claude, llama)"
+        description="LLM provider to use (gemini, openai, claude, llama, or local for embeddings only)"
+    )
+
+    embedding_provider: str = Field(
+        default=DEFAULT_EMBEDDING_PROVIDER,
+        env=ENV_EMBEDDING_PROVIDER,
+        description="Provider computing embeddings (gemini, openai, llama, local); empty uses the LLM provider"
     )
 
     # Gemini settings
@@ -227,14 +338,55 @@ class LLMSettings(BaseSettings):
         description="Ollama server base URL"
     )
 
+    # Local embedding settings
+    local_embedding_dimension: int = Field(
+        default=DEFAULT_LOCAL_EMBEDDING_DIMENSION,
+        env=ENV_LOCAL_EMBEDDING_DIMENSION,
+        description="Dimension of local hashing embeddings"
+    )
+
+    embedding_price_per_million_tokens: Optional[float] = Field(
+        default=None,
+        env=ENV_EMBEDDING_PRICE_PER_MILLION_TOKENS,
+        description="Embedding price in USD per 1M tokens for dry-run cost estimates (defaults to the list price)"
+    )
+
+    requests_per_minute: float = Field(
+        default=DEFAULT_LLM_REQUESTS_PER_MINUTE,
+        env=ENV_LLM_REQUESTS_PER_MINUTE,
+        description="Most LLM generation requests started per minute (0 = unlimited)"
+    )
+
     @validator("provider", allow_reuse=True)
     @classmethod
     def validate_provider(cls, v: str) -> str:
-        if v.lower() not in SUPPORTED_LLM_PROVIDERS:
+        if v.lower() not in SUPPORTED_LLM_PROVIDERS + [LOCAL_EMBEDDING_PROVIDER]:
             raise ValueError(
                 f"Unsupported LLM provider: {v}. Supported providers: {SUPPORTED_LLM_PROVIDERS}")
         return v.lower()
 
+    @validator("embedding_provider", allow_reuse=True)
+    @classmethod
+    def validate_embedding_provider(cls, v: str) -> str:
+        if v and v.lower() not in SUPPORTED_EMBEDDING_PROVIDERS:
+            raise ValueError(
+                f"Unsupported embedding provider: {v}. Supported providers: {SUPPORTED_EMBEDDING_PROVIDERS}")
+        return v.lower()
+
+    @validator("requests_per_minute", allow_reuse=True)
+    @classmethod
+    def validate_requests_per_minute(cls, v: float) -> float:
+        if v < 0:
+            raise ValueError("requests_per_minute must not be negative")
+        return v
+
+    @validator("local_embedding_dimension", allow_reuse=True)
+    @classmethod
+    def validate_local_embedding_dimension(cls, v: int) -> int:
+        if v < 16:
+            raise ValueError("local_embedding_dimension must be at least 16")
+        return v
+
     # Legacy fields for backward compatibility
     @property
     def embedding_model(self) -> str:
@@ -247,6 +399,8 @@ class LLMSettings(BaseSettings):
             return self.openai_embedding_model  # Claude uses OpenAI for embeddings
         elif self.provider == "llama":
             return self.llama_embedding_model
+        elif self.provider == LOCAL_EMBEDDING_PROVIDER:
+            return f"{LOCAL_EMBEDDING_MODEL}-{self.local_embedding_dimension}"
         return self.gemini_embedding_model
 
     @property
@@ -292,6 +446,72 @@ class ProcessingSettings(BaseSettings):
         description="Overlap between document chunks"
     )
 
+    chunking_mode: str = Field(
+        default=DEFAULT_CHUNKING_MODE,
+        env=ENV_CHUNKING_MODE,
+        description="How documents are split into chunks (fixed, content)"
+    )
+
+    near_duplicate_detection: bool = Field(
+        default=DEFAULT_NEAR_DUPLICATE_DETECTION,
+        env=ENV_NEAR_DUPLICATE_DETECTION,
+        description="Skip chunks that are near-duplicates of chunks already in the collection"
+    )
+
+    near_duplicate_max_distance: int = Field(
+        default=DEFAULT_NEAR_DUPLICATE_MAX_DISTANCE,
+        env=ENV_NEAR_DUPLICATE_MAX_DISTANCE,
+        description="Largest SimHash Hamming distance (of 64 bits) treated as a near-duplicate"
+    )
+
+    document_loader_backend: str = Field(
+        default=DEFAULT_DOCUMENT_LOADER_BACKEND,
+        env=ENV_DOCUMENT_LOADER_BACKEND,
+        description="Backend for PDF/DOCX/XLSX extraction (thread, process)"
+    )
+
+    document_loader_workers: int = Field(
+        default=DEFAULT_DOCUMENT_LOADER_WORKERS,
+        env=ENV_DOCUMENT_LOADER_WORKERS,
+        description="Worker processes for the process backend (0 = CPU count)"
+    )
+
+    document_extraction_timeout: int = Field(
+        default=DEFAULT_DOCUMENT_EXTRACTION_TIMEOUT,
+        env=ENV_DOCUMENT_EXTRACTION_TIMEOUT,
+        description="Per-file extraction timeout in seconds for the process backend"
+    )
+
+    xlsx_rows_per_chunk: int = Field(
+        default=DEFAULT_XLSX_ROWS_PER_CHUNK,
+        env=ENV_XLSX_ROWS_PER_CHUNK,
+        description="Spreadsheet rows per chunk when streaming XLSX files"
+    )
+
+    text_load_concurrency: int = Field(
+        default=DEFAULT_TEXT_LOAD_CONCURRENCY,
+        env=ENV_TEXT_LOAD_CONCURRENCY,
+        description="Text files read concurrently when loading a directory"
+    )
+
+    binary_load_concurrency: int = Field(
+        default=DEFAULT_BINARY_LOAD_CONCURRENCY,
+        env=ENV_BINARY_LOAD_CONCURRENCY,
+        description="PDF/DOCX/XLSX files extracted concurrently when loading a directory (0 = backend default)"
+    )
+
+    watch_debounce_seconds: float = Field(
+        default=DEFAULT_WATCH_DEBOUNCE_SECONDS,
+        env=ENV_WATCH_DEBOUNCE_SECONDS,
+        description="Seconds without further changes before watched documents are re-ingested"
+    )
+
+    watch_poll_interval: float = Field(
+        default=DEFAULT_WATCH_POLL_INTERVAL,
+        env=ENV_WATCH_POLL_INTERVAL,
+        description="Seconds between directory scans when watching without native notifications"
+    )
+
     code_extensions: List[str] = Field(
         default=DEFAULT_CODE_EXTENSIONS,
         env=ENV_CODE_EXTENSIONS,
@@ -304,6 +524,22 @@ class ProcessingSettings(BaseSettings):
         description="Base directory for temporary cloned repositories"
     )
 
+    @validator("document_loader_backend", allow_reuse=True)
+    @classmethod
+    def validate_document_loader_backend(cls, v: str) -> str:
+        if v.lower() not in SUPPORTED_DOCUMENT_LOADER_BACKENDS:
+            raise ValueError(
+                f"Unsupported document loader backend: {v}. Supported backends: {SUPPORTED_DOCUMENT_LOADER_BACKENDS}")
+        return v.lower()
+
+    @validator("chunking_mode", allow_reuse=True)
+    @classmethod
+    def validate_chunking_mode(cls, v: str) -> str:
+        if v.lower() not in SUPPORTED_CHUNKING_MODES:
+            raise ValueError(
+                f"Unsupported chunking mode: {v}. Supported modes: {SUPPORTED_CHUNKING_MODES}")
+        return v.lower()
+
     @validator("code_extensions", pre=True, allow_reuse=True)
     @classmethod
     def parse_code_extensions(cls, v):
@@ -330,6 +566,48 @@ class OutputSettings(BaseSettings):
         description="Path to save the generated output"
     )
 
+    generation_cache: bool = Field(
+        default=DEFAULT_GENERATION_CACHE,
+        env=ENV_GENERATION_CACHE,
+        description="Reuse generated test cases when the query, retrieved context and model are unchanged"
+    )
+
+    generation_cache_ttl: float = Field(
+        default=DEFAULT_GENERATION_CACHE_TTL,
+        env=ENV_GENERATION_CACHE_TTL,
+        description="Seconds a cached generation stays valid (0 never expires)"
+    )
+
+    generation_cache_max_entries: int = Field(
+        default=DEFAULT_GENERATION_CACHE_MAX_ENTRIES,
+        env=ENV_GENERATION_CACHE_MAX_ENTRIES,
+        description="Most cached generations kept per collection (least recently used are evicted)"
+    )
+
+    max_generated_tests_to_store: int = Field(
+        default=MAX_GENERATED_TESTS_TO_STORE,
+        env=ENV_MAX_GENERATED_TESTS_TO_STORE,
+        description="Most generated test case chunks kept in a collection (0 for no limit)"
+    )
+
+    generated_test_retention_days: float = Field(
+        default=GENERATED_TEST_RETENTION_DAYS,
+        env=ENV_GENERATED_TEST_RETENTION_DAYS,
+        description="Days a stored generated test case chunk is kept (0 keeps them indefinitely)"
+    )
+
+    max_generated_tests_per_query: int = Field(
+        default=MAX_GENERATED_TESTS_PER_QUERY,
+        env=ENV_MAX_GENERATED_TESTS_PER_QUERY,
+        description="Most generated test case chunks kept per generation query (0 for no limit)"
+    )
+
+    feedback_auto_compact: bool = Field(
+        default=FEEDBACK_AUTO_COMPACT,
+        env=ENV_FEEDBACK_AUTO_COMPACT,
+        description="Enforce generated test case retention after every feedback write"
+    )
+
     @validator("output_file_path", allow_reuse=True)
     @classmethod
     def validate_output_file_path(cls, v: str) -> str:
@@ -338,6 +616,21 @@ class OutputSettings(BaseSettings):
             raise ValueError(f"Output file path must end with one of {valid_extensions}")
         return v
 
+    @validator("generation_cache_ttl", "generation_cache_max_entries", allow_reuse=True)
+    @classmethod
+    def validate_generation_cache_limits(cls, v: float) -> float:
+        if v < 0:
+            raise ValueError("generation_cache_ttl and generation_cache_max_entries must not be negative")
+        return v
+
+    @validator("max_generated_tests_to_store", "generated_test_retention_days", "max_generated_tests_per_query",
+               allow_reuse=True)
+    @classmethod
+    def validate_feedback_retention(cls, v: float) -> float:
+        if v < 0:
+            raise ValueError("Generated test case retention limits must not be negative")
+        return v
+
 
 class LoggingSettings(BaseSettings):
     """Logging configurations."""
@@ -405,6 +698,24 @@ class CodeLoaderSettings(BaseSettings):
         description="Base directory for temporary cloned repositories"
     )
 
+    clone_mode: str = Field(
+        default=DEFAULT_CODE_CLONE_MODE,
+        env=ENV_CODE_CLONE_MODE,
+        description="How repositories are fetched for code ingestion (full, shallow, blobs)"
+    )
+
+    max_file_size: int = Field(
+        default=DEFAULT_CODE_MAX_FILE_SIZE,
+        env=ENV_CODE_MAX_FILE_SIZE,
+        description="Code files larger than this many bytes are skipped"
+    )
+
+    read_workers: int = Field(
+        default=DEFAULT_CODE_READ_WORKERS,
+        env=ENV_CODE_READ_WORKERS,
+        description="Number of threads reading code files in parallel"
+    )
+
     @validator("code_extensions", pre=True, allow_reuse=True)
     @classmethod
     def parse_code_extensions(cls, v):
@@ -418,6 +729,14 @@ class CodeLoaderSettings(BaseSettings):
             return [f".{ext.strip().strip('.')}" for ext in v if ext.strip()]
         return DEFAULT_CODE_EXTENSIONS
 
+    @validator("clone_mode", allow_reuse=True)
+    @classmethod
+    def validate_clone_mode(cls, v: str) -> str:
+        if v.lower() not in SUPPORTED_CODE_CLONE_MODES:
+            raise ValueError(
+                f"Unsupported code clone mode: {v}. Supported modes: {SUPPORTED_CODE_CLONE_MODES}")
+        return v.lower()
+
 
 class AppSettings:
     """Main application settings container."""
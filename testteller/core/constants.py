@@ -25,6 +25,49 @@ DEFAULT_CHROMA_PORT = 8000
 DEFAULT_CHROMA_USE_REMOTE = False
 DEFAULT_CHROMA_PERSIST_DIRECTORY = "./chroma_data"
 DEFAULT_COLLECTION_NAME = "test_collection"
+# Rows per collection.add call; embeddings are converted to lists one slice at a time
+CHROMA_ADD_BATCH_SIZE = 512
+# Ids per collection.delete call when removing many documents
+CHROMA_DELETE_BATCH_SIZE = 512
+# Documents per page when iterating over a collection
+CHROMA_ITER_BATCH_SIZE = 1000
+# Blue-green re-indexing (testteller reindex): documents per embedding request,
+# embedding requests per minute (0 = unthrottled), previous versions kept for
+# rollback, and documents sampled to check the new index before the swap
+DEFAULT_REINDEX_BATCH_SIZE = 100
+DEFAULT_REINDEX_REQUESTS_PER_MINUTE = 60
+DEFAULT_REINDEX_KEEP_VERSIONS = 2
+REINDEX_VALIDATION_SAMPLES = 20
+# Vector store backend: ChromaDB (SQLite + HNSW), or the in-process NumPy store of
+# memory-mapped float32 matrices searched exactly, which starts instantly and is
+# faster for collections up to a few hundred thousand chunks. The faiss and hnswlib
+# backends keep the NumPy store and search it through an approximate index
+# (optional packages: pip install testteller[faiss] / testteller[hnswlib])
+CHROMADB_VECTOR_STORE_BACKEND = "chromadb"
+NUMPY_VECTOR_STORE_BACKEND = "numpy"
+FAISS_VECTOR_STORE_BACKEND = "faiss"
+HNSWLIB_VECTOR_STORE_BACKEND = "hnswlib"
+NUMPY_STORE_BACKENDS = [NUMPY_VECTOR_STORE_BACKEND, FAISS_VECTOR_STORE_BACKEND, HNSWLIB_VECTOR_STORE_BACKEND]
+SUPPORTED_VECTOR_STORE_BACKENDS = [CHROMADB_VECTOR_STORE_BACKEND] + NUMPY_STORE_BACKENDS
+DEFAULT_VECTOR_STORE_BACKEND = CHROMADB_VECTOR_STORE_BACKEND
+# FAISS index: any faiss.index_factory string (e.g. HNSW32, IVF1024,Flat, IVF1024,PQ48,
+# IVF4096,SQ8) and the search parameters it takes (e.g. efSearch=128 for HNSW, nprobe=16 for IVF)
+DEFAULT_FAISS_INDEX_FACTORY = "HNSW32"
+DEFAULT_FAISS_SEARCH_PARAMS = "efSearch=128"
+# hnswlib index: graph links per node, and candidate list sizes when building and searching
+DEFAULT_HNSWLIB_M = 16
+DEFAULT_HNSWLIB_EF_CONSTRUCTION = 200
+DEFAULT_HNSWLIB_EF_SEARCH = 128
+# Collection snapshots (testteller snapshot): documents per page written to and read
+# from the file, and documents per collection.add call when importing (capped by
+# the ChromaDB client's max batch size)
+DEFAULT_SNAPSHOT_PAGE_SIZE = 1000
+DEFAULT_SNAPSHOT_IMPORT_BATCH_SIZE = 5000
+SNAPSHOT_EMBEDDING_DTYPES = ["float32", "float16"]
+# Query embedding cache (0 entries disables caching; a TTL of 0 never expires entries)
+DEFAULT_QUERY_CACHE_SIZE = 1024
+DEFAULT_QUERY_CACHE_TTL = 86400  # Seconds
+DEFAULT_QUERY_CACHE_PERSIST = False
 
 # LLM Settings
 # Supported LLM providers
@@ -50,14 +93,58 @@ DEFAULT_LLAMA_EMBEDDING_MODEL = "llama3.2:1b"
 DEFAULT_LLAMA_GENERATION_MODEL = "llama3.2:3b"
 DEFAULT_OLLAMA_BASE_URL = "http://localhost:11434"
 
+# Local embedding settings: deterministic hashing embeddings computed in-process
+# (no API key or network; embedding-only, so it cannot generate test cases)
+LOCAL_EMBEDDING_PROVIDER = "local"
+LOCAL_EMBEDDING_MODEL = "local-hashing"
+DEFAULT_LOCAL_EMBEDDING_DIMENSION = 384
+
+# Embedding provider override; empty means the LLM provider computes its own embeddings
+SUPPORTED_EMBEDDING_PROVIDERS = ["gemini", "openai", "llama", "local"]
+DEFAULT_EMBEDDING_PROVIDER = ""
+
 # Document Processing Settings
 DEFAULT_CHUNK_SIZE = 1000
 
+# Document Loader Settings
+# Backend used for CPU-heavy binary extraction (PDF, DOCX, XLSX)
+SUPPORTED_DOCUMENT_LOADER_BACKENDS = ["thread", "process"]
+DEFAULT_DOCUMENT_LOADER_BACKEND = "thread"
+DEFAULT_DOCUMENT_LOADER_WORKERS = 0  # 0 means one worker per CPU core
+DEFAULT_DOCUMENT_EXTRACTION_TIMEOUT = 300  # Seconds per file (process backend only)
+DEFAULT_PDF_PAGE_WINDOW = 8  # Pages held in memory at once when streaming PDFs
+DEFAULT_XLSX_ROWS_PER_CHUNK = 50  # Spreadsheet rows per chunk (header row is repeated in each)
+DEFAULT_STREAMING_BATCH_SIZE = 64  # Chunks sent to the vector store per batch when streaming
+DEFAULT_TEXT_LOAD_CONCURRENCY = 16  # Text files read at once when loading a directory
+DEFAULT_BINARY_LOAD_CONCURRENCY = 0  # PDF/DOCX/XLSX files extracted at once (0 = backend default)
+DEFAULT_WATCH_DEBOUNCE_SECONDS = 1.0  # Quiet period before watched changes are re-ingested
+DEFAULT_WATCH_POLL_INTERVAL = 1.0  # Seconds between scans when native file notifications are unavailable
+# "fixed" cuts chunks by size with positional ids; "content" cuts at content-defined
+# boundaries with content-hash ids, so an edit only changes the chunks it touches
+SUPPORTED_CHUNKING_MODES = ["fixed", "content"]
+DEFAULT_CHUNKING_MODE = "fixed"
+# Near-duplicate chunks (SimHash signatures within this many of 64 bits) are not embedded again
+DEFAULT_NEAR_DUPLICATE_DETECTION = False
+DEFAULT_NEAR_DUPLICATE_MAX_DISTANCE = 5  # one edited word in a ~1000 character chunk is typically 2-7 bits
+# Ingestion dry-run estimates (ingest-docs --dry-run), keyed by embedding backend
+DRY_RUN_CHARS_PER_TOKEN = 4  # Typical for English prose across provider tokenizers
+# USD list price per 1M input tokens of each backend's default embedding model
+# (text-embedding-004 is free of charge on the Gemini API; Ollama runs locally)
+EMBEDDING_PRICES_PER_MILLION_TOKENS = {"gemini": 0.0, "openai": 0.02, "llama": 0.0, "local": 0.0}
+# Typical latency of one embedding request
+EMBEDDING_CALL_SECONDS = {"gemini": 0.5, "openai": 0.4, "llama": 0.15, "local": 0.01}
+# Providers whose clients send one embedding request per text rather than per batch
+PER_TEXT_EMBEDDING_PROVIDERS = ["claude", "llama"]
+
 # Feedback Loop Configuration
 ENABLE_TEST_CASE_FEEDBACK = True
 MIN_QUALITY_SCORE_FOR_STORAGE = 0.7
+# Retention of stored generated test case chunks (0 = no limit), enforced by
+# compaction: the lowest quality_score (then oldest) chunks are removed first
 MAX_GENERATED_TESTS_TO_STORE = 1000
 GENERATED_TEST_RETENTION_DAYS = 90
+MAX_GENERATED_TESTS_PER_QUERY = 50
+FEEDBACK_AUTO_COMPACT = True  # Compact after every feedback write
 DEFAULT_CHUNK_OVERLAP = 200
 
 # Code Processing Settings
@@ -77,11 +164,35 @@ DEFAULT_CODE_EXTENSIONS = [
     ".php"   # PHP
 ]
 DEFAULT_TEMP_CLONE_DIR = "./temp_cloned_repos"
+# How repositories are fetched for code ingestion:
+#   full    - full-history clone with a complete checkout
+#   shallow - depth-1, blob-filtered clone with sparse checkout of code_extensions
+#   blobs   - bare blob-filtered clone; code files are read from the object store
+SUPPORTED_CODE_CLONE_MODES = ["full", "shallow", "blobs"]
+DEFAULT_CODE_CLONE_MODE = "full"
+DEFAULT_CODE_MAX_FILE_SIZE = 1024 * 1024  # bytes; larger files are skipped as generated or data
+DEFAULT_CODE_READ_WORKERS = 8
+# Directories never read during code ingestion (dependencies, build output, caches)
+DEFAULT_IGNORED_CODE_DIRS = [
+    ".git", ".hg", ".svn", "node_modules", "bower_components", "vendor", "third_party",
+    "site-packages", ".venv", "venv", "__pycache__", ".tox", ".nox", ".mypy_cache",
+    ".pytest_cache", ".ruff_cache", "dist", "build", "target", ".next", ".gradle",
+    ".idea", ".vscode", "coverage", "htmlcov"
+]
+# Ignore files honoured while walking a code directory, in order of precedence
+CODE_IGNORE_FILES = [".gitignore", ".testtellerignore"]
 
 # Output Settings
 DEFAULT_OUTPUT_FILE = "testteller-testcases.pdf"
 DEFAULT_AUTOMATION_OUTPUT_DIR = "./testteller_automated_tests"
 DEFAULT_TEST_GENERATION_DIR = "./testteller_generated_tests"
+# Generated test cases are cached on disk per query, retrieved context, model and prompt version
+DEFAULT_GENERATION_CACHE = True
+DEFAULT_GENERATION_CACHE_TTL = 604800  # Seconds (7 days); 0 never expires entries
+DEFAULT_GENERATION_CACHE_MAX_ENTRIES = 200
+# Generations run at once by testteller generate --queries-file
+DEFAULT_GENERATION_CONCURRENCY = 4
+MAX_GENERATION_CONCURRENCY = 32
 
 # Test Output Format Settings
 SUPPORTED_TEST_OUTPUT_FORMATS = ["md", "pdf", "docx"]
@@ -424,6 +535,8 @@ TESTWRITER_DESCRIPTION = "Test automation code generator for TestTeller Agent"
 # API Retry Settings
 DEFAULT_API_RETRY_ATTEMPTS = 3
 DEFAULT_API_RETRY_WAIT_SECONDS = 2
+# Client-side limit on LLM generation requests started per minute (0 = unlimited)
+DEFAULT_LLM_REQUESTS_PER_MINUTE = 0
 
 # Docker Settings
 DOCKER_HEALTHCHECK_INTERVAL = "30s"
@@ -450,6 +563,15 @@ ENV_CHROMA_DB_PORT = "CHROMA_DB_PORT"
 ENV_CHROMA_DB_USE_REMOTE = "CHROMA_DB_USE_REMOTE"
 ENV_CHROMA_DB_PERSIST_DIRECTORY = "CHROMA_DB_PERSIST_DIRECTORY"
 ENV_DEFAULT_COLLECTION_NAME = "DEFAULT_COLLECTION_NAME"
+ENV_QUERY_CACHE_SIZE = "QUERY_CACHE_SIZE"
+ENV_QUERY_CACHE_TTL = "QUERY_CACHE_TTL"
+ENV_QUERY_CACHE_PERSIST = "QUERY_CACHE_PERSIST"
+ENV_VECTOR_STORE_BACKEND = "VECTOR_STORE_BACKEND"
+ENV_FAISS_INDEX_FACTORY = "FAISS_INDEX_FACTORY"
+ENV_FAISS_SEARCH_PARAMS = "FAISS_SEARCH_PARAMS"
+ENV_HNSWLIB_M = "HNSWLIB_M"
+ENV_HNSWLIB_EF_CONSTRUCTION = "HNSWLIB_EF_CONSTRUCTION"
+ENV_HNSWLIB_EF_SEARCH = "HNSWLIB_EF_SEARCH"
 
 # Gemini Model Environment Variables
 ENV_GEMINI_EMBEDDING_MODEL = "GEMINI_EMBEDDING_MODEL"
@@ -467,16 +589,41 @@ ENV_CLAUDE_EMBEDDING_PROVIDER = "CLAUDE_EMBEDDING_PROVIDER"
 ENV_LLAMA_EMBEDDING_MODEL = "LLAMA_EMBEDDING_MODEL"
 ENV_LLAMA_GENERATION_MODEL = "LLAMA_GENERATION_MODEL"
 ENV_OLLAMA_BASE_URL = "OLLAMA_BASE_URL"
+ENV_EMBEDDING_PROVIDER = "EMBEDDING_PROVIDER"
+ENV_LOCAL_EMBEDDING_DIMENSION = "LOCAL_EMBEDDING_DIMENSION"
 
 # Other Environment Variables
 ENV_CHUNK_SIZE = "CHUNK_SIZE"
 ENV_CHUNK_OVERLAP = "CHUNK_OVERLAP"
+ENV_DOCUMENT_LOADER_BACKEND = "DOCUMENT_LOADER_BACKEND"
+ENV_DOCUMENT_LOADER_WORKERS = "DOCUMENT_LOADER_WORKERS"
+ENV_DOCUMENT_EXTRACTION_TIMEOUT = "DOCUMENT_EXTRACTION_TIMEOUT"
+ENV_XLSX_ROWS_PER_CHUNK = "XLSX_ROWS_PER_CHUNK"
+ENV_TEXT_LOAD_CONCURRENCY = "TEXT_LOAD_CONCURRENCY"
+ENV_BINARY_LOAD_CONCURRENCY = "BINARY_LOAD_CONCURRENCY"
+ENV_WATCH_DEBOUNCE_SECONDS = "WATCH_DEBOUNCE_SECONDS"
+ENV_WATCH_POLL_INTERVAL = "WATCH_POLL_INTERVAL"
+ENV_CHUNKING_MODE = "CHUNKING_MODE"
+ENV_NEAR_DUPLICATE_DETECTION = "NEAR_DUPLICATE_DETECTION"
+ENV_NEAR_DUPLICATE_MAX_DISTANCE = "NEAR_DUPLICATE_MAX_DISTANCE"
+ENV_EMBEDDING_PRICE_PER_MILLION_TOKENS = "EMBEDDING_PRICE_PER_MILLION_TOKENS"
 ENV_CODE_EXTENSIONS = "CODE_EXTENSIONS"
 ENV_TEMP_CLONE_DIR_BASE = "TEMP_CLONE_DIR_BASE"
+ENV_CODE_CLONE_MODE = "CODE_CLONE_MODE"
+ENV_CODE_MAX_FILE_SIZE = "CODE_MAX_FILE_SIZE"
+ENV_CODE_READ_WORKERS = "CODE_READ_WORKERS"
 ENV_OUTPUT_FILE_PATH = "OUTPUT_FILE_PATH"
 ENV_TEST_OUTPUT_FORMAT = "TEST_OUTPUT_FORMAT"
+ENV_GENERATION_CACHE = "GENERATION_CACHE"
+ENV_GENERATION_CACHE_TTL = "GENERATION_CACHE_TTL"
+ENV_GENERATION_CACHE_MAX_ENTRIES = "GENERATION_CACHE_MAX_ENTRIES"
+ENV_MAX_GENERATED_TESTS_TO_STORE = "MAX_GENERATED_TESTS_TO_STORE"
+ENV_GENERATED_TEST_RETENTION_DAYS = "GENERATED_TEST_RETENTION_DAYS"
+ENV_MAX_GENERATED_TESTS_PER_QUERY = "MAX_GENERATED_TESTS_PER_QUERY"
+ENV_FEEDBACK_AUTO_COMPACT = "FEEDBACK_AUTO_COMPACT"
 ENV_API_RETRY_ATTEMPTS = "API_RETRY_ATTEMPTS"
 ENV_API_RETRY_WAIT_SECONDS = "API_RETRY_WAIT_SECONDS"
+ENV_LLM_REQUESTS_PER_MINUTE = "LLM_REQUESTS_PER_MINUTE"
 
 # Automation Environment Variables
 ENV_AUTOMATION_LANGUAGE = "AUTOMATION_LANGUAGE"
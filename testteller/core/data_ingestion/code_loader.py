@@ -2,29 +2,83 @@
 Code loading utilities for ingesting code from various sources.
 """
 import asyncio
+import hashlib
 import logging
 import os
 import shutil
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
 
-from git import Repo
+from git import GitCommandError, Repo
 
 from testteller.config import ApiKeysSettings, CodeLoaderSettings, settings
+from ..constants import (
+    DEFAULT_TEMP_CLONE_DIR, DEFAULT_CODE_CLONE_MODE, SUPPORTED_CODE_CLONE_MODES,
+    DEFAULT_CODE_MAX_FILE_SIZE, DEFAULT_CODE_READ_WORKERS, DEFAULT_IGNORED_CODE_DIRS, CODE_IGNORE_FILES
+)
+from .ignore_rules import IgnoreRules
 
 logger = logging.getLogger(__name__)
 
+# Bytes inspected when deciding whether a file is binary
+BINARY_SNIFF_BYTES = 8192
+# Files handed from the directory walker to the readers at a time
+WALK_BATCH_SIZE = 64
+# Blobs read from the object store per thread hand-off in blobs mode
+BLOB_READ_BATCH_SIZE = 64
+
+
+@dataclass
+class CodeChanges:
+    """Code files that changed in a repository between two commits."""
+    commit: str
+    changed: List[Tuple[str, str]] = field(default_factory=list)  # (source identifier, content)
+    deleted: List[str] = field(default_factory=list)  # source identifiers
+
 
 class CodeLoader:
     """Handles loading code from various sources."""
 
-    def __init__(self):
-        """Initialize the code loader."""
-        # Use system temporary directory with testteller prefix
-        self.temp_dir = tempfile.mkdtemp(prefix="testteller_repos_")
-        self.clone_dir_base = Path(self.temp_dir)
-        logger.debug("Created temporary directory for repositories: %s", self.clone_dir_base)
+    def __init__(self, clone_dir_base: Optional[str] = None, clone_mode: Optional[str] = None):
+        """
+        Initialize the code loader.
+
+        Cloned repositories are kept in a persistent cache so later ingests only
+        fetch and re-read what changed.
+
+        Args:
+            clone_dir_base: Directory for the clone cache (defaults to the TEMP_CLONE_DIR_BASE setting)
+            clone_mode: full, shallow or blobs (defaults to the CODE_CLONE_MODE setting)
+
+        Files are read by CODE_READ_WORKERS threads, and files over
+        CODE_MAX_FILE_SIZE bytes, binary files, vendored directories and paths
+        matched by .gitignore/.testtellerignore are skipped.
+        """
+        settings_dict = {}
+        try:
+            if settings and settings.code_loader:
+                settings_dict = settings.code_loader.__dict__
+        except Exception as e:
+            logger.debug("Could not get code loader settings: %s", e)
+
+        if clone_dir_base is None:
+            clone_dir_base = settings_dict.get('temp_clone_dir', DEFAULT_TEMP_CLONE_DIR)
+        self.clone_dir_base = Path(clone_dir_base).resolve()
+        self.clone_mode = clone_mode or settings_dict.get('clone_mode', DEFAULT_CODE_CLONE_MODE)
+        if self.clone_mode not in SUPPORTED_CODE_CLONE_MODES:
+            raise ValueError(
+                f"Unsupported code clone mode: {self.clone_mode}. Supported modes: {SUPPORTED_CODE_CLONE_MODES}")
+        self.max_file_size = settings_dict.get('max_file_size', DEFAULT_CODE_MAX_FILE_SIZE)
+        self.read_workers = max(1, settings_dict.get('read_workers', DEFAULT_CODE_READ_WORKERS))
+        self.ignored_dirs = set(DEFAULT_IGNORED_CODE_DIRS)
+        logger.debug("Using repository clone cache %s in %s mode", self.clone_dir_base, self.clone_mode)
+
+    @staticmethod
+    def is_repository_source(source_path: str) -> bool:
+        """Whether a source path names a git repository to clone (URL or bundle) rather than a local folder."""
+        return "://" in source_path or source_path.startswith("git@") or source_path.endswith(".bundle")
 
     def _get_repo_name_from_url(self, repo_url: str) -> str:
         """Extract repository name from URL."""
@@ -33,50 +87,86 @@ class CodeLoader:
         # Get the last part of the URL/path
         return repo_url.split("/")[-1]
 
+    def _get_local_repo_path(self, repo_url: str) -> Path:
+        """Get the cache location for a repository, unique per URL and clone mode."""
+        url_hash = hashlib.sha256(repo_url.encode()).hexdigest()[:12]
+        suffix = "" if self.clone_mode == "full" else f".{self.clone_mode}"
+        return self.clone_dir_base / f"{self._get_repo_name_from_url(repo_url)}-{url_hash}{suffix}"
+
+    def _get_clone_url(self, repo_url: str) -> str:
+        """Get the URL to clone from, with the GitHub token injected for HTTPS URLs if configured."""
+        github_token = None
+        try:
+            if (settings and
+                settings.api_keys and
+                    isinstance(settings.api_keys, ApiKeysSettings)):
+                settings_dict = settings.api_keys.__dict__
+                if settings_dict.get('github_token'):
+                    github_token = settings_dict['github_token'].get_secret_value(
+                    )
+        except Exception as e:
+            logger.warning("Failed to access GitHub token: %s", e)
+
+        # Use GitHub token for HTTPS URLs if available
+        if github_token and "github.com" in repo_url and not repo_url.startswith("git@"):
+            # ensure token is not already in URL
+            if "@" not in repo_url.split("://")[1]:
+                protocol, rest = repo_url.split("://")
+                logger.info(
+                    "Using GITHUB_TOKEN for HTTPS clone. Ensure token is not logged if clone_url is logged elsewhere.")
+                return f"{protocol}://oauth2:{github_token}@{rest}"
+        return repo_url
+
     async def _git_command_wrapper(self, func, *args, **kwargs):
         """Wrapper to run git commands asynchronously."""
         return await asyncio.to_thread(func, *args, **kwargs)
 
     async def clone_or_pull_repo(self, repo_url: str) -> Optional[Path]:
-        """Clone a repository or pull latest changes if already cloned."""
+        """
+        Clone a repository or pull latest changes if already cloned.
+
+        A failed clone is removed, but a cached clone is kept when updating it
+        fails (e.g. a network error), so the next run can pull again instead of
+        re-cloning.
+
+        Returns:
+            Path of the local clone, or None if it could not be cloned or updated
+        """
         repo_name = self._get_repo_name_from_url(repo_url)
-        local_repo_path = self.clone_dir_base / repo_name
+        local_repo_path = self._get_local_repo_path(repo_url)
+        created = not local_repo_path.exists()
 
         try:
-            if local_repo_path.exists():
+            if not created:
                 logger.info(
                     "Repository %s exists. Pulling latest changes from %s.", repo_name, repo_url)
                 repo = await self._git_command_wrapper(Repo, str(local_repo_path))
-                origin = repo.remotes.origin
-                await self._git_command_wrapper(origin.pull)
+                if self.clone_mode == "shallow":
+                    await self._git_command_wrapper(self._update_shallow, repo)
+                elif self.clone_mode == "blobs":
+                    await self._git_command_wrapper(
+                        repo.git.fetch, "origin", "+refs/heads/*:refs/heads/*", "--prune")
+                else:
+                    origin = repo.remotes.origin
+                    await self._git_command_wrapper(origin.pull)
             else:
                 logger.info(
-                    "Cloning repository %s to %s.", repo_url, local_repo_path)
-                clone_url = repo_url
-
-                # Check if we have GitHub token configured
-                github_token = None
-                try:
-                    if (settings and
-                        settings.api_keys and
-                            isinstance(settings.api_keys, ApiKeysSettings)):
-                        settings_dict = settings.api_keys.__dict__
-                        if settings_dict.get('github_token'):
-                            github_token = settings_dict['github_token'].get_secret_value(
-                            )
-                except Exception as e:
-                    logger.warning("Failed to access GitHub token: %s", e)
-
-                # Use GitHub token for HTTPS URLs if available
-                if github_token and "github.com" in repo_url and not repo_url.startswith("git@"):
-                    # ensure token is not already in URL
-                    if "@" not in repo_url.split("://")[1]:
-                        protocol, rest = repo_url.split("://")
-                        clone_url = f"{protocol}://oauth2:{github_token}@{rest}"
-                        logger.info(
-                            "Using GITHUB_TOKEN for HTTPS clone. Ensure token is not logged if clone_url is logged elsewhere.")
-
-                await self._git_command_wrapper(Repo.clone_from, clone_url, str(local_repo_path))
+                    "Cloning repository %s to %s (%s mode).", repo_url, local_repo_path, self.clone_mode)
+                clone_url = self._get_clone_url(repo_url)
+                self.clone_dir_base.mkdir(parents=True, exist_ok=True)
+                if self.clone_mode == "shallow":
+                    # History and blobs of non-code files are never downloaded
+                    repo = await self._git_command_wrapper(
+                        Repo.clone_from, clone_url, str(local_repo_path),
+                        depth=1, filter="blob:none", no_checkout=True)
+                    await self._git_command_wrapper(self._sparse_checkout, repo)
+                elif self.clone_mode == "blobs":
+                    # Commits and trees only; blobs are fetched on demand when read
+                    await self._git_command_wrapper(
+                        Repo.clone_from, clone_url, str(local_repo_path),
+                        bare=True, filter="blob:none")
+                else:
+                    await self._git_command_wrapper(Repo.clone_from, clone_url, str(local_repo_path))
 
             logger.info(
                 "Repository %s is up to date at %s.", repo_name, local_repo_path)
@@ -84,8 +174,8 @@ class CodeLoader:
         except Exception as e:
             logger.error(
                 "Failed to clone/pull repository %s: %s", repo_url, e, exc_info=True)
-            # Clean up failed clone
-            if local_repo_path.exists():
+            # Clean up a failed clone; a cached clone that failed to update is kept
+            if created and local_repo_path.exists():
                 try:
                     await asyncio.to_thread(shutil.rmtree, local_repo_path)
                 except Exception as cleanup_e:
@@ -93,8 +183,161 @@ class CodeLoader:
                         "Failed to clean up failed clone at %s: %s", local_repo_path, cleanup_e)
             return None
 
-    async def _read_code_files_from_path(self, base_path: Path, source_identifier: str) -> List[Tuple[str, str]]:
-        """Read code files from a directory path."""
+    def _sparse_patterns(self) -> List[str]:
+        """Sparse-checkout patterns covering code files and the ignore files that filter them."""
+        return [f"*{ext}" for ext in self._get_code_extensions()] + list(CODE_IGNORE_FILES)
+
+    def _sparse_checkout(self, repo: Repo) -> None:
+        """Limit the worktree to files matching the configured code extensions and check it out."""
+        repo.git.sparse_checkout("set", "--no-cone", *self._sparse_patterns())
+        repo.git.checkout()
+
+    def _update_shallow(self, repo: Repo) -> None:
+        """Move a shallow clone to the latest commit of its branch, keeping depth 1."""
+        branch = repo.active_branch.name
+        repo.git.fetch("origin", branch, depth=1, filter="blob:none")
+        repo.git.sparse_checkout("set", "--no-cone", *self._sparse_patterns())
+        repo.git.reset("--hard", "FETCH_HEAD")
+
+    @staticmethod
+    def _ensure_commit_available(repo: Repo, commit: str) -> None:
+        """Fetch the trees of an older commit into a shallow clone if they are not already present."""
+        try:
+            repo.git.cat_file("-e", f"{commit}^{{tree}}")
+        except GitCommandError:
+            repo.git.fetch("origin", commit, depth=1, filter="blob:none")
+
+    @staticmethod
+    def _prefetch_blobs(repo: Repo, blob_shas: List[str], batch_size: int = 1000) -> None:
+        """Fetch blobs missing from a partial clone in a few batched requests instead of one per file."""
+        wanted = set(blob_shas)
+        missing_output = repo.git.rev_list("--objects", "--missing=print", "HEAD")
+        missing = [line[1:] for line in missing_output.splitlines()
+                   if line.startswith("?") and line[1:] in wanted]
+        for start in range(0, len(missing), batch_size):
+            repo.git.execute([
+                "git", "-c", "fetch.negotiationAlgorithm=noop", "fetch", "origin",
+                "--no-tags", "--no-write-fetch-head", "--recurse-submodules=no",
+                "--filter=blob:none", *missing[start:start + batch_size]
+            ])
+        if missing:
+            logger.debug("Prefetched %d blobs", len(missing))
+
+    def _read_code_blobs(self, repo: Repo, entries: List[Tuple[str, str]], source_identifier: str,
+                         prefetch: bool = True) -> List[Tuple[str, str]]:
+        """Read (path, blob sha) entries from the object store via git's persistent cat-file --batch process."""
+        if prefetch:
+            self._prefetch_blobs(repo, [sha for _, sha in entries])
+        code_files = []
+        for path, sha in entries:
+            try:
+                data = repo.git.get_object_data(sha)[3]
+            except Exception as e:
+                logger.warning("Failed to read blob %s (%s): %s", path, sha, e)
+                continue
+            content = self._decode_code(data, path)
+            if content is not None:
+                code_files.append((f"{source_identifier}:{path}", content))
+        return code_files
+
+    def _code_blob_entries(self, repo: Repo) -> List[Tuple[str, str]]:
+        """(path, blob sha) of the code files at HEAD of a bare repository, after size and ignore filtering."""
+        extensions = self._get_code_extensions()
+        blobs = []
+        for line in repo.git.ls_tree("-r", "-l", "-z", "HEAD").split("\0"):
+            if not line:
+                continue
+            info, path = line.split("\t", 1)
+            _, object_type, sha, size = info.split()
+            if object_type == "blob":
+                blobs.append((path, sha, size))
+
+        ignore_entries = [(path, sha) for path, sha, _ in blobs if path.rsplit("/", 1)[-1] in CODE_IGNORE_FILES]
+        rules = self._ignore_rules_from_blobs(repo, ignore_entries)
+        entries = []
+        for path, sha, size in blobs:
+            if not any(path.endswith(ext) for ext in extensions) or self._is_excluded(path, rules):
+                continue
+            if int(size) > self.max_file_size:
+                logger.debug("Skipping %s: %s bytes exceeds the %d byte limit", path, size, self.max_file_size)
+                continue
+            entries.append((path, sha))
+        return entries
+
+    async def _iter_code_files_from_objects(
+            self, repo_path: Path, source_identifier: str) -> AsyncIterator[Tuple[str, str]]:
+        """Stream the code files at HEAD of a bare repository, read from its object store in batches."""
+        repo = await asyncio.to_thread(Repo, str(repo_path))
+        entries = await asyncio.to_thread(self._code_blob_entries, repo)
+        # Missing blobs are fetched into the object store up front, in a few batched requests
+        await asyncio.to_thread(self._prefetch_blobs, repo, [sha for _, sha in entries])
+        file_count = 0
+        for start in range(0, len(entries), BLOB_READ_BATCH_SIZE):
+            code_files = await asyncio.to_thread(
+                self._read_code_blobs, repo, entries[start:start + BLOB_READ_BATCH_SIZE], source_identifier, False)
+            file_count += len(code_files)
+            for code_file in code_files:
+                yield code_file
+        logger.info("Found %d code files in %s", file_count, repo_path)
+
+    @staticmethod
+    def _ignore_rules_from_blobs(repo: Repo, ignore_entries: List[Tuple[str, str]]) -> IgnoreRules:
+        """Build ignore rules from (path, blob sha) entries of committed ignore files."""
+        rules = IgnoreRules()
+        CodeLoader._prefetch_blobs(repo, [sha for _, sha in ignore_entries])
+        # Parent directories first so deeper ignore files take precedence
+        for path, sha in sorted(ignore_entries, key=lambda entry: (entry[0].count("/"), entry[0])):
+            try:
+                text = repo.git.get_object_data(sha)[3].decode('utf-8', errors='ignore')
+            except Exception as e:
+                logger.debug("Could not read ignore file %s: %s", path, e)
+                continue
+            rules.add_patterns(text.splitlines(), path.rpartition("/")[0])
+        return rules
+
+    @staticmethod
+    def _ignore_rules_for_paths(base_path: Path, rel_paths: List[str]) -> IgnoreRules:
+        """Build ignore rules from the ignore files in the worktree directories above the given paths."""
+        rules = IgnoreRules()
+        for directory in CodeLoader._ancestor_dirs(rel_paths):
+            for ignore_name in CODE_IGNORE_FILES:
+                ignore_file = base_path / directory / ignore_name
+                if ignore_file.is_file():
+                    rules.add_file(ignore_file, directory)
+        return rules
+
+    def _is_excluded(self, rel_path: str, rules: IgnoreRules) -> bool:
+        """Whether a file path (relative, ``/``-separated) lies in a vendored or ignored directory or is ignored itself."""
+        parts = rel_path.split("/")
+        for i in range(1, len(parts)):
+            if parts[i - 1] in self.ignored_dirs or rules.is_ignored("/".join(parts[:i]), is_dir=True):
+                return True
+        return rules.is_ignored(rel_path)
+
+    @staticmethod
+    def _ancestor_dirs(rel_paths: List[str]) -> List[str]:
+        """Directories containing the given paths and all their parents, root ("") first."""
+        directories = {""}
+        for rel_path in rel_paths:
+            parts = rel_path.split("/")[:-1]
+            directories.update("/".join(parts[:i]) for i in range(1, len(parts) + 1))
+        return sorted(directories, key=lambda d: (d.count("/") + bool(d), d))
+
+    def _ignore_rules_at_head(self, repo: Repo, rel_paths: List[str]) -> IgnoreRules:
+        """Build ignore rules from the committed ignore files in the directories above the given paths."""
+        directories = set(self._ancestor_dirs(rel_paths))
+        ignore_entries = []
+        for line in repo.git.ls_tree("-r", "-z", "HEAD").split("\0"):
+            if not line:
+                continue
+            info, path = line.split("\t", 1)
+            directory, _, name = path.rpartition("/")
+            if name in CODE_IGNORE_FILES and directory in directories:
+                ignore_entries.append((path, info.split()[2]))
+        return self._ignore_rules_from_blobs(repo, ignore_entries)
+
+    def _get_code_extensions(self) -> List[str]:
+        """Get the configured code file extensions."""
         if not settings:
             raise ValueError(
                 "Settings not initialized. Please ensure .env file exists with required configurations.")
@@ -102,74 +345,303 @@ class CodeLoader:
         if not isinstance(settings.code_loader, CodeLoaderSettings):
             raise ValueError("Invalid code_loader settings configuration")
 
-        code_files = []
+        settings_dict = settings.code_loader.__dict__
+        extensions = settings_dict.get('code_extensions', [".py"])
+        if not extensions:
+            logger.warning(
+                "No code extensions configured. Using default: .py")
+            extensions = [".py"]
+        return extensions
+
+    @staticmethod
+    def _decode_code(data: bytes, file_path) -> Optional[str]:
+        """Decode raw file bytes, returning None for binary, non-UTF-8 or empty files."""
+        if b"\0" in data[:BINARY_SNIFF_BYTES]:
+            logger.debug("Skipping binary file: %s", file_path)
+            return None
         try:
-            # Get code extensions from settings
-            settings_dict = settings.code_loader.__dict__
-            extensions = settings_dict.get('code_extensions', [".py"])
-            if not extensions:
-                logger.warning(
-                    "No code extensions configured. Using default: .py")
-                extensions = [".py"]
-
-            for root, _, files in os.walk(base_path):
-                for file in files:
-                    file_path = Path(root) / file
-                    if any(file.endswith(ext) for ext in extensions):
-                        try:
-                            with open(file_path, 'r', encoding='utf-8') as f:
-                                content = f.read()
-                                if not content.strip():
-                                    logger.debug(
-                                        "Skipping empty file: %s", file_path)
-                                    continue
-                                relative_path = str(
-                                    file_path.relative_to(base_path))
-                                code_files.append(
-                                    (f"{source_identifier}:{relative_path}", content))
-                                logger.debug("Read file: %s", relative_path)
-                        except Exception as e:
-                            logger.warning(
-                                "Failed to read file %s: %s", file_path, e)
-                            continue
-
-            if not code_files:
-                logger.warning(
-                    "No code files found in %s with extensions: %s", base_path, extensions)
-            else:
-                logger.info("Found %d code files in %s",
-                            len(code_files), base_path)
+            content = data.decode('utf-8')
+        except UnicodeDecodeError as e:
+            logger.warning("Failed to read file %s: %s", file_path, e)
+            return None
+        if not content.strip():
+            logger.debug("Skipping empty file: %s", file_path)
+            return None
+        return content
 
+    def _read_code_file(self, file_path: Path) -> Optional[str]:
+        """Read a code file, returning None for oversized, binary, empty or unreadable files."""
+        try:
+            with open(file_path, 'rb') as f:
+                data = f.read(self.max_file_size + 1)
+        except Exception as e:
+            logger.warning(
+                "Failed to read file %s: %s", file_path, e)
+            return None
+        if len(data) > self.max_file_size:
+            logger.debug(
+                "Skipping %s: larger than the %d byte limit", file_path, self.max_file_size)
+            return None
+        # Translate \r\n and \r to \n, as text-mode reads do
+        content = self._decode_code(data, file_path)
+        return content.replace("\r\n", "\n").replace("\r", "\n") if content else None
+
+    def _walk_code_files(self, base_path: Path, extensions: List[str]) -> Iterator[Tuple[Path, str]]:
+        """
+        Walk a directory lazily, yielding (path, relative path) for candidate code files.
+
+        Vendored directories and anything matched by the ignore files found along
+        the way are pruned without being descended into, and files over the size
+        limit are skipped using the directory entry's cached stat.
+        """
+        rules = IgnoreRules()
+        stack = [(base_path, "")]
+        while stack:
+            directory, rel_dir = stack.pop()
+            for ignore_name in CODE_IGNORE_FILES:
+                ignore_file = directory / ignore_name
+                if ignore_file.is_file():
+                    rules.add_file(ignore_file, rel_dir)
+            try:
+                with os.scandir(directory) as scanner:
+                    entries = sorted(scanner, key=lambda entry: entry.name)
+            except OSError as e:
+                if not rel_dir:
+                    raise
+                logger.warning("Cannot list directory %s: %s", directory, e)
+                continue
+
+            subdirectories = []
+            for entry in entries:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in self.ignored_dirs and not rules.is_ignored(rel_path, is_dir=True):
+                            subdirectories.append((Path(entry.path), rel_path))
+                        continue
+                    if not entry.is_file() or not any(entry.name.endswith(ext) for ext in extensions):
+                        continue
+                    if rules.is_ignored(rel_path):
+                        continue
+                    if entry.stat().st_size > self.max_file_size:
+                        logger.debug("Skipping %s: larger than the %d byte limit", rel_path, self.max_file_size)
+                        continue
+                except OSError as e:
+                    logger.warning("Cannot stat %s: %s", entry.path, e)
+                    continue
+                yield Path(entry.path), rel_path
+            # Reversed so directories are visited in name order
+            stack.extend(reversed(subdirectories))
+
+    @staticmethod
+    def _next_batch(iterator: Iterator, batch_size: int) -> list:
+        """Take up to batch_size items from an iterator (empty once it is exhausted)."""
+        batch = []
+        for item in iterator:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                break
+        return batch
+
+    def _read_walked_file(self, file_path: Path, rel_path: str) -> Tuple[str, Optional[str]]:
+        return rel_path, self._read_code_file(file_path)
+
+    async def iter_code_files(self, base_path: Path, source_identifier: str) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Stream (source identifier, content) for the code files under a directory.
+
+        Directory walking and file reads run on a bounded thread pool of
+        ``read_workers`` threads, so the event loop is never blocked. The walker
+        hands over batches of paths while earlier reads are still running, and
+        files are yielded in completion order rather than path order.
+
+        Args:
+            base_path: Directory to read
+            source_identifier: Prefix for the yielded identifiers ("<source>:<relative path>")
+
+        Yields:
+            Tuples of (source identifier, file content)
+        """
+        extensions = self._get_code_extensions()
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=self.read_workers, thread_name_prefix="code-reader")
+        walker = self._walk_code_files(Path(base_path), extensions)
+        # Stop walking ahead once this many reads are queued, bounding memory on huge trees
+        max_pending = self.read_workers * 4
+        walk_future: Optional[asyncio.Future] = None
+        walk_done = False
+        reads = set()
+        file_count = 0
+        try:
+            while True:
+                if not walk_done and walk_future is None and len(reads) < max_pending:
+                    walk_future = loop.run_in_executor(
+                        executor, self._next_batch, walker, WALK_BATCH_SIZE)
+                waiting = reads | ({walk_future} if walk_future else set())
+                if not waiting:
+                    break
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+
+                if walk_future in done:
+                    batch = walk_future.result()
+                    walk_future = None
+                    walk_done = not batch
+                    for file_path, rel_path in batch:
+                        reads.add(loop.run_in_executor(
+                            executor, self._read_walked_file, file_path, rel_path))
+
+                for future in done & reads:
+                    reads.discard(future)
+                    rel_path, content = future.result()
+                    if content is None:
+                        continue
+                    file_count += 1
+                    logger.debug("Read file: %s", rel_path)
+                    yield f"{source_identifier}:{rel_path}", content
         except Exception as e:
             logger.error("Error walking directory %s: %s", base_path, e)
             raise
+        finally:
+            for future in reads:
+                future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
 
-        return code_files
+        if not file_count:
+            logger.warning(
+                "No code files found in %s with extensions: %s", base_path, extensions)
+        else:
+            logger.info("Found %d code files in %s", file_count, base_path)
 
-    async def load_code_from_repo(self, repo_url: str) -> List[Tuple[str, str]]:
-        """Load code from a remote GitHub repository."""
+    async def get_repo_commit(self, repo_url: str) -> Optional[str]:
+        """Get the commit SHA currently checked out in the clone cache, if the repository is cached."""
+        local_repo_path = self._get_local_repo_path(repo_url)
+        if not local_repo_path.exists():
+            return None
+        try:
+            repo = await self._git_command_wrapper(Repo, str(local_repo_path))
+            return repo.head.commit.hexsha
+        except Exception as e:
+            logger.warning("Could not read HEAD commit for %s: %s", repo_url, e)
+            return None
+
+    async def load_code_changes_from_repo(self, repo_url: str, since_commit: str) -> Optional[CodeChanges]:
+        """
+        Update the cached clone and load only the code files changed since a commit.
+
+        Uses ``git diff --raw`` (the ``--name-status`` listing plus blob ids) between
+        ``since_commit`` and the new HEAD. Rename detection is off, so a renamed
+        file is reported as a deletion of the old path and an addition of the new one.
+
+        Args:
+            repo_url: Repository URL
+            since_commit: Commit SHA recorded at the previous ingest
+
+        Returns:
+            CodeChanges, or None if the repository could not be updated or the
+            previous commit is no longer in its history (a full ingest is needed)
+        """
+        local_repo_path = await self.clone_or_pull_repo(repo_url)
+        if not local_repo_path:
+            return None
+
+        extensions = self._get_code_extensions()
+        try:
+            repo = await self._git_command_wrapper(Repo, str(local_repo_path))
+            head_commit = repo.head.commit.hexsha
+            if head_commit == since_commit:
+                logger.info("Repository %s unchanged since %s", repo_url, since_commit[:12])
+                return CodeChanges(commit=head_commit)
+            if self.clone_mode == "shallow":
+                await self._git_command_wrapper(self._ensure_commit_available, repo, since_commit)
+            diff_output = await self._git_command_wrapper(
+                repo.git.diff, "--raw", "--no-abbrev", "--no-renames", "-z", since_commit, head_commit)
+        except GitCommandError as e:
+            logger.warning(
+                "Cannot diff %s against recorded commit %s, falling back to full ingest: %s",
+                repo_url, since_commit[:12], e)
+            return None
+
+        changes = CodeChanges(commit=head_commit)
+        changed_entries = []
+        # -z output alternates ":<old mode> <new mode> <old sha> <new sha> <status>" and path fields
+        fields = diff_output.split("\0")
+        for info, path in zip(fields[0::2], fields[1::2]):
+            if not info.startswith(":") or not any(path.endswith(ext) for ext in extensions):
+                continue
+            _, _, _, new_sha, status = info[1:].split()
+            identifier = f"{repo_url}:{path}"
+            if status == "D":
+                changes.deleted.append(identifier)
+            else:
+                changed_entries.append((path, new_sha))
+
+        if self.clone_mode == "blobs":
+            rules = await asyncio.to_thread(self._ignore_rules_at_head, repo, [p for p, _ in changed_entries])
+        else:
+            rules = await asyncio.to_thread(
+                self._ignore_rules_for_paths, local_repo_path, [p for p, _ in changed_entries])
+        wanted_entries = [(path, sha) for path, sha in changed_entries if not self._is_excluded(path, rules)]
+
+        if self.clone_mode == "blobs":
+            changes.changed = await asyncio.to_thread(
+                self._read_code_blobs, repo, wanted_entries, repo_url)
+        else:
+            contents = await asyncio.gather(*(
+                asyncio.to_thread(self._read_code_file, local_repo_path / path) for path, _ in wanted_entries))
+            changes.changed = [(f"{repo_url}:{path}", content)
+                               for (path, _), content in zip(wanted_entries, contents) if content is not None]
+        # Files that are now excluded, empty or unreadable: drop whatever was ingested before
+        read_identifiers = {identifier for identifier, _ in changes.changed}
+        changes.deleted.extend(
+            f"{repo_url}:{path}" for path, _ in changed_entries
+            if f"{repo_url}:{path}" not in read_identifiers)
+
+        logger.info(
+            "Repository %s: %d changed and %d deleted code files since %s",
+            repo_url, len(changes.changed), len(changes.deleted), since_commit[:12])
+        return changes
+
+    async def iter_code_from_repo(self, repo_url: str) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Clone or update a repository and stream (source identifier, content) for its code files.
+
+        Yields nothing if the repository cannot be cloned or updated.
+        """
         local_repo_path = await self.clone_or_pull_repo(repo_url)
         if not local_repo_path:
             logger.error("Failed to clone/pull repository: %s", repo_url)
-            return []
-        return await self._read_code_files_from_path(local_repo_path, source_identifier=repo_url)
+            return
+        if self.clone_mode == "blobs":
+            code_files = self._iter_code_files_from_objects(local_repo_path, repo_url)
+        else:
+            code_files = self.iter_code_files(local_repo_path, source_identifier=repo_url)
+        async for code_file in code_files:
+            yield code_file
 
-    async def load_code_from_local_folder(self, folder_path: str) -> List[Tuple[str, str]]:
-        """Load code from a local folder path."""
+    async def iter_code_from_local_folder(self, folder_path: str) -> AsyncIterator[Tuple[str, str]]:
+        """Stream (source identifier, content) for the code files of a local folder."""
         local_path = Path(folder_path)
         if not local_path.is_dir():
             logger.error(
                 "Provided local path is not a directory or does not exist: %s", folder_path)
-            return []
+            return
 
         # Use the absolute path of the folder as the source_identifier for uniqueness and clarity
         abs_folder_path_str = str(local_path.resolve())
-        return await self._read_code_files_from_path(local_path, source_identifier=f"local:{abs_folder_path_str}")
+        async for code_file in self.iter_code_files(local_path, source_identifier=f"local:{abs_folder_path_str}"):
+            yield code_file
+
+    async def load_code_from_repo(self, repo_url: str) -> List[Tuple[str, str]]:
+        """Load the code files of a remote GitHub repository into a list (see iter_code_from_repo)."""
+        return [code_file async for code_file in self.iter_code_from_repo(repo_url)]
+
+    async def load_code_from_local_folder(self, folder_path: str) -> List[Tuple[str, str]]:
+        """Load the code files of a local folder into a list (see iter_code_from_local_folder)."""
+        return [code_file async for code_file in self.iter_code_from_local_folder(folder_path)]
 
     async def cleanup_repo(self, repo_url: str) -> None:
         """Clean up a cloned repository."""
-        repo_name = self._get_repo_name_from_url(repo_url)
-        local_repo_path = self.clone_dir_base / repo_name
+        local_repo_path = self._get_local_repo_path(repo_url)
         if local_repo_path.exists():
             try:
                 await asyncio.to_thread(shutil.rmtree, local_repo_path)
@@ -184,7 +656,7 @@ class CodeLoader:
         if self.clone_dir_base.exists():
             try:
                 await asyncio.to_thread(shutil.rmtree, self.clone_dir_base)
-                self.clone_dir_base.mkdir(exist_ok=True)
+                self.clone_dir_base.mkdir(parents=True, exist_ok=True)
                 logger.info("Cleaned up all cloned repositories")
             except Exception as e:
                 logger.error("Error cleaning up repositories: %s",
@@ -1,17 +1,119 @@
 import asyncio
+import itertools
 import logging
 import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator, List, Optional, Tuple, TypeVar
 
 import aiofiles  # For async file operations
 import docx
 import fitz  # PyMuPDF
 import openpyxl
 
+from testteller.config import settings
+from ..constants import (
+    DEFAULT_DOCUMENT_LOADER_BACKEND,
+    DEFAULT_DOCUMENT_LOADER_WORKERS,
+    DEFAULT_DOCUMENT_EXTRACTION_TIMEOUT,
+    DEFAULT_PDF_PAGE_WINDOW,
+    DEFAULT_XLSX_ROWS_PER_CHUNK,
+    DEFAULT_TEXT_LOAD_CONCURRENCY,
+    DEFAULT_BINARY_LOAD_CONCURRENCY
+)
+
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Concurrency used for binary formats when extraction runs on threads (GIL bound)
+DEFAULT_THREAD_EXTRACTION_CONCURRENCY = 3
+# File paths handed over at a time by the directory scanner thread
+DIRECTORY_SCAN_BATCH = 256
+
+
+class ProcessExtractionPool:
+    """
+    Process pool for CPU-heavy binary document extraction.
+
+    A running task cannot be cancelled in a ProcessPoolExecutor, so when a file
+    exceeds the timeout the pool's worker processes are terminated and a fresh
+    pool is created on the next submission. Files that were in flight on the
+    terminated pool are retried once.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, timeout: Optional[float] = None):
+        """
+        Initialize the extraction pool.
+
+        Args:
+            max_workers: Number of worker processes (defaults to CPU count)
+            timeout: Per-file timeout in seconds (None disables the timeout)
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            logger.info(
+                "Started document extraction pool with %d worker processes", self.max_workers)
+        return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor, terminate: bool = False) -> None:
+        """Drop an executor, optionally killing its worker processes first."""
+        if terminate:
+            # ProcessPoolExecutor has no public API to kill a busy worker
+            for process in list((getattr(executor, '_processes', None) or {}).values()):
+                try:
+                    process.terminate()
+                except Exception as e:
+                    logger.debug("Failed to terminate extraction worker: %s", e)
+        executor.shutdown(wait=False, cancel_futures=True)
+        if self._executor is executor:
+            self._executor = None
+
+    async def run(self, func: Callable[[str], str], file_path: str) -> str:
+        """
+        Run an extraction function for a file in a worker process.
+
+        Raises:
+            TimeoutError: If extraction exceeds the configured timeout
+        """
+        for attempt in range(2):
+            executor = self._get_executor()
+            future = asyncio.wrap_future(executor.submit(func, file_path))
+            try:
+                return await asyncio.wait_for(future, timeout=self.timeout)
+            except asyncio.TimeoutError:
+                logger.error(
+                    "Extraction of %s exceeded %ss, terminating worker pool", file_path, self.timeout)
+                self._discard_executor(executor, terminate=True)
+                raise TimeoutError(
+                    f"Extraction of {file_path} exceeded {self.timeout}s") from None
+            except BrokenProcessPool:
+                self._discard_executor(executor)
+                if attempt:
+                    raise
+                logger.warning(
+                    "Extraction pool was restarted while processing %s, retrying", file_path)
+        raise RuntimeError("unreachable")
+
+    def shutdown(self) -> None:
+        """Shut down the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
 
 class DocumentLoader:
+    BINARY_EXTENSIONS = ('.pdf', '.docx', '.xlsx')
+    TEXT_EXTENSIONS = ('.txt', '.md', '.py', '.js', '.java', '.html', '.css', '.json', '.yaml', '.log')
+
+    _extraction_pool: Optional[ProcessExtractionPool] = None
+
     @staticmethod
     async def load_document(file_path: str) -> str | None:
         _, extension = os.path.splitext(file_path)
@@ -24,13 +126,9 @@ class DocumentLoader:
                 logger.error("File not found: %s", file_path)
                 raise FileNotFoundError(f"File not found: {file_path}")
 
-            if extension == ".pdf":
-                content = await asyncio.to_thread(DocumentLoader._load_pdf_sync, file_path)
-            elif extension == ".docx":
-                content = await asyncio.to_thread(DocumentLoader._load_docx_sync, file_path)
-            elif extension == ".xlsx":
-                content = await asyncio.to_thread(DocumentLoader._load_xlsx_sync, file_path)
-            elif extension in ['.txt', '.md', '.py', '.js', '.java', '.html', '.css', '.json', '.yaml', '.log']:
+            if extension in DocumentLoader.BINARY_EXTENSIONS:
+                content = await DocumentLoader._load_binary_async(extension, file_path)
+            elif extension in DocumentLoader.TEXT_EXTENSIONS:
                 content = await DocumentLoader._load_text_async(file_path)
             else:
                 logger.warning(
@@ -50,12 +148,114 @@ class DocumentLoader:
                 "Error loading document %s: %s", file_path, e, exc_info=True)
             return None
 
-    @staticmethod  # Blocking, to be run in thread
+    @staticmethod
+    def _get_extraction_pool() -> Optional[ProcessExtractionPool]:
+        """Return the shared process pool, or None when the thread backend is configured."""
+        if DocumentLoader._extraction_pool is not None:
+            return DocumentLoader._extraction_pool
+
+        backend = DEFAULT_DOCUMENT_LOADER_BACKEND
+        workers = DEFAULT_DOCUMENT_LOADER_WORKERS
+        timeout = DEFAULT_DOCUMENT_EXTRACTION_TIMEOUT
+        try:
+            if settings and settings.processing:
+                processing_dict = settings.processing.__dict__
+                backend = processing_dict.get('document_loader_backend', backend)
+                workers = processing_dict.get('document_loader_workers', workers)
+                timeout = processing_dict.get('document_extraction_timeout', timeout)
+        except Exception as e:
+            logger.debug("Could not get document loader settings: %s", e)
+
+        if backend != "process":
+            return None
+        DocumentLoader._extraction_pool = ProcessExtractionPool(
+            max_workers=workers or None, timeout=timeout or None)
+        return DocumentLoader._extraction_pool
+
+    @staticmethod
+    def get_binary_concurrency() -> int:
+        """Number of binary documents worth extracting concurrently for the configured backend."""
+        pool = DocumentLoader._get_extraction_pool()
+        return pool.max_workers if pool else DEFAULT_THREAD_EXTRACTION_CONCURRENCY
+
+    @staticmethod
+    def shutdown_extraction_pool() -> None:
+        """Stop the shared extraction worker processes, if any were started."""
+        if DocumentLoader._extraction_pool is not None:
+            DocumentLoader._extraction_pool.shutdown()
+            DocumentLoader._extraction_pool = None
+
+    @staticmethod
+    async def _load_binary_async(extension: str, file_path: str) -> str:
+        extractors = {
+            ".pdf": DocumentLoader._load_pdf_sync,
+            ".docx": DocumentLoader._load_docx_sync,
+            ".xlsx": DocumentLoader._load_xlsx_sync,
+        }
+        extractor = extractors[extension]
+        pool = DocumentLoader._get_extraction_pool()
+        if pool is not None:
+            return await pool.run(extractor, file_path)
+        return await asyncio.to_thread(extractor, file_path)
+
+    @staticmethod  # Blocking, to be run in thread or worker process
     def _load_pdf_sync(file_path: str) -> str:
+        return "".join(text for _, text in DocumentLoader.iter_pdf_pages(file_path))
+
+    @staticmethod
+    def iter_pdf_pages(file_path: str) -> Iterator[Tuple[int, str]]:
+        """
+        Yield the text of a PDF one page at a time.
+
+        Args:
+            file_path: Path to the PDF file
+
+        Yields:
+            Tuples of (page_number, text) with 1-based page numbers
+        """
         doc = fitz.open(file_path)
-        text = "".join([page.get_text() for page in doc])
-        doc.close()
-        return text
+        try:
+            for index in range(doc.page_count):
+                yield index + 1, doc.load_page(index).get_text()
+        finally:
+            doc.close()
+
+    @staticmethod
+    async def stream_pdf_pages(
+        file_path: str, window_size: int = DEFAULT_PDF_PAGE_WINDOW
+    ) -> AsyncIterator[List[Tuple[int, str]]]:
+        """
+        Stream a PDF as windows of pages, extracting each window in a worker thread.
+
+        Only one window of page text is held in memory at a time, so peak memory
+        does not grow with the length of the document.
+
+        Args:
+            file_path: Path to the PDF file
+            window_size: Number of pages per yielded window
+
+        Yields:
+            Lists of (page_number, text) tuples
+        """
+        async for window in DocumentLoader._stream_in_thread(
+                DocumentLoader.iter_pdf_pages(file_path), window_size):
+            yield window
+
+    @staticmethod
+    async def _stream_in_thread(items: Iterator, window_size: int) -> AsyncIterator[list]:
+        """Drain a blocking iterator in worker threads, a window of items at a time."""
+        window_size = max(1, window_size)
+        try:
+            while True:
+                window = await asyncio.to_thread(
+                    lambda: list(itertools.islice(items, window_size)))
+                if not window:
+                    break
+                yield window
+        finally:
+            close = getattr(items, 'close', None)
+            if close:
+                close()
 
     @staticmethod  # Blocking
     def _load_docx_sync(file_path: str) -> str:
@@ -64,17 +264,90 @@ class DocumentLoader:
 
     @staticmethod  # Blocking
     def _load_xlsx_sync(file_path: str) -> str:
-        workbook = openpyxl.load_workbook(file_path, data_only=True)
-        text_parts = []
-        for sheet_name in workbook.sheetnames:
-            sheet = workbook[sheet_name]
-            text_parts.append(f"Sheet: {sheet_name}\n")
-            for row in sheet.iter_rows():
-                row_values = [
-                    str(cell.value) if cell.value is not None else "" for cell in row]
-                text_parts.append(", ".join(row_values))
-            text_parts.append("\n")
-        return "\n".join(text_parts)
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            text_parts = []
+            for sheet in workbook.worksheets:
+                text_parts.append(f"Sheet: {sheet.title}\n")
+                for row in sheet.iter_rows(values_only=True):
+                    row_values = DocumentLoader._xlsx_row_values(row)
+                    if row_values:
+                        text_parts.append(", ".join(row_values))
+                text_parts.append("\n")
+            return "\n".join(text_parts)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _xlsx_row_values(row: tuple) -> List[str]:
+        """Convert a row of cell values to strings, dropping empty trailing columns."""
+        values = ["" if value is None else str(value) for value in row]
+        while values and not values[-1].strip():
+            values.pop()
+        return values
+
+    @staticmethod
+    def iter_xlsx_row_batches(
+        file_path: str, rows_per_chunk: int = DEFAULT_XLSX_ROWS_PER_CHUNK
+    ) -> Iterator[Tuple[str, int, int, str]]:
+        """
+        Lazily yield a workbook as batches of rows.
+
+        The workbook is opened in read-only mode so rows are parsed as they are
+        iterated. The first non-empty row of each sheet is treated as its header
+        and repeated at the top of every batch; empty rows and empty trailing
+        columns are skipped.
+
+        Args:
+            file_path: Path to the XLSX file
+            rows_per_chunk: Maximum data rows per batch
+
+        Yields:
+            Tuples of (sheet_name, row_start, row_end, text) with 1-based sheet row numbers
+        """
+        rows_per_chunk = max(1, rows_per_chunk)
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+
+        def format_batch(sheet_name, header, rows):
+            lines = [f"Sheet: {sheet_name}", ", ".join(header)]
+            lines.extend(", ".join(values) for _, values in rows)
+            return "\n".join(lines)
+
+        try:
+            for sheet in workbook.worksheets:
+                header = None
+                header_row = None
+                batch = []
+                emitted = False
+                for row_number, row in enumerate(sheet.iter_rows(values_only=True), start=1):
+                    row_values = DocumentLoader._xlsx_row_values(row)
+                    if not row_values:
+                        continue
+                    if header is None:
+                        header, header_row = row_values, row_number
+                        continue
+                    batch.append((row_number, row_values))
+                    if len(batch) >= rows_per_chunk:
+                        yield sheet.title, batch[0][0], batch[-1][0], format_batch(sheet.title, header, batch)
+                        batch = []
+                        emitted = True
+
+                if batch:
+                    yield sheet.title, batch[0][0], batch[-1][0], format_batch(sheet.title, header, batch)
+                elif header is not None and not emitted:
+                    # Sheet holds nothing but its header row
+                    yield sheet.title, header_row, header_row, format_batch(sheet.title, header, [])
+        finally:
+            workbook.close()
+
+    @staticmethod
+    async def stream_xlsx_row_batches(
+        file_path: str, rows_per_chunk: int = DEFAULT_XLSX_ROWS_PER_CHUNK
+    ) -> AsyncIterator[Tuple[str, int, int, str]]:
+        """Async version of iter_xlsx_row_batches; each batch is read in a worker thread."""
+        async for window in DocumentLoader._stream_in_thread(
+                DocumentLoader.iter_xlsx_row_batches(file_path, rows_per_chunk), 1):
+            yield window[0]
 
     @staticmethod
     async def _load_text_async(file_path: str) -> str:
@@ -95,31 +368,178 @@ class DocumentLoader:
                 raise  # Re-raise the original or sync error
 
     @staticmethod
-    async def load_from_directory(directory_path: str) -> list[tuple[str, str]]:
-        documents_content = []
-        path = Path(directory_path)
-        if not path.is_dir():
-            logger.error("Provided path is not a directory: %s",
-                         directory_path, exc_info=True)
-            return []
-
-        file_paths_to_load = []
-        for file_path_obj in path.rglob('*'):
-            if file_path_obj.is_file():
-                file_paths_to_load.append(str(file_path_obj))
-
-        # Load documents concurrently
-        tasks = [DocumentLoader.load_document(fp) for fp in file_paths_to_load]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        for i, content_or_exc in enumerate(results):
-            file_path = file_paths_to_load[i]
-            if isinstance(content_or_exc, Exception):
-                logger.error(
-                    "Failed to load document %s from directory: %s", file_path, content_or_exc)
-            elif content_or_exc:
-                documents_content.append((file_path, content_or_exc))
+    def iter_directory_files(directory_path: str, extensions: Optional[Iterable[str]] = None) -> Iterator[str]:
+        """
+        Lazily walk a directory tree, yielding paths of loadable files.
+
+        Uses os.scandir so no full listing of the tree is ever built and file
+        types come from the directory entries rather than extra stat calls.
+
+        Args:
+            directory_path: Directory to walk
+            extensions: Lower-case extensions to include (defaults to all supported types)
+
+        Yields:
+            File paths, in name order within each directory
+        """
+        extensions = tuple(extensions or DocumentLoader.TEXT_EXTENSIONS + DocumentLoader.BINARY_EXTENSIONS)
+        stack = [directory_path]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as scanner:
+                    entries = sorted(scanner, key=lambda entry: entry.name)
+            except OSError as e:
+                logger.warning("Cannot list directory %s: %s", directory, e)
+                continue
+            subdirectories = []
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirectories.append(entry.path)
+                    elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in extensions:
+                        yield entry.path
+                except OSError as e:
+                    logger.warning("Cannot stat %s: %s", entry.path, e)
+            stack.extend(reversed(subdirectories))
+
+    @staticmethod
+    def _get_load_concurrency() -> Tuple[int, int]:
+        """Configured (text, binary) concurrency for loading many documents."""
+        text_concurrency = DEFAULT_TEXT_LOAD_CONCURRENCY
+        binary_concurrency = DEFAULT_BINARY_LOAD_CONCURRENCY
+        try:
+            if settings and settings.processing:
+                processing_dict = settings.processing.__dict__
+                text_concurrency = processing_dict.get('text_load_concurrency', text_concurrency)
+                binary_concurrency = processing_dict.get('binary_load_concurrency', binary_concurrency)
+        except Exception as e:
+            logger.debug("Could not get document load concurrency settings: %s", e)
+        return text_concurrency, binary_concurrency or DocumentLoader.get_binary_concurrency()
+
+    @staticmethod
+    async def iter_bounded(
+            file_paths: Iterable[str],
+            worker: Callable[[str], Awaitable[T]],
+            text_concurrency: Optional[int] = None,
+            binary_concurrency: Optional[int] = None) -> AsyncIterator[Tuple[str, T]]:
+        """
+        Run an async worker over many files with bounded concurrency, yielding (path, result) as each completes.
+
+        Text and binary (PDF/DOCX/XLSX) files are bounded by separate semaphores,
+        since text reads are I/O bound while binary extraction is CPU bound. The
+        path iterable is consumed in a worker thread a batch at a time and only
+        while fewer than twice the combined limit of workers are outstanding, so a
+        lazy iterable (see iter_directory_files) is never materialized and at most
+        that many results are held in memory. Files whose worker raises are
+        logged and skipped.
+
+        Args:
+            file_paths: Paths to process; may be a lazy iterator
+            worker: Coroutine function called with each path
+            text_concurrency: Concurrent text files (defaults to TEXT_LOAD_CONCURRENCY)
+            binary_concurrency: Concurrent binary files (defaults to BINARY_LOAD_CONCURRENCY,
+                or the extraction backend's own limit)
+
+        Yields:
+            Tuples of (file path, worker result) in completion order
+        """
+        default_text, default_binary = DocumentLoader._get_load_concurrency()
+        text_limit = max(1, text_concurrency or default_text)
+        binary_limit = max(1, binary_concurrency or default_binary)
+        semaphores = {False: asyncio.Semaphore(text_limit), True: asyncio.Semaphore(binary_limit)}
+        max_outstanding = 2 * (text_limit + binary_limit)
+
+        async def run_bounded(file_path: str) -> T:
+            is_binary = os.path.splitext(str(file_path))[1].lower() in DocumentLoader.BINARY_EXTENSIONS
+            async with semaphores[is_binary]:
+                return await worker(file_path)
+
+        scanner = DocumentLoader._stream_in_thread(iter(file_paths), DIRECTORY_SCAN_BATCH)
+        scan_task: Optional[asyncio.Task] = None
+        scan_done = False
+        tasks = {}
+        try:
+            while True:
+                if not scan_done and scan_task is None and len(tasks) < max_outstanding:
+                    scan_task = asyncio.ensure_future(scanner.__anext__())
+                waiting = set(tasks) | ({scan_task} if scan_task else set())
+                if not waiting:
+                    break
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+
+                if scan_task in done:
+                    try:
+                        for file_path in scan_task.result():
+                            tasks[asyncio.ensure_future(run_bounded(file_path))] = file_path
+                    except StopAsyncIteration:
+                        scan_done = True
+                    scan_task = None
 
+                for task in done:
+                    file_path = tasks.pop(task, None)
+                    if file_path is None:
+                        continue
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        logger.error("Failed to process document %s: %s", file_path, e)
+                        continue
+                    yield file_path, result
+        finally:
+            pending = list(tasks) + ([scan_task] if scan_task else [])
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            await scanner.aclose()
+
+    @staticmethod
+    async def iter_documents(
+            file_paths: Iterable[str],
+            text_concurrency: Optional[int] = None,
+            binary_concurrency: Optional[int] = None) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Load many documents with bounded concurrency, yielding (path, content) as each completes.
+
+        Loads are bounded per format class and the paths are read lazily; see
+        iter_bounded. Files that fail to load or are empty are skipped.
+
+        Args:
+            file_paths: Paths to load; may be a lazy iterator
+            text_concurrency: Concurrent text reads (defaults to TEXT_LOAD_CONCURRENCY)
+            binary_concurrency: Concurrent binary extractions (defaults to BINARY_LOAD_CONCURRENCY,
+                or the extraction backend's own limit)
+
+        Yields:
+            Tuples of (file path, content) in completion order
+        """
+        async for file_path, content in DocumentLoader.iter_bounded(
+                file_paths, DocumentLoader.load_document, text_concurrency, binary_concurrency):
+            if content:
+                yield file_path, content
+
+    @staticmethod
+    async def iter_directory(
+            directory_path: str,
+            text_concurrency: Optional[int] = None,
+            binary_concurrency: Optional[int] = None) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Stream (path, content) for every supported document under a directory.
+
+        Discovery is lazy and loads are bounded per format class; see iter_documents.
+        """
+        if not Path(directory_path).is_dir():
+            logger.error("Provided path is not a directory: %s", directory_path)
+            return
+        async for document in DocumentLoader.iter_documents(
+                DocumentLoader.iter_directory_files(directory_path), text_concurrency, binary_concurrency):
+            yield document
+
+    @staticmethod
+    async def load_from_directory(directory_path: str) -> list[tuple[str, str]]:
+        """Load every supported document under a directory into a list (see iter_directory)."""
+        documents_content = [document async for document in DocumentLoader.iter_directory(directory_path)]
         logger.info(
             "Loaded %d documents from directory %s", len(documents_content), directory_path)
         return documents_content
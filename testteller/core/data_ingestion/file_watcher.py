@@ -0,0 +1,211 @@
+"""
+Directory watching for continuous document re-ingestion.
+
+Native filesystem notifications (inotify on Linux, FSEvents/ReadDirectoryChangesW
+elsewhere) are used through the optional ``watchfiles`` package; without it the
+directory is polled. Either way raw events are debounced and coalesced into
+batches of changed and deleted files.
+"""
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+from testteller.config import settings
+from ..constants import DEFAULT_WATCH_DEBOUNCE_SECONDS, DEFAULT_WATCH_POLL_INTERVAL
+from .document_loader import DocumentLoader
+
+try:
+    import watchfiles
+    HAS_WATCHFILES = True
+except ImportError:
+    watchfiles = None
+    HAS_WATCHFILES = False
+
+logger = logging.getLogger(__name__)
+
+# A batch is flushed after this many debounce periods even if events keep arriving
+MAX_DEBOUNCE_PERIODS = 10
+
+CHANGED = "changed"
+DELETED = "deleted"
+
+
+@dataclass
+class WatchBatch:
+    """Coalesced filesystem changes: files created or modified, and files removed."""
+    changed: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+
+
+class DirectoryWatcher:
+    """Watches a directory tree and yields debounced batches of document changes."""
+
+    def __init__(
+            self,
+            directory: str,
+            extensions: Optional[Iterable[str]] = None,
+            debounce: Optional[float] = None,
+            poll_interval: Optional[float] = None,
+            force_polling: bool = False):
+        """
+        Initialize the watcher.
+
+        Reported paths are built from ``directory`` as given, exactly like
+        DocumentLoader.iter_directory_files, so they match the ``source`` of
+        chunks ingested from the same directory.
+
+        Args:
+            directory: Directory to watch recursively
+            extensions: Extensions to watch (defaults to all loadable document types)
+            debounce: Seconds without new events before a batch is emitted (defaults to WATCH_DEBOUNCE_SECONDS)
+            poll_interval: Seconds between scans when polling (defaults to WATCH_POLL_INTERVAL)
+            force_polling: Poll even when native notifications are available
+        """
+        processing_dict = {}
+        try:
+            if settings and settings.processing:
+                processing_dict = settings.processing.__dict__
+        except Exception as e:
+            logger.debug("Could not get watch settings: %s", e)
+
+        self.directory = directory
+        self.extensions = tuple(
+            ext.lower() for ext in (extensions or DocumentLoader.TEXT_EXTENSIONS + DocumentLoader.BINARY_EXTENSIONS))
+        self.debounce = debounce if debounce is not None else processing_dict.get(
+            'watch_debounce_seconds', DEFAULT_WATCH_DEBOUNCE_SECONDS)
+        self.poll_interval = poll_interval if poll_interval is not None else processing_dict.get(
+            'watch_poll_interval', DEFAULT_WATCH_POLL_INTERVAL)
+        self.use_polling = force_polling or not HAS_WATCHFILES
+        self._abs_directory = os.path.abspath(directory)
+        self._known: Set[str] = set()
+
+    @property
+    def backend(self) -> str:
+        """Name of the change-detection mechanism in use."""
+        return "polling" if self.use_polling else "native"
+
+    def _is_document(self, path: str) -> bool:
+        return os.path.splitext(path)[1].lower() in self.extensions
+
+    def _to_watch_path(self, path: str) -> str:
+        """Express an absolute event path relative to the directory as it was given."""
+        return os.path.join(self.directory, os.path.relpath(path, self._abs_directory))
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        """Map every watched file to its (mtime_ns, size)."""
+        snapshot = {}
+        for path in DocumentLoader.iter_directory_files(self.directory, self.extensions):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    async def _poll_events(self, stop_event: asyncio.Event) -> AsyncIterator[Set[Tuple[str, str]]]:
+        """Yield change sets found by comparing successive directory snapshots."""
+        previous = await asyncio.to_thread(self._snapshot)
+        while not stop_event.is_set():
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=self.poll_interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            current = await asyncio.to_thread(self._snapshot)
+            events = {(DELETED, path) for path in previous.keys() - current.keys()}
+            events.update((CHANGED, path) for path, state in current.items() if previous.get(path) != state)
+            previous = current
+            if events:
+                yield events
+
+    async def _native_events(self, stop_event: asyncio.Event) -> AsyncIterator[Set[Tuple[str, str]]]:
+        """Yield change sets reported by the operating system through watchfiles."""
+        def watch_filter(change, path: str) -> bool:
+            # Directories are kept so that moved or deleted folders can be expanded
+            return self._is_document(path) or change == watchfiles.Change.deleted or os.path.isdir(path)
+
+        async for changes in watchfiles.awatch(
+                self._abs_directory, watch_filter=watch_filter, stop_event=stop_event,
+                debounce=int(self.debounce * 1000), step=50, rust_timeout=500):
+            events = set()
+            for change, path in changes:
+                watch_path = self._to_watch_path(path)
+                kind = DELETED if change == watchfiles.Change.deleted else CHANGED
+                events.update(await asyncio.to_thread(self._expand_event, kind, watch_path))
+            if events:
+                yield events
+
+    def _expand_event(self, kind: str, path: str) -> Set[Tuple[str, str]]:
+        """Turn an event on a directory into events for the documents it contains."""
+        if kind == DELETED:
+            if path in self._known:
+                return {(DELETED, path)}
+            prefix = path.rstrip(os.sep) + os.sep
+            return {(DELETED, known) for known in self._known if known.startswith(prefix)}
+        if os.path.isdir(path):
+            return {(CHANGED, p) for p in DocumentLoader.iter_directory_files(path, self.extensions)}
+        return {(CHANGED, path)} if self._is_document(path) else set()
+
+    async def batches(self, stop_event: Optional[asyncio.Event] = None) -> AsyncIterator[WatchBatch]:
+        """
+        Watch until ``stop_event`` is set, yielding coalesced batches of changes.
+
+        Events are accumulated until none arrive for ``debounce`` seconds (or
+        for at most MAX_DEBOUNCE_PERIODS debounce periods while events keep
+        coming). Only the last event per path counts, so a file written several
+        times is re-ingested once and a file created then deleted only has its
+        chunks removed.
+        """
+        stop_event = stop_event or asyncio.Event()
+        self._known = set((await asyncio.to_thread(self._snapshot)).keys())
+        source = self._poll_events(stop_event) if self.use_polling else self._native_events(stop_event)
+        queue: asyncio.Queue = asyncio.Queue()
+        logger.info("Watching %s for document changes (%s backend)", self.directory, self.backend)
+
+        async def produce() -> None:
+            try:
+                async for events in source:
+                    await queue.put(events)
+            finally:
+                await queue.put(None)
+
+        producer = asyncio.create_task(produce())
+        pending: Dict[str, str] = {}
+        first_event_at = 0.0
+        finished = False
+        try:
+            while not finished:
+                if not pending:
+                    events = await queue.get()
+                    if events is None:
+                        return
+                    first_event_at = time.monotonic()
+                    pending.update((path, kind) for kind, path in events)
+                    continue
+
+                remaining = first_event_at + self.debounce * MAX_DEBOUNCE_PERIODS - time.monotonic()
+                try:
+                    events = await asyncio.wait_for(queue.get(), timeout=max(0.0, min(self.debounce, remaining)))
+                    if events is None:
+                        finished = True
+                    else:
+                        pending.update((path, kind) for kind, path in events)
+                        continue
+                except asyncio.TimeoutError:
+                    pass
+
+                batch = WatchBatch(
+                    changed=sorted(p for p, kind in pending.items() if kind == CHANGED),
+                    deleted=sorted(p for p, kind in pending.items() if kind == DELETED))
+                self._known.difference_update(batch.deleted)
+                self._known.update(batch.changed)
+                pending.clear()
+                logger.info("Detected %d changed and %d deleted documents", len(batch.changed), len(batch.deleted))
+                yield batch
+        finally:
+            stop_event.set()
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
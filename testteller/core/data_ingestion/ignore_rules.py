@@ -0,0 +1,142 @@
+"""
+Gitignore-style path filtering for code ingestion.
+
+Supports the commonly used subset of gitignore syntax: comments, negation
+with ``!``, directory-only patterns ending in ``/``, patterns anchored by a
+``/``, and ``*``, ``?``, ``[...]`` and ``**`` wildcards. Rules from nested
+ignore files apply relative to the directory that contains them, and the
+last matching rule wins.
+"""
+import logging
+import re
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Pattern
+
+logger = logging.getLogger(__name__)
+
+
+class IgnoreRule(NamedTuple):
+    """A single compiled ignore pattern."""
+    base: str  # Directory (relative to the walk root, "" for the root) the rule applies under
+    regex: Pattern
+    negate: bool
+    dir_only: bool
+
+
+def _translate(pattern: str) -> str:
+    """Translate a gitignore glob (without leading/trailing slashes) into a regex body."""
+    result = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            result.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            result.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            result.append(".*")
+            i += 2
+        elif char == "*":
+            result.append("[^/]*")
+            i += 1
+        elif char == "?":
+            result.append("[^/]")
+            i += 1
+        elif char == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                result.append(re.escape(char))
+                i += 1
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                result.append(f"[{body}]")
+                i = end + 1
+        elif char == "\\" and i + 1 < len(pattern):
+            result.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            result.append(re.escape(char))
+            i += 1
+    return "".join(result)
+
+
+def parse_ignore_line(line: str, base: str = "") -> Optional[IgnoreRule]:
+    """
+    Compile one line of an ignore file.
+
+    Args:
+        line: Raw line from the ignore file
+        base: Directory of the ignore file, relative to the walk root
+
+    Returns:
+        IgnoreRule, or None for blank lines and comments
+    """
+    line = line.rstrip("\n").rstrip()
+    if not line or line.startswith("#"):
+        return None
+
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    elif line.startswith("\\!") or line.startswith("\\#"):
+        line = line[1:]
+
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+
+    # A slash anywhere but the end anchors the pattern to the ignore file's directory
+    anchored = "/" in line
+    line = line.lstrip("/")
+    body = _translate(line)
+    regex = re.compile(f"^{body}$" if anchored else f"^(?:.*/)?{body}$")
+    return IgnoreRule(base=base, regex=regex, negate=negate, dir_only=dir_only)
+
+
+class IgnoreRules:
+    """An ordered collection of ignore rules gathered while walking a tree."""
+
+    def __init__(self, rules: Optional[List[IgnoreRule]] = None):
+        self.rules: List[IgnoreRule] = list(rules or [])
+
+    def add_patterns(self, lines: List[str], base: str = "") -> None:
+        """Add rules from ignore-file lines located in directory ``base``."""
+        for line in lines:
+            rule = parse_ignore_line(line, base)
+            if rule:
+                self.rules.append(rule)
+
+    def add_file(self, ignore_file: Path, base: str = "") -> None:
+        """Add rules from an ignore file, if it exists and is readable."""
+        try:
+            with open(ignore_file, "r", encoding="utf-8", errors="ignore") as f:
+                self.add_patterns(f.readlines(), base)
+        except OSError as e:
+            logger.debug("Could not read ignore file %s: %s", ignore_file, e)
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """
+        Check a path (relative to the walk root, using ``/`` separators) against the rules.
+
+        Directories matched here should be pruned by the caller, since a path
+        inside an ignored directory cannot be re-included.
+        """
+        ignored = False
+        for rule in self.rules:
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.base:
+                prefix = rule.base + "/"
+                if not rel_path.startswith(prefix):
+                    continue
+                sub_path = rel_path[len(prefix):]
+            else:
+                sub_path = rel_path
+            if rule.regex.match(sub_path):
+                ignored = not rule.negate
+        return ignored
@@ -0,0 +1,259 @@
+"""
+Offline dry-run planning for document ingestion.
+
+A dry run drives the normal ingestion code (loading, parsing, chunking, chunk
+ids and near-duplicate detection) against DryRunVectorStore, which records
+what would be embedded instead of calling the embedding provider or writing
+to the collection. Chunks already in the local collection are looked up
+read-only, so only genuinely new chunks are counted. The recording is then
+turned into token, request, time and cost estimates for the configured
+provider.
+"""
+import logging
+import math
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import chromadb
+from chromadb.api.types import Documents, IDs, Metadatas, Where
+
+from testteller.config import settings
+from ..constants import (
+    DRY_RUN_CHARS_PER_TOKEN, EMBEDDING_CALL_SECONDS, EMBEDDING_PRICES_PER_MILLION_TOKENS,
+    PER_TEXT_EMBEDDING_PROVIDERS, DEFAULT_CLAUDE_EMBEDDING_PROVIDER
+)
+from ..llm.llm_manager import LLMManager
+from ..vector_store.numpy_store import open_local_client
+from .ingest_state import get_persist_directory
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the number of embedding tokens in a text without a provider tokenizer."""
+    return math.ceil(len(text) / DRY_RUN_CHARS_PER_TOKEN)
+
+
+def get_embedding_backend(provider: str) -> str:
+    """
+    Get the backend that computes embeddings for an LLM provider.
+
+    Claude has no embedding API and uses the configured CLAUDE_EMBEDDING_PROVIDER.
+    """
+    if provider != "claude":
+        return provider
+    embedding_provider = DEFAULT_CLAUDE_EMBEDDING_PROVIDER
+    try:
+        if settings and settings.llm:
+            embedding_provider = settings.llm.__dict__.get('claude_embedding_provider', DEFAULT_CLAUDE_EMBEDDING_PROVIDER)
+    except Exception as e:
+        logger.debug("Could not get Claude embedding provider from settings: %s", e)
+    return "openai" if embedding_provider == "openai" else "gemini"
+
+
+def _get_price_per_million_tokens(backend: str) -> float:
+    """Get the embedding price from settings, or the backend's list price."""
+    try:
+        if settings and settings.llm:
+            price = settings.llm.__dict__.get('embedding_price_per_million_tokens')
+            if price is not None:
+                return price
+    except Exception as e:
+        logger.debug("Could not get embedding price from settings: %s", e)
+    return EMBEDDING_PRICES_PER_MILLION_TOKENS.get(backend, 0.0)
+
+
+class DryRunVectorStore:
+    """Vector store stand-in that records what an ingestion would embed, without storing anything."""
+
+    def __init__(self, collection: Optional[chromadb.Collection] = None):
+        """
+        Initialize the recorder.
+
+        Args:
+            collection: Existing collection to check chunk ids against (read only); None when there is none
+        """
+        self.collection = collection
+        # Texts of each add_documents call that would request embeddings
+        self.batches: List[List[str]] = []
+        self.received = 0
+        # Chunks skipped because their id is stored, or was already recorded by this run
+        self.unchanged = 0
+        self._recorded_ids: set = set()
+
+    @classmethod
+    def for_collection(cls, collection_name: str, persist_directory: Optional[str] = None) -> "DryRunVectorStore":
+        """
+        Create a recorder that checks chunk ids against a local collection, if it exists.
+
+        Nothing is created on disk. A remote ChromaDB server is not contacted,
+        so with CHROMA_DB_USE_REMOTE every chunk counts as new.
+        """
+        try:
+            if settings and settings.chromadb and settings.chromadb.__dict__.get('use_remote', False):
+                logger.info("Dry run does not contact remote ChromaDB; all chunks are counted as new")
+                return cls()
+        except Exception as e:
+            logger.debug("Could not get ChromaDB settings: %s", e)
+
+        path = get_persist_directory(persist_directory)
+        if not os.path.isdir(path):
+            return cls()
+        try:
+            return cls(open_local_client(path).get_collection(collection_name))
+        except Exception as e:
+            logger.debug("No existing collection '%s' to check chunks against: %s", collection_name, e)
+            return cls()
+
+    def get_existing_ids(self, ids: IDs) -> set:
+        """Return the ids that are stored in the collection or were recorded earlier in the dry run."""
+        ids = list(dict.fromkeys(ids))
+        existing = {chunk_id for chunk_id in ids if chunk_id in self._recorded_ids}
+        if self.collection is not None and ids:
+            stored = self.collection.get(ids=ids, include=[])
+            existing.update(stored['ids'] if stored and stored['ids'] else [])
+        return existing
+
+    def add_documents(
+        self,
+        documents: Documents,
+        metadatas: Optional[Metadatas] = None,
+        ids: Optional[IDs] = None,
+        refresh_metadata: bool = False
+    ) -> None:
+        """Record the documents that ChromaDBManager.add_documents would embed."""
+        self.received += len(documents)
+        if ids is None:
+            new_documents = list(documents)
+        else:
+            existing = self.get_existing_ids(ids)
+            new_documents = []
+            for document, chunk_id in zip(documents, ids):
+                if chunk_id in existing or chunk_id in self._recorded_ids:
+                    continue
+                self._recorded_ids.add(chunk_id)
+                new_documents.append(document)
+        self.unchanged += len(documents) - len(new_documents)
+        if new_documents:
+            self.batches.append(new_documents)
+
+    def upsert_documents(
+        self,
+        documents: Documents,
+        metadatas: Optional[Metadatas] = None,
+        ids: Optional[IDs] = None
+    ) -> int:
+        """Record the documents that ChromaDBManager.upsert_documents would embed: new ids and changed texts."""
+        if ids is None:
+            self.add_documents(documents, metadatas)
+            return len(documents)
+        self.received += len(documents)
+        stored_documents = {}
+        if self.collection is not None and ids:
+            stored = self.collection.get(ids=list(dict.fromkeys(ids)), include=["documents"])
+            stored_documents = dict(zip(stored['ids'], stored['documents'])) if stored and stored['ids'] else {}
+        new_documents = []
+        for document, chunk_id in zip(documents, ids):
+            if chunk_id in self._recorded_ids or stored_documents.get(chunk_id, None) == document:
+                continue
+            self._recorded_ids.add(chunk_id)
+            new_documents.append(document)
+        self.unchanged += len(documents) - len(new_documents)
+        if new_documents:
+            self.batches.append(new_documents)
+        return len(new_documents)
+
+    def prune_source(self, source: str, keep_ids: IDs) -> int:
+        """Nothing is removed in a dry run."""
+        return 0
+
+    def delete_where(self, where: Where) -> int:
+        """Nothing is removed in a dry run."""
+        return 0
+
+    def delete_by_source(self, source: str) -> int:
+        """Nothing is removed in a dry run."""
+        return 0
+
+    def get_collection_count(self) -> int:
+        """Number of documents in the existing collection."""
+        return self.collection.count() if self.collection is not None else 0
+
+    async def get_collection_count_async(self) -> int:
+        return self.get_collection_count()
+
+    def close(self) -> None:
+        self.collection = None
+
+
+@dataclass
+class IngestPlan:
+    """Projected work and cost of an ingestion, from a dry run."""
+    provider: str
+    embedding_backend: str
+    files_by_type: Dict[str, int] = field(default_factory=dict)
+    chunks: int = 0
+    unchanged_chunks: int = 0
+    near_duplicate_chunks: int = 0
+    new_chunks: int = 0
+    tokens: int = 0
+    provider_calls: int = 0
+    parse_seconds: float = 0.0
+    embed_seconds: float = 0.0
+    cost: float = 0.0
+
+    @property
+    def files(self) -> int:
+        return sum(self.files_by_type.values())
+
+    @property
+    def wall_seconds(self) -> float:
+        return self.parse_seconds + self.embed_seconds
+
+    @classmethod
+    def from_dry_run(
+            cls,
+            store: DryRunVectorStore,
+            provider: str,
+            file_paths: List[str],
+            near_duplicate_chunks: int = 0,
+            parse_seconds: float = 0.0) -> "IngestPlan":
+        """
+        Estimate an ingestion from what a dry run recorded.
+
+        Embedding requests are sent one after another, so projected wall time
+        is the measured local parse time plus one typical request latency per
+        provider call.
+
+        Args:
+            store: Recorder the dry run ingested into
+            provider: Configured LLM provider (embeddings may come from EMBEDDING_PROVIDER)
+            file_paths: Documents the ingestion would read
+            near_duplicate_chunks: Chunks near-duplicate detection would skip
+            parse_seconds: Measured time spent loading, parsing and chunking
+
+        Returns:
+            The ingestion plan
+        """
+        embedding_provider = LLMManager.resolve_embedding_provider(provider)
+        backend = get_embedding_backend(embedding_provider)
+        files_by_type = Counter(os.path.splitext(p)[1].lower() or "(none)" for p in file_paths)
+        texts = [text for batch in store.batches for text in batch]
+        tokens = sum(estimate_tokens(text) for text in texts)
+        calls = len(texts) if embedding_provider in PER_TEXT_EMBEDDING_PROVIDERS else len(store.batches)
+        return cls(
+            provider=provider,
+            embedding_backend=backend,
+            files_by_type=dict(files_by_type.most_common()),
+            chunks=store.received + near_duplicate_chunks,
+            unchanged_chunks=store.unchanged,
+            near_duplicate_chunks=near_duplicate_chunks,
+            new_chunks=len(texts),
+            tokens=tokens,
+            provider_calls=calls,
+            parse_seconds=parse_seconds,
+            embed_seconds=calls * EMBEDDING_CALL_SECONDS.get(backend, 0.0),
+            cost=tokens / 1_000_000 * _get_price_per_million_tokens(backend)
+        )
@@ -0,0 +1,259 @@
+"""
+Persistent ingestion state kept alongside the vector store.
+
+Each collection gets its own directory under ``<persist_directory>/testteller_state``
+holding small JSON files that let re-ingestion skip work that was already done,
+such as the last ingested commit of each code repository, and an append-only
+journal of the files and chunk batches stored by the current ingestion run so
+an interrupted run can be resumed.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from testteller.config import settings
+from ..constants import DEFAULT_CHROMA_PERSIST_DIRECTORY
+
+logger = logging.getLogger(__name__)
+
+STATE_DIR_NAME = "testteller_state"
+CODE_STATE_FILE = "code_sources.json"
+JOURNAL_FILE = "journal.jsonl"
+
+
+def get_collection_state_dir(collection_name: str, persist_directory: Optional[str] = None) -> Path:
+    """
+    Get the directory holding ingestion state for a collection.
+
+    Args:
+        collection_name: Name of the ChromaDB collection
+        persist_directory: ChromaDB persist directory (defaults to the configured one)
+
+    Returns:
+        Path to the collection's state directory (not created)
+    """
+    safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', collection_name)
+    return Path(get_persist_directory(persist_directory)) / STATE_DIR_NAME / safe_name
+
+
+def get_persist_directory(persist_directory: Optional[str] = None) -> str:
+    """Get the ChromaDB persist directory: the given one, else the configured one."""
+    if persist_directory is not None:
+        return persist_directory
+    try:
+        if settings and settings.chromadb:
+            return settings.chromadb.__dict__.get('persist_directory', DEFAULT_CHROMA_PERSIST_DIRECTORY)
+    except Exception as e:
+        logger.debug("Could not get persist directory from settings: %s", e)
+    return DEFAULT_CHROMA_PERSIST_DIRECTORY
+
+
+def write_json_atomic(path: Path, data: Any) -> None:
+    """Write JSON to a file so readers never see a partially written file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class IngestStateStore:
+    """Per-collection record of what has already been ingested."""
+
+    def __init__(self, collection_name: str, persist_directory: Optional[str] = None):
+        """
+        Initialize the state store.
+
+        Args:
+            collection_name: Name of the ChromaDB collection
+            persist_directory: ChromaDB persist directory (defaults to the configured one)
+        """
+        self.state_dir = get_collection_state_dir(collection_name, persist_directory)
+
+    def _read(self, file_name: str) -> Dict[str, Any]:
+        path = self.state_dir / file_name
+        if not path.exists():
+            return {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable ingestion state %s: %s", path, e)
+            return {}
+
+    def get_code_state(self, source: str) -> Optional[Dict[str, Any]]:
+        """Get the recorded state for a code source, e.g. {"commit": ..., "ingested_at": ...}."""
+        return self._read(CODE_STATE_FILE).get(source)
+
+    def set_code_state(self, source: str, commit: str) -> None:
+        """Record the commit a code source was last ingested at."""
+        state = self._read(CODE_STATE_FILE)
+        state[source] = {"commit": commit, "ingested_at": datetime.now().isoformat()}
+        write_json_atomic(self.state_dir / CODE_STATE_FILE, state)
+        logger.debug("Recorded commit %s for code source %s", commit, source)
+
+    def clear(self) -> None:
+        """Forget all recorded state for the collection."""
+        if not self.state_dir.exists():
+            return
+        for path in self.state_dir.iterdir():
+            if path.is_file():
+                path.unlink()
+
+
+def file_fingerprint(file_path: str) -> str:
+    """Cheap fingerprint of a file on disk (size and modification time)."""
+    stat = os.stat(file_path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def content_fingerprint(content: str) -> str:
+    """Fingerprint of in-memory content, for sources without a stable file on disk."""
+    return hashlib.sha256(content.encode('utf-8', errors='ignore')).hexdigest()[:16]
+
+
+@dataclass
+class IngestRun:
+    """
+    Progress of one ingestion run of a source, backed by the collection's journal.
+
+    When resuming, ``completed`` and ``partial`` hold what the interrupted run
+    already stored, keyed by file. Entries only count if the file's fingerprint
+    still matches, so files changed since the interrupted run are re-ingested.
+    """
+    journal: "IngestJournal"
+    source: str
+    resumed: bool = False
+    completed: Dict[str, str] = field(default_factory=dict)  # file -> fingerprint
+    partial: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # file -> {"fingerprint", "chunks"}
+    skipped_files: List[str] = field(default_factory=list)
+    skipped_chunks: int = 0
+
+    def is_completed(self, file: str, fingerprint: str) -> bool:
+        """Whether a file was fully stored by the interrupted run; records it as skipped if so."""
+        if self.completed.get(file) != fingerprint:
+            return False
+        self.skipped_files.append(file)
+        return True
+
+    def resume_offset(self, file: str, fingerprint: str) -> int:
+        """Number of leading chunks of a file already stored by the interrupted run."""
+        progress = self.partial.get(file)
+        if not progress or progress.get("fingerprint") != fingerprint:
+            return 0
+        self.skipped_chunks += progress["chunks"]
+        return progress["chunks"]
+
+    def record_batch(self, file: str, fingerprint: str, chunks: int) -> None:
+        """Record that the first ``chunks`` chunks of a file are stored."""
+        self.journal.append({"event": "batch", "source": self.source, "file": file,
+                             "fingerprint": fingerprint, "chunks": chunks})
+
+    def record_file(self, file: str, fingerprint: str) -> None:
+        """Record that a file is completely stored."""
+        self.journal.append({"event": "file", "source": self.source, "file": file,
+                             "fingerprint": fingerprint})
+
+    def complete(self) -> None:
+        """Mark the run finished, so a later resume starts a fresh run."""
+        self.journal.complete(self.source)
+
+
+class IngestJournal:
+    """
+    Append-only JSON Lines journal of ingestion progress for a collection.
+
+    A run of a source writes a ``start`` record, then ``batch`` and ``file``
+    records as chunks reach the vector store. Finished runs are compacted away,
+    so the journal only ever holds interrupted or in-flight runs.
+    """
+
+    def __init__(self, collection_name: str, persist_directory: Optional[str] = None):
+        """
+        Initialize the journal.
+
+        Args:
+            collection_name: Name of the ChromaDB collection
+            persist_directory: ChromaDB persist directory (defaults to the configured one)
+        """
+        self.path = get_collection_state_dir(collection_name, persist_directory) / JOURNAL_FILE
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Append one record; each record is a single line so a crash can at most truncate the last one."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'ab+') as f:
+            line = json.dumps(record).encode('utf-8') + b"\n"
+            if f.tell():
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # Terminate a line torn by a crash so this record stays parseable
+                    line = b"\n" + line
+            f.write(line)
+
+    def _read_records(self) -> List[Dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        records = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    logger.debug("Skipping torn journal line in %s", self.path)
+        return records
+
+    def start_run(self, source: str, resume: bool = False) -> IngestRun:
+        """
+        Start ingesting a source.
+
+        Args:
+            source: Key identifying what is being ingested (e.g. "docs:/abs/path")
+            resume: Continue the source's interrupted run, if there is one
+
+        Returns:
+            IngestRun to check and record progress against
+        """
+        run = IngestRun(journal=self, source=source)
+        if resume:
+            records = [r for r in self._read_records() if r.get("source") == source]
+            starts = [i for i, r in enumerate(records) if r.get("event") == "start"]
+            if starts:
+                run.resumed = True
+                for record in records[starts[-1] + 1:]:
+                    if record.get("event") == "file":
+                        run.completed[record["file"]] = record["fingerprint"]
+                        run.partial.pop(record["file"], None)
+                    elif record.get("event") == "batch":
+                        run.partial[record["file"]] = {
+                            "fingerprint": record["fingerprint"], "chunks": record["chunks"]}
+                logger.info(
+                    "Resuming ingestion of %s: %d files and %d partially ingested files recorded",
+                    source, len(run.completed), len(run.partial))
+                return run
+            logger.info("No interrupted ingestion of %s to resume; starting from the beginning", source)
+
+        self.discard(source)
+        self.append({"event": "start", "source": source, "started_at": datetime.now().isoformat()})
+        return run
+
+    def complete(self, source: str) -> None:
+        """Drop a finished run's records from the journal."""
+        self.discard(source)
+        logger.debug("Ingestion of %s completed; journal compacted", source)
+
+    def discard(self, source: str) -> None:
+        """Remove every record of a source, rewriting the journal atomically."""
+        records = self._read_records()
+        remaining = [r for r in records if r.get("source") != source]
+        if len(remaining) == len(records):
+            return
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(r) + "\n" for r in remaining)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,224 @@
+"""
+Near-duplicate chunk detection for ingestion.
+
+Each chunk gets a 64-bit SimHash over its word 3-gram shingles, computed for a
+whole batch at once with NumPy. Chunks whose signatures differ in at most
+``max_distance`` bits are near-duplicates. Signatures are kept in a persistent
+per-collection index that splits them into ``max_distance + 1`` bands: by the
+pigeonhole principle two signatures within that distance agree exactly on at
+least one band, so candidates are found with one dictionary lookup per band.
+"""
+import hashlib
+import logging
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from ..constants import DEFAULT_NEAR_DUPLICATE_MAX_DISTANCE
+from .ingest_state import get_collection_state_dir
+
+logger = logging.getLogger(__name__)
+
+SIMHASH_INDEX_FILE = "simhash_index.npz"
+SIGNATURE_BITS = 64
+SHINGLE_SIZE = 3
+# Chunks with fewer words than this are too short for a meaningful signature
+MIN_SHINGLE_TOKENS = 8
+
+_TOKEN_RE = re.compile(r'\w+')
+_BIT_SHIFTS = np.arange(SIGNATURE_BITS, dtype=np.uint64)
+
+
+def _shingles(text: str) -> List[str]:
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < MIN_SHINGLE_TOKENS:
+        return []
+    return [" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)]
+
+
+def simhash_signatures(texts: Sequence[str]) -> np.ndarray:
+    """
+    Compute 64-bit SimHash signatures for a batch of texts.
+
+    Args:
+        texts: Texts to sign
+
+    Returns:
+        uint64 array with one signature per text; 0 for texts too short to sign
+    """
+    shingle_lists = [_shingles(text) for text in texts]
+    counts = np.array([len(shingles) for shingles in shingle_lists], dtype=np.int64)
+    signatures = np.zeros(len(texts), dtype=np.uint64)
+    if not counts.any():
+        return signatures
+
+    digests = b"".join(
+        hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest()
+        for shingles in shingle_lists for shingle in shingles)
+    hashes = np.frombuffer(digests, dtype='<u8')
+
+    # +1/-1 vote of every shingle on every bit, summed per text
+    votes = ((hashes[:, None] >> _BIT_SHIFTS) & np.uint64(1)).astype(np.int32) * 2 - 1
+    signed = counts > 0
+    offsets = np.concatenate(([0], np.cumsum(counts[signed])[:-1]))
+    totals = np.add.reduceat(votes, offsets, axis=0)
+
+    bits = (totals > 0).astype(np.uint64) << _BIT_SHIFTS
+    signatures[signed] = np.bitwise_or.reduce(bits, axis=1)
+    return signatures
+
+
+def hamming_distances(signature: int, signatures: np.ndarray) -> np.ndarray:
+    """Number of differing bits between one signature and each of an array of signatures."""
+    xor = np.bitwise_xor(signatures.astype(np.uint64), np.uint64(signature))
+    return np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def word_jaccard_matrix(texts: Sequence[str], others: Sequence[str]) -> np.ndarray:
+    """
+    Word-set Jaccard similarity of every text with every other text.
+
+    Args:
+        texts: Texts compared (rows)
+        others: Texts compared against (columns)
+
+    Returns:
+        float array of shape (len(texts), len(others)); 0 where either text has no words
+    """
+    word_sets = [set(text.lower().split()) for text in list(texts) + list(others)]
+    vocabulary = {word: i for i, word in enumerate(set().union(*word_sets))} if word_sets else {}
+    incidence = np.zeros((len(word_sets), len(vocabulary)), dtype=np.float32)
+    for row, words in enumerate(word_sets):
+        incidence[row, [vocabulary[word] for word in words]] = 1.0
+
+    left, right = incidence[:len(texts)], incidence[len(texts):]
+    intersections = left @ right.T
+    unions = left.sum(axis=1)[:, None] + right.sum(axis=1)[None, :] - intersections
+    return np.divide(intersections, unions, out=np.zeros_like(intersections), where=unions > 0)
+
+
+@dataclass
+class NearDuplicateStats:
+    """Savings from near-duplicate elimination during one ingestion."""
+    checked: int = 0
+    skipped: int = 0
+    skipped_chars: int = 0
+
+    @property
+    def skipped_ratio(self) -> float:
+        return self.skipped / self.checked if self.checked else 0.0
+
+
+class NearDuplicateIndex:
+    """Persistent LSH index of chunk SimHash signatures for a collection."""
+
+    def __init__(
+            self,
+            collection_name: str,
+            persist_directory: Optional[str] = None,
+            max_distance: int = DEFAULT_NEAR_DUPLICATE_MAX_DISTANCE):
+        """
+        Initialize the index; stored signatures are loaded on first use.
+
+        Args:
+            collection_name: Name of the ChromaDB collection
+            persist_directory: ChromaDB persist directory (defaults to the configured one)
+            max_distance: Largest Hamming distance (in bits) that counts as a near-duplicate
+        """
+        self.path = get_collection_state_dir(collection_name, persist_directory) / SIMHASH_INDEX_FILE
+        self.max_distance = max(0, min(max_distance, SIGNATURE_BITS // 2 - 1))
+        self.bands = self.max_distance + 1
+        self.band_bits = SIGNATURE_BITS // self.bands
+        self._signatures: List[int] = []
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in range(self.bands)]
+        self._loaded = False
+        self._dirty = False
+
+    def __len__(self) -> int:
+        self._load()
+        return len(self._positions)
+
+    def _band_keys(self, signature: int) -> List[int]:
+        mask = (1 << self.band_bits) - 1
+        return [(signature >> (band * self.band_bits)) & mask for band in range(self.bands)]
+
+    def _insert(self, signature: int, chunk_id: str) -> None:
+        position = len(self._ids)
+        self._signatures.append(signature)
+        self._ids.append(chunk_id)
+        self._positions[chunk_id] = position
+        for table, key in zip(self._tables, self._band_keys(signature)):
+            table.setdefault(key, []).append(position)
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path.exists():
+            return
+        try:
+            with np.load(self.path) as data:
+                signatures, ids = data["signatures"], data["ids"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable near-duplicate index %s: %s", self.path, e)
+            return
+        for signature, chunk_id in zip(signatures.tolist(), ids.tolist()):
+            self._insert(signature, chunk_id)
+        logger.debug("Loaded %d chunk signatures from %s", len(self._ids), self.path)
+
+    def find(self, signature: int, exclude_id: Optional[str] = None) -> List[str]:
+        """
+        Find indexed chunks within ``max_distance`` bits of a signature.
+
+        Args:
+            signature: SimHash signature to look up
+            exclude_id: Chunk id to leave out (normally the id of the chunk being checked)
+
+        Returns:
+            Matching chunk ids, nearest first
+        """
+        self._load()
+        candidates = set()
+        for table, key in zip(self._tables, self._band_keys(signature)):
+            candidates.update(table.get(key, ()))
+        candidates = [p for p in candidates
+                      if self._ids[p] != exclude_id and self._positions.get(self._ids[p]) == p]
+        if not candidates:
+            return []
+        distances = hamming_distances(signature, np.array([self._signatures[p] for p in candidates], dtype=np.uint64))
+        return [self._ids[candidates[i]] for i in np.argsort(distances, kind="stable")
+                if distances[i] <= self.max_distance]
+
+    def add(self, signatures: Iterable[int], chunk_ids: Iterable[str]) -> None:
+        """Index the signatures of stored chunks (replacing earlier signatures of the same ids)."""
+        self._load()
+        for signature, chunk_id in zip(signatures, chunk_ids):
+            if signature:
+                self._insert(int(signature), chunk_id)
+                self._dirty = True
+
+    def remove(self, chunk_ids: Iterable[str]) -> None:
+        """Forget chunks that are no longer stored."""
+        self._load()
+        for chunk_id in chunk_ids:
+            if self._positions.pop(chunk_id, None) is not None:
+                self._dirty = True
+
+    def save(self) -> None:
+        """Write the index if it changed, compacting removed and replaced entries."""
+        if not self._dirty:
+            return
+        live = sorted(self._positions.values())
+        signatures = np.array([self._signatures[p] for p in live], dtype=np.uint64)
+        ids = np.array([self._ids[p] for p in live], dtype=str)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.stem}.tmp.npz")
+        np.savez(tmp_path, signatures=signatures, ids=ids)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+        logger.debug("Saved %d chunk signatures to %s", len(live), self.path)
@@ -23,13 +23,23 @@ Usage:
     
     # Get structured metadata
     metadata = await parser.extract_metadata(file_path)
+
+    # Stream large PDFs chunk by chunk with page numbers
+    async for chunk in parser.stream_pdf_chunks(file_path, chunk_size=1000):
+        print(chunk.page_start, chunk.page_end, chunk.text)
+
+    # Stream large workbooks as row batches with the header repeated
+    async for chunk in parser.stream_xlsx_chunks(file_path, rows_per_chunk=50):
+        print(chunk.sheet, chunk.row_start, chunk.row_end, chunk.text)
 """
 
 import asyncio
 import logging
 import os
+import re
+import zlib
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Union, Tuple
+from typing import List, Dict, Any, Iterable, Optional, Union, Tuple, AsyncIterator
 from dataclasses import dataclass
 from enum import Enum
 
@@ -115,6 +125,161 @@ class ParsedDocument:
             self.chunks = []
 
 
+# Characters before a segment boundary hashed to decide content-defined cuts
+CONTENT_HASH_WINDOW = 64
+
+
+@dataclass
+class PageChunk:
+    """A chunk of streamed document text with the page range it came from"""
+    text: str
+    page_start: Optional[int] = None
+    page_end: Optional[int] = None
+
+
+@dataclass
+class RowChunk:
+    """A batch of spreadsheet rows (with the sheet header repeated) and its location"""
+    text: str
+    sheet: str
+    row_start: int
+    row_end: int
+
+
+class _SmartChunkBuilder:
+    """Incremental form of the smart chunking rules, fed one line at a time."""
+
+    def __init__(self, chunk_size: int):
+        self.chunk_size = chunk_size
+        self.current_chunk = ""
+        self.page_start: Optional[int] = None
+        self.page_end: Optional[int] = None
+
+    def _emit(self) -> PageChunk:
+        chunk = PageChunk(self.current_chunk.strip(), self.page_start, self.page_end)
+        self.current_chunk = ""
+        self.page_start = None
+        return chunk
+
+    def add_line(self, line: str, page: Optional[int] = None) -> List[PageChunk]:
+        """Add a line and return any chunks it completed."""
+        completed = []
+
+        # If adding this line would exceed chunk size and we have content
+        if len(self.current_chunk) + len(line) > self.chunk_size and self.current_chunk:
+            completed.append(self._emit())
+
+        if not self.current_chunk:
+            self.page_start = page
+        self.current_chunk += line + '\n'
+        self.page_end = page
+
+        # Break at section boundaries for better semantic chunking
+        if line.strip().startswith('#') and len(self.current_chunk) > self.chunk_size * 0.5:
+            completed.append(self._emit())
+
+        return completed
+
+    def flush(self) -> List[PageChunk]:
+        """Return the final partial chunk, if any."""
+        if self.current_chunk.strip():
+            return [self._emit()]
+        return []
+
+
+class _ContentChunkBuilder:
+    """
+    Content-defined chunking, fed one piece of text (e.g. a page) at a time.
+
+    Text is split into segments at newlines and sentence ends. After each
+    segment a hash of the preceding CONTENT_HASH_WINDOW characters decides
+    whether to cut, so cut points depend only on nearby content: an edit
+    moves the cuts around it, and chunking falls back into step at the next
+    content-selected cut. Chunks are at least a quarter of ``chunk_size`` and
+    never longer than ``chunk_size``.
+    """
+
+    BOUNDARY_RE = re.compile(r'(?<=[.!?])\s+|\n\s*')
+
+    def __init__(self, chunk_size: int):
+        self.max_size = max(chunk_size, 1)
+        self.min_size = self.max_size // 4
+        # Length past min_size over which a cut becomes expected, giving chunks of about half of chunk_size
+        self.cut_span = max(self.max_size // 4, 1)
+        self.segments: List[str] = []
+        self.length = 0
+        self.page_start: Optional[int] = None
+        self.page_end: Optional[int] = None
+        self.pending = ""
+        self.pending_page: Optional[int] = None
+        self.tail = ""
+
+    def _emit(self) -> List[PageChunk]:
+        text = "".join(self.segments).strip()
+        chunk = PageChunk(text, self.page_start, self.page_end)
+        self.segments = []
+        self.length = 0
+        self.page_start = None
+        return [chunk] if text else []
+
+    def _is_cut_point(self, segment_length: int) -> bool:
+        window_hash = zlib.crc32(self.tail.encode('utf-8', errors='replace'))
+        return window_hash < (1 << 32) * min(1.0, segment_length / self.cut_span)
+
+    def _split_oversized(self, segment: str) -> List[str]:
+        """Split a segment longer than a chunk at whitespace (or anywhere, failing that)."""
+        pieces = []
+        while len(segment) > self.max_size:
+            cut = max(segment.rfind(' ', 0, self.max_size), segment.rfind('\t', 0, self.max_size)) + 1
+            if cut <= self.max_size // 2:
+                cut = self.max_size
+            pieces.append(segment[:cut])
+            segment = segment[cut:]
+        pieces.append(segment)
+        return pieces
+
+    def _add_segment(self, segment: str, page_start: Optional[int], page_end: Optional[int]) -> List[PageChunk]:
+        completed = []
+        for piece in self._split_oversized(segment):
+            if self.segments and self.length + len(piece) > self.max_size:
+                completed.extend(self._emit())
+            if not self.segments:
+                self.page_start = page_start
+            self.segments.append(piece)
+            self.length += len(piece)
+            self.page_end = page_end
+            self.tail = (self.tail + piece)[-CONTENT_HASH_WINDOW:]
+            if self.length >= self.min_size and self._is_cut_point(len(piece)):
+                completed.extend(self._emit())
+        return completed
+
+    def add_text(self, text: str, page: Optional[int] = None) -> List[PageChunk]:
+        """Add text and return any chunks it completed."""
+        if not self.pending:
+            self.pending_page = page
+        self.pending += text
+        completed = []
+        start = 0
+        for match in self.BOUNDARY_RE.finditer(self.pending):
+            # A boundary at the very end may still grow with the next piece of text
+            if match.end() == len(self.pending):
+                break
+            completed.extend(self._add_segment(self.pending[start:match.end()], self.pending_page, page))
+            start = match.end()
+            self.pending_page = page
+        self.pending = self.pending[start:]
+        return completed
+
+    def flush(self) -> List[PageChunk]:
+        """Return the remaining chunks, if any."""
+        completed = []
+        if self.pending:
+            completed.extend(self._add_segment(self.pending, self.pending_page, self.pending_page))
+            self.pending = ""
+        completed.extend(self._emit())
+        return completed
+
+
 class UnifiedDocumentParser:
     """Unified document parser for TestTeller ecosystem"""
     
@@ -151,7 +316,8 @@ class UnifiedDocumentParser:
         self, 
         file_path: Union[str, Path], 
         mode: ParseMode = ParseMode.RAG_INGESTION,
-        chunk_size: Optional[int] = None
+        chunk_size: Optional[int] = None,
+        chunking_mode: str = "fixed"
     ) -> ParsedDocument:
         """
         Parse a document based on the specified mode.
@@ -160,6 +326,7 @@ class UnifiedDocumentParser:
             file_path: Path to the document
             mode: Parsing mode (RAG_INGESTION, AUTOMATION, ANALYSIS, METADATA_ONLY)
             chunk_size: Optional chunk size for text splitting
+            chunking_mode: "fixed" for size-based chunks or "content" for content-defined chunks
             
         Returns:
             ParsedDocument object with parsed content and metadata
@@ -194,7 +361,7 @@ class UnifiedDocumentParser:
             return parsed_doc
         
         elif mode == ParseMode.RAG_INGESTION:
-            await self._process_for_rag(parsed_doc, chunk_size)
+            await self._process_for_rag(parsed_doc, chunk_size, chunking_mode)
             
         elif mode == ParseMode.AUTOMATION:
             await self._process_for_automation(parsed_doc)
@@ -207,10 +374,11 @@ class UnifiedDocumentParser:
     async def parse_for_rag(
         self, 
         file_path: Union[str, Path], 
-        chunk_size: int = 1000
+        chunk_size: int = 1000,
+        chunking_mode: str = "fixed"
     ) -> ParsedDocument:
         """Parse document for RAG ingestion with chunking."""
-        return await self.parse_document(file_path, ParseMode.RAG_INGESTION, chunk_size)
+        return await self.parse_document(file_path, ParseMode.RAG_INGESTION, chunk_size, chunking_mode)
     
     async def parse_for_automation(self, file_path: Union[str, Path]) -> ParsedDocument:
         """Parse document for test automation with structured test cases."""
@@ -225,28 +393,129 @@ class UnifiedDocumentParser:
         parsed_doc = await self.parse_document(file_path, ParseMode.METADATA_ONLY)
         return parsed_doc.metadata
     
+    async def stream_pdf_chunks(
+        self,
+        file_path: Union[str, Path],
+        chunk_size: int = 1000,
+        window_size: Optional[int] = None,
+        chunking_mode: str = "fixed"
+    ) -> AsyncIterator[PageChunk]:
+        """
+        Stream smart chunks from a PDF without loading the whole document.
+
+        Pages are read a window at a time and fed to the chunker incrementally,
+        so memory is bounded by the page window rather than the document size.
+
+        Args:
+            file_path: Path to the PDF file
+            chunk_size: Target chunk size in characters
+            window_size: Pages read per extraction step (defaults to the loader's window)
+            chunking_mode: "fixed" for size-based chunks or "content" for content-defined chunks
+
+        Yields:
+            PageChunk objects with 1-based page_start/page_end
+        """
+        file_path = Path(file_path)
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        window_kwargs = {'window_size': window_size} if window_size else {}
+        if chunking_mode == "content":
+            content_builder = _ContentChunkBuilder(chunk_size)
+            async for window in self.document_loader.stream_pdf_pages(str(file_path), **window_kwargs):
+                for page, page_text in window:
+                    for chunk in content_builder.add_text(page_text + '\n', page):
+                        yield chunk
+            for chunk in content_builder.flush():
+                yield chunk
+            return
+
+        builder = _SmartChunkBuilder(chunk_size)
+        async for window in self.document_loader.stream_pdf_pages(str(file_path), **window_kwargs):
+            for page, page_text in window:
+                for line in page_text.split('\n'):
+                    for chunk in builder.add_line(line, page):
+                        if chunk.text:
+                            yield chunk
+        for chunk in builder.flush():
+            yield chunk
+
+    async def stream_xlsx_chunks(
+        self,
+        file_path: Union[str, Path],
+        rows_per_chunk: Optional[int] = None
+    ) -> AsyncIterator[RowChunk]:
+        """
+        Stream a workbook as row-batched chunks without loading it whole.
+
+        Args:
+            file_path: Path to the XLSX file
+            rows_per_chunk: Data rows per chunk (defaults to the loader's batch size)
+
+        Yields:
+            RowChunk objects with the sheet name and 1-based row range
+        """
+        file_path = Path(file_path)
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        batch_kwargs = {'rows_per_chunk': rows_per_chunk} if rows_per_chunk else {}
+        async for sheet, row_start, row_end, text in self.document_loader.stream_xlsx_row_batches(
+                str(file_path), **batch_kwargs):
+            yield RowChunk(text=text, sheet=sheet, row_start=row_start, row_end=row_end)
+
+    async def iter_parse(
+        self,
+        file_paths: Iterable[Union[str, Path]],
+        mode: ParseMode = ParseMode.RAG_INGESTION,
+        chunk_size: Optional[int] = None,
+        chunking_mode: str = "fixed",
+        text_concurrency: Optional[int] = None,
+        binary_concurrency: Optional[int] = None
+    ) -> AsyncIterator[Tuple[Union[str, Path], Optional[ParsedDocument]]]:
+        """
+        Parse many documents with bounded concurrency, yielding each as soon as it is parsed.
+
+        Text and binary formats have separate concurrency limits and the paths
+        are read lazily, so a directory walk is never materialized; see
+        DocumentLoader.iter_bounded.
+
+        Args:
+            file_paths: Documents to parse; may be a lazy iterator
+            mode: Parsing mode
+            chunk_size: Chunk size for RAG ingestion
+            chunking_mode: Chunking strategy for RAG ingestion
+            text_concurrency: Concurrent text documents (defaults to TEXT_LOAD_CONCURRENCY)
+            binary_concurrency: Concurrent binary documents (defaults to BINARY_LOAD_CONCURRENCY)
+
+        Yields:
+            Tuples of (file path, parsed document), with None for documents that failed to parse
+        """
+        async def parse_single(file_path):
+            try:
+                return await self.parse_document(file_path, mode, chunk_size, chunking_mode)
+            except Exception as e:
+                logger.error(f"Failed to parse {file_path}: {e}")
+                return None
+
+        async for file_path, parsed_doc in DocumentLoader.iter_bounded(
+                file_paths, parse_single, text_concurrency, binary_concurrency):
+            yield file_path, parsed_doc
+
     async def batch_parse(
         self, 
         file_paths: List[Union[str, Path]], 
         mode: ParseMode = ParseMode.RAG_INGESTION,
-        max_concurrency: int = 5
+        max_concurrency: int = 5,
+        chunk_size: Optional[int] = None,
+        chunking_mode: str = "fixed"
     ) -> List[ParsedDocument]:
-        """Parse multiple documents concurrently."""
-        semaphore = asyncio.Semaphore(max_concurrency)
-        
-        async def parse_single(file_path):
-            async with semaphore:
-                try:
-                    return await self.parse_document(file_path, mode)
-                except Exception as e:
-                    logger.error(f"Failed to parse {file_path}: {e}")
-                    return None
-        
-        tasks = [parse_single(fp) for fp in file_paths]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Filter out failed parses
-        return [result for result in results if result is not None]
+        """Parse multiple documents concurrently into a list, dropping failed parses (see iter_parse)."""
+        return [
+            parsed_doc async for _, parsed_doc in self.iter_parse(
+                file_paths, mode, chunk_size, chunking_mode, max_concurrency, max_concurrency)
+            if parsed_doc is not None
+        ]
     
     # Private methods
     
@@ -339,7 +608,7 @@ class UnifiedDocumentParser:
         
         return None
     
-    async def _process_for_rag(self, parsed_doc: ParsedDocument, chunk_size: Optional[int]):
+    async def _process_for_rag(self, parsed_doc: ParsedDocument, chunk_size: Optional[int], chunking_mode: str = "fixed"):
         """Process document for RAG ingestion."""
         content = parsed_doc.content
         
@@ -348,7 +617,9 @@ class UnifiedDocumentParser:
         parsed_doc.metadata.sections = sections
         
         # Create chunks if requested
-        if chunk_size:
+        if chunk_size and chunking_mode == "content":
+            parsed_doc.chunks = self._create_content_chunks(content, chunk_size)
+        elif chunk_size:
             parsed_doc.chunks = self._create_smart_chunks(content, chunk_size)
         
         # Create structured content for better RAG retrieval
@@ -459,26 +730,18 @@ class UnifiedDocumentParser:
     
     def _create_smart_chunks(self, content: str, chunk_size: int) -> List[str]:
         """Create intelligent chunks that respect document structure."""
+        builder = _SmartChunkBuilder(chunk_size)
         chunks = []
-        current_chunk = ""
-        lines = content.split('\n')
-        
-        for line in lines:
-            # If adding this line would exceed chunk size and we have content
-            if len(current_chunk) + len(line) > chunk_size and current_chunk:
-                chunks.append(current_chunk.strip())
-                current_chunk = ""
-            
-            current_chunk += line + '\n'
-            
-            # Break at section boundaries for better semantic chunking
-            if line.strip().startswith('#') and len(current_chunk) > chunk_size * 0.5:
-                chunks.append(current_chunk.strip())
-                current_chunk = ""
-        
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
-        
+        for line in content.split('\n'):
+            chunks.extend(chunk.text for chunk in builder.add_line(line))
+        chunks.extend(chunk.text for chunk in builder.flush())
+        return chunks
+    
+    def _create_content_chunks(self, content: str, chunk_size: int) -> List[str]:
+        """Create content-defined chunks whose boundaries survive edits elsewhere in the document."""
+        builder = _ContentChunkBuilder(chunk_size)
+        chunks = [chunk.text for chunk in builder.add_text(content)]
+        chunks.extend(chunk.text for chunk in builder.flush())
         return chunks
     
     def _create_automation_chunks(self, content: str) -> List[str]:
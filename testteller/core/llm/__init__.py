@@ -7,11 +7,13 @@ from .gemini_client import GeminiClient
 from .openai_client import OpenAIClient
 from .claude_client import ClaudeClient
 from .llama_client import LlamaClient
+from .local_client import LocalEmbeddingClient
 
 __all__ = [
     'BaseLLMClient',
     'GeminiClient',
     'OpenAIClient',
     'ClaudeClient',
-    'LlamaClient'
+    'LlamaClient',
+    'LocalEmbeddingClient'
 ]
\ No newline at end of file
@@ -6,6 +6,8 @@ import logging
 import os
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional
+
+import numpy as np
 from pydantic import SecretStr
 
 from testteller.config import settings
@@ -14,6 +16,24 @@ from ..utils.retry_helpers import api_retry_async, api_retry_sync
 logger = logging.getLogger(__name__)
 
 
+def embeddings_to_array(embeddings: List[Optional[List[float]]]) -> np.ndarray:
+    """
+    Stack per-text embeddings into a contiguous float32 matrix.
+
+    Args:
+        embeddings: Embedding per text, None for texts whose embedding failed
+
+    Returns:
+        float32 array of shape (len(embeddings), dimension); failed texts get NaN rows
+    """
+    dimension = next((len(e) for e in embeddings if e is not None), 0) or 1
+    matrix = np.full((len(embeddings), dimension), np.nan, dtype=np.float32)
+    for i, embedding in enumerate(embeddings):
+        if embedding is not None and len(embedding) == dimension:
+            matrix[i] = embedding
+    return matrix
+
+
 class BaseLLMClient(ABC):
     """Base class for all LLM clients with common functionality."""
     
@@ -87,6 +107,21 @@ class BaseLLMClient(ABC):
         """Generate embedding for given text synchronously."""
         pass
     
+    def get_embeddings_array(self, texts: List[str]) -> np.ndarray:
+        """
+        Get embeddings for a batch of texts as one float32 matrix.
+
+        Clients that can decode provider responses straight into an array
+        override this; the default converts ``get_embeddings_sync`` output.
+
+        Args:
+            texts: Texts to get embeddings for
+
+        Returns:
+            float32 array of shape (len(texts), dimension) with NaN rows for failed texts
+        """
+        return embeddings_to_array(self.get_embeddings_sync(texts))
+
     @abstractmethod
     async def generate_text_async(self, prompt: str, **kwargs) -> str:
         """Generate text based on prompt asynchronously."""
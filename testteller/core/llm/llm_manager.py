@@ -5,12 +5,19 @@ import logging
 import os
 from typing import List, Union, Optional
 
+import numpy as np
+
 from testteller.config import settings
-from ..constants import SUPPORTED_LLM_PROVIDERS, DEFAULT_LLM_PROVIDER
+from ..constants import (
+    SUPPORTED_LLM_PROVIDERS, DEFAULT_LLM_PROVIDER, LOCAL_EMBEDDING_PROVIDER, SUPPORTED_EMBEDDING_PROVIDERS,
+    DEFAULT_LLM_REQUESTS_PER_MINUTE
+)
+from ..utils.rate_limiter import AsyncRateLimiter
 from .gemini_client import GeminiClient
 from .openai_client import OpenAIClient
 from .claude_client import ClaudeClient
 from .llama_client import LlamaClient
+from .local_client import LocalEmbeddingClient
 
 logger = logging.getLogger(__name__)
 
@@ -18,23 +25,72 @@ logger = logging.getLogger(__name__)
 class LLMManager:
     """Manager class that provides unified access to different LLM providers."""
 
-    def __init__(self, provider: Optional[str] = None):
+    def __init__(self, provider: Optional[str] = None, embedding_provider: Optional[str] = None):
         """
         Initialize the LLM Manager.
 
         Args:
-            provider: The LLM provider to use ('gemini', 'openai', 'claude', 'llama')
-                     If None, will try to get from settings or environment
+            provider: The LLM provider to use ('gemini', 'openai', 'claude', 'llama', or 'local'
+                     for embeddings only). If None, will try to get from settings or environment
+            embedding_provider: Provider computing embeddings ('gemini', 'openai', 'llama', 'local').
+                     If None, uses EMBEDDING_PROVIDER, else the LLM provider itself
         """
         self.provider = self._get_provider(provider)
         self.client = self._initialize_client()
+        self.embedding_provider = self.resolve_embedding_provider(self.provider, embedding_provider)
+        self.embedding_client = (
+            self.client if self.embedding_provider == self.provider
+            else self._initialize_client(self.embedding_provider))
+        # Shared by every generation request made through this manager
+        self.rate_limiter = AsyncRateLimiter(self._get_requests_per_minute())
+
+        logger.info("Initialized LLM Manager with provider: %s (embeddings: %s)",
+                    self.provider, self.embedding_provider)
+
+    @property
+    def embedding_spec(self) -> str:
+        """Embedding provider and model as 'provider/model', the form use_embedding_model accepts."""
+        return f"{self.embedding_provider}/{getattr(self.embedding_client, 'embedding_model', '')}"
+
+    def use_embedding_model(self, spec: str) -> None:
+        """
+        Compute embeddings with another provider and model; generation is unaffected.
+
+        Args:
+            spec: 'provider' or 'provider/model', e.g. 'openai/text-embedding-3-large'
 
-        logger.info("Initialized LLM Manager with provider: %s", self.provider)
+        Raises:
+            ValueError: If the provider does not support embeddings
+        """
+        provider, _, model = spec.partition("/")
+        provider = self.resolve_embedding_provider(self.provider, provider or self.embedding_provider)
+        # A fresh client, so changing its model never changes the generation client's
+        client = self._initialize_client(provider)
+        if model:
+            client.embedding_model = model
+        self.embedding_provider, self.embedding_client = provider, client
+        logger.info("Using embedding model %s", self.embedding_spec)
+
+    def _get_requests_per_minute(self) -> float:
+        """Get the generation request rate limit from settings or use default."""
+        try:
+            if settings and settings.llm:
+                return settings.llm.__dict__.get('requests_per_minute', DEFAULT_LLM_REQUESTS_PER_MINUTE)
+        except Exception as e:
+            logger.debug("Could not get LLM request rate limit from settings: %s", e)
+        return DEFAULT_LLM_REQUESTS_PER_MINUTE
 
     def _get_provider(self, provider: Optional[str] = None) -> str:
         """Get the LLM provider to use."""
+        return self.resolve_provider(provider)
+
+    @staticmethod
+    def resolve_provider(provider: Optional[str] = None) -> str:
+        """Resolve the LLM provider to use without initializing its client."""
+        # The local provider computes embeddings only, so it is not listed among the generation providers
+        known_providers = SUPPORTED_LLM_PROVIDERS + [LOCAL_EMBEDDING_PROVIDER]
         if provider:
-            if provider not in SUPPORTED_LLM_PROVIDERS:
+            if provider not in known_providers:
                 raise ValueError(
                     f"Unsupported LLM provider: {provider}. Supported providers: {SUPPORTED_LLM_PROVIDERS}")
             return provider.lower()
@@ -43,41 +99,75 @@ class LLMManager:
         try:
             if settings and settings.llm:
                 settings_provider = settings.llm.__dict__.get('provider')
-                if settings_provider and settings_provider.lower() in SUPPORTED_LLM_PROVIDERS:
+                if settings_provider and settings_provider.lower() in known_providers:
                     return settings_provider.lower()
         except Exception as e:
             logger.debug("Could not get LLM provider from settings: %s", e)
 
         # Try to get from environment
         env_provider = os.getenv("LLM_PROVIDER")
-        if env_provider and env_provider.lower() in SUPPORTED_LLM_PROVIDERS:
+        if env_provider and env_provider.lower() in known_providers:
             return env_provider.lower()
 
         # Default fallback
         return DEFAULT_LLM_PROVIDER.lower()
 
-    def _initialize_client(self) -> Union[GeminiClient, OpenAIClient, ClaudeClient, LlamaClient]:
-        """Initialize the appropriate LLM client based on the provider."""
+    @staticmethod
+    def resolve_embedding_provider(provider: str, embedding_provider: Optional[str] = None) -> str:
+        """
+        Resolve the provider computing embeddings for an LLM provider.
+
+        Args:
+            provider: The resolved LLM provider
+            embedding_provider: Explicit embedding provider (optional)
+
+        Returns:
+            The embedding provider, or ``provider`` itself when none is configured
+        """
+        if not embedding_provider:
+            try:
+                if settings and settings.llm:
+                    embedding_provider = settings.llm.__dict__.get('embedding_provider')
+            except Exception as e:
+                logger.debug("Could not get embedding provider from settings: %s", e)
+        if not embedding_provider:
+            embedding_provider = os.getenv("EMBEDDING_PROVIDER")
+        if not embedding_provider:
+            return provider
+        if embedding_provider.lower() not in SUPPORTED_EMBEDDING_PROVIDERS:
+            raise ValueError(
+                f"Unsupported embedding provider: {embedding_provider}. "
+                f"Supported providers: {SUPPORTED_EMBEDDING_PROVIDERS}")
+        return embedding_provider.lower()
+
+    def _initialize_client(
+            self, provider: Optional[str] = None
+    ) -> Union[GeminiClient, OpenAIClient, ClaudeClient, LlamaClient, LocalEmbeddingClient]:
+        """Initialize the client for a provider (defaults to the LLM provider)."""
+        provider = provider or self.provider
         try:
-            if self.provider == "gemini":
+            if provider == "gemini":
                 return GeminiClient()
-            elif self.provider == "openai":
+            elif provider == "openai":
                 return OpenAIClient()
-            elif self.provider == "claude":
+            elif provider == "claude":
                 return ClaudeClient()
-            elif self.provider == "llama":
+            elif provider == "llama":
                 return LlamaClient()
+            elif provider == LOCAL_EMBEDDING_PROVIDER:
+                return LocalEmbeddingClient()
             else:
-                raise ValueError(f"Unsupported LLM provider: {self.provider}")
+                raise ValueError(f"Unsupported LLM provider: {provider}")
         except Exception as e:
             # Check if it's an API key error and provide helpful guidance
             error_msg = str(e).lower()
             if "api key" in error_msg or "authentication" in error_msg:
-                self._handle_api_key_error(e)
+                self._handle_api_key_error(e, provider)
             raise
 
-    def _handle_api_key_error(self, original_error: Exception):
+    def _handle_api_key_error(self, original_error: Exception, provider: Optional[str] = None):
         """Handle API key errors with helpful messages."""
+        provider = provider or self.provider
         provider_key_map = {
             "gemini": "GOOGLE_API_KEY",
             "openai": "OPENAI_API_KEY",
@@ -85,17 +175,17 @@ class LLMManager:
             "llama": "No API key required (uses local Ollama)"
         }
 
-        required_key = provider_key_map.get(self.provider, "API_KEY")
+        required_key = provider_key_map.get(provider, "API_KEY")
 
-        if self.provider == "llama":
+        if provider == "llama":
             error_message = (
-                f"Failed to initialize {self.provider} client. "
+                f"Failed to initialize {provider} client. "
                 "Make sure Ollama is running locally at http://localhost:11434 "
                 "and the required models are installed."
             )
         else:
             error_message = (
-                f"Failed to initialize {self.provider} client due to missing or invalid API key. "
+                f"Failed to initialize {provider} client due to missing or invalid API key. "
                 f"Please set {required_key} in your .env file or run 'testteller configure' "
                 "to set up your configuration."
             )
@@ -105,26 +195,37 @@ class LLMManager:
 
     async def get_embedding_async(self, text: str) -> List[float]:
         """Get embeddings for text asynchronously."""
-        return await self.client.get_embedding_async(text)
+        return await self.embedding_client.get_embedding_async(text)
 
     def get_embedding_sync(self, text: str) -> List[float]:
         """Get embeddings for text synchronously."""
-        return self.client.get_embedding_sync(text)
+        return self.embedding_client.get_embedding_sync(text)
 
     async def get_embeddings_async(self, texts: List[str]) -> List[List[float] | None]:
         """Get embeddings for multiple texts asynchronously."""
-        return await self.client.get_embeddings_async(texts)
+        return await self.embedding_client.get_embeddings_async(texts)
 
     def get_embeddings_sync(self, texts: List[str]) -> List[List[float] | None]:
         """Get embeddings for multiple texts synchronously."""
-        return self.client.get_embeddings_sync(texts)
+        return self.embedding_client.get_embeddings_sync(texts)
+
+    def get_embeddings_array(self, texts: List[str]) -> np.ndarray:
+        """
+        Get embeddings for multiple texts as one float32 matrix.
+
+        Returns:
+            Array of shape (len(texts), dimension); rows of texts whose embedding failed are NaN
+        """
+        return self.embedding_client.get_embeddings_array(texts)
 
     async def generate_text_async(self, prompt: str) -> str:
-        """Generate text asynchronously."""
+        """Generate text asynchronously (subject to LLM_REQUESTS_PER_MINUTE)."""
+        await self.rate_limiter.acquire()
         return await self.client.generate_text_async(prompt)
 
     def generate_text(self, prompt: str) -> str:
-        """Generate text synchronously."""
+        """Generate text synchronously (subject to LLM_REQUESTS_PER_MINUTE)."""
+        self.rate_limiter.acquire_sync()
         return self.client.generate_text(prompt)
 
     def get_provider_info(self) -> dict:
@@ -132,8 +233,10 @@ class LLMManager:
         info = {
             "provider": self.provider,
             "generation_model": getattr(self.client, 'generation_model', 'Unknown'),
-            "embedding_model": getattr(self.client, 'embedding_model', 'Unknown')
+            "embedding_model": getattr(self.embedding_client, 'embedding_model', 'Unknown')
         }
+        if self.embedding_provider != self.provider:
+            info["embedding_provider"] = self.embedding_provider
 
         # Add provider-specific info
         if self.provider == "llama":
@@ -0,0 +1,162 @@
+"""
+Local embedding client: deterministic hashing embeddings computed in-process.
+"""
+import asyncio
+import hashlib
+import logging
+import re
+from functools import lru_cache
+from typing import List, Optional
+
+import numpy as np
+
+from .base_client import BaseLLMClient
+from ..constants import DEFAULT_LOCAL_EMBEDDING_DIMENSION, LOCAL_EMBEDDING_MODEL
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r'\w+')
+# Odd 64-bit multiplier used to combine adjacent token hashes into bigram hashes
+_BIGRAM_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+@lru_cache(maxsize=1 << 17)
+def _token_hash(token: str) -> int:
+    """Stable 64-bit hash of a token (Python's hash() is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _mix(hashes: np.ndarray) -> np.ndarray:
+    """SplitMix64 finalizer, so bucket and sign bits depend on every input bit."""
+    hashes = hashes ^ (hashes >> np.uint64(30))
+    hashes = hashes * np.uint64(0xBF58476D1CE4E5B9)
+    hashes = hashes ^ (hashes >> np.uint64(27))
+    hashes = hashes * np.uint64(0x94D049BB133111EB)
+    return hashes ^ (hashes >> np.uint64(31))
+
+
+class LocalEmbeddingClient(BaseLLMClient):
+    """
+    Client computing embeddings locally by feature hashing, with no model, API key or network.
+
+    Word unigrams and bigrams are hashed into a fixed number of signed
+    buckets, counts are dampened with log(1 + tf) and vectors are L2
+    normalized. The same text always gets the same vector, on any machine,
+    and texts sharing words get similar vectors. Retrieval quality is below
+    a neural embedding model (there is no notion of synonyms), so this is
+    meant for offline and air-gapped use and as a stable, fast baseline for
+    performance tests. It cannot generate text.
+    """
+
+    def __init__(self, dimension: Optional[int] = None):
+        """
+        Initialize the local embedding client.
+
+        Args:
+            dimension: Embedding dimension (defaults to LOCAL_EMBEDDING_DIMENSION)
+        """
+        self.dimension = dimension or self._get_dimension()
+        super().__init__("local")
+
+    def _get_dimension(self) -> int:
+        """Get the embedding dimension from settings or use default."""
+        try:
+            from testteller.config import settings
+            if settings and settings.llm:
+                return settings.llm.__dict__.get('local_embedding_dimension', DEFAULT_LOCAL_EMBEDDING_DIMENSION)
+        except Exception as e:
+            logger.debug("Could not get local embedding dimension from settings: %s", e)
+        return DEFAULT_LOCAL_EMBEDDING_DIMENSION
+
+    @property
+    def embedding_model(self) -> str:
+        """Model name, which encodes the dimension: vectors of different dimensions are different models."""
+        return f"{LOCAL_EMBEDDING_MODEL}-{self.dimension}"
+
+    @embedding_model.setter
+    def embedding_model(self, name: str) -> None:
+        match = re.fullmatch(re.escape(LOCAL_EMBEDDING_MODEL) + r"-(\d+)", name)
+        if not match:
+            raise ValueError(f"Unknown local embedding model: {name}. Expected {LOCAL_EMBEDDING_MODEL}-<dimension>")
+        self.dimension = int(match.group(1))
+
+    def _get_env_key_name(self) -> str:
+        """Get the environment variable name for the API key (not used, but required by base class)."""
+        return "LOCAL_API_KEY"
+
+    def _get_default_models(self) -> tuple[str, str]:
+        """Get default generation and embedding model names."""
+        return "none", f"{LOCAL_EMBEDDING_MODEL}-{self.dimension}"
+
+    def _get_api_key(self) -> str:
+        """Override base class - local embeddings don't require an API key."""
+        return "not-required"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed a batch of texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            float32 array of shape (len(texts), dimension) with unit-length rows
+        """
+        rows, features = [], []
+        for row, text in enumerate(texts):
+            hashes = np.fromiter(
+                (_token_hash(token) for token in _TOKEN_RE.findall(text.lower())), dtype=np.uint64)
+            if hashes.size > 1:
+                hashes = np.concatenate((hashes, hashes[:-1] * _BIGRAM_MULTIPLIER + hashes[1:]))
+            features.append(hashes)
+            rows.append(np.full(hashes.size, row, dtype=np.int64))
+
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        if features:
+            mixed = _mix(np.concatenate(features))
+            buckets = np.concatenate(rows) * self.dimension + (mixed % np.uint64(self.dimension)).astype(np.int64)
+            signs = np.where(mixed >> np.uint64(63), -1.0, 1.0)
+            counts = np.bincount(buckets, weights=signs, minlength=matrix.size).reshape(matrix.shape)
+            matrix[:] = np.sign(counts) * np.log1p(np.abs(counts))
+
+        norms = np.linalg.norm(matrix, axis=1)
+        # Texts without words get a constant unit vector rather than an unusable zero vector
+        matrix[norms == 0] = 1.0 / np.sqrt(self.dimension)
+        norms[norms == 0] = 1.0
+        matrix /= norms[:, None]
+        return matrix
+
+    async def get_embedding_async(self, text: str) -> List[float]:
+        """Get the embedding of a text asynchronously."""
+        return (await asyncio.to_thread(self.embed, [text]))[0].tolist()
+
+    def get_embedding_sync(self, text: str) -> List[float]:
+        """Get the embedding of a text synchronously."""
+        return self.embed([text])[0].tolist()
+
+    async def get_embeddings_async(self, texts: list[str]) -> list[list[float] | None]:
+        """Get embeddings for a list of texts asynchronously."""
+        if not texts:
+            return []
+        return (await asyncio.to_thread(self.embed, texts)).tolist()
+
+    def get_embeddings_sync(self, texts: list[str]) -> list[list[float] | None]:
+        """Get embeddings for a list of texts synchronously in a single batch."""
+        if not texts:
+            return []
+        return self.embed(texts).tolist()
+
+    def get_embeddings_array(self, texts: list[str]) -> np.ndarray:
+        """Get embeddings for a list of texts as a float32 matrix."""
+        return self.embed(texts)
+
+    async def generate_text_async(self, prompt: str, **kwargs) -> str:
+        """Local embeddings cannot generate text."""
+        return self.generate_text(prompt)
+
+    def generate_text(self, prompt: str, **kwargs) -> str:
+        """Local embeddings cannot generate text."""
+        raise ValueError(
+            "The local provider only computes embeddings and cannot generate text. "
+            "Set LLM_PROVIDER to gemini, openai, claude or llama (optionally with EMBEDDING_PROVIDER=local) "
+            "to generate test cases.")
@@ -2,9 +2,11 @@
 OpenAI API client implementation.
 """
 import asyncio
+import base64
 import logging
 from typing import List
 
+import numpy as np
 import openai
 
 from .base_client import BaseLLMClient
@@ -112,6 +114,41 @@ class OpenAIClient(BaseLLMClient):
             # Return a list of Nones to indicate failure for all texts in the batch
             return [None] * len(texts)
 
+    @api_retry_sync
+    def get_embeddings_array(self, texts: list[str]) -> np.ndarray:
+        """
+        Get embeddings for a list of texts as a float32 matrix in a single batch.
+
+        Embeddings are requested base64-encoded and decoded directly into the
+        array, so no per-value Python floats are created.
+
+        Args:
+            texts: List of texts to get embeddings for
+
+        Returns:
+            float32 array of shape (len(texts), dimension), with NaN rows if the batch failed
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        try:
+            # Replace any empty strings with a single space to avoid API errors
+            processed_texts = [text if text.strip() else " " for text in texts]
+
+            response = self.client.embeddings.create(
+                model=self.embedding_model,
+                input=processed_texts,
+                encoding_format="base64"
+            )
+            return np.stack([
+                np.frombuffer(base64.b64decode(embedding.embedding), dtype='<f4')
+                for embedding in response.data
+            ]).astype(np.float32, copy=False)
+        except Exception as e:
+            logger.error(
+                "Error generating sync embeddings for a batch of %d texts: %s", len(texts), e, exc_info=True)
+            return np.full((len(texts), 1), np.nan, dtype=np.float32)
+
     @api_retry_async
     async def generate_text_async(self, prompt: str) -> str:
         """
@@ -40,6 +40,16 @@ class CodeIngestionError(Exception):
     pass
 
 
+class ReindexError(Exception):
+    """Custom exception for errors during collection re-indexing."""
+    pass
+
+
+class SnapshotError(Exception):
+    """Custom exception for errors exporting or importing a collection snapshot."""
+    pass
+
+
 class TestCaseGenerationError(Exception):
     """Custom exception for errors during test case generation."""
     __test__ = False  # Tell pytest this is not a test class
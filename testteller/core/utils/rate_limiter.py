@@ -0,0 +1,57 @@
+"""
+Client-side request rate limiting for LLM provider calls.
+"""
+import asyncio
+import threading
+import time
+
+
+class AsyncRateLimiter:
+    """
+    Spaces requests evenly to stay under a requests-per-minute limit.
+
+    Each caller reserves the next free start time under a thread lock and then
+    sleeps until it, so one limiter can be shared by coroutines on any event
+    loop and by threads. A limit of 0 disables limiting.
+    """
+
+    def __init__(self, requests_per_minute: float = 0):
+        """
+        Initialize the limiter.
+
+        Args:
+            requests_per_minute: Most requests started per minute (0 for no limit)
+        """
+        self.requests_per_minute = max(0.0, requests_per_minute)
+        self.interval = 60.0 / self.requests_per_minute if self.requests_per_minute else 0.0
+        self._next_start = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Reserve the next request slot and return the seconds to wait for it."""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        return start - now
+
+    async def acquire(self) -> None:
+        """Wait until a request may start."""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def acquire_sync(self) -> None:
+        """Block until a request may start."""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def __aenter__(self) -> "AsyncRateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        return None
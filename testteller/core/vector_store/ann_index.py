@@ -0,0 +1,273 @@
+"""
+Approximate nearest neighbour indexes over the NumPy vector store.
+
+Exact search scores every stored vector, which past a few hundred thousand
+chunks costs more per query than walking an index. With
+VECTOR_STORE_BACKEND=faiss or hnswlib a collection keeps the NumPy store's
+matrix and record log (documents and metadata) and adds an index over the
+matrix rows, saved next to them as ``index.<gen>.<backend>`` with an
+``index.<gen>.json`` sidecar recording its backend and parameters:
+
+- faiss: any ``faiss.index_factory`` string (FAISS_INDEX_FACTORY), including
+  IVF and HNSW indexes and product or scalar quantization that ChromaDB does
+  not expose, searched with FAISS_SEARCH_PARAMS
+- hnswlib: an HNSW graph (HNSWLIB_M, HNSWLIB_EF_CONSTRUCTION, HNSWLIB_EF_SEARCH)
+
+Indexes hold normalized vectors and search by inner product, i.e. cosine
+similarity. Index labels are matrix row numbers, so rows appended after the
+index was saved are added on the next query, and deleted rows are skipped
+when reading results.
+"""
+import json
+import logging
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from ..constants import (
+    FAISS_VECTOR_STORE_BACKEND, HNSWLIB_VECTOR_STORE_BACKEND,
+    DEFAULT_FAISS_INDEX_FACTORY, DEFAULT_FAISS_SEARCH_PARAMS,
+    DEFAULT_HNSWLIB_M, DEFAULT_HNSWLIB_EF_CONSTRUCTION, DEFAULT_HNSWLIB_EF_SEARCH
+)
+from ..data_ingestion.ingest_state import write_json_atomic
+
+try:
+    import faiss
+    HAS_FAISS = True
+except ImportError:
+    faiss = None
+    HAS_FAISS = False
+
+try:
+    import hnswlib
+    HAS_HNSWLIB = True
+except ImportError:
+    hnswlib = None
+    HAS_HNSWLIB = False
+
+logger = logging.getLogger(__name__)
+
+# Rows sampled to train indexes that need it (IVF coarse quantizers, PQ/SQ codebooks)
+ANN_TRAIN_SAMPLE_ROWS = 100000
+
+
+class AnnIndex(ABC):
+    """An approximate index over the rows of a collection matrix; labels are row numbers."""
+
+    backend = ""
+    # Parameters that only affect searching; changing them does not rebuild the index
+    search_param_names: Tuple[str, ...] = ()
+
+    def __init__(self, dimension: int, params: Dict[str, Any]):
+        self.dimension = dimension
+        self.params = params
+
+    @classmethod
+    def build_params(cls, params: Dict[str, Any]) -> Dict[str, Any]:
+        """The parameters an index file was built with."""
+        return {key: value for key, value in params.items() if key not in cls.search_param_names}
+
+    @property
+    @abstractmethod
+    def rows(self) -> int:
+        """Number of matrix rows in the index (rows 0 to rows - 1)."""
+
+    @property
+    def is_trained(self) -> bool:
+        return True
+
+    def train(self, vectors: np.ndarray) -> None:
+        """Train the index on a sample of normalized vectors, if its type needs it."""
+
+    @abstractmethod
+    def add(self, vectors: np.ndarray) -> None:
+        """Append normalized vectors for the next rows of the matrix."""
+
+    @abstractmethod
+    def search(self, queries: np.ndarray, k: int) -> np.ndarray:
+        """Row numbers of up to k neighbours of each normalized query, best first, -1 past the last."""
+
+    @abstractmethod
+    def save(self, path: Path) -> None:
+        """Write the index to a file."""
+
+    @classmethod
+    @abstractmethod
+    def load(cls, path: Path, dimension: int, params: Dict[str, Any]) -> "AnnIndex":
+        """Read an index written by save."""
+
+
+class FaissIndex(AnnIndex):
+    """Index built by ``faiss.index_factory`` with inner-product metric."""
+
+    backend = FAISS_VECTOR_STORE_BACKEND
+    search_param_names = ("search_params",)
+
+    def __init__(self, dimension: int, params: Dict[str, Any], index: Optional[Any] = None):
+        super().__init__(dimension, params)
+        self.index = index if index is not None else faiss.index_factory(
+            dimension, params["factory"], faiss.METRIC_INNER_PRODUCT)
+        if params.get("search_params"):
+            faiss.ParameterSpace().set_index_parameters(self.index, params["search_params"])
+
+    @property
+    def rows(self) -> int:
+        return int(self.index.ntotal)
+
+    @property
+    def is_trained(self) -> bool:
+        return bool(self.index.is_trained)
+
+    def train(self, vectors: np.ndarray) -> None:
+        self.index.train(np.ascontiguousarray(vectors, dtype=np.float32))
+
+    def add(self, vectors: np.ndarray) -> None:
+        self.index.add(np.ascontiguousarray(vectors, dtype=np.float32))
+
+    def search(self, queries: np.ndarray, k: int) -> np.ndarray:
+        _, labels = self.index.search(np.ascontiguousarray(queries, dtype=np.float32), k)
+        return labels
+
+    def save(self, path: Path) -> None:
+        faiss.write_index(self.index, str(path))
+
+    @classmethod
+    def load(cls, path: Path, dimension: int, params: Dict[str, Any]) -> "FaissIndex":
+        return cls(dimension, params, faiss.read_index(str(path)))
+
+
+class HnswlibIndex(AnnIndex):
+    """hnswlib HNSW graph with inner-product space."""
+
+    backend = HNSWLIB_VECTOR_STORE_BACKEND
+    search_param_names = ("ef_search",)
+
+    def __init__(self, dimension: int, params: Dict[str, Any], index: Optional[Any] = None):
+        super().__init__(dimension, params)
+        if index is None:
+            index = hnswlib.Index(space='ip', dim=dimension)
+            index.init_index(max_elements=1, ef_construction=params["ef_construction"], M=params["m"])
+        index.set_ef(params["ef_search"])
+        self.index = index
+
+    @property
+    def rows(self) -> int:
+        return int(self.index.get_current_count())
+
+    def add(self, vectors: np.ndarray) -> None:
+        start = self.rows
+        needed = start + len(vectors)
+        if needed > self.index.get_max_elements():
+            # Grow geometrically so appending in blocks stays linear
+            self.index.resize_index(max(needed, 2 * self.index.get_max_elements()))
+        self.index.add_items(np.ascontiguousarray(vectors, dtype=np.float32), np.arange(start, needed))
+
+    def search(self, queries: np.ndarray, k: int) -> np.ndarray:
+        k = min(k, self.rows)
+        if not k:
+            return np.full((len(queries), 0), -1, dtype=np.int64)
+        labels, _ = self.index.knn_query(np.ascontiguousarray(queries, dtype=np.float32), k=k)
+        return labels.astype(np.int64)
+
+    def save(self, path: Path) -> None:
+        self.index.save_index(str(path))
+
+    @classmethod
+    def load(cls, path: Path, dimension: int, params: Dict[str, Any]) -> "HnswlibIndex":
+        index = hnswlib.Index(space='ip', dim=dimension)
+        index.load_index(str(path))
+        return cls(dimension, params, index)
+
+
+ANN_INDEX_TYPES = {
+    FAISS_VECTOR_STORE_BACKEND: FaissIndex,
+    HNSWLIB_VECTOR_STORE_BACKEND: HnswlibIndex,
+}
+_ANN_PACKAGES = {
+    FAISS_VECTOR_STORE_BACKEND: ("faiss-cpu", lambda: HAS_FAISS),
+    HNSWLIB_VECTOR_STORE_BACKEND: ("hnswlib", lambda: HAS_HNSWLIB),
+}
+
+
+def check_ann_backend(backend: str) -> None:
+    """
+    Check that an index backend is known and its package is installed.
+
+    Raises:
+        ValueError: If the backend is unknown
+        ImportError: If its optional package is missing
+    """
+    if backend not in ANN_INDEX_TYPES:
+        raise ValueError(f"Unknown vector index backend: {backend}")
+    package, installed = _ANN_PACKAGES.get(backend, (None, lambda: True))
+    if not installed():
+        raise ImportError(
+            f"VECTOR_STORE_BACKEND={backend} needs the '{package}' package: pip install testteller[{backend}]")
+
+
+def get_ann_index_params(backend: str) -> Dict[str, Any]:
+    """Get an index backend's parameters from settings, or the defaults."""
+    params = {
+        FAISS_VECTOR_STORE_BACKEND: {
+            "factory": DEFAULT_FAISS_INDEX_FACTORY, "search_params": DEFAULT_FAISS_SEARCH_PARAMS},
+        HNSWLIB_VECTOR_STORE_BACKEND: {
+            "m": DEFAULT_HNSWLIB_M, "ef_construction": DEFAULT_HNSWLIB_EF_CONSTRUCTION,
+            "ef_search": DEFAULT_HNSWLIB_EF_SEARCH},
+    }.get(backend, {})
+    try:
+        from testteller.config import settings
+        if settings and settings.chromadb:
+            prefix = "faiss_" if backend == FAISS_VECTOR_STORE_BACKEND else "hnswlib_"
+            for key in params:
+                setting = prefix + ("index_factory" if key == "factory" else key)
+                params[key] = settings.chromadb.__dict__.get(setting, params[key])
+    except Exception as e:
+        logger.debug("Could not get %s index settings: %s", backend, e)
+    return params
+
+
+def ann_index_paths(prefix: Path, backend: str) -> Tuple[Path, Path]:
+    """Index file and sidecar file of an index saved under ``prefix`` (e.g. ``<dir>/index.0``)."""
+    return prefix.with_name(f"{prefix.name}.{backend}"), prefix.with_name(f"{prefix.name}.json")
+
+
+def save_ann_index(index: AnnIndex, prefix: Path) -> None:
+    """Write an index and its sidecar, each replaced atomically."""
+    path, sidecar = ann_index_paths(prefix, index.backend)
+    tmp_path = path.with_name(path.name + ".tmp")
+    index.save(tmp_path)
+    tmp_path.replace(path)
+    write_json_atomic(sidecar, {
+        "backend": index.backend, "dimension": index.dimension, "rows": index.rows, "params": index.params})
+
+
+def load_ann_index(backend: str, prefix: Path, dimension: int) -> Optional[AnnIndex]:
+    """
+    Read the index saved under ``prefix``, if it was built by ``backend`` with the current parameters.
+
+    Returns:
+        The index, or None if there is none or it is stale and must be rebuilt
+    """
+    path, sidecar = ann_index_paths(prefix, backend)
+    params = get_ann_index_params(backend)
+    try:
+        with open(sidecar, 'r', encoding='utf-8') as f:
+            recorded = json.load(f)
+        index_type = ANN_INDEX_TYPES[backend]
+        if recorded.get("backend") != backend or recorded.get("dimension") != dimension or \
+                index_type.build_params(recorded.get("params", {})) != index_type.build_params(params) or \
+                not path.exists():
+            return None
+        return index_type.load(path, dimension, params)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Ignoring unreadable %s index %s: %s", backend, path, e)
+        return None
+
+
+def create_ann_index(backend: str, dimension: int) -> AnnIndex:
+    """Create an empty index of a backend with its configured parameters."""
+    return ANN_INDEX_TYPES[backend](dimension, get_ann_index_params(backend))
@@ -0,0 +1,153 @@
+"""
+Vector store interface used by the agents.
+
+TestTellerAgent, the automation generators and the automator CLI only need
+to add, query, delete, count and iterate documents of one collection, so
+they depend on the VectorStore protocol rather than on a concrete class.
+ChromaDBManager implements it for every backend selected with
+VECTOR_STORE_BACKEND: ChromaDB itself, or the NumPy store searched exactly
+(numpy) or through a FAISS or hnswlib index (faiss, hnswlib). Use
+create_vector_store to open the configured one.
+"""
+from typing import Any, Iterator, List, Optional, Protocol, Tuple, runtime_checkable
+
+import numpy as np
+from chromadb.api.types import Documents, GetResult, IDs, Metadatas, QueryResult, Where, WhereDocument
+
+from ..constants import CHROMA_ITER_BATCH_SIZE
+from ..llm.llm_manager import LLMManager
+
+
+@runtime_checkable
+class VectorStore(Protocol):
+    """A collection of embedded documents with metadata."""
+
+    collection_name: str
+
+    def add_documents(
+        self,
+        documents: Documents,
+        metadatas: Optional[Metadatas] = None,
+        ids: Optional[IDs] = None,
+        refresh_metadata: bool = False,
+        embeddings: Optional[np.ndarray] = None
+    ) -> None:
+        """Add documents, skipping ids that are already stored."""
+        ...
+
+    def upsert_documents(
+        self,
+        documents: Documents,
+        metadatas: Optional[Metadatas] = None,
+        ids: Optional[IDs] = None,
+        embeddings: Optional[np.ndarray] = None
+    ) -> int:
+        """Add documents, replacing stored ones with the same id; returns how many were embedded."""
+        ...
+
+    def get_existing_ids(self, ids: IDs) -> set:
+        """Return the subset of ``ids`` that are stored."""
+        ...
+
+    def query_similar(
+        self,
+        query_text: str,
+        n_results: int = 5,
+        where: Optional[Where] = None,
+        where_document: Optional[WhereDocument] = None
+    ) -> QueryResult:
+        """Nearest documents of a query text."""
+        ...
+
+    def query_similar_batch(
+        self,
+        query_texts: List[str],
+        n_results: int = 5,
+        where: Optional[Where] = None
+    ) -> List[QueryResult]:
+        """Nearest documents of many query texts, one QueryResult per text."""
+        ...
+
+    def query_by_embeddings(
+        self,
+        embeddings: np.ndarray,
+        n_results: int = 5,
+        where: Optional[Where] = None,
+        include: Optional[List[str]] = None
+    ) -> QueryResult:
+        """Nearest documents of precomputed query embeddings."""
+        ...
+
+    def delete_where(self, where: Where) -> int:
+        """Delete the documents matching a metadata filter; returns how many were deleted."""
+        ...
+
+    def delete_by_source(self, source: str) -> int:
+        """Delete the documents of a source; returns how many were deleted."""
+        ...
+
+    def delete_ids(self, ids: IDs) -> int:
+        """Delete documents by id; returns how many ids were deleted."""
+        ...
+
+    def prune_source(self, source: str, keep_ids: IDs) -> int:
+        """Delete the documents of a source whose ids are not in ``keep_ids``."""
+        ...
+
+    def get_metadatas_where(self, where: Where) -> Tuple[IDs, Metadatas]:
+        """Ids and metadata of the documents matching a metadata filter."""
+        ...
+
+    def iter_documents(
+        self,
+        where: Optional[Where] = None,
+        batch_size: int = CHROMA_ITER_BATCH_SIZE,
+        include: Optional[List[str]] = None
+    ) -> Iterator[GetResult]:
+        """Iterate over the documents a page at a time."""
+        ...
+
+    def get_collection_count(self) -> int:
+        """Number of stored documents."""
+        ...
+
+    async def get_collection_count_async(self) -> int:
+        """Number of stored documents, without blocking the event loop."""
+        ...
+
+    def clear_collection(self) -> None:
+        """Delete every document, keeping the collection."""
+        ...
+
+    def list_collections(self) -> List[str]:
+        """Names of the collections in the store."""
+        ...
+
+    def close(self) -> None:
+        """Release the store's resources."""
+        ...
+
+
+def create_vector_store(
+    llm_manager: LLMManager,
+    collection_name: Optional[str] = None,
+    persist_directory: Optional[str] = None,
+    backend: Optional[str] = None,
+    **kwargs: Any
+) -> VectorStore:
+    """
+    Open the vector store of a collection with the configured backend.
+
+    Args:
+        llm_manager: Instance of LLMManager for embeddings
+        collection_name: Collection name (optional, defaults to the configured one)
+        persist_directory: Directory of local stores (optional)
+        backend: 'chromadb', 'numpy', 'faiss' or 'hnswlib' (optional, defaults to VECTOR_STORE_BACKEND)
+        **kwargs: Further ChromaDBManager options (host, port, use_remote)
+
+    Returns:
+        The collection's vector store
+    """
+    from .chromadb_manager import ChromaDBManager
+    return ChromaDBManager(llm_manager, collection_name=collection_name, persist_directory=persist_directory,
+                           backend=backend, **kwargs)
@@ -3,24 +3,36 @@ ChromaDB vector store manager implementation.
 """
 import logging
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import functools
 import hashlib
 import asyncio
+from pathlib import Path
 import chromadb
+import numpy as np
 from chromadb.api.types import (
+    GetResult,
     QueryResult,
     EmbeddingFunction,
     Documents,
     Metadatas,
     IDs,
     Where,
-    WhereDocument
+    WhereDocument,
+    validate_embeddings
 )
 from testteller.config import settings
-from ..constants import DEFAULT_COLLECTION_NAME, DEFAULT_CHROMA_HOST, DEFAULT_CHROMA_PORT, DEFAULT_CHROMA_PERSIST_DIRECTORY
+from ..constants import (
+    DEFAULT_COLLECTION_NAME, DEFAULT_CHROMA_HOST, DEFAULT_CHROMA_PORT, DEFAULT_CHROMA_PERSIST_DIRECTORY,
+    CHROMA_ADD_BATCH_SIZE, CHROMA_DELETE_BATCH_SIZE, CHROMA_ITER_BATCH_SIZE, DEFAULT_QUERY_CACHE_SIZE, DEFAULT_QUERY_CACHE_TTL, DEFAULT_QUERY_CACHE_PERSIST,
+    NUMPY_STORE_BACKENDS
+)
+from ..data_ingestion.ingest_state import STATE_DIR_NAME
 from ..llm.llm_manager import LLMManager
 from ..utils.exceptions import EmbeddingGenerationError
+from .collection_aliases import CollectionAliases
+from .numpy_store import get_vector_store_backend, open_local_client
+from .query_cache import QueryEmbeddingCache
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +40,56 @@ logger = logging.getLogger(__name__)
 DEFAULT_PERSIST_DIRECTORY = DEFAULT_CHROMA_PERSIST_DIRECTORY
 DEFAULT_HOST = DEFAULT_CHROMA_HOST
 DEFAULT_PORT = DEFAULT_CHROMA_PORT
+# Collection metadata naming the 'provider/model' a collection's vectors were computed with.
+# Set on collections built by migrate-embeddings; queries then use that model.
+EMBEDDING_MODEL_METADATA_KEY = "testteller:embedding_model"
+# QueryResult fields holding one list per query; others (e.g. chromadb 0.5's "included") are not split
+QUERY_RESULT_PER_QUERY_KEYS = ("ids", "documents", "metadatas", "distances", "embeddings", "uris", "data")
+
+
+def _chroma_accepts_arrays() -> bool:
+    """Whether this ChromaDB version accepts NumPy rows as embeddings (0.4.x requires lists)."""
+    try:
+        validate_embeddings([np.zeros(1, dtype=np.float32)])
+        return True
+    except Exception:
+        return False
+
+
+_CHROMA_ACCEPTS_ARRAYS = _chroma_accepts_arrays()
+
+
+def to_chroma_embeddings(matrix: np.ndarray) -> list:
+    """Convert an embedding matrix to the row format ChromaDB accepts, without copying when possible."""
+    return list(matrix) if _CHROMA_ACCEPTS_ARRAYS else matrix.tolist()
+
+
+def add_embedded_rows(
+        collection: chromadb.Collection,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Optional[Dict[str, Any]]],
+        embeddings: np.ndarray) -> None:
+    """Add documents with precomputed embeddings, including documents stored without metadata."""
+    # ChromaDB rejects empty metadata, so documents stored without any are added separately
+    for has_metadata in (True, False):
+        rows = [i for i, metadata in enumerate(metadatas) if bool(metadata) == has_metadata]
+        if rows:
+            collection.add(
+                ids=[ids[i] for i in rows],
+                documents=[documents[i] for i in rows],
+                metadatas=[metadatas[i] for i in rows] if has_metadata else None,
+                embeddings=to_chroma_embeddings(embeddings[rows]))
+
+
+def collection_names(client: Any) -> List[str]:
+    """Names of a client's collections (chromadb 0.6+ lists names, older releases Collection objects)."""
+    return [getattr(collection, "name", collection) for collection in client.list_collections()]
+
+
+def _failed_rows(matrix: np.ndarray) -> List[int]:
+    """Indices of embedding rows that failed to generate (NaN rows)."""
+    return np.flatnonzero(np.isnan(matrix).any(axis=1)).tolist()
 
 
 class ChromaDBManager:
@@ -40,7 +102,8 @@ class ChromaDBManager:
         persist_directory: Optional[str] = None,
         host: Optional[str] = None,
         port: Optional[int] = None,
-        use_remote: Optional[bool] = None
+        use_remote: Optional[bool] = None,
+        backend: Optional[str] = None
     ):
         """
         Initialize ChromaDB manager with configuration from settings or parameters.
@@ -52,6 +115,8 @@ class ChromaDBManager:
             host: Host for remote ChromaDB (optional)
             port: Port for remote ChromaDB (optional)
             use_remote: Whether to use remote ChromaDB (optional)
+            backend: Vector store backend, 'chromadb', 'numpy', 'faiss' or 'hnswlib'
+                (optional, defaults to VECTOR_STORE_BACKEND)
         """
         self.llm_manager = llm_manager
 
@@ -85,13 +150,24 @@ class ChromaDBManager:
             self.port = port or DEFAULT_PORT
             self.use_remote = use_remote if use_remote is not None else False
 
+        self.backend = backend or get_vector_store_backend()
+        if self.backend in NUMPY_STORE_BACKENDS and self.use_remote:
+            logger.warning("The %s vector store is local; ignoring CHROMA_DB_USE_REMOTE", self.backend)
+            self.use_remote = False
+
         # Store the actual db_path based on whether we're using remote or local
         self.db_path = None if self.use_remote else os.path.abspath(
             self.persist_directory)
 
+        # The collection name may be an alias of a versioned collection (see reindex)
+        self.aliases = CollectionAliases(self.persist_directory)
+        self.index_name = self.aliases.resolve(self.collection_name)
+
+        self.query_cache = self._create_query_cache()
         self.client = self._initialize_client()
         self.embedding_function = self._create_embedding_function()
         self.collection = self._get_or_create_collection()
+        self._use_recorded_embedding_model()
         logger.info(
             "Initialized ChromaDB manager with collection '%s' using %s LLM %s",
             self.collection_name,
@@ -99,6 +175,25 @@ class ChromaDBManager:
             f"at {self.host}:{self.port}" if self.use_remote else f"in {self.persist_directory}"
         )
 
+    def _create_query_cache(self) -> QueryEmbeddingCache:
+        """Create the query embedding cache from settings, persisted per embedding model if enabled."""
+        size, ttl, persist = DEFAULT_QUERY_CACHE_SIZE, DEFAULT_QUERY_CACHE_TTL, DEFAULT_QUERY_CACHE_PERSIST
+        try:
+            if settings and settings.chromadb:
+                size = settings.chromadb.__dict__.get('query_cache_size', DEFAULT_QUERY_CACHE_SIZE)
+                ttl = settings.chromadb.__dict__.get('query_cache_ttl', DEFAULT_QUERY_CACHE_TTL)
+                persist = settings.chromadb.__dict__.get('query_cache_persist', DEFAULT_QUERY_CACHE_PERSIST)
+        except Exception as e:
+            logger.debug("Could not get query cache settings: %s", e)
+
+        path = None
+        if persist and size:
+            # Cached vectors are only valid for the model that produced them
+            embedding_model = getattr(getattr(self.llm_manager, 'embedding_client', None), 'embedding_model', None)
+            path = QueryEmbeddingCache.path_for_model(
+                Path(self.persist_directory) / STATE_DIR_NAME, embedding_model or str(self.llm_manager.provider))
+        return QueryEmbeddingCache(size, ttl, path)
+
     def _initialize_client(self) -> chromadb.Client:
         """Initialize ChromaDB client based on configuration."""
         try:
@@ -106,7 +201,9 @@ class ChromaDBManager:
             os.environ['ANONYMIZED_TELEMETRY'] = 'False'
             os.environ['CHROMA_CLIENT_AUTH_PROVIDER'] = ''
             
-            if self.use_remote:
+            if self.backend in NUMPY_STORE_BACKENDS:
+                return open_local_client(self.persist_directory, self.backend)
+            elif self.use_remote:
                 return chromadb.HttpClient(host=self.host, port=self.port)
             else:
                 return chromadb.PersistentClient(
@@ -119,83 +216,139 @@ class ChromaDBManager:
 
     def _get_or_create_collection(self) -> chromadb.Collection:
         """Get existing collection or create new one."""
+        return self.open_collection(self.index_name)
+
+    def open_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None) -> chromadb.Collection:
+        """
+        Get or create a physical collection by name, bypassing the collection alias.
+
+        ``metadata`` only applies when the collection is created: get_or_create_collection
+        would replace the stored metadata, and with it the recorded embedding model.
+        Existence is checked by listing, as the exception get_collection raises for a
+        missing collection differs between chromadb releases.
+        """
         try:
-            return self.client.get_or_create_collection(
-                name=self.collection_name,
-                metadata={"hnsw:space": "cosine"}
+            if name in collection_names(self.client):
+                return self.client.get_collection(name=name)
+            return self.client.create_collection(
+                name=name,
+                metadata={"hnsw:space": "cosine", **(metadata or {})}
             )
         except Exception as e:
             logger.error(
-                "Failed to get or create collection '%s': %s", self.collection_name, e)
+                "Failed to get or create collection '%s': %s", name, e)
             raise
 
+    def use_index(self, index_name: str) -> None:
+        """Serve this manager's collection from another physical collection (after a re-index swap)."""
+        self.index_name = index_name
+        self.collection = self._get_or_create_collection()
+        self._use_recorded_embedding_model()
+
+    def _use_recorded_embedding_model(self) -> None:
+        """Embed queries with the model recorded on the collection, if it differs from the configured one."""
+        recorded = (self.collection.metadata or {}).get(EMBEDDING_MODEL_METADATA_KEY)
+        if not recorded or recorded == self.llm_manager.embedding_spec:
+            return
+        try:
+            self.use_embedding_model(recorded)
+            logger.info("Collection '%s' is embedded with %s; using it instead of the configured model",
+                        self.collection_name, recorded)
+        except Exception as e:
+            logger.warning("Collection '%s' is embedded with %s but it could not be loaded (%s); "
+                           "queries use %s", self.collection_name, recorded, e, self.llm_manager.embedding_spec)
+
+    def use_embedding_model(self, spec: str) -> None:
+        """Switch the embedding model, with a query embedding cache of its own."""
+        self.llm_manager.use_embedding_model(spec)
+        self.query_cache.save()
+        self.query_cache = self._create_query_cache()
+
     def add_documents(
         self,
         documents: Documents,
         metadatas: Optional[Metadatas] = None,
-        ids: Optional[IDs] = None
+        ids: Optional[IDs] = None,
+        refresh_metadata: bool = False,
+        embeddings: Optional[np.ndarray] = None
     ) -> None:
-        """Add documents to the collection."""
-        try:
-            # Get embeddings for all documents
-            embeddings = self.llm_manager.get_embeddings_sync(documents)
-
-            # Check for embedding generation failures
-            if any(embedding is None for embedding in embeddings):
-                failed_indices = [i for i, emb in enumerate(
-                    embeddings) if emb is None]
-                error_msg = f"Embedding generation failed for {len(failed_indices)} out of {len(documents)} documents."
-                logger.error(error_msg + f" Failed indices: {failed_indices}")
-                # We can't be sure which exception caused the failure for which document,
-                # so we raise a general error. The root cause is likely in the logs from the LLM client.
-                raise EmbeddingGenerationError(
-                    message=error_msg,
-                    provider=self.llm_manager.provider
-                )
+        """
+        Add documents to the collection.
+
+        Documents whose id is already stored (or repeated within the batch) are
+        skipped before any embedding is requested, so re-adding unchanged
+        content costs no embedding calls.
 
+        Args:
+            documents: Document texts
+            metadatas: Metadata per document (optional)
+            ids: Id per document (optional, random ids are generated otherwise)
+            refresh_metadata: Overwrite the metadata of documents that are already stored
+            embeddings: Precomputed embedding per document (optional); when given no
+                embedding call is made
+        """
+        try:
             # If no IDs provided, generate unique IDs
             if not ids:
                 import uuid
                 ids = [str(uuid.uuid4()) for _ in documents]
 
-            # Get existing IDs to check for duplicates
-            existing_docs = self.collection.get()
-            existing_ids = set(
-                existing_docs['ids']) if existing_docs and existing_docs['ids'] else set()
-
             # Track seen IDs to handle duplicates within the batch
             seen_ids = set()
-
-            # Filter out duplicates while preserving order
-            docs_to_add = []
-            embeddings_to_add = []
-            metadatas_to_add = []
-            ids_to_add = []
-
+            batch_indices = []
             for i, doc_id in enumerate(ids):
-                # Skip if ID is duplicate within batch or exists in collection
-                if doc_id in seen_ids or doc_id in existing_ids:
-                    logger.warning(
-                        "Document with ID '%s' is duplicate %s, skipping",
-                        doc_id,
-                        "within batch" if doc_id in seen_ids else "in collection"
-                    )
+                if doc_id in seen_ids:
+                    logger.warning("Document with ID '%s' is duplicate within batch, skipping", doc_id)
                     continue
-
-                docs_to_add.append(documents[i])
-                embeddings_to_add.append(embeddings[i])
-                if metadatas:
-                    metadatas_to_add.append(metadatas[i])
-                ids_to_add.append(doc_id)
                 seen_ids.add(doc_id)
+                batch_indices.append(i)
+
+            # Look up only this batch's IDs rather than reading the whole collection
+            existing_ids = self.get_existing_ids([ids[i] for i in batch_indices])
+            if existing_ids:
+                logger.debug("Skipping %d documents already in collection '%s'",
+                             len(existing_ids), self.collection_name)
+                if refresh_metadata and metadatas:
+                    stored_indices = [i for i in batch_indices if ids[i] in existing_ids]
+                    self.collection.update(
+                        ids=[ids[i] for i in stored_indices],
+                        metadatas=[metadatas[i] for i in stored_indices]
+                    )
+
+            new_indices = [i for i in batch_indices if ids[i] not in existing_ids]
+            docs_to_add = [documents[i] for i in new_indices]
+            metadatas_to_add = [metadatas[i] for i in new_indices] if metadatas else None
+            ids_to_add = [ids[i] for i in new_indices]
 
             if docs_to_add:
-                self.collection.add(
-                    embeddings=embeddings_to_add,
-                    documents=docs_to_add,
-                    metadatas=metadatas_to_add if metadatas else None,
-                    ids=ids_to_add
-                )
+                # Get embeddings for the new documents only, as one float32 matrix
+                if embeddings is not None:
+                    embeddings_to_add = np.asarray(embeddings, dtype=np.float32)[new_indices]
+                else:
+                    embeddings_to_add = self.llm_manager.get_embeddings_array(docs_to_add)
+
+                # Check for embedding generation failures
+                failed_indices = _failed_rows(embeddings_to_add)
+                if failed_indices:
+                    error_msg = f"Embedding generation failed for {len(failed_indices)} out of {len(docs_to_add)} documents."
+                    logger.error(error_msg + f" Failed indices: {failed_indices}")
+                    # We can't be sure which exception caused the failure for which document,
+                    # so we raise a general error. The root cause is likely in the logs from the LLM client.
+                    raise EmbeddingGenerationError(
+                        message=error_msg,
+                        provider=self.llm_manager.provider
+                    )
+
+                # Convert to ChromaDB's row format one slice at a time, so large
+                # batches never hold a full list-of-floats copy of the matrix
+                for start in range(0, len(docs_to_add), CHROMA_ADD_BATCH_SIZE):
+                    end = start + CHROMA_ADD_BATCH_SIZE
+                    self.collection.add(
+                        embeddings=to_chroma_embeddings(embeddings_to_add[start:end]),
+                        documents=docs_to_add[start:end],
+                        metadatas=metadatas_to_add[start:end] if metadatas_to_add else None,
+                        ids=ids_to_add[start:end]
+                    )
                 logger.info(
                     "Added %d new documents to collection '%s' (skipped %d duplicates)",
                     len(docs_to_add), self.collection_name, len(
@@ -208,31 +361,118 @@ class ChromaDBManager:
                 )
 
         except Exception as e:
-            error_msg = str(e)
-            if "expecting embedding with dimension" in error_msg and "got" in error_msg:
-                # Extract dimensions from error message
-                import re
-                match = re.search(r'dimension of (\d+), got (\d+)', error_msg)
-                if match:
-                    expected_dim = match.group(1)
-                    actual_dim = match.group(2)
-                    logger.error(
-                        "Embedding dimension mismatch in collection '%s': "
-                        "Collection expects %s-dimensional embeddings but received %s-dimensional embeddings. "
-                        "This happens when switching between embedding models with different dimensions. "
-                        "To fix: 1) Clear the collection with 'testteller clear-data -c %s', or "
-                        "2) Use a different collection name, or "
-                        "3) Use an embedding model that produces %s-dimensional embeddings.",
-                        self.collection_name, expected_dim, actual_dim, self.collection_name, expected_dim
-                    )
-                else:
-                    logger.error(
-                        "Error adding documents to collection '%s': %s", self.collection_name, e)
+            self._log_write_error(e)
+            raise
+
+    def upsert_documents(
+        self,
+        documents: Documents,
+        metadatas: Optional[Metadatas] = None,
+        ids: Optional[IDs] = None,
+        embeddings: Optional[np.ndarray] = None
+    ) -> int:
+        """
+        Add documents, replacing the stored documents that have the same id.
+
+        Only documents that are new or whose text changed are embedded and
+        written; stored documents with unchanged text just get their metadata
+        updated. Re-ingesting an edited file therefore embeds only the chunks
+        whose text changed, whatever the chunking mode.
+
+        Args:
+            documents: Document texts
+            metadatas: Metadata per document (optional); merged into stored metadata
+            ids: Id per document (optional, random ids are generated otherwise)
+            embeddings: Precomputed embedding per document (optional); when given no
+                embedding call is made
+
+        Returns:
+            Number of documents embedded and written
+        """
+        try:
+            if not ids:
+                import uuid
+                ids = [str(uuid.uuid4()) for _ in documents]
+
+            batch_indices = list({doc_id: i for i, doc_id in reversed(list(enumerate(ids)))}.values())[::-1]
+            if len(batch_indices) < len(ids):
+                logger.warning("Skipping %d ids repeated within the batch", len(ids) - len(batch_indices))
+
+            stored = self.collection.get(ids=[ids[i] for i in batch_indices], include=["documents"])
+            stored_documents = dict(zip(stored['ids'], stored['documents'])) if stored and stored['ids'] else {}
+            unchanged = [i for i in batch_indices if ids[i] in stored_documents
+                         and stored_documents[ids[i]] == documents[i]]
+            if unchanged and metadatas:
+                for start in range(0, len(unchanged), CHROMA_ADD_BATCH_SIZE):
+                    rows = unchanged[start:start + CHROMA_ADD_BATCH_SIZE]
+                    self.collection.update(ids=[ids[i] for i in rows], metadatas=[metadatas[i] for i in rows])
+
+            unchanged_set = set(unchanged)
+            changed = [i for i in batch_indices if i not in unchanged_set]
+            if not changed:
+                logger.info("No documents changed in collection '%s' (%d unchanged)",
+                            self.collection_name, len(unchanged))
+                return 0
+
+            if embeddings is not None:
+                embeddings_to_write = np.asarray(embeddings, dtype=np.float32)[changed]
             else:
-                logger.error(
-                    "Error adding documents to collection '%s': %s", self.collection_name, e)
+                embeddings_to_write = self.llm_manager.get_embeddings_array([documents[i] for i in changed])
+            failed_indices = _failed_rows(embeddings_to_write)
+            if failed_indices:
+                error_msg = f"Embedding generation failed for {len(failed_indices)} out of {len(changed)} documents."
+                logger.error(error_msg + f" Failed indices: {failed_indices}")
+                raise EmbeddingGenerationError(message=error_msg, provider=self.llm_manager.provider)
+
+            for start in range(0, len(changed), CHROMA_ADD_BATCH_SIZE):
+                rows = changed[start:start + CHROMA_ADD_BATCH_SIZE]
+                self.collection.upsert(
+                    embeddings=to_chroma_embeddings(embeddings_to_write[start:start + CHROMA_ADD_BATCH_SIZE]),
+                    documents=[documents[i] for i in rows],
+                    metadatas=[metadatas[i] for i in rows] if metadatas else None,
+                    ids=[ids[i] for i in rows]
+                )
+            replaced = sum(1 for i in changed if ids[i] in stored_documents)
+            logger.info(
+                "Upserted %d documents in collection '%s' (%d new, %d replaced, %d unchanged)",
+                len(changed), self.collection_name, len(changed) - replaced, replaced, len(unchanged))
+            return len(changed)
+        except Exception as e:
+            self._log_write_error(e)
             raise
 
+    def _log_write_error(self, e: Exception) -> None:
+        """Log a failed write, explaining embedding dimension mismatches."""
+        error_msg = str(e)
+        if "expecting embedding with dimension" in error_msg and "got" in error_msg:
+            # Extract dimensions from error message
+            import re
+            match = re.search(r'dimension of (\d+), got (\d+)', error_msg)
+            if match:
+                expected_dim = match.group(1)
+                actual_dim = match.group(2)
+                logger.error(
+                    "Embedding dimension mismatch in collection '%s': "
+                    "Collection expects %s-dimensional embeddings but received %s-dimensional embeddings. "
+                    "This happens when switching between embedding models with different dimensions. "
+                    "To fix: 1) Re-embed the stored documents with "
+                    "'testteller migrate-embeddings -c %s --to <provider/model>', or "
+                    "2) Clear the collection with 'testteller clear-data -c %s', or "
+                    "3) Use an embedding model that produces %s-dimensional embeddings.",
+                    self.collection_name, expected_dim, actual_dim, self.collection_name,
+                    self.collection_name, expected_dim
+                )
+                return
+        logger.error(
+            "Error adding documents to collection '%s': %s", self.collection_name, e)
+
+    def get_existing_ids(self, ids: IDs) -> set:
+        """Return the subset of ``ids`` that are stored in the collection."""
+        if not ids:
+            return set()
+        existing_docs = self.collection.get(ids=list(ids), include=[])
+        return set(existing_docs['ids']) if existing_docs and existing_docs['ids'] else set()
+
     def query_similar(
         self,
         query_text: str,
@@ -242,17 +482,10 @@ class ChromaDBManager:
     ) -> QueryResult:
         """Query similar documents from the collection."""
         try:
-            query_embedding = self.llm_manager.get_embedding_sync(query_text)
-
-            # Handle case where embedding generation fails
-            if query_embedding is None:
-                raise EmbeddingGenerationError(
-                    message="Failed to generate embedding for query text.",
-                    provider=self.llm_manager.provider
-                )
+            query_embedding = self.get_query_embedding(query_text)
 
             results = self.collection.query(
-                query_embeddings=[query_embedding],
+                query_embeddings=to_chroma_embeddings(query_embedding[np.newaxis]),
                 n_results=n_results,
                 where=where,
                 where_document=where_document
@@ -268,11 +501,250 @@ class ChromaDBManager:
                          self.collection_name, e)
             raise
 
+    def query_similar_batch(
+        self,
+        query_texts: List[str],
+        n_results: int = 5,
+        where: Optional[Where] = None
+    ) -> List[QueryResult]:
+        """
+        Query similar documents for many query texts at once.
+
+        Uncached query texts are embedded in a single provider call and all
+        queries are answered by one collection query.
+
+        Args:
+            query_texts: Query texts
+            n_results: Results per query
+            where: Metadata filter applied to every query (optional)
+
+        Returns:
+            One QueryResult per query text, shaped like the result of query_similar
+        """
+        if not query_texts:
+            return []
+        try:
+            embeddings = self.query_cache.get_many_or_compute(query_texts, self.llm_manager.get_embeddings_array)
+            failed = [text for text, embedding in zip(query_texts, embeddings) if embedding is None]
+            if failed:
+                raise EmbeddingGenerationError(
+                    message=f"Failed to generate embeddings for {len(failed)} of {len(query_texts)} query texts.",
+                    provider=self.llm_manager.provider
+                )
+
+            results = self.collection.query(
+                query_embeddings=to_chroma_embeddings(np.stack(embeddings)),
+                n_results=n_results,
+                where=where
+            )
+            per_query = [
+                {key: ([value[i]] if key in QUERY_RESULT_PER_QUERY_KEYS and value is not None else value)
+                 for key, value in results.items()}
+                for i in range(len(query_texts))
+            ]
+            logger.info(
+                "Retrieved results for %d queries from collection '%s' in one batch",
+                len(query_texts), self.collection_name)
+            return per_query
+        except Exception as e:
+            logger.error("Error batch querying collection '%s': %s",
+                         self.collection_name, e)
+            raise
+
+    def query_by_embeddings(
+        self,
+        embeddings: np.ndarray,
+        n_results: int = 5,
+        where: Optional[Where] = None,
+        include: Optional[List[str]] = None
+    ) -> QueryResult:
+        """
+        Query similar documents for precomputed embeddings with one collection query.
+
+        Args:
+            embeddings: float32 matrix with one query embedding per row
+            n_results: Results per query embedding
+            where: Metadata filter applied to every query (optional)
+            include: Fields to return (defaults to ChromaDB's documents, metadatas and distances)
+
+        Returns:
+            QueryResult with one result list per query embedding
+        """
+        query_args = {"include": include} if include is not None else {}
+        try:
+            return self.collection.query(
+                query_embeddings=to_chroma_embeddings(np.asarray(embeddings, dtype=np.float32)),
+                n_results=n_results,
+                where=where,
+                **query_args
+            )
+        except Exception as e:
+            logger.error("Error querying collection '%s' by embeddings: %s",
+                         self.collection_name, e)
+            raise
+
+    def get_query_embedding(self, query_text: str) -> np.ndarray:
+        """
+        Get the embedding of a query text through the query embedding cache.
+
+        Repeated queries are served from the cache, and concurrent callers
+        asking for the same text share one provider call.
+
+        Raises:
+            EmbeddingGenerationError: If the provider fails to embed the text
+        """
+        query_embedding = self.query_cache.get_or_compute(query_text, self.llm_manager.get_embedding_sync)
+
+        # Handle case where embedding generation fails
+        if query_embedding is None:
+            raise EmbeddingGenerationError(
+                message="Failed to generate embedding for query text.",
+                provider=self.llm_manager.provider
+            )
+        return query_embedding
+
+    def delete_where(self, where: Where) -> int:
+        """
+        Delete all documents whose metadata matches a filter.
+
+        The matching ids are read once and deleted in batches of
+        CHROMA_DELETE_BATCH_SIZE, so large deletes never send one huge request.
+
+        Args:
+            where: ChromaDB metadata filter, e.g. {"source": {"$in": [...]}}
+
+        Returns:
+            Number of documents deleted
+        """
+        try:
+            matches = self.collection.get(where=where, include=[])
+        except Exception as e:
+            logger.error("Error deleting documents from collection '%s': %s",
+                         self.collection_name, e)
+            raise
+        return self.delete_ids(matches['ids'] if matches and matches['ids'] else [])
+
+    def delete_by_source(self, source: str) -> int:
+        """
+        Delete all documents of a source (a document path or code file identifier).
+
+        Args:
+            source: Value of the ``source`` metadata field
+
+        Returns:
+            Number of documents deleted
+        """
+        return self.delete_where({"source": source})
+
+    def get_metadatas_where(self, where: Where) -> Tuple[IDs, Metadatas]:
+        """
+        Get the ids and metadata (without documents or embeddings) of documents matching a filter.
+
+        Args:
+            where: ChromaDB metadata filter
+
+        Returns:
+            Ids and metadata of the matching documents
+        """
+        try:
+            matches = self.collection.get(where=where, include=["metadatas"])
+            return (matches['ids'] or []), (matches['metadatas'] or [])
+        except Exception as e:
+            logger.error("Error reading metadata from collection '%s': %s",
+                         self.collection_name, e)
+            raise
+
+    def iter_documents(
+        self,
+        where: Optional[Where] = None,
+        batch_size: int = CHROMA_ITER_BATCH_SIZE,
+        include: Optional[List[str]] = None
+    ) -> Iterator[GetResult]:
+        """
+        Iterate over the documents of the collection a page at a time.
+
+        Pages are read with limit/offset, so documents added or deleted while
+        iterating may be missed or seen twice.
+
+        Args:
+            where: Metadata filter (optional)
+            batch_size: Documents per page
+            include: Fields to return (defaults to documents and metadatas)
+
+        Yields:
+            GetResult pages of at most ``batch_size`` documents
+        """
+        include = ["documents", "metadatas"] if include is None else include
+        offset = 0
+        while True:
+            try:
+                page = self.collection.get(where=where, limit=batch_size, offset=offset, include=include)
+            except Exception as e:
+                logger.error("Error reading documents from collection '%s': %s",
+                             self.collection_name, e)
+                raise
+            if not page['ids']:
+                return
+            yield page
+            offset += len(page['ids'])
+
+    def delete_ids(self, ids: IDs) -> int:
+        """
+        Delete documents by id in batches of CHROMA_DELETE_BATCH_SIZE.
+
+        Args:
+            ids: Ids to delete
+
+        Returns:
+            Number of ids deleted
+        """
+        try:
+            for start in range(0, len(ids), CHROMA_DELETE_BATCH_SIZE):
+                self.collection.delete(ids=list(ids[start:start + CHROMA_DELETE_BATCH_SIZE]))
+            if ids:
+                logger.info("Deleted %d documents from collection '%s'", len(ids), self.collection_name)
+            return len(ids)
+        except Exception as e:
+            logger.error("Error deleting documents from collection '%s': %s",
+                         self.collection_name, e)
+            raise
+
+    def prune_source(self, source: str, keep_ids: IDs) -> int:
+        """
+        Delete the documents of a source whose ids are not in ``keep_ids``.
+
+        Used after re-ingesting a document with content-hash ids, where chunks
+        that were edited away are left behind under ids that are no longer produced.
+
+        Args:
+            source: Value of the ``source`` metadata field
+            keep_ids: Ids of the source's current documents
+
+        Returns:
+            Number of documents deleted
+        """
+        try:
+            matches = self.collection.get(where={"source": source}, include=[])
+            keep = set(keep_ids)
+            stale_ids = [doc_id for doc_id in (matches['ids'] if matches and matches['ids'] else [])
+                         if doc_id not in keep]
+            if stale_ids:
+                self.delete_ids(stale_ids)
+                logger.info("Removed %d stale documents of '%s' from collection '%s'",
+                            len(stale_ids), source, self.collection_name)
+            return len(stale_ids)
+        except Exception as e:
+            logger.error("Error pruning documents of '%s' from collection '%s': %s",
+                         source, self.collection_name, e)
+            raise
+
     def clear_collection(self) -> None:
         """Clear all data from the collection."""
         try:
-            self.client.delete_collection(name=self.collection_name)
-            self.collection = self._get_or_create_collection()
+            # Keep the distance metric and the recorded embedding model
+            metadata = self.collection.metadata
+            self.client.delete_collection(name=self.index_name)
+            self.collection = self.open_collection(self.index_name, metadata)
             logger.info("Cleared all data from collection '%s'",
                         self.collection_name)
         except Exception as e:
@@ -296,14 +768,12 @@ class ChromaDBManager:
                 self.llm_client = llm_client
 
             def __call__(self, input_texts: List[str]) -> List[List[float]]:
-                raw_embeddings = self.llm_client.get_embeddings_sync(
+                raw_embeddings = self.llm_client.get_embeddings_array(
                     input_texts)
-                valid_embeddings: List[List[float]] = []
 
                 # Check for embedding generation failures
-                if any(embedding is None for embedding in raw_embeddings):
-                    failed_indices = [i for i, emb in enumerate(
-                        raw_embeddings) if emb is None]
+                failed_indices = _failed_rows(raw_embeddings)
+                if failed_indices:
                     error_msg = f"Embedding generation failed for {len(failed_indices)} out of {len(raw_embeddings)} documents during embedding function call."
                     logger.error(
                         error_msg + f" Failed indices: {failed_indices}")
@@ -312,18 +782,7 @@ class ChromaDBManager:
                         provider=self.llm_client.provider
                     )
 
-                # Assuming all embeddings are valid if we passed the check above
-                embedding_dim = len(raw_embeddings[0]) if raw_embeddings else 0
-
-                for i, emb in enumerate(raw_embeddings):
-                    if emb is None or len(emb) != embedding_dim:
-                        logger.warning(
-                            "Invalid embedding for text at index %d. Using zero vector.", i)
-                        valid_embeddings.append([0.0] * embedding_dim)
-                    else:
-                        valid_embeddings.append(emb)
-
-                return valid_embeddings
+                return to_chroma_embeddings(raw_embeddings)
 
         return LLMChromaEmbeddingFunction(self.llm_manager)
 
@@ -372,10 +831,11 @@ class ChromaDBManager:
                     "Query for '%.50s...' resulted in 0 n_results. Returning empty list.", query_text)
                 return []
 
+            query_embedding = await asyncio.to_thread(self.get_query_embedding, query_text)
             results = await self._run_collection_method(
                 'query',  # method_name
                 # No positional arguments for collection.query, all are keyword.
-                query_texts=[query_text],
+                query_embeddings=to_chroma_embeddings(query_embedding[np.newaxis]),
                 n_results=actual_n_results,
                 include=['documents', 'metadatas', 'distances']
             )
@@ -417,14 +877,9 @@ class ChromaDBManager:
             "Clearing collection '%s'. This will delete and recreate it.", self.collection_name)
         try:
             # These client operations are synchronous and not part of the _run_collection_method helper
-            await asyncio.to_thread(self.client.delete_collection, name=self.collection_name)
-
-            new_collection_instance = await asyncio.to_thread(
-                self.client.get_or_create_collection,
-                name=self.collection_name,
-                embedding_function=self.embedding_function
-            )
-            self.collection = new_collection_instance
+            metadata = self.collection.metadata
+            await asyncio.to_thread(self.client.delete_collection, name=self.index_name)
+            self.collection = await asyncio.to_thread(self.open_collection, self.index_name, metadata)
 
             new_count = await self.get_collection_count_async()
             logger.info(
@@ -436,8 +891,7 @@ class ChromaDBManager:
     def list_collections(self) -> List[str]:
         """List all collections in the ChromaDB client."""
         try:
-            collections = self.client.list_collections()
-            return [col.name for col in collections]
+            return collection_names(self.client)
         except Exception as e:
             logger.error("Error listing collections: %s", e)
             return []
@@ -446,6 +900,13 @@ class ChromaDBManager:
         """Clean up ChromaDB resources and connections."""
         try:
             logger.debug("Closing ChromaDB manager for collection '%s'", self.collection_name)
+
+            stats = self.query_cache.stats
+            if stats.lookups:
+                logger.info(
+                    "Query embedding cache: %d hits, %d coalesced, %d misses (%.0f%% hit rate), ~%.2fs saved",
+                    stats.hits, stats.coalesced, stats.misses, stats.hit_rate * 100, stats.saved_seconds)
+            self.query_cache.save()
             
             # Clear references to help garbage collection
             if hasattr(self, 'collection'):
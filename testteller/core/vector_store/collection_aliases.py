@@ -0,0 +1,115 @@
+"""
+Collection aliases for blue-green re-indexing.
+
+The collection name used by the CLI and the agents is a logical name that is
+resolved through an alias registry before ChromaDB is opened. Re-indexing
+builds a new physical collection ``<name>__v<n>`` next to the live one and,
+once it validates, points the alias at it with one atomic file replace:
+processes that open the collection afterwards use the new index, while those
+already running keep reading the previous version, which is kept for rollback
+until it is garbage collected. Names without an alias resolve to themselves.
+"""
+import json
+import logging
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..data_ingestion.ingest_state import STATE_DIR_NAME, get_persist_directory, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+ALIASES_FILE = "collection_aliases.json"
+VERSION_SEPARATOR = "__v"
+
+
+def versioned_name(name: str, version: int) -> str:
+    """Physical collection name of an alias's version."""
+    return f"{name}{VERSION_SEPARATOR}{version}"
+
+
+def collection_version(name: str, collection: str) -> Optional[int]:
+    """Version number of a physical collection of ``name``, or None if it is not one."""
+    match = re.fullmatch(re.escape(name) + re.escape(VERSION_SEPARATOR) + r"(\d+)", collection)
+    return int(match.group(1)) if match else None
+
+
+def collection_versions(name: str, collections: Iterable[str]) -> List[str]:
+    """The unversioned collection ``name`` (if present) and its versions, oldest first."""
+    collections = list(collections)
+    versions = sorted((collection_version(name, c), c) for c in collections if collection_version(name, c))
+    return ([name] if name in collections else []) + [collection for _, collection in versions]
+
+
+class CollectionAliases:
+    """Registry mapping logical collection names to their live physical collection."""
+
+    def __init__(self, persist_directory: Optional[str] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            persist_directory: ChromaDB persist directory (defaults to the configured one)
+        """
+        self.path = Path(get_persist_directory(persist_directory)) / STATE_DIR_NAME / ALIASES_FILE
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        # Always read from disk so swaps made by other processes are seen
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable collection aliases %s: %s", self.path, e)
+            return {}
+
+    def resolve(self, name: str) -> str:
+        """Physical collection an alias points to; ``name`` itself if it is not an alias."""
+        entry = self._read().get(name)
+        return entry["target"] if entry else name
+
+    def history(self, name: str) -> List[str]:
+        """Collections an alias pointed to before, most recent first."""
+        entry = self._read().get(name)
+        return list(entry.get("previous", [])) if entry else []
+
+    def swap(self, name: str, target: str) -> str:
+        """
+        Point an alias at a physical collection.
+
+        Args:
+            name: Logical collection name
+            target: Physical collection to serve under ``name``
+
+        Returns:
+            The collection the alias resolved to before the swap
+        """
+        aliases = self._read()
+        entry = aliases.get(name, {})
+        current = entry.get("target", name)
+        previous = [current] + [c for c in entry.get("previous", []) if c != current]
+        aliases[name] = {
+            "target": target,
+            "previous": [c for c in previous if c != target],
+            "updated": time.time(),
+        }
+        write_json_atomic(self.path, aliases)
+        logger.info("Collection alias '%s' now points to '%s' (was '%s')", name, target, current)
+        return current
+
+    def forget(self, name: str, collections: Iterable[str]) -> None:
+        """Drop deleted collections from an alias's rollback history."""
+        aliases = self._read()
+        if name not in aliases:
+            return
+        removed = set(collections)
+        aliases[name]["previous"] = [c for c in aliases[name].get("previous", []) if c not in removed]
+        write_json_atomic(self.path, aliases)
+
+    def remove(self, name: str) -> None:
+        """Delete an alias so ``name`` resolves to itself again."""
+        aliases = self._read()
+        if aliases.pop(name, None) is not None:
+            write_json_atomic(self.path, aliases)
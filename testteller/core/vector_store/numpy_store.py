@@ -0,0 +1,718 @@
+"""
+In-process vector store on memory-mapped NumPy arrays.
+
+Opening a ChromaDB client starts SQLite, loads HNSW segments and sets up
+telemetry, which for small and medium collections costs more than an exact
+search. NumpyVectorClient is a drop-in alternative for the part of the
+ChromaDB client and collection API that ChromaDBManager, re-indexing and
+snapshots use, selected with VECTOR_STORE_BACKEND=numpy.
+
+Each collection is a directory under ``<persist_directory>/numpy_store``:
+
+- ``collection.json``: name, metadata, dimension and current generation
+- ``vectors.<gen>.f32`` and ``norms.<gen>.f32``: the float32 embedding matrix and
+  its row norms, appended to and read through ``np.memmap``
+- ``records.<gen>.jsonl``: an append-only log of added ids, documents and
+  metadata, metadata updates and deletes
+
+Writes are append-only and deletes are tombstones, so nothing is rewritten
+until tombstones outnumber live rows; compaction then writes the next
+generation and switches to it by replacing ``collection.json``. Opening a
+collection reads only its manifest, and the log is replayed on first use.
+Queries score every live row with blocked matrix products and keep the top-k
+with ``argpartition``: results are exact, with ChromaDB's cosine distances.
+
+With VECTOR_STORE_BACKEND=faiss or hnswlib, unfiltered queries on
+collections of at least ANN_MIN_ROWS rows go through an approximate index
+over the same matrix instead (see ann_index); its candidates are re-scored
+against the stored vectors, so distances match exact search.
+
+A collection has one writing process at a time; other processes pick up its
+appends and compactions on their next call.
+"""
+import json
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..constants import (
+    DEFAULT_VECTOR_STORE_BACKEND, NUMPY_VECTOR_STORE_BACKEND, NUMPY_STORE_BACKENDS, SUPPORTED_VECTOR_STORE_BACKENDS
+)
+from ..data_ingestion.ingest_state import write_json_atomic
+from .ann_index import (
+    ANN_TRAIN_SAMPLE_ROWS, AnnIndex, check_ann_backend, create_ann_index, load_ann_index, save_ann_index
+)
+
+logger = logging.getLogger(__name__)
+
+STORE_DIR_NAME = "numpy_store"
+MANIFEST_FILE = "collection.json"
+# Rows scored per matrix product, bounding the memory of one search
+SEARCH_BLOCK_ROWS = 65536
+# Compaction runs once tombstones outnumber live rows and reach this count
+COMPACT_MIN_TOMBSTONES = 1000
+# Smaller collections are searched exactly even with an index backend
+ANN_MIN_ROWS = 20000
+# Extra index candidates fetched per query to make up for deleted rows
+ANN_MAX_EXTRA_CANDIDATES = 256
+DEFAULT_INCLUDE_GET = ["metadatas", "documents"]
+DEFAULT_INCLUDE_QUERY = ["metadatas", "documents", "distances"]
+
+_MISSING = object()
+
+
+def get_vector_store_backend() -> str:
+    """Get the configured vector store backend, or the default one."""
+    try:
+        from testteller.config import settings
+        if settings and settings.chromadb:
+            backend = settings.chromadb.__dict__.get('vector_store_backend', DEFAULT_VECTOR_STORE_BACKEND)
+            if backend in SUPPORTED_VECTOR_STORE_BACKENDS:
+                return backend
+    except Exception as e:
+        logger.debug("Could not get vector store backend from settings: %s", e)
+    return DEFAULT_VECTOR_STORE_BACKEND
+
+
+def open_local_client(persist_directory: str, backend: Optional[str] = None):
+    """
+    Open the local (non-remote) client of a vector store backend.
+
+    Args:
+        persist_directory: Directory holding the vector store
+        backend: 'chromadb', 'numpy', 'faiss' or 'hnswlib' (defaults to the configured backend)
+
+    Returns:
+        A ChromaDB PersistentClient or a NumpyVectorClient
+    """
+    backend = backend or get_vector_store_backend()
+    if backend in NUMPY_STORE_BACKENDS:
+        return NumpyVectorClient(persist_directory, None if backend == NUMPY_VECTOR_STORE_BACKEND else backend)
+    import chromadb
+    return chromadb.PersistentClient(
+        path=persist_directory, settings=chromadb.config.Settings(anonymized_telemetry=False))
+
+
+def _compare(value: Any, operator: str, operand: Any) -> bool:
+    if value is _MISSING:
+        return False
+    if operator == "$eq":
+        return value == operand
+    if operator == "$ne":
+        return value != operand
+    if operator == "$in":
+        return value in operand
+    if operator == "$nin":
+        return value not in operand
+    try:
+        if operator == "$gt":
+            return value > operand
+        if operator == "$gte":
+            return value >= operand
+        if operator == "$lt":
+            return value < operand
+        if operator == "$lte":
+            return value <= operand
+    except TypeError:
+        return False
+    raise ValueError(f"Unsupported where operator: {operator}")
+
+
+def matches_where(metadata: Optional[Dict[str, Any]], where: Dict[str, Any]) -> bool:
+    """Whether metadata matches a ChromaDB where filter ($and, $or, $eq, $ne, $gt, $gte, $lt, $lte, $in, $nin)."""
+    metadata = metadata or {}
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key, _MISSING)
+            if not all(_compare(value, operator, operand) for operator, operand in condition.items()):
+                return False
+        elif not _compare(metadata.get(key, _MISSING), "$eq", condition):
+            return False
+    return True
+
+
+def matches_where_document(document: Optional[str], where_document: Dict[str, Any]) -> bool:
+    """Whether a document matches a ChromaDB where_document filter ($contains, $not_contains, $and, $or)."""
+    document = document or ""
+    for operator, operand in where_document.items():
+        if operator == "$contains":
+            matched = operand in document
+        elif operator == "$not_contains":
+            matched = operand not in document
+        elif operator == "$and":
+            matched = all(matches_where_document(document, clause) for clause in operand)
+        elif operator == "$or":
+            matched = any(matches_where_document(document, clause) for clause in operand)
+        else:
+            raise ValueError(f"Unsupported where_document operator: {operator}")
+        if not matched:
+            return False
+    return True
+
+
+class NumpyCollection:
+    """A collection of the NumPy store, with the ChromaDB Collection methods TestTeller uses."""
+
+    def __init__(self, path: Path, index_backend: Optional[str] = None):
+        """
+        Open a collection directory; its records are loaded on first use.
+
+        Args:
+            path: Collection directory holding collection.json
+            index_backend: 'faiss' or 'hnswlib' to search through an approximate index (optional)
+        """
+        self.path = path
+        self.index_backend = index_backend
+        self._ann: Optional[AnnIndex] = None
+        self._lock = threading.RLock()
+        self._manifest: Dict[str, Any] = {}
+        self._manifest_mtime: Optional[int] = None
+        self._log_offset = 0
+        self._ids: List[str] = []
+        self._documents: List[Optional[str]] = []
+        self._metadatas: List[Optional[Dict[str, Any]]] = []
+        self._alive = np.zeros(0, dtype=bool)
+        self._row_of: Dict[str, int] = {}
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._read_manifest()
+
+    def _read_manifest(self) -> None:
+        with open(self.path / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            self._manifest = json.load(f)
+        self._manifest_mtime = os.stat(self.path / MANIFEST_FILE).st_mtime_ns
+
+    def _write_manifest(self) -> None:
+        write_json_atomic(self.path / MANIFEST_FILE, self._manifest)
+        self._manifest_mtime = os.stat(self.path / MANIFEST_FILE).st_mtime_ns
+
+    def _file(self, kind: str, generation: Optional[int] = None) -> Path:
+        generation = self._manifest.get("generation", 0) if generation is None else generation
+        suffix = "jsonl" if kind == "records" else "f32"
+        return self.path / f"{kind}.{generation}.{suffix}"
+
+    @property
+    def name(self) -> str:
+        return self._manifest["name"]
+
+    @property
+    def metadata(self) -> Optional[Dict[str, Any]]:
+        return self._manifest.get("metadata") or None
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return self._manifest.get("dimension")
+
+    def _set_metadata(self, metadata: Optional[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._manifest["metadata"] = metadata or {}
+            self._write_manifest()
+
+    def _reset(self) -> None:
+        self._log_offset = 0
+        self._ids, self._documents, self._metadatas = [], [], []
+        self._alive = np.zeros(0, dtype=bool)
+        self._row_of = {}
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._ann = None
+
+    def _refresh(self) -> None:
+        """Pick up appends and compactions made since the last call, by this or another process."""
+        manifest_mtime = os.stat(self.path / MANIFEST_FILE).st_mtime_ns
+        if manifest_mtime != self._manifest_mtime:
+            generation = self._manifest.get("generation", 0)
+            self._read_manifest()
+            if self._manifest.get("generation", 0) != generation:
+                self._reset()
+        records = self._file("records")
+        size = records.stat().st_size if records.exists() else 0
+        if size < self._log_offset:
+            self._reset()
+        if size > self._log_offset:
+            self._replay(records)
+        if len(self._ids) != len(self._vectors):
+            self._map_vectors()
+
+    def _replay(self, records: Path) -> None:
+        with open(records, 'rb') as f:
+            f.seek(self._log_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # A write in progress (or interrupted); read it on a later call
+                    break
+                self._apply(json.loads(line))
+                self._log_offset += len(line)
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        op = record["op"]
+        if op == "add":
+            start = len(self._ids)
+            self._ids.extend(record["ids"])
+            self._documents.extend(record["documents"])
+            self._metadatas.extend(record["metadatas"])
+            self._alive = np.concatenate([self._alive, np.ones(len(record["ids"]), dtype=bool)])
+            for offset, doc_id in enumerate(record["ids"]):
+                self._row_of[doc_id] = start + offset
+        elif op == "update":
+            for doc_id, metadata, document in zip(record["ids"], record["metadatas"], record["documents"]):
+                row = self._row_of.get(doc_id)
+                if row is None:
+                    continue
+                if metadata is not None:
+                    merged = {**(self._metadatas[row] or {}), **metadata}
+                    self._metadatas[row] = {k: v for k, v in merged.items() if v is not None} or None
+                if document is not None:
+                    self._documents[row] = document
+        elif op == "delete":
+            for doc_id in record["ids"]:
+                row = self._row_of.pop(doc_id, None)
+                if row is not None:
+                    self._alive[row] = False
+
+    def _map_vectors(self) -> None:
+        rows, dimension = len(self._ids), self.dimension or 0
+        if not rows:
+            self._vectors = np.zeros((0, dimension), dtype=np.float32)
+            self._norms = np.zeros(0, dtype=np.float32)
+            return
+        self._vectors = np.memmap(self._file("vectors"), dtype=np.float32, mode='r', shape=(rows, dimension))
+        self._norms = np.memmap(self._file("norms"), dtype=np.float32, mode='r', shape=(rows,))
+
+    def _append_log(self, record: Dict[str, Any]) -> None:
+        line = (json.dumps(record) + "\n").encode('utf-8')
+        path = self._file("records")
+        with open(path, 'r+b' if path.exists() else 'wb') as f:
+            # Drop a partial line left by an interrupted write
+            f.truncate(self._log_offset)
+            f.seek(self._log_offset)
+            f.write(line)
+        self._apply(record)
+        self._log_offset += len(line)
+
+    def _append_matrix(self, kind: str, rows: int, array: np.ndarray) -> None:
+        path = self._file(kind)
+        # Drop bytes past the last logged row, left by an interrupted append
+        expected = rows * array[0].nbytes if array.ndim > 1 else rows * array.itemsize
+        with open(path, 'r+b' if path.exists() else 'wb') as f:
+            f.truncate(expected)
+            f.seek(expected)
+            f.write(np.ascontiguousarray(array).tobytes())
+
+    def _check_dimension(self, embeddings: np.ndarray) -> None:
+        if self.dimension is None:
+            self._manifest["dimension"] = int(embeddings.shape[1])
+            self._write_manifest()
+        elif embeddings.shape[1] != self.dimension:
+            raise ValueError(
+                f"Collection expecting embedding with dimension of {self.dimension}, got {embeddings.shape[1]}")
+
+    def add(
+            self,
+            ids: Sequence[str],
+            embeddings: Optional[Sequence[Sequence[float]]] = None,
+            metadatas: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+            documents: Optional[Sequence[Optional[str]]] = None,
+            **kwargs) -> None:
+        """Append documents with their embeddings; ids that are already stored are skipped."""
+        if embeddings is None:
+            raise ValueError("The NumPy vector store needs precomputed embeddings")
+        ids = list(ids)
+        if len(set(ids)) != len(ids):
+            raise ValueError("Expected IDs to be unique within an add call")
+        with self._lock:
+            self._refresh()
+            matrix = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)
+            keep = [i for i, doc_id in enumerate(ids) if doc_id not in self._row_of]
+            if len(keep) < len(ids):
+                logger.warning("Skipping %d ids already in collection '%s'", len(ids) - len(keep), self.name)
+            if not keep:
+                return
+            self._check_dimension(matrix)
+            matrix = matrix[keep]
+            rows = len(self._ids)
+            self._append_matrix("vectors", rows, matrix)
+            self._append_matrix("norms", rows, np.linalg.norm(matrix, axis=1).astype(np.float32))
+            # The log is written last: rows it does not list are ignored when replaying
+            self._append_log({
+                "op": "add",
+                "ids": [ids[i] for i in keep],
+                "documents": [documents[i] for i in keep] if documents else [None] * len(keep),
+                "metadatas": [metadatas[i] or None for i in keep] if metadatas else [None] * len(keep),
+            })
+            self._map_vectors()
+
+    def update(
+            self,
+            ids: Sequence[str],
+            embeddings: Optional[Sequence[Sequence[float]]] = None,
+            metadatas: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+            documents: Optional[Sequence[Optional[str]]] = None,
+            **kwargs) -> None:
+        """Update stored documents; metadata is merged and keys set to None are removed."""
+        ids = list(ids)
+        with self._lock:
+            self._refresh()
+            if embeddings is not None:
+                # Vectors are append-only: re-add the documents with their new vectors
+                rows = [self._row_of[doc_id] for doc_id in ids if doc_id in self._row_of]
+                stored = {self._ids[row]: (self._documents[row], self._metadatas[row]) for row in rows}
+                present = [i for i, doc_id in enumerate(ids) if doc_id in stored]
+                self._append_log({"op": "delete", "ids": [ids[i] for i in present]})
+                new_metadatas = []
+                for i in present:
+                    merged = {**(stored[ids[i]][1] or {}), **((metadatas[i] or {}) if metadatas else {})}
+                    new_metadatas.append({k: v for k, v in merged.items() if v is not None} or None)
+                self.add(
+                    ids=[ids[i] for i in present],
+                    embeddings=np.asarray(embeddings, dtype=np.float32)[present],
+                    metadatas=new_metadatas,
+                    documents=[(documents[i] if documents and documents[i] is not None else stored[ids[i]][0])
+                               for i in present])
+                return
+            self._append_log({
+                "op": "update",
+                "ids": ids,
+                "metadatas": list(metadatas) if metadatas else [None] * len(ids),
+                "documents": list(documents) if documents else [None] * len(ids),
+            })
+
+    def upsert(
+            self,
+            ids: Sequence[str],
+            embeddings: Optional[Sequence[Sequence[float]]] = None,
+            metadatas: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+            documents: Optional[Sequence[Optional[str]]] = None,
+            **kwargs) -> None:
+        """Update the stored documents among ``ids`` and add the others."""
+        if embeddings is None:
+            raise ValueError("The NumPy vector store needs precomputed embeddings")
+        ids = list(ids)
+        matrix = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)
+        with self._lock:
+            self._refresh()
+            stored = [doc_id in self._row_of for doc_id in ids]
+            for write, is_stored in ((self.update, True), (self.add, False)):
+                part = [i for i in range(len(ids)) if stored[i] == is_stored]
+                if not part:
+                    continue
+                write(
+                    ids=[ids[i] for i in part],
+                    embeddings=matrix[part],
+                    metadatas=[metadatas[i] for i in part] if metadatas else None,
+                    documents=[documents[i] for i in part] if documents else None)
+
+    def delete(
+            self,
+            ids: Optional[Sequence[str]] = None,
+            where: Optional[Dict[str, Any]] = None,
+            where_document: Optional[Dict[str, Any]] = None) -> None:
+        """Tombstone documents by id and/or filter."""
+        with self._lock:
+            self._refresh()
+            rows = self._select(ids, where, where_document)
+            if not len(rows):
+                return
+            self._append_log({"op": "delete", "ids": [self._ids[row] for row in rows]})
+            tombstones = len(self._ids) - int(self._alive.sum())
+            if tombstones >= COMPACT_MIN_TOMBSTONES and tombstones > self._alive.sum():
+                self.compact()
+
+    def compact(self) -> None:
+        """Rewrite the collection without its deleted rows, as a new generation."""
+        with self._lock:
+            self._refresh()
+            live = np.flatnonzero(self._alive)
+            old_generation = self._manifest.get("generation", 0)
+            generation = old_generation + 1
+            with open(self._file("records", generation), 'wb') as f:
+                for start in range(0, len(live), SEARCH_BLOCK_ROWS):
+                    rows = live[start:start + SEARCH_BLOCK_ROWS]
+                    f.write((json.dumps({
+                        "op": "add",
+                        "ids": [self._ids[row] for row in rows],
+                        "documents": [self._documents[row] for row in rows],
+                        "metadatas": [self._metadatas[row] for row in rows],
+                    }) + "\n").encode('utf-8'))
+            for kind, array in (("vectors", self._vectors), ("norms", self._norms)):
+                with open(self._file(kind, generation), 'wb') as f:
+                    for start in range(0, len(live), SEARCH_BLOCK_ROWS):
+                        f.write(np.ascontiguousarray(array[live[start:start + SEARCH_BLOCK_ROWS]]).tobytes())
+            self._manifest["generation"] = generation
+            self._write_manifest()
+            removed = len(self._ids) - len(live)
+            self._reset()
+            self._refresh()
+            for kind in ("records", "vectors", "norms"):
+                self._file(kind, old_generation).unlink(missing_ok=True)
+            for path in self.path.glob(f"index.{old_generation}.*"):
+                path.unlink(missing_ok=True)
+            logger.info("Compacted collection '%s': dropped %d deleted rows", self.name, removed)
+
+    def count(self) -> int:
+        with self._lock:
+            self._refresh()
+            return int(self._alive.sum())
+
+    def _filter_mask(self, where: Optional[Dict[str, Any]], where_document: Optional[Dict[str, Any]]) -> np.ndarray:
+        mask = self._alive.copy()
+        for row in np.flatnonzero(mask) if (where or where_document) else ():
+            if (where and not matches_where(self._metadatas[row], where)) or \
+                    (where_document and not matches_where_document(self._documents[row], where_document)):
+                mask[row] = False
+        return mask
+
+    def _select(self, ids, where, where_document) -> np.ndarray:
+        """Rows of live documents matching ids (in the given order) and filters."""
+        if ids is not None:
+            rows = np.array([self._row_of[doc_id] for doc_id in dict.fromkeys(ids) if doc_id in self._row_of],
+                            dtype=np.int64)
+            if where or where_document:
+                mask = self._filter_mask(where, where_document)
+                rows = rows[mask[rows]]
+            return rows
+        return np.flatnonzero(self._filter_mask(where, where_document))
+
+    def _results(self, rows: Sequence[int], include: List[str]) -> Dict[str, Any]:
+        return {
+            "embeddings": self._vectors[rows].tolist() if "embeddings" in include else None,
+            "metadatas": [self._metadatas[row] for row in rows] if "metadatas" in include else None,
+            "documents": [self._documents[row] for row in rows] if "documents" in include else None,
+        }
+
+    def get(
+            self,
+            ids: Optional[Sequence[str]] = None,
+            where: Optional[Dict[str, Any]] = None,
+            limit: Optional[int] = None,
+            offset: Optional[int] = None,
+            where_document: Optional[Dict[str, Any]] = None,
+            include: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Get documents by id and/or filter, in insertion order when no ids are given."""
+        include = DEFAULT_INCLUDE_GET if include is None else include
+        with self._lock:
+            self._refresh()
+            rows = self._select(ids, where, where_document)
+            start = offset or 0
+            rows = rows[start:start + limit] if limit is not None else rows[start:]
+            rows = rows.tolist()
+            return {"ids": [self._ids[row] for row in rows], **self._results(rows, include),
+                    "uris": None, "data": None}
+
+    def peek(self, limit: int = 10) -> Dict[str, Any]:
+        return self.get(limit=limit, include=["embeddings", "metadatas", "documents"])
+
+    def query(
+            self,
+            query_embeddings: Sequence[Sequence[float]],
+            n_results: int = 10,
+            where: Optional[Dict[str, Any]] = None,
+            where_document: Optional[Dict[str, Any]] = None,
+            include: Optional[List[str]] = None,
+            **kwargs) -> Dict[str, Any]:
+        """Exact cosine nearest neighbours of each query embedding, shaped like a ChromaDB QueryResult."""
+        include = DEFAULT_INCLUDE_QUERY if include is None else include
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        queries = queries.reshape(1, -1) if queries.ndim == 1 else queries
+        with self._lock:
+            self._refresh()
+            if self.dimension is not None and len(self._ids) and queries.shape[1] != self.dimension:
+                raise ValueError(
+                    f"Collection expecting embedding with dimension of {self.dimension}, got {queries.shape[1]}")
+            top = None
+            if self.index_backend and not where and not where_document:
+                top = self._ann_top_k(queries, max(1, n_results))
+            if top is None:
+                top = self._top_k(queries, self._filter_mask(where, where_document), max(1, n_results))
+            top_rows, top_scores = top
+
+            result: Dict[str, Any] = {"ids": [], "distances": [] if "distances" in include else None,
+                                      "embeddings": [] if "embeddings" in include else None,
+                                      "metadatas": [] if "metadatas" in include else None,
+                                      "documents": [] if "documents" in include else None,
+                                      "uris": None, "data": None}
+            for rows, scores in zip(top_rows, top_scores):
+                rows = rows.tolist()
+                result["ids"].append([self._ids[row] for row in rows])
+                if result["distances"] is not None:
+                    result["distances"].append((1.0 - scores).tolist())
+                for key, values in self._results(rows, include).items():
+                    if values is not None:
+                        result[key].append(values)
+            return result
+
+    def _top_k(self, queries: np.ndarray, mask: np.ndarray, k: int):
+        """Rows and cosine similarities of the k best live rows for each query, best first."""
+        query_norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(query_norms > 0, query_norms, 1.0)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        for start in range(0, len(self._ids), SEARCH_BLOCK_ROWS):
+            end = min(start + SEARCH_BLOCK_ROWS, len(self._ids))
+            block_mask = mask[start:end]
+            if not block_mask.any():
+                continue
+            norms = np.asarray(self._norms[start:end])
+            scores = (queries @ np.asarray(self._vectors[start:end]).T) / np.where(norms > 0, norms, np.inf)
+            if not block_mask.all():
+                scores[:, ~block_mask] = -np.inf
+            scores = np.concatenate([best_scores, scores], axis=1)
+            rows = np.concatenate([best_rows, np.broadcast_to(np.arange(start, end), (len(queries), end - start))],
+                                  axis=1)
+            if scores.shape[1] > k:
+                keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, keep, axis=1)
+                rows = np.take_along_axis(rows, keep, axis=1)
+            best_scores, best_rows = scores, rows
+
+        order = np.argsort(-best_scores, axis=1, kind='stable')
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        found = np.isfinite(best_scores)
+        return ([rows[ok] for rows, ok in zip(best_rows, found)],
+                [scores[ok] for scores, ok in zip(best_scores, found)])
+
+    def _normalized(self, rows) -> np.ndarray:
+        norms = np.asarray(self._norms[rows])
+        return np.asarray(self._vectors[rows]) / np.where(norms > 0, norms, 1.0)[:, np.newaxis]
+
+    def _sync_index(self) -> AnnIndex:
+        """Load or build this generation's index, and add the rows appended since it was saved."""
+        prefix = self.path / f"index.{self._manifest.get('generation', 0)}"
+        if self._ann is None:
+            self._ann = load_ann_index(self.index_backend, prefix, self.dimension)
+        if self._ann is None or self._ann.rows > len(self._ids):
+            self._ann = create_ann_index(self.index_backend, self.dimension)
+        start = self._ann.rows
+        if start == len(self._ids):
+            return self._ann
+        if not self._ann.is_trained:
+            sample = np.arange(len(self._ids))
+            if len(sample) > ANN_TRAIN_SAMPLE_ROWS:
+                sample = np.sort(np.random.default_rng(0).choice(sample, ANN_TRAIN_SAMPLE_ROWS, replace=False))
+            self._ann.train(self._normalized(sample))
+        for block in range(start, len(self._ids), SEARCH_BLOCK_ROWS):
+            self._ann.add(self._normalized(slice(block, min(block + SEARCH_BLOCK_ROWS, len(self._ids)))))
+        save_ann_index(self._ann, prefix)
+        logger.info("Added %d rows of collection '%s' to its %s index", len(self._ids) - start, self.name,
+                    self.index_backend)
+        return self._ann
+
+    def _ann_top_k(self, queries: np.ndarray, k: int):
+        """Like _top_k, through the approximate index; None if the collection is searched exactly."""
+        live = int(self._alive.sum())
+        if live < ANN_MIN_ROWS:
+            return None
+        index = self._sync_index()
+        query_norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(query_norms > 0, query_norms, 1.0)
+        tombstones = len(self._ids) - live
+        labels = index.search(queries, min(len(self._ids), k + min(tombstones, ANN_MAX_EXTRA_CANDIDATES)))
+        top_rows, top_scores = [], []
+        for query, candidates in zip(queries, labels):
+            candidates = candidates[candidates >= 0]
+            candidates = np.sort(candidates[self._alive[candidates]])
+            if len(candidates) < k:
+                # Too many neighbours were deleted rows: answer this query exactly
+                rows, scores = self._top_k(query[np.newaxis], self._alive, k)
+                top_rows.append(rows[0])
+                top_scores.append(scores[0])
+                continue
+            # Re-score against the stored vectors: exact distances even for quantized indexes
+            scores = self._normalized(candidates) @ query
+            order = np.argsort(-scores, kind='stable')[:k]
+            top_rows.append(candidates[order])
+            top_scores.append(scores[order])
+        return top_rows, top_scores
+
+
+class NumpyVectorClient:
+    """Client of the NumPy store, with the ChromaDB client methods TestTeller uses."""
+
+    # Adds are appended in one write whatever their size
+    max_batch_size = 1 << 20
+
+    def __init__(self, path: str, index_backend: Optional[str] = None):
+        """
+        Open the NumPy store of a persist directory.
+
+        Args:
+            path: Persist directory; collections live in its numpy_store subdirectory
+            index_backend: 'faiss' or 'hnswlib' to search collections through an approximate index (optional)
+
+        Raises:
+            ImportError: If the index backend's optional package is not installed
+        """
+        if index_backend:
+            check_ann_backend(index_backend)
+        self.root = Path(path) / STORE_DIR_NAME
+        self.index_backend = index_backend
+        self._collections: Dict[str, NumpyCollection] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> Path:
+        if not name or name != Path(name).name or name.startswith("."):
+            raise ValueError(f"Invalid collection name: {name}")
+        return self.root / name
+
+    def _exists(self, name: str) -> bool:
+        return (self._path(name) / MANIFEST_FILE).is_file()
+
+    def list_collections(self) -> List[NumpyCollection]:
+        if not self.root.is_dir():
+            return []
+        return [self.get_collection(path.name) for path in sorted(self.root.iterdir())
+                if (path / MANIFEST_FILE).is_file()]
+
+    def get_collection(self, name: str, **kwargs) -> NumpyCollection:
+        with self._lock:
+            if not self._exists(name):
+                self._collections.pop(name, None)
+                raise ValueError(f"Collection {name} does not exist.")
+            if name not in self._collections:
+                self._collections[name] = NumpyCollection(self._path(name), self.index_backend)
+            return self._collections[name]
+
+    def create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None, **kwargs) -> NumpyCollection:
+        with self._lock:
+            if self._exists(name):
+                raise ValueError(f"Collection {name} already exists.")
+            path = self._path(name)
+            path.mkdir(parents=True, exist_ok=True)
+            write_json_atomic(path / MANIFEST_FILE, {
+                "name": name, "metadata": metadata or {}, "dimension": None, "generation": 0,
+                "backend": NUMPY_VECTOR_STORE_BACKEND})
+        logger.debug("Created NumPy store collection '%s' in %s", name, path)
+        return self.get_collection(name)
+
+    def get_or_create_collection(
+            self, name: str, metadata: Optional[Dict[str, Any]] = None, **kwargs) -> NumpyCollection:
+        """Get or create a collection; like ChromaDB, given metadata replaces the stored metadata."""
+        if not self._exists(name):
+            return self.create_collection(name, metadata)
+        collection = self.get_collection(name)
+        if metadata is not None:
+            collection._set_metadata(metadata)
+        return collection
+
+    def delete_collection(self, name: str) -> None:
+        with self._lock:
+            if not self._exists(name):
+                raise ValueError(f"Collection {name} does not exist.")
+            self._collections.pop(name, None)
+            shutil.rmtree(self._path(name))
+
+    def close(self) -> None:
+        self._collections.clear()
+
@@ -0,0 +1,272 @@
+"""
+Cache of query-text embeddings for vector store lookups.
+
+Retrieval embeds the query text on every call, and the same queries recur
+across categories, test cases and runs. QueryEmbeddingCache keeps recently
+used query embeddings in a bounded LRU with a time-to-live, optionally
+persisted per embedding model, and coalesces concurrent requests for the same
+text so they share a single provider call (single flight).
+"""
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+QUERY_CACHE_DIR_NAME = "query_embeddings"
+
+
+@dataclass
+class QueryCacheStats:
+    """Hit counts and estimated savings of a query embedding cache."""
+    hits: int = 0
+    misses: int = 0
+    # Lookups that waited for an identical in-flight request instead of calling the provider
+    coalesced: int = 0
+    expired: int = 0
+    evictions: int = 0
+    provider_seconds: float = 0.0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses + self.coalesced
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups served without a provider call of their own."""
+        return (self.hits + self.coalesced) / self.lookups if self.lookups else 0.0
+
+    @property
+    def saved_seconds(self) -> float:
+        """Estimated embedding latency saved: the mean provider call time for each avoided call."""
+        if not self.misses:
+            return 0.0
+        return (self.hits + self.coalesced) * self.provider_seconds / self.misses
+
+
+class QueryEmbeddingCache:
+    """Thread-safe LRU cache of query embeddings with TTL, persistence and request coalescing."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float = 0, path: Optional[Path] = None):
+        """
+        Initialize the cache; a persisted cache is loaded on first use.
+
+        Args:
+            max_entries: Most embeddings kept; 0 disables caching (requests are still coalesced)
+            ttl_seconds: Seconds an embedding stays valid; 0 keeps it until evicted
+            path: File to persist the cache to (None keeps it in memory only)
+        """
+        self.max_entries = max(0, max_entries)
+        self.ttl_seconds = max(0, ttl_seconds)
+        self.path = path
+        self.stats = QueryCacheStats()
+        self._entries: "OrderedDict[str, Tuple[np.ndarray, float]]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._loaded = path is None
+        self._dirty = False
+
+    @staticmethod
+    def path_for_model(state_dir: Path, embedding_model: str) -> Path:
+        """Persistence file for an embedding model's query cache under a state directory."""
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', embedding_model)
+        return state_dir / QUERY_CACHE_DIR_NAME / f"{safe_name}.npz"
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._load()
+            return len(self._entries)
+
+    def _is_expired(self, created: float, now: float) -> bool:
+        return bool(self.ttl_seconds) and now - created > self.ttl_seconds
+
+    def _load(self) -> None:
+        """Load the persisted cache (caller holds the lock)."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path.exists():
+            return
+        try:
+            with np.load(self.path) as data:
+                texts, vectors, created = data["texts"], data["vectors"], data["created"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable query embedding cache %s: %s", self.path, e)
+            return
+        now = time.time()
+        for text, vector, timestamp in zip(texts.tolist(), vectors, created.tolist()):
+            if not self._is_expired(timestamp, now):
+                self._entries[text] = (vector, timestamp)
+        self._evict()
+        logger.debug("Loaded %d query embeddings from %s", len(self._entries), self.path)
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _lookup(self, text: str) -> Optional[np.ndarray]:
+        """Return a fresh cached embedding and mark it recently used (caller holds the lock)."""
+        entry = self._entries.get(text)
+        if entry is None:
+            return None
+        vector, created = entry
+        if self._is_expired(created, time.time()):
+            del self._entries[text]
+            self.stats.expired += 1
+            self._dirty = True
+            return None
+        self._entries.move_to_end(text)
+        return vector
+
+    def get_or_compute(
+            self, text: str, compute: Callable[[str], Optional[List[float]]]) -> Optional[np.ndarray]:
+        """
+        Get the embedding of a query text, calling ``compute`` only when no cached or in-flight one exists.
+
+        Args:
+            text: Query text
+            compute: Function embedding a text; returns None when embedding fails
+
+        Returns:
+            float32 embedding, or None if ``compute`` failed (failures are not cached)
+        """
+        with self._lock:
+            self._load()
+            vector = self._lookup(text)
+            if vector is not None:
+                self.stats.hits += 1
+                return vector
+            future = self._in_flight.get(text)
+            owner = future is None
+            if owner:
+                future = self._in_flight[text] = Future()
+                self.stats.misses += 1
+            else:
+                self.stats.coalesced += 1
+
+        if not owner:
+            return future.result()
+
+        start = time.perf_counter()
+        try:
+            embedding = compute(text)
+            vector = None if embedding is None else np.asarray(embedding, dtype=np.float32)
+        except BaseException as e:
+            with self._lock:
+                self._in_flight.pop(text, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self.stats.provider_seconds += time.perf_counter() - start
+            self._in_flight.pop(text, None)
+            if vector is not None and self.max_entries:
+                self._entries[text] = (vector, time.time())
+                self._entries.move_to_end(text)
+                self._evict()
+                self._dirty = True
+        future.set_result(vector)
+        return vector
+
+    def get_many_or_compute(
+            self, texts: List[str], compute_many: Callable[[List[str]], np.ndarray]) -> List[Optional[np.ndarray]]:
+        """
+        Get the embeddings of several query texts, computing all uncached ones in one batch call.
+
+        Texts that another caller is embedding right now are waited for rather
+        than embedded again.
+
+        Args:
+            texts: Query texts (repeats are embedded once)
+            compute_many: Function embedding a list of texts into a matrix with NaN rows for failures
+
+        Returns:
+            float32 embedding per text, None where embedding failed
+        """
+        found: Dict[str, Optional[np.ndarray]] = {}
+        waiting: Dict[str, Future] = {}
+        owned: Dict[str, Future] = {}
+        with self._lock:
+            self._load()
+            for text in dict.fromkeys(texts):
+                vector = self._lookup(text)
+                if vector is not None:
+                    self.stats.hits += 1
+                    found[text] = vector
+                elif text in self._in_flight:
+                    self.stats.coalesced += 1
+                    waiting[text] = self._in_flight[text]
+                else:
+                    self.stats.misses += 1
+                    owned[text] = self._in_flight[text] = Future()
+
+        if owned:
+            batch = list(owned)
+            start = time.perf_counter()
+            try:
+                matrix = np.asarray(compute_many(batch), dtype=np.float32)
+            except BaseException as e:
+                with self._lock:
+                    for text in batch:
+                        self._in_flight.pop(text, None)
+                for future in owned.values():
+                    future.set_exception(e)
+                raise
+            with self._lock:
+                # One batch call stands in for len(batch) single calls in the saved-time estimate
+                self.stats.provider_seconds += time.perf_counter() - start
+                for text, vector in zip(batch, matrix):
+                    self._in_flight.pop(text, None)
+                    vector = None if np.isnan(vector).any() else vector
+                    found[text] = vector
+                    if vector is not None and self.max_entries:
+                        self._entries[text] = (vector, time.time())
+                        self._entries.move_to_end(text)
+                        self._dirty = True
+                self._evict()
+            for text in batch:
+                owned[text].set_result(found[text])
+
+        for text, future in waiting.items():
+            found[text] = future.result()
+        return [found[text] for text in texts]
+
+    def clear(self) -> None:
+        """Drop all cached embeddings (and the persisted copy on the next save)."""
+        with self._lock:
+            self._loaded = True
+            self._dirty = bool(self._entries) or (self.path is not None and self.path.exists())
+            self._entries.clear()
+
+    def save(self) -> None:
+        """Persist the cache if it has a path and changed since it was loaded."""
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.time()
+            live = [(text, vector, created) for text, (vector, created) in self._entries.items()
+                    if not self._is_expired(created, now)]
+            dimensions = {vector.shape for _, vector, _ in live}
+            if len(dimensions) > 1:
+                logger.warning("Not persisting query embedding cache with mixed dimensions %s", dimensions)
+                return
+            texts = np.array([text for text, _, _ in live], dtype=str)
+            vectors = np.stack([vector for _, vector, _ in live]) if live else np.empty((0, 0), dtype=np.float32)
+            created = np.array([created for _, _, created in live], dtype=np.float64)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f".{self.path.stem}.tmp.npz")
+            np.savez(tmp_path, texts=texts, vectors=vectors, created=created)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+            logger.debug("Saved %d query embeddings to %s", len(live), self.path)
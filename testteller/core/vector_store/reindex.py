@@ -0,0 +1,396 @@
+"""
+Blue-green re-indexing of a collection.
+
+Clearing a collection to rebuild it leaves an empty index that concurrent
+generations query in the meantime. CollectionReindexer instead builds the
+next version ``<name>__v<n>`` from the live collection's documents, with
+embedding requests throttled so the live workload keeps its provider quota.
+It then catches up on documents added or removed during the build, checks the
+new index, and swaps the collection alias to it atomically. Previous versions
+are kept for rollback and garbage collected beyond a configured count.
+"""
+import asyncio
+import copy
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import chromadb
+import numpy as np
+
+from ..constants import (
+    DEFAULT_REINDEX_BATCH_SIZE, DEFAULT_REINDEX_KEEP_VERSIONS, DEFAULT_REINDEX_REQUESTS_PER_MINUTE,
+    REINDEX_VALIDATION_SAMPLES
+)
+from ..data_ingestion.ingest_state import get_collection_state_dir, write_json_atomic
+from ..utils.exceptions import EmbeddingGenerationError, ReindexError
+from ..utils.rate_limiter import AsyncRateLimiter
+from .chromadb_manager import (
+    EMBEDDING_MODEL_METADATA_KEY, ChromaDBManager, add_embedded_rows, to_chroma_embeddings
+)
+from .collection_aliases import collection_version, collection_versions, versioned_name
+
+logger = logging.getLogger(__name__)
+
+# Largest cosine distance at which a sampled document still counts as finding itself
+SELF_MATCH_DISTANCE = 1e-3
+# Progress of an embedding migration, in the collection's state directory
+MIGRATION_STATE_FILE = "embedding_migration.json"
+
+
+@dataclass
+class ReindexReport:
+    """Outcome of one re-index."""
+    name: str
+    source: str
+    target: str
+    documents: int = 0
+    # Documents sent to the embedding provider (0 when stored embeddings are reused)
+    embedded: int = 0
+    # Documents added to or removed from the live collection while the new version was built
+    caught_up: int = 0
+    validated: int = 0
+    seconds: float = 0.0
+    removed_versions: List[str] = field(default_factory=list)
+
+
+class CollectionReindexer:
+    """Rebuilds the collection behind a ChromaDBManager as a new version and swaps it in."""
+
+    def __init__(
+            self,
+            vector_store: ChromaDBManager,
+            batch_size: int = DEFAULT_REINDEX_BATCH_SIZE,
+            requests_per_minute: float = DEFAULT_REINDEX_REQUESTS_PER_MINUTE,
+            reuse_embeddings: bool = False,
+            validation_samples: int = REINDEX_VALIDATION_SAMPLES):
+        """
+        Initialize the reindexer.
+
+        Args:
+            vector_store: Manager of the collection to rebuild
+            batch_size: Documents read, embedded and written per batch
+            requests_per_minute: Most embedding requests per minute (0 for no throttling)
+            reuse_embeddings: Copy the stored embeddings instead of embedding the documents again
+            validation_samples: Documents checked to be retrievable from the new version before the swap
+        """
+        self.vector_store = vector_store
+        self.batch_size = max(1, batch_size)
+        self.limiter = AsyncRateLimiter(requests_per_minute)
+        self.reuse_embeddings = reuse_embeddings
+        self.validation_samples = max(0, validation_samples)
+        # Computes the new version's embeddings
+        self.embedder = vector_store.llm_manager
+
+    @property
+    def name(self) -> str:
+        return self.vector_store.collection_name
+
+    def _collections(self) -> List[str]:
+        return self.vector_store.list_collections()
+
+    def next_version_name(self) -> str:
+        """Name of the next version of the collection."""
+        versions = [collection_version(self.name, c) for c in self._collections()]
+        return versioned_name(self.name, max([v for v in versions if v] + [0]) + 1)
+
+    async def reindex(
+            self,
+            keep_versions: int = DEFAULT_REINDEX_KEEP_VERSIONS,
+            on_progress: Optional[Callable[[int, int], None]] = None) -> ReindexReport:
+        """
+        Build, check and swap in a new version of the collection.
+
+        Args:
+            keep_versions: Previous versions kept for rollback; older ones are deleted
+            on_progress: Called with (documents copied, documents to copy) after each batch
+
+        Returns:
+            What was built and removed
+
+        Raises:
+            ReindexError: If the new version fails validation (the live collection is untouched)
+        """
+        start = time.perf_counter()
+        source = self.vector_store.collection
+        report = ReindexReport(name=self.name, source=self.vector_store.index_name, target=self.next_version_name())
+        logger.info("Re-indexing '%s': building '%s' from '%s'", report.name, report.target, report.source)
+        target = await asyncio.to_thread(self.vector_store.open_collection, report.target, source.metadata)
+        try:
+            source_ids = await asyncio.to_thread(self._ids, source)
+            report.embedded = await self._copy(source, target, source_ids, on_progress)
+            await self._finish_build(source, target, report)
+        except BaseException:
+            logger.error("Re-indexing '%s' failed; dropping '%s'", report.name, report.target)
+            await asyncio.to_thread(self.vector_store.client.delete_collection, name=report.target)
+            raise
+
+        await self._swap(report, keep_versions)
+        report.seconds = time.perf_counter() - start
+        logger.info("Re-indexed '%s' into '%s': %d documents in %.1fs",
+                    report.name, report.target, report.documents, report.seconds)
+        return report
+
+    async def _finish_build(
+            self, source: chromadb.Collection, target: chromadb.Collection, report: ReindexReport) -> None:
+        """Catch up on writes to the live collection during the build, then validate the new version."""
+        source_ids = await asyncio.to_thread(self._ids, source)
+        target_ids = set(await asyncio.to_thread(self._ids, target))
+        added = [doc_id for doc_id in source_ids if doc_id not in target_ids]
+        removed = list(target_ids - set(source_ids))
+        report.embedded += await self._copy(source, target, added)
+        if removed:
+            await asyncio.to_thread(target.delete, ids=removed)
+        report.caught_up = len(added) + len(removed)
+        report.documents = len(source_ids)
+        report.validated = await asyncio.to_thread(self._validate, target, source_ids)
+
+    async def _swap(self, report: ReindexReport, keep_versions: int) -> None:
+        self.vector_store.aliases.swap(self.name, report.target)
+        await asyncio.to_thread(self.vector_store.use_index, report.target)
+        report.removed_versions = await asyncio.to_thread(self.garbage_collect, keep_versions)
+
+    @staticmethod
+    def _ids(collection: chromadb.Collection) -> List[str]:
+        return collection.get(include=[])['ids']
+
+    async def _copy(
+            self,
+            source: chromadb.Collection,
+            target: chromadb.Collection,
+            ids: Sequence[str],
+            on_progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """Copy documents in batches, embedding them again unless embeddings are reused; returns how many were embedded."""
+        include = ["documents", "metadatas"] + (["embeddings"] if self.reuse_embeddings else [])
+        embedded = 0
+        for offset in range(0, len(ids), self.batch_size):
+            batch = await asyncio.to_thread(source.get, ids=list(ids[offset:offset + self.batch_size]), include=include)
+            embeddings = np.asarray(batch['embeddings'], dtype=np.float32) if self.reuse_embeddings else None
+            embedded += await self._embed_and_add(
+                target, batch['ids'], batch['documents'], batch['metadatas'], embeddings)
+            if on_progress:
+                on_progress(min(offset + self.batch_size, len(ids)), len(ids))
+        return embedded
+
+    async def _embed_and_add(
+            self,
+            target: chromadb.Collection,
+            ids: List[str],
+            documents: List[Optional[str]],
+            metadatas: List[Optional[Dict[str, Any]]],
+            embeddings: Optional[np.ndarray] = None) -> int:
+        """Add documents to the new version, embedding them (throttled) unless embeddings are given."""
+        documents = [doc or "" for doc in documents]
+        embedded = 0
+        if embeddings is None:
+            await self.limiter.acquire()
+            embeddings = await asyncio.to_thread(self.embedder.get_embeddings_array, documents)
+            failed = int(np.isnan(embeddings).any(axis=1).sum())
+            if failed:
+                raise EmbeddingGenerationError(
+                    message=f"Embedding generation failed for {failed} documents while re-indexing '{self.name}'.",
+                    provider=self.embedder.provider)
+            embedded = len(ids)
+        await asyncio.to_thread(add_embedded_rows, target, ids, documents, metadatas, embeddings)
+        return embedded
+
+    def _validate(self, target: chromadb.Collection, ids: List[str]) -> int:
+        """Check the new version holds every document and finds sampled documents by their own embedding."""
+        count = target.count()
+        if count != len(ids):
+            raise ReindexError(f"New version holds {count} documents, expected {len(ids)}")
+        if not ids or not self.validation_samples:
+            return 0
+
+        positions = np.linspace(0, len(ids) - 1, min(self.validation_samples, len(ids))).astype(int)
+        sample = [ids[i] for i in dict.fromkeys(positions.tolist())]
+        stored = target.get(ids=sample, include=["embeddings"])
+        results = target.query(
+            query_embeddings=to_chroma_embeddings(np.asarray(stored['embeddings'], dtype=np.float32)),
+            n_results=1, include=["distances"])
+        missed = [doc_id for doc_id, found, distances in zip(stored['ids'], results['ids'], results['distances'])
+                  if not found or (found[0] != doc_id and distances[0] > SELF_MATCH_DISTANCE)]
+        if missed:
+            raise ReindexError(
+                f"{len(missed)} of {len(sample)} sampled documents are not retrievable from the new version")
+        return len(sample)
+
+    def garbage_collect(self, keep_versions: int = DEFAULT_REINDEX_KEEP_VERSIONS) -> List[str]:
+        """
+        Delete versions of the collection that are neither live nor among the latest kept for rollback.
+
+        Returns:
+            Names of the deleted collections
+        """
+        live = self.vector_store.aliases.resolve(self.name)
+        keep = {live, *self.vector_store.aliases.history(self.name)[:max(0, keep_versions)]}
+        keep.update(self._in_progress_versions())
+        removed = [c for c in collection_versions(self.name, self._collections()) if c not in keep]
+        for collection in removed:
+            self.vector_store.client.delete_collection(name=collection)
+            logger.info("Deleted old version '%s' of collection '%s'", collection, self.name)
+        if removed:
+            self.vector_store.aliases.forget(self.name, removed)
+        return removed
+
+    def _in_progress_versions(self) -> List[str]:
+        """Versions being built by an interrupted embedding migration, which must survive garbage collection."""
+        state = _read_migration_state(self._migration_state_path())
+        return [state["target"]] if state.get("target") else []
+
+    def _migration_state_path(self) -> Path:
+        return get_collection_state_dir(self.name, self.vector_store.persist_directory) / MIGRATION_STATE_FILE
+
+    def rollback(self) -> Tuple[str, str]:
+        """
+        Point the collection back at its most recent previous version.
+
+        Returns:
+            The versions swapped from and to
+
+        Raises:
+            ReindexError: If no previous version exists
+        """
+        collections = set(self._collections())
+        previous = [c for c in self.vector_store.aliases.history(self.name) if c in collections]
+        if not previous:
+            raise ReindexError(f"No previous version of '{self.name}' to roll back to")
+        current = self.vector_store.aliases.swap(self.name, previous[0])
+        self.vector_store.use_index(previous[0])
+        return current, previous[0]
+
+
+@dataclass
+class MigrationReport(ReindexReport):
+    """Outcome of one embedding model migration."""
+    from_model: str = ""
+    to_model: str = ""
+    # Documents already streamed by an interrupted run of the same migration
+    resumed_from: int = 0
+
+
+def _read_migration_state(path: Path) -> Dict[str, Any]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable embedding migration state %s: %s", path, e)
+        return {}
+
+
+class EmbeddingMigrator(CollectionReindexer):
+    """
+    Re-embeds a collection with another embedding model into a shadow version and swaps it in when complete.
+
+    Documents are streamed out of the live collection page by page, so the
+    original source files are not needed. Progress is recorded after every
+    page: an interrupted migration resumes where it stopped. The new version
+    records its embedding model in its metadata, so every process that opens
+    the collection after the swap embeds queries with it.
+    """
+
+    def __init__(
+            self,
+            vector_store: ChromaDBManager,
+            to_model: str,
+            batch_size: int = DEFAULT_REINDEX_BATCH_SIZE,
+            requests_per_minute: float = DEFAULT_REINDEX_REQUESTS_PER_MINUTE,
+            validation_samples: int = REINDEX_VALIDATION_SAMPLES):
+        """
+        Initialize the migrator.
+
+        Args:
+            vector_store: Manager of the collection to migrate
+            to_model: Embedding model as 'provider' or 'provider/model'
+            batch_size: Documents read, embedded and written per page
+            requests_per_minute: Most embedding requests per minute (0 for no throttling)
+            validation_samples: Documents checked to be retrievable from the new version before the swap
+
+        Raises:
+            ValueError: If the provider does not support embeddings
+        """
+        super().__init__(vector_store, batch_size, requests_per_minute, validation_samples=validation_samples)
+        # Same generation client, its own embedding client
+        self.embedder = copy.copy(vector_store.llm_manager)
+        self.embedder.use_embedding_model(to_model)
+        self.to_model = self.embedder.embedding_spec
+
+    async def migrate(
+            self,
+            keep_versions: int = DEFAULT_REINDEX_KEEP_VERSIONS,
+            on_progress: Optional[Callable[[int, int], None]] = None,
+            restart: bool = False) -> MigrationReport:
+        """
+        Re-embed every document with the new model and swap the new version in.
+
+        Args:
+            keep_versions: Previous versions kept for rollback; older ones are deleted
+            on_progress: Called with (documents streamed, documents in the collection) after each page
+            restart: Discard the progress of an interrupted migration instead of resuming it
+
+        Returns:
+            What was migrated and removed
+
+        Raises:
+            ReindexError: If the new version fails validation (it is dropped; the live collection is untouched)
+        """
+        start = time.perf_counter()
+        source = self.vector_store.collection
+        state_path = self._migration_state_path()
+        state = _read_migration_state(state_path)
+        collections = set(self._collections())
+        resumable = (not restart and state.get("to") == self.to_model
+                     and state.get("source") == self.vector_store.index_name and state.get("target") in collections)
+        if state.get("target") in collections and not resumable and state["target"] != self.vector_store.index_name:
+            logger.info("Discarding unfinished migration version '%s'", state["target"])
+            await asyncio.to_thread(self.vector_store.client.delete_collection, name=state["target"])
+
+        offset = state.get("offset", 0) if resumable else 0
+        report = MigrationReport(
+            name=self.name, source=self.vector_store.index_name,
+            target=state["target"] if resumable else self.next_version_name(),
+            from_model=self.vector_store.llm_manager.embedding_spec, to_model=self.to_model, resumed_from=offset)
+        logger.info("Migrating '%s' from %s to %s into '%s'%s", report.name, report.from_model, report.to_model,
+                    report.target, f" (resuming after {offset} documents)" if offset else "")
+        target = await asyncio.to_thread(
+            self.vector_store.open_collection, report.target,
+            {**(source.metadata or {}), EMBEDDING_MODEL_METADATA_KEY: self.to_model})
+
+        total = await asyncio.to_thread(source.count)
+        while True:
+            page = await asyncio.to_thread(
+                source.get, limit=self.batch_size, offset=offset, include=["documents", "metadatas"])
+            if not page['ids']:
+                break
+            stored = set((await asyncio.to_thread(target.get, ids=page["ids"], include=[]))["ids"])
+            rows = [i for i, doc_id in enumerate(page['ids']) if doc_id not in stored]
+            if rows:
+                report.embedded += await self._embed_and_add(
+                    target, [page['ids'][i] for i in rows], [page['documents'][i] for i in rows],
+                    [page['metadatas'][i] for i in rows])
+            offset += len(page['ids'])
+            write_json_atomic(state_path, {
+                "source": report.source, "target": report.target, "to": self.to_model,
+                "offset": offset, "updated": time.time()})
+            if on_progress:
+                on_progress(min(offset, total), total)
+
+        try:
+            await self._finish_build(source, target, report)
+        except ReindexError:
+            logger.error("Migrated version '%s' failed validation; dropping it", report.target)
+            await asyncio.to_thread(self.vector_store.client.delete_collection, name=report.target)
+            state_path.unlink(missing_ok=True)
+            raise
+
+        state_path.unlink(missing_ok=True)
+        await self._swap(report, keep_versions)
+        report.seconds = time.perf_counter() - start
+        logger.info("Migrated '%s' to %s: %d documents in %.1fs",
+                    report.name, report.to_model, report.documents, report.seconds)
+        return report
@@ -0,0 +1,320 @@
+"""
+Portable collection snapshots for fast warm starts.
+
+A snapshot is a single zip file holding a collection's ids, documents,
+metadata and embeddings, so a node can load a collection without ingesting
+its sources or calling an embedding provider. Collections are written and
+read in pages: each page is an ``.npy`` embedding matrix (float32, or float16
+for half the size) and a ``.jsonl`` file with one record per row. The
+manifest records the format version, the embedding model and the pages; it is
+written last, so a file without one is an incomplete export. Code ingestion
+state travels with the snapshot, so later incremental ingests pick up where
+the exporting node left off.
+"""
+import json
+import logging
+import time
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import chromadb
+import numpy as np
+
+from ..constants import DEFAULT_SNAPSHOT_IMPORT_BATCH_SIZE, DEFAULT_SNAPSHOT_PAGE_SIZE, SNAPSHOT_EMBEDDING_DTYPES
+from ..data_ingestion.ingest_state import CODE_STATE_FILE, get_collection_state_dir
+from ..utils.exceptions import SnapshotError
+from .chromadb_manager import EMBEDDING_MODEL_METADATA_KEY, add_embedded_rows, collection_names
+from .collection_aliases import CollectionAliases, collection_version, versioned_name
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = "testteller-snapshot"
+SNAPSHOT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+# Ingestion state files carried by snapshots; the resume journal is specific to one node
+SNAPSHOT_STATE_FILES = (CODE_STATE_FILE,)
+
+
+@dataclass
+class SnapshotReport:
+    """Outcome of one snapshot export or import."""
+    collection: str
+    path: str
+    documents: int = 0
+    pages: int = 0
+    dimension: int = 0
+    dtype: str = "float32"
+    embedding_model: Optional[str] = None
+    bytes: int = 0
+    seconds: float = 0.0
+
+
+def _page_name(index: int) -> str:
+    return f"pages/{index:06d}"
+
+
+def _member(name: str, compress_type: int) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+    info.compress_type = compress_type
+    return info
+
+
+def export_snapshot(
+        collection: chromadb.Collection,
+        path: str,
+        name: Optional[str] = None,
+        embedding_model: Optional[str] = None,
+        state_dir: Optional[Path] = None,
+        page_size: int = DEFAULT_SNAPSHOT_PAGE_SIZE,
+        dtype: str = "float32",
+        on_progress: Optional[Callable[[int, int], None]] = None) -> SnapshotReport:
+    """
+    Write a collection to a snapshot file, one page at a time.
+
+    Args:
+        collection: Collection to export
+        path: Snapshot file to write (replaced if it exists)
+        name: Collection name recorded in the snapshot (defaults to the collection's own name)
+        embedding_model: 'provider/model' the embeddings were computed with
+        state_dir: Ingestion state directory of the collection, whose code state is included
+        page_size: Documents read from the collection and written per page
+        dtype: Embedding precision, 'float32' or 'float16'
+        on_progress: Called with (documents written, documents in the collection) after each page
+
+    Returns:
+        What was exported
+
+    Raises:
+        ValueError: If the dtype is not supported
+    """
+    if dtype not in SNAPSHOT_EMBEDDING_DTYPES:
+        raise ValueError(f"Unsupported snapshot dtype: {dtype}. Supported: {SNAPSHOT_EMBEDDING_DTYPES}")
+    start = time.perf_counter()
+    page_size = max(1, page_size)
+    total = collection.count()
+    report = SnapshotReport(collection=name or collection.name, path=path, dtype=dtype, embedding_model=embedding_model)
+    pages: List[Dict[str, Any]] = []
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # Written next to the target and renamed, so a failed export never replaces a good snapshot
+    tmp_path = target.with_name(f".{target.name}.tmp")
+
+    try:
+        with zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+            offset = 0
+            while True:
+                page = collection.get(
+                    limit=page_size, offset=offset, include=["documents", "metadatas", "embeddings"])
+                if not page['ids']:
+                    break
+                matrix = np.asarray(page['embeddings'], dtype=np.float32).astype(dtype, copy=False)
+                report.dimension = report.dimension or matrix.shape[1]
+                page_name = _page_name(len(pages))
+                # Embeddings barely compress, so they are stored as is
+                with zf.open(_member(f"{page_name}.npy", zipfile.ZIP_STORED), 'w', force_zip64=True) as f:
+                    np.lib.format.write_array(f, matrix, allow_pickle=False)
+                with zf.open(_member(f"{page_name}.jsonl", zipfile.ZIP_DEFLATED), 'w', force_zip64=True) as f:
+                    for doc_id, document, metadata in zip(page['ids'], page['documents'], page['metadatas']):
+                        f.write(json.dumps({"id": doc_id, "document": document, "metadata": metadata}).encode('utf-8'))
+                        f.write(b"\n")
+                pages.append({"name": page_name, "documents": len(page['ids'])})
+                offset += len(page['ids'])
+                if on_progress:
+                    on_progress(min(offset, total), total)
+
+            state = {}
+            for file_name in SNAPSHOT_STATE_FILES if state_dir else ():
+                state_path = state_dir / file_name
+                if state_path.is_file():
+                    zf.write(state_path, f"state/{file_name}")
+                    state[file_name] = f"state/{file_name}"
+
+            collection_metadata = {key: value for key, value in (collection.metadata or {}).items()
+                                   if key != EMBEDDING_MODEL_METADATA_KEY}
+            zf.writestr(MANIFEST_NAME, json.dumps({
+                "format": SNAPSHOT_FORMAT,
+                "version": SNAPSHOT_VERSION,
+                "collection": report.collection,
+                "collection_metadata": collection_metadata,
+                "embedding_model": embedding_model,
+                "dimension": report.dimension,
+                "dtype": dtype,
+                "documents": offset,
+                "pages": pages,
+                "state": state,
+                "created": time.time(),
+            }, indent=2))
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    tmp_path.replace(target)
+    report.documents, report.pages = offset, len(pages)
+    report.bytes = target.stat().st_size
+    report.seconds = time.perf_counter() - start
+    logger.info("Exported %d documents of '%s' to %s in %.1fs",
+                report.documents, report.collection, path, report.seconds)
+    return report
+
+
+def read_manifest(zf: zipfile.ZipFile) -> Dict[str, Any]:
+    """
+    Read and check the manifest of an open snapshot file.
+
+    Raises:
+        SnapshotError: If the file is not a complete snapshot of a supported version
+    """
+    try:
+        manifest = json.loads(zf.read(MANIFEST_NAME))
+    except KeyError:
+        raise SnapshotError(f"{zf.filename} has no manifest; it is not a snapshot or its export did not finish")
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise SnapshotError(f"{zf.filename} is not a testteller snapshot")
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        raise SnapshotError(
+            f"{zf.filename} is a version {manifest.get('version')} snapshot; "
+            f"this testteller reads version {SNAPSHOT_VERSION}")
+    return manifest
+
+
+def iter_snapshot_pages(
+        zf: zipfile.ZipFile,
+        manifest: Dict[str, Any]) -> Iterator[Tuple[List[str], List[str], List[Optional[Dict[str, Any]]], np.ndarray]]:
+    """Yield (ids, documents, metadatas, float32 embeddings) for each page of an open snapshot file."""
+    for page in manifest["pages"]:
+        with zf.open(f"{page['name']}.npy") as f:
+            embeddings = np.lib.format.read_array(f, allow_pickle=False).astype(np.float32, copy=False)
+        ids, documents, metadatas = [], [], []
+        with zf.open(f"{page['name']}.jsonl") as f:
+            for line in f:
+                record = json.loads(line)
+                ids.append(record["id"])
+                documents.append(record["document"] or "")
+                metadatas.append(record["metadata"])
+        if len(ids) != len(embeddings):
+            raise SnapshotError(f"Page {page['name']} of {zf.filename} has {len(ids)} records "
+                                f"but {len(embeddings)} embeddings")
+        yield ids, documents, metadatas, embeddings
+
+
+def import_snapshot(
+        client: chromadb.ClientAPI,
+        path: str,
+        collection_name: Optional[str] = None,
+        persist_directory: Optional[str] = None,
+        replace: bool = False,
+        batch_size: int = DEFAULT_SNAPSHOT_IMPORT_BATCH_SIZE,
+        on_progress: Optional[Callable[[int, int], None]] = None) -> SnapshotReport:
+    """
+    Load a snapshot file into a collection without calling any embedding provider.
+
+    The collection records the snapshot's embedding model, so queries against it
+    are embedded with the same model whatever the node is configured with.
+    Replacing a collection that holds documents loads the snapshot into its next
+    version ``<name>__v<n>`` and points the collection's alias at it only once
+    every page is loaded, like re-indexing; the replaced collection is kept for
+    rollback. A load that fails drops the partial collection.
+
+    Args:
+        client: ChromaDB client to load into
+        path: Snapshot file
+        collection_name: Collection to create (defaults to the exported collection's name)
+        persist_directory: ChromaDB persist directory, for aliases and ingestion state
+        replace: Replace the collection if it already holds documents
+        batch_size: Documents per collection.add call
+        on_progress: Called with (documents loaded, documents in the snapshot) after each batch
+
+    Returns:
+        What was imported
+
+    Raises:
+        SnapshotError: If the file is not a valid snapshot, or the collection holds documents and replace is False
+    """
+    start = time.perf_counter()
+    with zipfile.ZipFile(path, 'r') as zf:
+        manifest = read_manifest(zf)
+        name = collection_name or manifest["collection"]
+        aliases = CollectionAliases(persist_directory)
+        physical = aliases.resolve(name)
+        existing = collection_names(client)
+        target = physical
+        if physical in existing:
+            count = client.get_collection(name=physical).count()
+            if count and not replace:
+                raise SnapshotError(f"Collection '{name}' already holds {count} documents; "
+                                    "import with --replace to overwrite it")
+            if count:
+                # The live collection keeps serving until the new version is fully loaded
+                versions = [collection_version(name, c) for c in existing]
+                target = versioned_name(name, max([v for v in versions if v] + [0]) + 1)
+            else:
+                client.delete_collection(name=physical)
+
+        metadata = {"hnsw:space": "cosine", **manifest.get("collection_metadata", {})}
+        if manifest.get("embedding_model"):
+            metadata[EMBEDDING_MODEL_METADATA_KEY] = manifest["embedding_model"]
+        collection = client.create_collection(name=target, metadata=metadata)
+        try:
+            loaded = _load_pages(client, collection, zf, manifest, batch_size, on_progress)
+        except BaseException:
+            logger.error("Importing %s into '%s' failed; dropping '%s'", path, name, target)
+            client.delete_collection(name=target)
+            raise
+        if target != physical:
+            aliases.swap(name, target)
+
+        state_dir = get_collection_state_dir(name, persist_directory)
+        for file_name, member in manifest.get("state", {}).items():
+            if file_name in SNAPSHOT_STATE_FILES:
+                state_dir.mkdir(parents=True, exist_ok=True)
+                (state_dir / file_name).write_bytes(zf.read(member))
+
+    report = SnapshotReport(
+        collection=name, path=path, documents=loaded, pages=len(manifest["pages"]),
+        dimension=manifest.get("dimension", 0), dtype=manifest.get("dtype", "float32"),
+        embedding_model=manifest.get("embedding_model"), bytes=Path(path).stat().st_size,
+        seconds=time.perf_counter() - start)
+    logger.info("Imported %d documents into '%s' from %s in %.1fs", loaded, name, path, report.seconds)
+    return report
+
+
+def _load_pages(
+        client: chromadb.ClientAPI,
+        collection: chromadb.Collection,
+        zf: zipfile.ZipFile,
+        manifest: Dict[str, Any],
+        batch_size: int,
+        on_progress: Optional[Callable[[int, int], None]]) -> int:
+    """Add every page of an open snapshot file to a collection; returns the number of documents loaded."""
+    max_batch_size = getattr(client, 'max_batch_size', None) or batch_size
+    batch_size = max(1, min(batch_size, max_batch_size))
+    total, loaded = manifest["documents"], 0
+    buffer: List[Tuple] = []
+    buffered = 0
+    for page in iter_snapshot_pages(zf, manifest):
+        buffer.append(page)
+        buffered += len(page[0])
+        if buffered >= batch_size:
+            loaded += _flush(collection, buffer, batch_size)
+            buffer, buffered = [], 0
+            if on_progress:
+                on_progress(loaded, total)
+    if buffer:
+        loaded += _flush(collection, buffer, batch_size)
+        if on_progress:
+            on_progress(loaded, total)
+    return loaded
+
+
+def _flush(collection: chromadb.Collection, pages: List[Tuple], batch_size: int) -> int:
+    """Add buffered pages to a collection in batches of at most batch_size documents."""
+    ids = [doc_id for page in pages for doc_id in page[0]]
+    documents = [document for page in pages for document in page[1]]
+    metadatas = [metadata for page in pages for metadata in page[2]]
+    embeddings = np.concatenate([page[3] for page in pages])
+    for offset in range(0, len(ids), batch_size):
+        rows = slice(offset, offset + batch_size)
+        add_embedded_rows(collection, ids[rows], documents[rows], metadatas[rows], embeddings[rows])
+    return len(ids)
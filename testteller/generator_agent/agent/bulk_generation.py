@@ -0,0 +1,120 @@
+"""
+Bulk test case generation: query files, per-query results and throughput reporting.
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+LATENCY_PERCENTILES = (50, 90, 99)
+
+
+@dataclass
+class GenerationQuery:
+    """One query of a bulk generation and the name its output is written under."""
+    query: str
+    name: str
+
+
+@dataclass
+class GenerationResult:
+    """Outcome of generating test cases for one query."""
+    query: str
+    test_cases: Optional[str] = None
+    seconds: float = 0.0
+    cached: bool = False
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BulkGenerationReport:
+    """Throughput and latency of a bulk generation."""
+    results: List[GenerationResult] = field(default_factory=list)
+    retrieval_seconds: float = 0.0
+    wall_seconds: float = 0.0
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for r in self.results if r.ok)
+
+    @property
+    def failed(self) -> int:
+        return len(self.results) - self.succeeded
+
+    @property
+    def cached(self) -> int:
+        return sum(1 for r in self.results if r.ok and r.cached)
+
+    @property
+    def queries_per_minute(self) -> float:
+        return self.succeeded * 60 / self.wall_seconds if self.wall_seconds else 0.0
+
+    def latency_percentiles(self) -> Dict[int, float]:
+        """Per-query generation latency percentiles in seconds, over successful queries."""
+        latencies = [r.seconds for r in self.results if r.ok]
+        if not latencies:
+            return {}
+        return dict(zip(LATENCY_PERCENTILES, np.percentile(latencies, LATENCY_PERCENTILES).tolist()))
+
+
+def _slugify(text: str, max_length: int = 40) -> str:
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', text.lower()).strip('-')
+    return slug[:max_length].rstrip('-') or "query"
+
+
+def read_queries_file(path: str) -> List[GenerationQuery]:
+    """
+    Read the queries of a bulk generation.
+
+    ``.jsonl`` files hold one JSON object per line with a ``query`` (and an
+    optional ``id`` naming its output) or a bare JSON string. Other files hold
+    one query per line; blank lines and lines starting with ``#`` are skipped.
+
+    Args:
+        path: Queries file
+
+    Returns:
+        Queries in file order, each with a unique output name
+
+    Raises:
+        ValueError: If a JSONL line is not valid or has no query
+    """
+    file_path = Path(path)
+    queries: List[GenerationQuery] = []
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or (file_path.suffix.lower() != ".jsonl" and line.startswith('#')):
+                continue
+            query_id = None
+            if file_path.suffix.lower() == ".jsonl":
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{line_number}: invalid JSON: {e}") from e
+                if isinstance(record, dict):
+                    query, query_id = record.get("query"), record.get("id")
+                else:
+                    query = record
+                if not isinstance(query, str) or not query.strip():
+                    raise ValueError(f"{path}:{line_number}: expected a non-empty \"query\"")
+                line = query.strip()
+            index = len(queries) + 1
+            name = _slugify(str(query_id)) if query_id is not None else f"{index:03d}-{_slugify(line)}"
+            queries.append(GenerationQuery(query=line, name=name))
+
+    # Ids may repeat or slugify to the same name; keep every output
+    seen: Dict[str, int] = {}
+    for item in queries:
+        count = seen.get(item.name, 0)
+        seen[item.name] = count + 1
+        if count:
+            item.name = f"{item.name}-{count + 1}"
+    return queries
@@ -0,0 +1,114 @@
+"""
+Retention of generated test cases stored back into a collection.
+
+Every successful generation feeds its test case chunks back into the
+collection as ``type=generated_test_case``. Left alone they grow without
+bound, slow down similarity search and crowd source documents out of the
+top-k results. FeedbackRetentionPolicy bounds them by age (from
+``generation_timestamp``), per generation query and in total; whenever a cap
+forces a choice, the chunks with the best ``quality_score`` are kept, newest
+first among equal scores.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from testteller.core.constants import (
+    GENERATED_TEST_RETENTION_DAYS, MAX_GENERATED_TESTS_PER_QUERY, MAX_GENERATED_TESTS_TO_STORE
+)
+
+GENERATED_TEST_CASE_FILTER = {"type": "generated_test_case"}
+
+
+@dataclass
+class FeedbackRetentionPolicy:
+    """Limits on stored generated test case chunks; 0 disables a limit."""
+    max_count: int = MAX_GENERATED_TESTS_TO_STORE
+    max_age_days: float = GENERATED_TEST_RETENTION_DAYS
+    max_per_query: int = MAX_GENERATED_TESTS_PER_QUERY
+
+
+@dataclass
+class FeedbackCompactionReport:
+    """Generated test case chunks removed by one compaction, by the limit that removed them."""
+    stored: int = 0
+    expired: int = 0
+    over_query_cap: int = 0
+    over_total_cap: int = 0
+    dry_run: bool = False
+
+    @property
+    def removed(self) -> int:
+        return self.expired + self.over_query_cap + self.over_total_cap
+
+    @property
+    def kept(self) -> int:
+        return self.stored - self.removed
+
+
+def _timestamp(metadata: Dict[str, Any]) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(str(metadata["generation_timestamp"])).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def select_feedback_to_remove(
+        ids: Sequence[str],
+        metadatas: Sequence[Optional[Dict[str, Any]]],
+        policy: FeedbackRetentionPolicy,
+        now: Optional[float] = None) -> Tuple[List[str], FeedbackCompactionReport]:
+    """
+    Choose the generated test case chunks a retention policy removes.
+
+    Limits apply in order: chunks older than ``max_age_days`` are removed, then
+    each generation query keeps its best ``max_per_query`` chunks, then the
+    collection keeps its best ``max_count``. Chunks without a readable
+    timestamp never expire and rank as the oldest.
+
+    Args:
+        ids: Ids of the stored generated test case chunks
+        metadatas: Metadata of each chunk
+        policy: Retention limits
+        now: Current time as a POSIX timestamp (defaults to the current time)
+
+    Returns:
+        Ids to delete and a report counting them per limit
+    """
+    now = datetime.now().timestamp() if now is None else now
+    report = FeedbackCompactionReport(stored=len(ids))
+    remove: List[str] = []
+    ranked = []
+    for chunk_id, metadata in zip(ids, metadatas):
+        metadata = metadata or {}
+        created = _timestamp(metadata)
+        if policy.max_age_days and created is not None and now - created > policy.max_age_days * 86400:
+            remove.append(chunk_id)
+            report.expired += 1
+            continue
+        quality = metadata.get("quality_score")
+        rank = (float(quality) if isinstance(quality, (int, float)) else 0.0,
+                created if created is not None else float("-inf"))
+        ranked.append((rank, str(metadata.get("generation_query", "")), chunk_id))
+
+    # Best chunks first, so every cap keeps a prefix
+    ranked.sort(key=lambda item: item[0], reverse=True)
+
+    if policy.max_per_query:
+        per_query: Dict[str, int] = {}
+        kept = []
+        for item in ranked:
+            count = per_query.get(item[1], 0)
+            if count >= policy.max_per_query:
+                remove.append(item[2])
+                report.over_query_cap += 1
+            else:
+                per_query[item[1]] = count + 1
+                kept.append(item)
+        ranked = kept
+
+    if policy.max_count and len(ranked) > policy.max_count:
+        remove.extend(item[2] for item in ranked[policy.max_count:])
+        report.over_total_cap += len(ranked) - policy.max_count
+
+    return remove, report
@@ -0,0 +1,124 @@
+"""
+On-disk cache of generated test cases.
+
+A generation is fully determined by the query, the retrieved context, the
+model and the prompt template, so its result is stored under a key hashed
+from exactly those inputs: the whitespace-normalized query, the ordered
+retrieved chunk ids with a hash of each chunk's content, the provider and
+generation model, and PROMPT_TEMPLATE_VERSION. Re-running a query whose
+retrieval is unaffected by document changes is served from disk; any change
+to what retrieval returns changes the key. Entries expire after a TTL and the
+least recently used entries are evicted beyond a maximum count.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Optional, Sequence, Tuple
+
+from testteller.core.constants import DEFAULT_GENERATION_CACHE_MAX_ENTRIES, DEFAULT_GENERATION_CACHE_TTL
+from testteller.core.data_ingestion.ingest_state import get_collection_state_dir, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+GENERATION_CACHE_DIR_NAME = "generation_cache"
+
+
+def normalize_query(query: str) -> str:
+    """Collapse runs of whitespace so formatting-only differences share a cache entry."""
+    return " ".join(query.split())
+
+
+class GenerationCache:
+    """Per-collection on-disk cache of generation results, one JSON file per entry."""
+
+    def __init__(
+            self,
+            collection_name: str,
+            persist_directory: Optional[str] = None,
+            ttl_seconds: float = DEFAULT_GENERATION_CACHE_TTL,
+            max_entries: int = DEFAULT_GENERATION_CACHE_MAX_ENTRIES):
+        """
+        Initialize the cache.
+
+        Args:
+            collection_name: Name of the ChromaDB collection the context is retrieved from
+            persist_directory: ChromaDB persist directory (defaults to the configured one)
+            ttl_seconds: Seconds an entry stays valid; 0 keeps entries until evicted
+            max_entries: Most entries kept on disk; older entries are evicted least recently used first
+        """
+        self.directory = get_collection_state_dir(collection_name, persist_directory) / GENERATION_CACHE_DIR_NAME
+        self.ttl_seconds = max(0, ttl_seconds)
+        self.max_entries = max(1, max_entries)
+
+    @staticmethod
+    def make_key(
+            query: str,
+            chunks: Sequence[Tuple[str, str]],
+            provider: str,
+            model: str,
+            template_version: str) -> str:
+        """
+        Hash the inputs that determine a generation into a cache key.
+
+        Args:
+            query: Generation query
+            chunks: Retrieved (chunk id, chunk text) pairs, in retrieval order
+            provider: LLM provider
+            model: Generation model
+            template_version: Prompt template version
+
+        Returns:
+            Hex digest identifying the generation
+        """
+        payload = {
+            "query": normalize_query(query),
+            "chunks": [[chunk_id, hashlib.sha256(text.encode('utf-8')).hexdigest()] for chunk_id, text in chunks],
+            "provider": provider,
+            "model": model,
+            "template_version": template_version,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _path(self, key: str):
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached generation for a key, or None if it is missing or expired."""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable generation cache entry %s: %s", path, e)
+            return None
+
+        if self.ttl_seconds and time.time() - entry.get("created", 0) > self.ttl_seconds:
+            logger.debug("Generation cache entry %s expired", key)
+            path.unlink(missing_ok=True)
+            return None
+        # The file's modification time tracks recency for eviction
+        os.utime(path)
+        return entry.get("response")
+
+    def put(self, key: str, response: str, query: str) -> None:
+        """Store a generation and evict the least recently used entries beyond the maximum."""
+        write_json_atomic(self._path(key), {"created": time.time(), "query": query, "response": response})
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for path in entries[:max(0, len(entries) - self.max_entries)]:
+            path.unlink(missing_ok=True)
+            logger.debug("Evicted generation cache entry %s", path.stem)
+
+    def clear(self) -> int:
+        """Delete all entries; returns how many were removed."""
+        removed = 0
+        for path in self.directory.glob("*.json"):
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
@@ -3,17 +3,41 @@ TestTellerAgent implementation for test case generation.
 """
 import asyncio
 import logging
+import copy
 import os
-from typing import List, Dict, Any, Optional
+import time
+from typing import Awaitable, Callable, Iterable, List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import re
+import numpy as np
 from testteller.config import settings
 from testteller.core.llm.llm_manager import LLMManager
-from testteller.core.vector_store.chromadb_manager import ChromaDBManager
+from testteller.core.vector_store.base import VectorStore, create_vector_store
 from testteller.core.data_ingestion.document_loader import DocumentLoader
 from testteller.core.data_ingestion.code_loader import CodeLoader
+from testteller.core.data_ingestion.file_watcher import DirectoryWatcher, WatchBatch
+from testteller.core.data_ingestion.ingest_planner import DryRunVectorStore, IngestPlan
+from testteller.core.data_ingestion.ingest_state import (
+    IngestJournal, IngestRun, IngestStateStore, content_fingerprint, file_fingerprint
+)
+from testteller.core.data_ingestion.near_duplicates import (
+    NearDuplicateIndex, NearDuplicateStats, hamming_distances, simhash_signatures, word_jaccard_matrix
+)
 from testteller.core.data_ingestion.unified_document_parser import UnifiedDocumentParser, ParseMode
-from testteller.generator_agent.prompts import TEST_CASE_GENERATION_PROMPT_TEMPLATE, get_test_case_generation_prompt
+from testteller.core.constants import (
+    DEFAULT_CHUNKING_MODE, DEFAULT_NEAR_DUPLICATE_DETECTION, DEFAULT_NEAR_DUPLICATE_MAX_DISTANCE,
+    DEFAULT_STREAMING_BATCH_SIZE, DEFAULT_XLSX_ROWS_PER_CHUNK,
+    DEFAULT_GENERATION_CACHE, DEFAULT_GENERATION_CACHE_TTL, DEFAULT_GENERATION_CACHE_MAX_ENTRIES,
+    DEFAULT_GENERATION_CONCURRENCY, FEEDBACK_AUTO_COMPACT
+)
+from testteller.generator_agent.prompts import (
+    PROMPT_TEMPLATE_VERSION, TEST_CASE_GENERATION_PROMPT_TEMPLATE, get_test_case_generation_prompt
+)
+from .bulk_generation import BulkGenerationReport, GenerationResult
+from .feedback_retention import (
+    GENERATED_TEST_CASE_FILTER, FeedbackCompactionReport, FeedbackRetentionPolicy, select_feedback_to_remove
+)
+from .generation_cache import GenerationCache, normalize_query
 import hashlib
 
 logger = logging.getLogger(__name__)
@@ -26,10 +50,19 @@ class TestTellerAgent:
     """Agent for generating test cases using RAG approach."""
     __test__ = False  # Tell pytest this is not a test class
 
+    # Formats ingested as a stream of chunks rather than a single parsed document
+    STREAMED_EXTENSIONS = ('.pdf', '.xlsx')
+    # Generated test cases whose word overlap with a stored one exceeds this are not stored again
+    DUPLICATE_TEST_CASE_SIMILARITY = 0.8
+    DUPLICATE_CANDIDATES_PER_TEST_CASE = 3
+    # Formats picked up when ingesting a directory
+    DOCUMENT_EXTENSIONS = {'.md', '.txt', '.pdf', '.docx', '.xlsx', '.py', '.js', '.java', '.html', '.css', '.json', '.yaml', '.log'}
+
     def __init__(
         self,
         collection_name: Optional[str] = None,
-        llm_manager: Optional[LLMManager] = None
+        llm_manager: Optional[LLMManager] = None,
+        vector_store: Optional[VectorStore] = None
     ):
         """
         Initialize the TestTellerAgent.
@@ -37,19 +70,37 @@ class TestTellerAgent:
         Args:
             collection_name: Name of the ChromaDB collection (optional)
             llm_manager: Instance of LLMManager (optional)
+            vector_store: Vector store to use instead of the configured one for the collection (optional).
+                Given without an llm_manager, no LLM client is created and the agent can
+                only ingest, e.g. into a DryRunVectorStore for plan_document_ingestion
         """
         self.collection_name = collection_name or self._get_collection_name()
-        self.llm_manager = llm_manager or LLMManager()
-        self.vector_store = ChromaDBManager(
+        self.llm_manager = llm_manager or (None if vector_store is not None else LLMManager())
+        self.vector_store = vector_store or create_vector_store(
             llm_manager=self.llm_manager,
             collection_name=self.collection_name
         )
         self.document_loader = DocumentLoader()
         self.code_loader = CodeLoader()
         self.unified_parser = UnifiedDocumentParser()
+        self.ingest_state = IngestStateStore(self.collection_name)
+        self.ingest_journal = IngestJournal(self.collection_name)
+        self.chunking_mode = self._get_chunking_mode()
+        self.near_duplicate_detection, max_distance = self._get_near_duplicate_settings()
+        self.near_duplicate_index = NearDuplicateIndex(self.collection_name, max_distance=max_distance)
+        # Savings of the most recent ingestion (reset by each ingest call)
+        self.near_duplicate_stats = NearDuplicateStats()
+        # Journal-backed progress of the ingestion in flight (kept afterwards for reporting)
+        self.ingest_run: Optional[IngestRun] = None
+        self.generation_cache_enabled, cache_ttl, cache_max_entries = self._get_generation_cache_settings()
+        self.generation_cache = GenerationCache(
+            self.collection_name, ttl_seconds=cache_ttl, max_entries=cache_max_entries)
+        # Whether the most recent generate_test_cases call was served from the generation cache
+        self.last_generation_cached = False
+        self.feedback_retention, self.feedback_auto_compact = self._get_feedback_retention_settings()
         logger.info(
             "Initialized TestTellerAgent with collection '%s' and LLM provider '%s'",
-            self.collection_name, self.llm_manager.provider)
+            self.collection_name, self.llm_manager.provider if self.llm_manager else None)
 
     def _get_collection_name(self) -> str:
         """Get collection name from settings or use default."""
@@ -60,34 +111,286 @@ class TestTellerAgent:
             logger.debug("Could not get collection name from settings: %s", e)
         return DEFAULT_COLLECTION_NAME
 
-    async def ingest_documents_from_path(self, path: str, enhanced_parsing: bool = True, chunk_size: int = 1000) -> None:
+    def _get_chunking_mode(self) -> str:
+        """Get the document chunking mode from settings or use default."""
+        try:
+            if settings and settings.processing:
+                return settings.processing.__dict__.get('chunking_mode', DEFAULT_CHUNKING_MODE)
+        except Exception as e:
+            logger.debug("Could not get chunking mode from settings: %s", e)
+        return DEFAULT_CHUNKING_MODE
+
+    def _get_near_duplicate_settings(self) -> Tuple[bool, int]:
+        """Get whether near-duplicate detection is enabled, and its distance threshold, from settings."""
+        try:
+            if settings and settings.processing:
+                processing_dict = settings.processing.__dict__
+                return (processing_dict.get('near_duplicate_detection', DEFAULT_NEAR_DUPLICATE_DETECTION),
+                        processing_dict.get('near_duplicate_max_distance', DEFAULT_NEAR_DUPLICATE_MAX_DISTANCE))
+        except Exception as e:
+            logger.debug("Could not get near-duplicate settings: %s", e)
+        return DEFAULT_NEAR_DUPLICATE_DETECTION, DEFAULT_NEAR_DUPLICATE_MAX_DISTANCE
+
+    def _get_generation_cache_settings(self) -> Tuple[bool, float, int]:
+        """Get whether the generation cache is enabled, its TTL and its maximum size from settings."""
+        try:
+            if settings and settings.output:
+                output_dict = settings.output.__dict__
+                return (output_dict.get('generation_cache', DEFAULT_GENERATION_CACHE),
+                        output_dict.get('generation_cache_ttl', DEFAULT_GENERATION_CACHE_TTL),
+                        output_dict.get('generation_cache_max_entries', DEFAULT_GENERATION_CACHE_MAX_ENTRIES))
+        except Exception as e:
+            logger.debug("Could not get generation cache settings: %s", e)
+        return DEFAULT_GENERATION_CACHE, DEFAULT_GENERATION_CACHE_TTL, DEFAULT_GENERATION_CACHE_MAX_ENTRIES
+
+    def _get_feedback_retention_settings(self) -> Tuple[FeedbackRetentionPolicy, bool]:
+        """Get the generated test case retention policy and whether it is enforced after every write."""
+        policy = FeedbackRetentionPolicy()
+        try:
+            if settings and settings.output:
+                output_dict = settings.output.__dict__
+                policy = FeedbackRetentionPolicy(
+                    max_count=output_dict.get('max_generated_tests_to_store', policy.max_count),
+                    max_age_days=output_dict.get('generated_test_retention_days', policy.max_age_days),
+                    max_per_query=output_dict.get('max_generated_tests_per_query', policy.max_per_query))
+                return policy, output_dict.get('feedback_auto_compact', FEEDBACK_AUTO_COMPACT)
+        except Exception as e:
+            logger.debug("Could not get feedback retention settings: %s", e)
+        return policy, FEEDBACK_AUTO_COMPACT
+
+    def _start_near_duplicate_tracking(self, dedup: Optional[bool]) -> None:
+        if dedup is not None:
+            self.near_duplicate_detection = dedup
+        self.near_duplicate_stats = NearDuplicateStats()
+
+    def _save_near_duplicate_index(self) -> None:
+        try:
+            self.near_duplicate_index.save()
+        except OSError as e:
+            logger.warning("Could not save near-duplicate index: %s", e)
+
+    async def ingest_documents_from_path(
+            self, path: str, enhanced_parsing: bool = True, chunk_size: int = 1000, resume: bool = False,
+            chunking_mode: Optional[str] = None, dedup: Optional[bool] = None) -> None:
         """
         Ingest documents from a file or directory with enhanced parsing.
-        
+
+        Progress is journaled per file and per streamed chunk batch. With
+        ``resume``, files stored by an interrupted run of the same path are
+        skipped and partially stored PDFs/workbooks continue after their last
+        stored batch; ``self.ingest_run`` reports what was skipped.
+
+        In "content" chunking mode chunk ids are hashes of chunk text, so
+        re-ingesting an edited document only embeds the chunks the edit
+        changed and then removes the document's chunks that no longer exist.
+
         Args:
             path: File or directory path
             enhanced_parsing: Use unified parser for enhanced metadata and chunking
             chunk_size: Size of text chunks for better retrieval
+            resume: Continue an interrupted ingestion of the same path
+            chunking_mode: "fixed" or "content" (defaults to CHUNKING_MODE); also used by later watch cycles
+            dedup: Skip near-duplicates of stored chunks (defaults to NEAR_DUPLICATE_DETECTION);
+                also used by later watch cycles. ``self.near_duplicate_stats`` reports the savings
         """
         try:
+            if chunking_mode:
+                self.chunking_mode = chunking_mode
+            self._start_near_duplicate_tracking(dedup)
+            if not os.path.exists(path):
+                raise ValueError(f"Path not found: {path}")
+            self.ingest_run = self.ingest_journal.start_run(f"docs:{os.path.abspath(path)}", resume)
             if os.path.isfile(path):
                 await self._ingest_single_document(path, enhanced_parsing, chunk_size)
-            elif os.path.isdir(path):
-                await self._ingest_directory(path, enhanced_parsing, chunk_size)
             else:
-                raise ValueError(f"Path not found: {path}")
-            
+                await self._ingest_directory(path, enhanced_parsing, chunk_size)
+            self.ingest_run.complete()
+
             logger.info("Ingested documents from path: %s", path)
         except Exception as e:
             logger.error("Error ingesting documents: %s", e)
             raise
-    
+        finally:
+            self._save_near_duplicate_index()
+
+    async def plan_document_ingestion(
+            self, path: str, enhanced_parsing: bool = True, chunk_size: int = 1000,
+            chunking_mode: Optional[str] = None, dedup: Optional[bool] = None,
+            provider: Optional[str] = None) -> IngestPlan:
+        """
+        Dry-run a document ingestion and estimate its cost, without embedding or storing anything.
+
+        Documents go through the same loading, parsing, chunking and
+        near-duplicate code as ingest_documents_from_path, but into a
+        DryRunVectorStore. Chunks already in the collection (checked read-only)
+        or repeated within the run count as unchanged. The journal and the
+        near-duplicate index on disk are left untouched.
+
+        Args:
+            path: File or directory path
+            enhanced_parsing: Use unified parser for enhanced metadata and chunking
+            chunk_size: Size of text chunks for better retrieval
+            chunking_mode: "fixed" or "content" (defaults to CHUNKING_MODE)
+            dedup: Skip near-duplicates of stored chunks (defaults to NEAR_DUPLICATE_DETECTION)
+            provider: LLM provider to estimate for (defaults to the configured one)
+
+        Returns:
+            Projected chunks, tokens, provider calls, wall time and cost
+        """
+        if not os.path.exists(path):
+            raise ValueError(f"Path not found: {path}")
+        if chunking_mode:
+            self.chunking_mode = chunking_mode
+        self._start_near_duplicate_tracking(dedup)
+        if os.path.isfile(path):
+            file_paths = [path]
+        else:
+            file_paths = await asyncio.to_thread(
+                lambda: list(DocumentLoader.iter_directory_files(path, self.DOCUMENT_EXTENSIONS)))
+
+        store = DryRunVectorStore(getattr(self.vector_store, 'collection', None))
+        vector_store, near_duplicate_index = self.vector_store, self.near_duplicate_index
+        # Scratch copy so signatures recorded by the dry run are never saved
+        self.vector_store, self.near_duplicate_index = store, copy.deepcopy(near_duplicate_index)
+        self.ingest_run = None
+        started = time.perf_counter()
+        try:
+            if os.path.isfile(path):
+                await self._ingest_document(path, enhanced_parsing, chunk_size)
+            elif file_paths:
+                await self._ingest_files(file_paths, enhanced_parsing, chunk_size, path)
+        finally:
+            self.vector_store, self.near_duplicate_index = vector_store, near_duplicate_index
+
+        return IngestPlan.from_dry_run(
+            store,
+            provider or (self.llm_manager.provider if self.llm_manager else LLMManager.resolve_provider()),
+            file_paths,
+            near_duplicate_chunks=self.near_duplicate_stats.skipped if self.near_duplicate_detection else 0,
+            parse_seconds=time.perf_counter() - started)
+
+    def _run_fingerprint(self, file_path: str) -> Optional[str]:
+        """Fingerprint of a document for the journal, or None when no run is being journaled."""
+        return file_fingerprint(file_path) if self.ingest_run else None
+
+    @property
+    def _content_chunking(self) -> bool:
+        return self.chunking_mode == "content"
+
+    def _chunking_kwargs(self) -> Dict[str, Any]:
+        """Parser arguments selecting the chunking mode (empty for the default fixed mode)."""
+        return {"chunking_mode": self.chunking_mode} if self._content_chunking else {}
+
+    def _chunk_id(self, file_path: str, text: str, index: Optional[int] = None) -> str:
+        """
+        Id of a stored chunk (or of a whole document when ``index`` is None).
+
+        Fixed mode ids are positional. Content mode ids hash the chunk text, so
+        a chunk keeps its id (and its embedding) wherever it moves in the document.
+        """
+        if self._content_chunking:
+            key = f"doc:{file_path}:{content_fingerprint(text)}"
+        elif index is None:
+            key = f"doc:{file_path}"
+        else:
+            key = f"doc:{file_path}:chunk:{index}"
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _drop_near_duplicates(self, contents: List[str], metadatas: List[Dict[str, Any]], ids: List[str]):
+        """
+        Remove chunks that are near-duplicates of stored chunks or of earlier chunks in the batch.
+
+        Chunks whose own id is already stored are left for upsert_documents,
+        which re-embeds them only if their text changed. Index entries for chunks that have since been deleted from the
+        collection are dropped rather than treated as duplicates.
+
+        Returns:
+            Tuple of the remaining contents, metadatas, ids and their signatures
+        """
+        signatures = simhash_signatures(contents)
+        candidates = [self.near_duplicate_index.find(int(signature), exclude_id=chunk_id) if signature else []
+                      for signature, chunk_id in zip(signatures, ids)]
+        lookup = set(ids).union(*candidates)
+        stored = self.vector_store.get_existing_ids(list(lookup)) if lookup else set()
+        self.near_duplicate_index.remove(
+            {candidate for matches in candidates for candidate in matches} - stored)
+
+        keep = []
+        signed_keep = []  # Kept chunks that are new and have a signature, for matching within the batch
+        for i, signature in enumerate(signatures):
+            if not signature or ids[i] in stored:
+                keep.append(i)
+                continue
+            self.near_duplicate_stats.checked += 1
+            duplicate_of = next((c for c in candidates[i] if c in stored), None)
+            if duplicate_of is None and signed_keep:
+                distances = hamming_distances(int(signature), signatures[signed_keep])
+                nearest = int(distances.argmin())
+                if distances[nearest] <= self.near_duplicate_index.max_distance:
+                    duplicate_of = ids[signed_keep[nearest]]
+            if duplicate_of is None:
+                keep.append(i)
+                signed_keep.append(i)
+                continue
+            self.near_duplicate_stats.skipped += 1
+            self.near_duplicate_stats.skipped_chars += len(contents[i])
+            logger.debug("Skipping chunk %s of %s: near-duplicate of %s",
+                         ids[i], metadatas[i].get("source"), duplicate_of)
+
+        return ([contents[i] for i in keep], [metadatas[i] for i in keep],
+                [ids[i] for i in keep], signatures[keep])
+
+    async def _store_chunks(self, contents: List[str], metadatas: List[Dict[str, Any]], ids: List[str]) -> None:
+        """
+        Upsert chunks into the vector store.
+
+        Chunks whose id is stored with the same text are not re-embedded, only
+        their metadata is refreshed; stored chunks whose text changed (e.g.
+        positional fixed mode ids of an edited document) are replaced. With
+        near-duplicate detection, near-duplicates of stored chunks are not
+        embedded and the signatures of stored chunks are indexed.
+        """
+        signatures = None
+        if self.near_duplicate_detection and contents:
+            contents, metadatas, ids, signatures = await asyncio.to_thread(
+                self._drop_near_duplicates, contents, metadatas, ids)
+            if not contents:
+                return
+        await asyncio.to_thread(self.vector_store.upsert_documents, contents, metadatas, ids)
+        if signatures is not None:
+            self.near_duplicate_index.add(signatures, ids)
+
+    async def _prune_stale_chunks(self, file_path: str, ids: List[str]) -> None:
+        """Remove a document's chunks that its latest version no longer produces."""
+        await asyncio.to_thread(self.vector_store.prune_source, file_path, ids)
+
     async def _ingest_single_document(self, file_path: str, enhanced_parsing: bool, chunk_size: int) -> None:
+        """Ingest a single document, skipping it if an interrupted run already stored it."""
+        fingerprint = self._run_fingerprint(file_path)
+        if fingerprint and self.ingest_run.is_completed(file_path, fingerprint):
+            logger.info("Skipping already ingested document: %s", file_path)
+            return
+        await self._ingest_document(file_path, enhanced_parsing, chunk_size)
+        if fingerprint:
+            self.ingest_run.record_file(file_path, fingerprint)
+
+    async def _ingest_document(self, file_path: str, enhanced_parsing: bool, chunk_size: int) -> None:
         """Ingest a single document with optional enhanced parsing."""
-        if enhanced_parsing:
+        extension = os.path.splitext(file_path)[1].lower()
+        if enhanced_parsing and extension in self.STREAMED_EXTENSIONS:
+            # Stream large formats so whole documents never sit in memory
+            try:
+                if extension == '.pdf':
+                    await self._ingest_pdf_streaming(file_path, chunk_size)
+                else:
+                    await self._ingest_xlsx_streaming(file_path)
+            except Exception as e:
+                logger.warning("Streaming ingestion failed for %s, falling back to basic parsing: %s", file_path, e)
+                await self._ingest_document_fallback(file_path)
+        elif enhanced_parsing:
             # Use unified parser for enhanced ingestion
             try:
-                parsed_doc = await self.unified_parser.parse_for_rag(file_path, chunk_size)
+                parsed_doc = await self.unified_parser.parse_for_rag(file_path, chunk_size, **self._chunking_kwargs())
                 
                 if parsed_doc.chunks:
                     # Ingest document chunks with rich metadata
@@ -115,11 +418,11 @@ class TestTellerAgent:
                         metadatas.append(metadata)
                         
                         # Generate unique ID for each chunk
-                        chunk_id = hashlib.sha256(f"doc:{file_path}:chunk:{i}".encode()).hexdigest()
-                        ids.append(chunk_id)
+                        ids.append(self._chunk_id(file_path, chunk, i))
                     
                     # Add to vector store (run in thread pool to avoid blocking)
-                    await asyncio.to_thread(self.vector_store.add_documents, contents, metadatas, ids)
+                    await self._store_chunks(contents, metadatas, ids)
+                    await self._prune_stale_chunks(file_path, ids)
                     
                     logger.info(
                         "Enhanced ingestion: %s (%d chunks, %s, %d words)",
@@ -137,66 +440,234 @@ class TestTellerAgent:
             # Use basic document loader
             await self._ingest_document_fallback(file_path)
     
+    async def _ingest_pdf_streaming(self, file_path: str, chunk_size: int) -> int:
+        """Ingest a PDF by streaming page windows through the chunker, with page metadata."""
+        async def chunks():
+            async for chunk in self.unified_parser.stream_pdf_chunks(
+                    file_path, chunk_size, **self._chunking_kwargs()):
+                yield chunk.text, {"page_start": chunk.page_start, "page_end": chunk.page_end}
+
+        return await self._ingest_chunk_stream(file_path, ".pdf", chunks())
+
+    async def _ingest_xlsx_streaming(self, file_path: str) -> int:
+        """Ingest a workbook as row batches, with sheet and row-range metadata."""
+        async def chunks():
+            async for chunk in self.unified_parser.stream_xlsx_chunks(file_path, self._get_xlsx_rows_per_chunk()):
+                yield chunk.text, {"sheet": chunk.sheet, "row_start": chunk.row_start, "row_end": chunk.row_end}
+
+        return await self._ingest_chunk_stream(file_path, ".xlsx", chunks())
+
+    def _get_xlsx_rows_per_chunk(self) -> int:
+        """Get spreadsheet rows per chunk from settings or use default."""
+        try:
+            if settings and settings.processing:
+                return settings.processing.__dict__.get('xlsx_rows_per_chunk', DEFAULT_XLSX_ROWS_PER_CHUNK)
+        except Exception as e:
+            logger.debug("Could not get XLSX rows per chunk from settings: %s", e)
+        return DEFAULT_XLSX_ROWS_PER_CHUNK
+
+    async def _ingest_chunk_stream(self, file_path: str, file_type: str, chunks) -> int:
+        """
+        Write a stream of (text, location metadata) chunks to the vector store in batches.
+
+        Args:
+            file_path: Source document path
+            file_type: Document extension recorded in metadata
+            chunks: Async iterable of (chunk text, extra metadata) tuples
+
+        Returns:
+            Number of chunks ingested
+        """
+        title = os.path.splitext(os.path.basename(file_path))[0]
+        document_type = None
+        contents, metadatas, ids = [], [], []
+        # Ids of every chunk of the document, including resumed ones, for pruning in content mode
+        all_ids = []
+        chunk_count = 0
+        fingerprint = self._run_fingerprint(file_path)
+        # Chunks an interrupted run already stored are re-chunked but not re-embedded
+        resume_offset = self.ingest_run.resume_offset(file_path, fingerprint) if fingerprint else 0
+        if resume_offset:
+            logger.info("Resuming %s after %d stored chunks", file_path, resume_offset)
+
+        async def flush() -> None:
+            if contents:
+                await self._store_chunks(list(contents), list(metadatas), list(ids))
+                contents.clear()
+                metadatas.clear()
+                ids.clear()
+                if fingerprint:
+                    self.ingest_run.record_batch(file_path, fingerprint, chunk_count)
+
+        async for text, location in chunks:
+            if document_type is None:
+                # Classify from the opening chunk, as metadata extraction does for text files
+                document_type = self.unified_parser._detect_document_type(text).value
+            chunk_id = self._chunk_id(file_path, text, chunk_count)
+            all_ids.append(chunk_id)
+            if chunk_count < resume_offset:
+                chunk_count += 1
+                continue
+
+            contents.append(text)
+            metadatas.append({
+                "source": file_path,
+                "type": "document",
+                "document_type": document_type,
+                "title": title,
+                "chunk_index": chunk_count,
+                "word_count": len(text.split()),
+                "file_type": file_type,
+                **location
+            })
+            ids.append(chunk_id)
+            chunk_count += 1
+
+            if len(contents) >= DEFAULT_STREAMING_BATCH_SIZE:
+                await flush()
+
+        await flush()
+
+        if not chunk_count:
+            raise ValueError(f"No text extracted from: {file_path}")
+        await self._prune_stale_chunks(file_path, all_ids)
+
+        logger.info("Streaming ingestion: %s (%d chunks)", file_path, chunk_count)
+        return chunk_count
+
     async def _ingest_document_fallback(self, file_path: str) -> None:
         """Fallback document ingestion using basic document loader."""
         content = await self.document_loader.load_document(file_path)
         if content:
             # Generate unique ID for the document
-            doc_id = hashlib.sha256(f"doc:{file_path}".encode()).hexdigest()
+            doc_id = self._chunk_id(file_path, content)
             # Add to vector store (run in thread pool to avoid blocking)
-            await asyncio.to_thread(
-                self.vector_store.add_documents,
-                [content],
-                [{"source": file_path, "type": "document"}],
-                [doc_id]
-            )
+            await self._store_chunks([content], [{"source": file_path, "type": "document"}], [doc_id])
+            await self._prune_stale_chunks(file_path, [doc_id])
         else:
             logger.warning("No content loaded from document: %s", file_path)
+            # A document emptied since the last run must not keep its old chunks
+            await asyncio.to_thread(self.vector_store.delete_by_source, file_path)
     
     async def _ingest_directory(self, dir_path: str, enhanced_parsing: bool, chunk_size: int) -> None:
-        """Ingest all documents from a directory."""
-        from pathlib import Path
-        
-        supported_extensions = {'.md', '.txt', '.pdf', '.docx', '.xlsx', '.py', '.js', '.java', '.html', '.css', '.json', '.yaml', '.log'}
-        
-        dir_path_obj = Path(dir_path)
-        file_paths = []
-        
-        # Collect all supported files
-        for file_path in dir_path_obj.rglob('*'):
-            if file_path.is_file() and file_path.suffix.lower() in supported_extensions:
-                file_paths.append(str(file_path))
-        
-        if not file_paths:
+        """Ingest all documents from a directory, as they are found by a lazy directory walk."""
+        file_paths = DocumentLoader.iter_directory_files(dir_path, self.DOCUMENT_EXTENSIONS)
+        if self.ingest_run and self.ingest_run.resumed:
+            file_paths = (p for p in file_paths if not self.ingest_run.is_completed(p, file_fingerprint(p)))
+
+        ingested = await self._ingest_files(file_paths, enhanced_parsing, chunk_size, dir_path)
+
+        skipped = len(self.ingest_run.skipped_files) if self.ingest_run else 0
+        if skipped:
+            logger.info("Skipped %d documents already ingested by the interrupted run", skipped)
+        elif not ingested:
             logger.warning("No supported documents found in directory: %s", dir_path)
-            return
-        
-        # Process files with enhanced parsing if requested
-        if enhanced_parsing:
-            # Use batch processing for efficiency
+
+    async def _ingest_files(
+            self, file_paths: Iterable[str], enhanced_parsing: bool, chunk_size: int, label: str) -> int:
+        """
+        Ingest documents, storing each as soon as it is parsed.
+
+        Args:
+            file_paths: Documents to ingest; may be a lazy iterator, which is consumed once
+            enhanced_parsing: Use the unified parser instead of the basic document loader
+            chunk_size: Size of text chunks
+            label: Names the documents' origin in log messages
+
+        Returns:
+            Number of documents ingested
+        """
+        if not enhanced_parsing:
+            # Use basic document loader for all files
+            return await self._ingest_directory_fallback(file_paths)
+
+        # PDFs and workbooks are streamed individually once the other documents are stored;
+        # only their paths are held until then
+        streamed_paths = []
+
+        def parsed_paths():
+            for file_path in file_paths:
+                if os.path.splitext(file_path)[1].lower() in self.STREAMED_EXTENSIONS:
+                    streamed_paths.append(file_path)
+                else:
+                    yield file_path
+
+        ingested = 0
+        async for file_path, parsed_doc in self.unified_parser.iter_parse(
+                parsed_paths(), ParseMode.RAG_INGESTION, chunk_size=chunk_size, **self._chunking_kwargs()):
+            if parsed_doc and parsed_doc.chunks:
+                try:
+                    await self._add_parsed_document_to_store(parsed_doc)
+                except Exception as e:
+                    logger.warning("Enhanced ingestion failed for %s, falling back to basic parsing: %s",
+                                   file_path, e)
+                    await self._ingest_document_fallback(file_path)
+            else:
+                # Documents that failed to parse or produced no chunks
+                await self._ingest_document_fallback(file_path)
+            if self.ingest_run:
+                self.ingest_run.record_file(file_path, file_fingerprint(file_path))
+            ingested += 1
+
+        for streamed_path in streamed_paths:
+            await self._ingest_single_document(streamed_path, enhanced_parsing, chunk_size)
+            ingested += 1
+
+        logger.info("Enhanced ingestion completed: %d documents from %s", ingested, label)
+        return ingested
+
+    async def watch_documents(
+            self,
+            dir_path: str,
+            enhanced_parsing: bool = True,
+            chunk_size: int = 1000,
+            stop_event: Optional[asyncio.Event] = None,
+            on_batch: Optional[Callable[[WatchBatch], None]] = None,
+            watcher: Optional[DirectoryWatcher] = None) -> None:
+        """
+        Keep a directory's documents in sync with the collection until stopped.
+
+        Changes are debounced and coalesced by DirectoryWatcher. Each batch is
+        one re-ingestion cycle: the chunks of deleted files are removed, then
+        the changed files are parsed together and upserted, which re-embeds
+        only their new or edited chunks; chunks a changed file no longer
+        produces (e.g. after it was shortened) are pruned once it is stored.
+
+        Args:
+            dir_path: Directory to watch; normally ingested beforehand with ingest_documents_from_path
+            enhanced_parsing: Use unified parser for enhanced metadata and chunking
+            chunk_size: Size of text chunks for better retrieval
+            stop_event: Set to stop watching (watches until cancelled otherwise)
+            on_batch: Called with each batch after it has been applied
+            watcher: Watcher to use (defaults to a DirectoryWatcher with configured settings)
+        """
+        watcher = watcher or DirectoryWatcher(dir_path)
+        # Watch cycles are not journaled; --resume applies to the initial ingestion only
+        self.ingest_run = None
+        async for batch in watcher.batches(stop_event):
             try:
-                parsed_docs = await self.unified_parser.batch_parse(
-                    file_paths, ParseMode.RAG_INGESTION, max_concurrency=3
-                )
-                
-                # Process each parsed document
-                for parsed_doc in parsed_docs:
-                    if parsed_doc and parsed_doc.chunks:
-                        await self._add_parsed_document_to_store(parsed_doc)
-                    elif parsed_doc:
-                        # Fallback for documents without chunks
-                        await self._ingest_document_fallback(parsed_doc.metadata.file_path)
-                
-                logger.info("Enhanced directory ingestion completed: %d documents from %s", 
-                           len(parsed_docs), dir_path)
-                
+                await self.reingest_documents(batch.changed, batch.deleted, enhanced_parsing, chunk_size)
             except Exception as e:
-                logger.warning("Batch enhanced parsing failed for directory %s, falling back: %s", dir_path, e)
-                await self._ingest_directory_fallback(file_paths)
-        else:
-            # Use basic document loader for all files
-            await self._ingest_directory_fallback(file_paths)
-    
+                # A failed cycle (e.g. provider outage) must not end the watch; the next edit retries
+                logger.error("Re-ingestion of %d changed documents failed: %s", len(batch.changed), e)
+                continue
+            if on_batch:
+                on_batch(batch)
+
+    async def reingest_documents(
+            self, changed: List[str], deleted: List[str], enhanced_parsing: bool = True, chunk_size: int = 1000) -> None:
+        """Replace the chunks of changed documents and drop the chunks of deleted ones."""
+        # Changed documents are upserted, re-embedding only changed chunks; their stale ones are pruned after storing
+        if deleted:
+            removed = await asyncio.to_thread(
+                self.vector_store.delete_where, {"source": {"$in": list(deleted)}})
+            logger.debug("Removed %d chunks of deleted documents", removed)
+        if changed:
+            await self._ingest_files(list(changed), enhanced_parsing, chunk_size, "watched changes")
+            self._save_near_duplicate_index()
+        logger.info("Re-ingested %d changed documents and removed %d deleted documents",
+                    len(changed), len(deleted))
+
     async def _add_parsed_document_to_store(self, parsed_doc) -> None:
         """Add a parsed document to the vector store."""
         contents = parsed_doc.chunks
@@ -220,65 +691,181 @@ class TestTellerAgent:
             
             metadatas.append(metadata)
             
-            chunk_id = hashlib.sha256(f"doc:{parsed_doc.metadata.file_path}:chunk:{i}".encode()).hexdigest()
-            ids.append(chunk_id)
+            ids.append(self._chunk_id(parsed_doc.metadata.file_path, chunk, i))
         
-        await asyncio.to_thread(self.vector_store.add_documents, contents, metadatas, ids)
+        await self._store_chunks(contents, metadatas, ids)
+        await self._prune_stale_chunks(parsed_doc.metadata.file_path, ids)
     
-    async def _ingest_directory_fallback(self, file_paths: List[str]) -> None:
-        """Fallback directory ingestion using basic document loader."""
+    async def _ingest_directory_fallback(self, file_paths: Iterable[str]) -> int:
+        """
+        Fallback directory ingestion using basic document loader, storing documents as they load.
+
+        Returns:
+            Number of documents ingested
+        """
         docs = []
-        for file_path in file_paths:
-            try:
-                content = await self.document_loader.load_document(file_path)
-                if content:
-                    docs.append((content, file_path))
-            except Exception as e:
-                logger.warning("Failed to load document %s: %s", file_path, e)
-        
-        if docs:
-            contents, paths = zip(*docs)
-            ids = [hashlib.sha256(f"doc:{p}".encode()).hexdigest() for p in paths]
-            await asyncio.to_thread(
-                self.vector_store.add_documents,
-                list(contents),
-                [{"source": p, "type": "document"} for p in paths],
-                ids
-            )
+        ingested = 0
+
+        async def flush():
+            if docs:
+                paths, contents = zip(*docs)
+                ids = [self._chunk_id(p, c) for p, c in docs]
+                await self._store_chunks(list(contents), [{"source": p, "type": "document"} for p in paths], ids)
+                for file_path, doc_id in zip(paths, ids):
+                    await self._prune_stale_chunks(file_path, [doc_id])
+                if self.ingest_run:
+                    for file_path in paths:
+                        self.ingest_run.record_file(file_path, file_fingerprint(file_path))
+                docs.clear()
+
+        async for file_path, content in self.document_loader.iter_documents(file_paths):
+            docs.append((file_path, content))
+            ingested += 1
+            if len(docs) >= DEFAULT_STREAMING_BATCH_SIZE:
+                await flush()
+        await flush()
+        return ingested
+
+    async def ingest_code_from_source(
+            self, source_path: str, cleanup_github_after: bool = False, resume: bool = False,
+            dedup: Optional[bool] = None) -> None:
+        """
+        Ingest code from GitHub repository or local folder.
 
-    async def ingest_code_from_source(self, source_path: str, cleanup_github_after: bool = True) -> None:
-        """Ingest code from GitHub repository or local folder."""
+        Remote repositories are ingested incrementally: the commit ingested last
+        is recorded per collection, and later runs only embed files added or
+        modified since then and delete chunks for files that were removed.
+        Clones stay in the persistent clone cache so those runs only pull new
+        commits; ``cleanup_github_after`` deletes the clone instead.
+        Code files are stored and journaled in batches; with ``resume``, files
+        an interrupted run already stored with the same content are skipped.
+        With ``dedup``, files that are near-duplicates of stored content (e.g.
+        vendored copies) are not embedded again.
+        """
         try:
-            is_remote = "://" in source_path or source_path.startswith("git@")
+            self._start_near_duplicate_tracking(dedup)
+            is_remote = CodeLoader.is_repository_source(source_path)
+            source_key = source_path if is_remote else os.path.abspath(source_path)
+            self.ingest_run = self.ingest_journal.start_run(f"code:{source_key}", resume)
+            commit = None
+            loaded_sources = set()
             if is_remote:
-                code_files = await self.code_loader.load_code_from_repo(source_path)
+                code_files = None
+                code_state = self.ingest_state.get_code_state(source_path)
+                if code_state and code_state.get("commit"):
+                    changes = await self.code_loader.load_code_changes_from_repo(
+                        source_path, code_state["commit"])
+                    if changes is not None:
+                        await self._apply_code_changes(source_path, changes)
+                        commit = changes.commit
+                if commit is None:
+                    loaded_sources = await self._stream_code_files(
+                        source_path, self.code_loader.iter_code_from_repo(source_path))
+                    commit = await self.code_loader.get_repo_commit(source_path)
+                    # A full reload has no diff to delete from: drop chunks of files no longer in the tree.
+                    # An empty read (e.g. a failed clone or pull) proves nothing, so nothing is pruned then.
+                    if loaded_sources:
+                        await self._prune_missing_code_files(source_path, loaded_sources)
                 if cleanup_github_after:
                     await self.code_loader.cleanup_repo(source_path)
             else:
-                code_files = await self.code_loader.load_code_from_local_folder(source_path)
-
-            if code_files:
-                contents, paths = zip(*code_files)
-                # Generate unique IDs based on source path and file path
-                ids = [
-                    hashlib.sha256(
-                        f"{source_path}:{str(p)}".encode()).hexdigest()
-                    for p in paths
-                ]
-                # Add to vector store (run in thread pool to avoid blocking)
-                await asyncio.to_thread(
-                    self.vector_store.add_documents,
-                    list(contents),
-                    [{"source": p, "type": "code"} for p in paths],
-                    ids
-                )
+                loaded_sources = await self._stream_code_files(
+                    source_path, self.code_loader.iter_code_from_local_folder(source_path))
+
+            if loaded_sources:
                 logger.info("Ingested code from source: %s", source_path)
-            else:
+            elif commit is None:
                 logger.warning(
                     "No code files loaded from source: %s", source_path)
+
+            if commit:
+                self.ingest_state.set_code_state(source_path, commit)
+            self.ingest_run.complete()
         except Exception as e:
             logger.error("Error ingesting code: %s", e)
             raise
+        finally:
+            self._save_near_duplicate_index()
+
+    async def _stream_code_files(self, source_path: str, code_files) -> set:
+        """
+        Store code files from an async iterator in batches as they are read.
+
+        Returns:
+            The source identifiers of all files read.
+        """
+        loaded_sources = set()
+        batch = []
+        async for code_file in code_files:
+            batch.append(code_file)
+            loaded_sources.add(code_file[0])
+            if len(batch) >= DEFAULT_STREAMING_BATCH_SIZE:
+                await self._add_code_files(source_path, batch)
+                batch = []
+        if batch:
+            await self._add_code_files(source_path, batch)
+        return loaded_sources
+
+    async def _prune_missing_code_files(self, source_path: str, loaded_sources: set) -> None:
+        """Delete the code chunks of a repository whose files were not loaded by a full reload."""
+        prefix = f"{source_path}:"
+
+        def stale_ids():
+            ids = []
+            for page in self.vector_store.iter_documents(where={"type": "code"}, include=["metadatas"]):
+                for doc_id, metadata in zip(page["ids"], page["metadatas"] or []):
+                    source = (metadata or {}).get("source", "")
+                    if source.startswith(prefix) and source not in loaded_sources:
+                        ids.append(doc_id)
+            return ids
+
+        ids = await asyncio.to_thread(stale_ids)
+        if ids:
+            await asyncio.to_thread(self.vector_store.delete_ids, ids)
+            logger.info("Deleted %d code chunks of files no longer in %s", len(ids), source_path)
+
+    def _skip_completed_code_files(self, code_files):
+        """Drop code files an interrupted run already stored with identical content."""
+        if not (self.ingest_run and self.ingest_run.resumed):
+            return list(code_files)
+        remaining = [(p, c) for p, c in code_files
+                     if not self.ingest_run.is_completed(p, content_fingerprint(c))]
+        if len(remaining) < len(code_files):
+            logger.info("Skipping %d code files already ingested by the interrupted run",
+                        len(code_files) - len(remaining))
+        return remaining
+
+    async def _add_code_files(self, source_path: str, code_files) -> None:
+        """Embed and store (source identifier, content) code files as returned by CodeLoader."""
+        code_files = self._skip_completed_code_files(code_files)
+        for start in range(0, len(code_files), DEFAULT_STREAMING_BATCH_SIZE):
+            batch = code_files[start:start + DEFAULT_STREAMING_BATCH_SIZE]
+            paths, contents = zip(*batch)
+            # Generate unique IDs based on source path and file path
+            ids = [
+                hashlib.sha256(
+                    f"{source_path}:{str(p)}".encode()).hexdigest()
+                for p in paths
+            ]
+            # Add to vector store (run in thread pool to avoid blocking)
+            await self._store_chunks(list(contents), [{"source": p, "type": "code"} for p in paths], ids)
+            if self.ingest_run:
+                for path, content in batch:
+                    self.ingest_run.record_file(path, content_fingerprint(content))
+
+    async def _apply_code_changes(self, source_path: str, changes) -> None:
+        """Replace chunks for changed code files and drop chunks for deleted ones."""
+        # Files re-added by an interrupted run are already current: neither delete nor re-add them
+        changes.changed = self._skip_completed_code_files(changes.changed)
+        # Modified files keep their IDs and are upserted in place
+        if changes.deleted:
+            await asyncio.to_thread(
+                self.vector_store.delete_where, {"source": {"$in": list(changes.deleted)}})
+        if changes.changed:
+            await self._add_code_files(source_path, changes.changed)
+        logger.info(
+            "Incremental code ingestion for %s at %s: %d files updated, %d removed",
+            source_path, changes.commit[:12], len(changes.changed), len(changes.deleted))
 
     async def get_ingested_data_count(self) -> int:
         """Get count of ingested documents."""
@@ -288,6 +875,7 @@ class TestTellerAgent:
         """Clear all ingested data."""
         try:
             self.vector_store.clear_collection()
+            self.ingest_state.clear()
             await self.code_loader.cleanup_all_repos()
             logger.info("Cleared all ingested data")
         except Exception as e:
@@ -297,20 +885,29 @@ class TestTellerAgent:
     async def generate_test_cases(
         self,
         code_context: str,
-        n_retrieved_docs: int = 5
+        n_retrieved_docs: int = 5,
+        use_cache: Optional[bool] = None
     ) -> str:
         """
         Generate test cases for given code context.
 
+        When the query, the retrieved context, the model and the prompt template
+        all match an earlier generation, its result is returned from the
+        generation cache without calling the LLM (``self.last_generation_cached``
+        tells which happened).
+
         Args:
             code_context: Code to generate tests for
             n_retrieved_docs: Number of similar documents to retrieve
+            use_cache: Read and write the generation cache (defaults to the GENERATION_CACHE setting)
 
         Returns:
             Generated test cases as string
         """
         try:
             logger.info("Starting test case generation for query: '%.50s...'", code_context)
+            self.last_generation_cached = False
+            use_cache = self.generation_cache_enabled if use_cache is None else use_cache
             
             # Query similar test cases using async method to avoid blocking
             logger.debug("Querying vector store for similar documents...")
@@ -319,30 +916,149 @@ class TestTellerAgent:
                 query_text=code_context,
                 n_results=n_retrieved_docs
             )
-            similar_tests = results.get('documents', [[]])[0]
-            logger.debug("Retrieved %d similar documents from vector store", len(similar_tests))
-
-            # Get provider-optimized prompt
-            current_provider = self.llm_manager.get_current_provider()
-            logger.debug("Using LLM provider: %s", current_provider)
-            prompt = get_test_case_generation_prompt(
-                provider=current_provider,
-                context="\n\n".join(similar_tests),
-                query=code_context
-            )
-
-            # Generate test cases using LLM Manager
-            logger.debug("Sending request to LLM for test case generation...")
-            response_text = await self.llm_manager.generate_text_async(prompt)
-            logger.info("Generated test cases for code context using %s provider with optimized prompt",
-                        self.llm_manager.provider)
-            logger.debug("Test case generation completed successfully")
+            response_text, self.last_generation_cached = await self._generate_from_retrieval(
+                code_context, results, n_retrieved_docs, use_cache)
             return response_text
 
         except Exception as e:
             logger.error("Error generating test cases: %s", e)
             raise
 
+    async def _generate_from_retrieval(
+        self,
+        code_context: str,
+        results: Dict[str, Any],
+        n_retrieved_docs: int,
+        use_cache: bool
+    ) -> Tuple[str, bool]:
+        """
+        Generate test cases from already retrieved context.
+
+        Returns:
+            The generated test cases and whether they came from the generation cache
+        """
+        similar_tests = results.get('documents', [[]])[0]
+        logger.debug("Retrieved %d similar documents from vector store", len(similar_tests))
+
+        cache_key = None
+        if use_cache:
+            cache_key = await self._get_generation_cache_key(code_context, results, n_retrieved_docs)
+            cached = await asyncio.to_thread(self.generation_cache.get, cache_key)
+            if cached is not None:
+                logger.info("Returning cached test cases for query: '%.50s...'", code_context)
+                return cached, True
+
+        # Get provider-optimized prompt
+        current_provider = self.llm_manager.get_current_provider()
+        logger.debug("Using LLM provider: %s", current_provider)
+        prompt = get_test_case_generation_prompt(
+            provider=current_provider,
+            context="\n\n".join(similar_tests),
+            query=code_context
+        )
+
+        # Generate test cases using LLM Manager
+        logger.debug("Sending request to LLM for test case generation...")
+        response_text = await self.llm_manager.generate_text_async(prompt)
+        logger.info("Generated test cases for code context using %s provider with optimized prompt",
+                    self.llm_manager.provider)
+        logger.debug("Test case generation completed successfully")
+        if cache_key and response_text and response_text.strip():
+            try:
+                await asyncio.to_thread(self.generation_cache.put, cache_key, response_text, code_context)
+            except OSError as e:
+                logger.warning("Could not cache generated test cases: %s", e)
+        return response_text, False
+
+    async def generate_test_cases_bulk(
+        self,
+        queries: List[str],
+        n_retrieved_docs: int = 5,
+        concurrency: int = DEFAULT_GENERATION_CONCURRENCY,
+        use_cache: Optional[bool] = None,
+        on_result: Optional[Callable[[int, GenerationResult], Awaitable[None]]] = None
+    ) -> BulkGenerationReport:
+        """
+        Generate test cases for many queries in one run.
+
+        All query texts are embedded in one batch and retrieved with one
+        collection query, then up to ``concurrency`` generations run at once
+        (each LLM request still passes the manager's rate limiter). A failing
+        query is reported in its result and does not stop the others.
+
+        Args:
+            queries: Queries to generate test cases for
+            n_retrieved_docs: Number of similar documents to retrieve per query
+            concurrency: Most generations in flight at once
+            use_cache: Read and write the generation cache (defaults to the GENERATION_CACHE setting)
+            on_result: Coroutine called with the query index and result as each query finishes
+
+        Returns:
+            Per-query results in query order, with throughput and latency figures
+        """
+        use_cache = self.generation_cache_enabled if use_cache is None else use_cache
+        start = time.perf_counter()
+        retrievals = await asyncio.to_thread(
+            self.vector_store.query_similar_batch, query_texts=queries, n_results=n_retrieved_docs)
+        report = BulkGenerationReport(retrieval_seconds=time.perf_counter() - start)
+        logger.info("Retrieved context for %d queries in %.2fs", len(queries), report.retrieval_seconds)
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def generate_one(index: int, query: str) -> GenerationResult:
+            async with semaphore:
+                query_start = time.perf_counter()
+                try:
+                    test_cases, cached = await self._generate_from_retrieval(
+                        query, retrievals[index], n_retrieved_docs, use_cache)
+                    result = GenerationResult(query, test_cases, time.perf_counter() - query_start, cached)
+                except Exception as e:
+                    logger.error("Error generating test cases for query '%.50s...': %s", query, e)
+                    result = GenerationResult(query, seconds=time.perf_counter() - query_start, error=str(e))
+            if on_result is not None:
+                await on_result(index, result)
+            return result
+
+        report.results = await asyncio.gather(*(generate_one(i, q) for i, q in enumerate(queries)))
+        report.wall_seconds = time.perf_counter() - start
+        return report
+
+    async def _get_generation_cache_key(self, query: str, results: Dict[str, Any], n_retrieved_docs: int) -> str:
+        """
+        Build the generation cache key from the query and what retrieval returned.
+
+        Test cases stored from earlier generations of this same query (see
+        store_generated_test_cases) are derived from the cached answer itself,
+        so they are left out of the key and the remaining top results are used
+        instead; otherwise every run would feed its own output back into the key.
+        """
+        def retrieved_chunks(query_results: Dict[str, Any]) -> List[Tuple[str, str, Dict[str, Any]]]:
+            documents = (query_results.get('documents') or [[]])[0] or []
+            ids = (query_results.get('ids') or [[]])[0] or [""] * len(documents)
+            metadatas = (query_results.get('metadatas') or [[]])[0] or [{}] * len(documents)
+            return list(zip(ids, documents, [m or {} for m in metadatas]))
+
+        def is_own_output(metadata: Dict[str, Any]) -> bool:
+            return (metadata.get('type') == 'generated_test_case'
+                    and normalize_query(str(metadata.get('generation_query', ''))) == normalize_query(query))
+
+        chunks = retrieved_chunks(results)
+        own_outputs = sum(1 for _, _, metadata in chunks if is_own_output(metadata))
+        if own_outputs:
+            results = await asyncio.to_thread(
+                self.vector_store.query_similar,
+                query_text=query,
+                n_results=n_retrieved_docs + own_outputs
+            )
+            chunks = retrieved_chunks(results)
+        context = [(chunk_id, document) for chunk_id, document, metadata in chunks
+                   if not is_own_output(metadata)][:n_retrieved_docs]
+
+        client = getattr(self.llm_manager, 'client', None)
+        return GenerationCache.make_key(
+            query, context, str(self.llm_manager.provider),
+            str(getattr(client, 'generation_model', '')), PROMPT_TEMPLATE_VERSION)
+
     def add_test_cases(
         self,
         test_cases: List[str],
@@ -474,116 +1190,142 @@ class TestTellerAgent:
             
             # Parse test cases into chunks
             test_case_chunks = self._parse_test_cases(test_cases_content)
-            
-            # Check for duplicates before storing
-            stored_count = 0
-            skipped_count = 0
-            
-            for i, chunk in enumerate(test_case_chunks):
-                # Check if similar test case already exists
-                if await self._is_duplicate_test_case(chunk, query):
-                    logger.debug(f"Skipping duplicate test case chunk {i}")
-                    skipped_count += 1
-                    continue
-                
-                # Prepare metadata
+
+            # Embed all chunks in one call; the vectors serve both the duplicate
+            # lookup and the write, so nothing is embedded twice
+            embeddings = await asyncio.to_thread(self.llm_manager.get_embeddings_array, test_case_chunks)
+            if np.isnan(embeddings).any():
+                logger.warning("Skipping storage of test cases: embedding failed for some chunks")
+                return False
+
+            duplicates = await asyncio.to_thread(
+                self._find_duplicate_test_cases, test_case_chunks, embeddings, query)
+            keep = [i for i, duplicate in enumerate(duplicates) if not duplicate]
+            skipped_count = len(test_case_chunks) - len(keep)
+            for i in range(len(test_case_chunks)):
+                if duplicates[i]:
+                    logger.debug("Skipping duplicate test case chunk %d", i)
+
+            if keep:
+                generation_timestamp = datetime.now().isoformat()
                 base_metadata = {
                     "type": "generated_test_case",
                     "source": "testteller_generator",
                     "generation_query": query,
-                    "generation_timestamp": datetime.now().isoformat(),
+                    "generation_timestamp": generation_timestamp,
                     "llm_provider": self.llm_manager.provider,
                     "quality_score": quality_score,
                     "document_type": "test_cases"
                 }
-                
                 if metadata:
                     base_metadata.update(metadata)
-                
-                # Generate unique ID for this chunk
-                chunk_id = hashlib.sha256(
-                    f"generated:{query}:{i}:{datetime.now().isoformat()}".encode()
-                ).hexdigest()
-                
-                chunk_metadata = base_metadata.copy()
-                chunk_metadata["chunk_index"] = i
-                chunk_metadata["total_chunks"] = len(test_case_chunks)
-                
-                # Add to vector store (run in thread pool to avoid blocking)
+
+                chunk_metadatas = []
+                chunk_ids = []
+                for i in keep:
+                    chunk_metadata = base_metadata.copy()
+                    chunk_metadata["chunk_index"] = i
+                    chunk_metadata["total_chunks"] = len(test_case_chunks)
+                    chunk_metadatas.append(chunk_metadata)
+                    # Generate unique ID for this chunk
+                    chunk_ids.append(hashlib.sha256(
+                        f"generated:{query}:{i}:{generation_timestamp}".encode()
+                    ).hexdigest())
+
+                # Add all new chunks in one write (run in thread pool to avoid blocking)
                 await asyncio.to_thread(
                     self.vector_store.add_documents,
-                    documents=[chunk],
-                    metadatas=[chunk_metadata],
-                    ids=[chunk_id]
+                    documents=[test_case_chunks[i] for i in keep],
+                    metadatas=chunk_metadatas,
+                    ids=chunk_ids,
+                    embeddings=embeddings[keep]
                 )
-                stored_count += 1
-            
+            stored_count = len(keep)
+
             logger.info(
                 "Stored %d generated test case chunks (skipped %d duplicates, quality: %.2f)",
                 stored_count, skipped_count, quality_score
             )
+            if stored_count and self.feedback_auto_compact:
+                try:
+                    await self.compact_generated_test_cases()
+                except Exception as e:
+                    logger.warning("Could not compact generated test cases: %s", e)
             return stored_count > 0
             
         except Exception as e:
             logger.error("Error storing generated test cases: %s", e)
             return False
-    
-    async def _is_duplicate_test_case(self, test_case: str, query: str) -> bool:
+
+    async def compact_generated_test_cases(
+        self,
+        policy: Optional[FeedbackRetentionPolicy] = None,
+        dry_run: bool = False
+    ) -> FeedbackCompactionReport:
         """
-        Check if a similar test case already exists in the vector store.
-        
+        Delete stored generated test cases beyond the retention policy.
+
+        Only metadata is read, and deletions are issued in batches.
+
         Args:
-            test_case: The test case content to check
-            query: The original query used for generation
-            
+            policy: Retention limits (defaults to the configured policy)
+            dry_run: Report what would be removed without deleting anything
+
         Returns:
-            True if a very similar test case exists, False otherwise
+            Counts of stored and removed chunks per retention limit
         """
-        try:
-            # Query for similar test cases
-            results = self.vector_store.query_similar(
-                query_text=test_case[:500],  # Use first 500 chars for similarity check
-                n_results=3,
-                metadata_filter={
-                    "type": "generated_test_case",
-                    "generation_query": query  # Look for test cases from same query
-                }
-            )
-            
-            if results and results.get('documents'):
-                # Check similarity of results
-                for doc in results['documents'][0]:
-                    # Simple similarity check - if >80% of content matches, consider duplicate
-                    if self._calculate_similarity(test_case, doc) > 0.8:
-                        return True
-                        
-        except Exception as e:
-            logger.warning(f"Error checking for duplicate test cases: {e}")
-            
-        return False
-    
-    def _calculate_similarity(self, text1: str, text2: str) -> float:
+        policy = policy or self.feedback_retention
+        ids, metadatas = await asyncio.to_thread(self.vector_store.get_metadatas_where, GENERATED_TEST_CASE_FILTER)
+        remove, report = select_feedback_to_remove(ids, metadatas, policy)
+        report.dry_run = dry_run
+        if remove and not dry_run:
+            await asyncio.to_thread(self.vector_store.delete_ids, remove)
+        logger.info(
+            "Compacted generated test cases in '%s': %d stored, %d expired, %d over the per-query cap, "
+            "%d over the total cap%s",
+            self.collection_name, report.stored, report.expired, report.over_query_cap, report.over_total_cap,
+            " (dry run)" if dry_run else "")
+        return report
+
+    def _find_duplicate_test_cases(self, test_cases: List[str], embeddings: np.ndarray, query: str) -> List[bool]:
         """
-        Calculate simple similarity between two texts.
-        
+        Flag test cases that closely match one already stored for the same query or an earlier one in the batch.
+
+        Candidates are the nearest stored test cases of the same query, fetched
+        for all test cases with one filtered similarity query; word overlap with
+        every candidate is then computed as one matrix.
+
         Args:
-            text1: First text
-            text2: Second text
-            
+            test_cases: Test case chunks to check
+            embeddings: Embedding per test case chunk
+            query: The original query used for generation
+
         Returns:
-            Similarity score between 0.0 and 1.0
+            Whether each test case is a duplicate
         """
-        # Simple word-based similarity
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
-        
-        if not words1 or not words2:
-            return 0.0
-            
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-        
-        return len(intersection) / len(union) if union else 0.0
+        candidates: List[str] = []
+        try:
+            results = self.vector_store.query_by_embeddings(
+                embeddings,
+                n_results=self.DUPLICATE_CANDIDATES_PER_TEST_CASE,
+                where={"$and": [{"type": "generated_test_case"}, {"generation_query": query}]},
+                include=["documents"]
+            )
+            candidates = list(dict.fromkeys(
+                doc for docs in (results.get('documents') or []) for doc in (docs or []) if doc))
+        except Exception as e:
+            logger.warning("Error checking for duplicate test cases: %s", e)
+
+        similar = word_jaccard_matrix(test_cases, candidates + test_cases) > self.DUPLICATE_TEST_CASE_SIMILARITY
+        keep = ~similar[:, :len(candidates)].any(axis=1)
+        # later[i, j]: test case j comes after i in the batch and matches it
+        later = np.triu(similar[:, len(candidates):], k=1)
+        # Only kept test cases rule out later ones (a dropped one must not drop its own matches),
+        # so the batch is resolved greedily in order, visiting only rows that match a later test case
+        for i in np.flatnonzero(later.any(axis=1)):
+            if keep[i]:
+                keep &= ~later[i]
+        return (~keep).tolist()
 
     def close(self):
         """Clean up resources and connections."""
@@ -593,6 +1335,9 @@ class TestTellerAgent:
             # Close vector store if it has a close method
             if hasattr(self.vector_store, 'close'):
                 self.vector_store.close()
+
+            # Stop extraction worker processes started by the process backend
+            DocumentLoader.shutdown_extraction_pool()
                 
             # Clear references to help garbage collection
             if hasattr(self, 'vector_store'):
@@ -1,3 +1,7 @@
+# Version of the prompt templates below, part of every generation cache key.
+# Bump it whenever a template or provider refinement changes.
+PROMPT_TEMPLATE_VERSION = "1"
+
 TEST_CASE_GENERATION_PROMPT_TEMPLATE = """You are a senior technical QA engineer and test architect. Your mission is to produce clear, actionable, and well-structured test cases that are easy for both manual testers and automation engineers to understand and execute.
 Your task is to generate detailed test cases based on available documentation and code analysis, with a focus on both functional completeness and technical depth.
 
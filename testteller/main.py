@@ -7,18 +7,25 @@ import typer
 from typing_extensions import Annotated
 
 from .generator_agent.agent import TestTellerRagAgent
+from .generator_agent.agent.bulk_generation import read_queries_file
+from .generator_agent.agent.feedback_retention import FeedbackRetentionPolicy
 from .config import settings
 from .core.constants import (
     DEFAULT_OUTPUT_FILE, DEFAULT_COLLECTION_NAME, SUPPORTED_LLM_PROVIDERS,
     DEFAULT_CHROMA_PERSIST_DIRECTORY, SUPPORTED_TEST_OUTPUT_FORMATS,
-    DEFAULT_TEST_OUTPUT_FORMAT, DEFAULT_TEST_GENERATION_DIR, APP_SHORT_DESCRIPTION
+    DEFAULT_TEST_OUTPUT_FORMAT, DEFAULT_TEST_GENERATION_DIR, APP_SHORT_DESCRIPTION,
+    SUPPORTED_CODE_CLONE_MODES, SUPPORTED_CHUNKING_MODES, LOCAL_EMBEDDING_PROVIDER,
+    DEFAULT_GENERATION_CONCURRENCY, MAX_GENERATION_CONCURRENCY,
+    DEFAULT_REINDEX_BATCH_SIZE, DEFAULT_REINDEX_REQUESTS_PER_MINUTE, DEFAULT_REINDEX_KEEP_VERSIONS,
+    DEFAULT_SNAPSHOT_PAGE_SIZE, DEFAULT_SNAPSHOT_IMPORT_BATCH_SIZE, SNAPSHOT_EMBEDDING_DTYPES,
+    NUMPY_STORE_BACKENDS
 )
 from pathlib import Path
 # Import config modules inside function to avoid circular imports
 from .core.utils.helpers import setup_logging
-from .core.utils.loader import with_spinner
+from .core.utils.loader import DeterminateProgressBar, with_spinner
 from ._version import __version__
-from .core.utils.exceptions import EmbeddingGenerationError
+from .core.utils.exceptions import EmbeddingGenerationError, ReindexError, SnapshotError
 
 # Import automation command functionality
 try:
@@ -334,6 +341,10 @@ def check_api_key_configured():
 
     # Get provider from settings
     provider = settings.llm.provider if settings.llm else 'gemini'
+
+    # Local embeddings are computed in-process and need no key
+    if provider == LOCAL_EMBEDDING_PROVIDER:
+        return True
     
     # Check for API key based on provider
     api_key = None
@@ -384,16 +395,20 @@ def check_api_key_configured():
 
 
 def requires_api_key(func):
-    """Decorator to ensure API key is configured before running a command."""
+    """
+    Decorator to ensure API key is configured before running a command.
+
+    Commands run with ``dry_run=True`` work offline and skip the check.
+    """
     @wraps(func)
     def wrapper(*args, **kwargs):
-        if not check_api_key_configured():
+        if not kwargs.get('dry_run') and not check_api_key_configured():
             raise typer.Exit(code=1)
         return func(*args, **kwargs)
 
     @wraps(func)
     async def async_wrapper(*args, **kwargs):
-        if not check_api_key_configured():
+        if not kwargs.get('dry_run') and not check_api_key_configured():
             raise typer.Exit(code=1)
         return await func(*args, **kwargs)
 
@@ -431,7 +446,100 @@ def _get_agent(collection_name: str) -> TestTellerRagAgent:
         raise typer.Exit(code=1)
 
 
-async def ingest_docs_async(path: str, collection_name: str, enhanced: bool = True, chunk_size: int = 1000):
+def _print_resume_report(run) -> None:
+    """Summarize what a --resume run skipped because the interrupted run had already stored it."""
+    if run is None:
+        return
+    if not run.resumed:
+        print("No interrupted ingestion found to resume; ingested from the beginning.")
+        return
+    print(
+        f"↩️  Resumed interrupted ingestion: skipped {len(run.skipped_files)} already ingested files"
+        f" and {run.skipped_chunks} already stored chunks.")
+    for skipped in run.skipped_files[:10]:
+        print(f"   • {skipped}")
+    if len(run.skipped_files) > 10:
+        print(f"   … and {len(run.skipped_files) - 10} more")
+
+
+def _print_near_duplicate_report(stats) -> None:
+    """Summarize the chunks skipped as near-duplicates of already stored content."""
+    if stats is None:
+        return
+    print(
+        f"🧹 Near-duplicate detection: skipped {stats.skipped} of {stats.checked} new chunks"
+        f" ({stats.skipped_ratio:.0%}), {stats.skipped_chars:,} characters not embedded.")
+
+
+async def _watch_docs(agent, path: str, enhanced: bool, chunk_size: int) -> None:
+    """Re-ingest documents under path as they change, until interrupted."""
+    from datetime import datetime
+    from testteller.core.data_ingestion.file_watcher import DirectoryWatcher
+
+    watcher = DirectoryWatcher(path)
+    print(f"\n👀 Watching '{path}' for changes ({watcher.backend} backend). Press Ctrl+C to stop.")
+    if watcher.use_polling:
+        print("   Install 'watchfiles' (pip install testteller[watch]) for instant native file notifications.")
+
+    def report(batch) -> None:
+        stamp = datetime.now().strftime("%H:%M:%S")
+        print(f"[{stamp}] ↻ Re-ingested {len(batch.changed)} changed, removed {len(batch.deleted)} deleted document(s)")
+        for changed in batch.changed[:5]:
+            print(f"   • {changed}")
+
+    await agent.watch_documents(path, enhanced_parsing=enhanced, chunk_size=chunk_size,
+                                on_batch=report, watcher=watcher)
+
+
+def _format_duration(seconds: float) -> str:
+    """Format a duration as e.g. '2h 05m', '3m 20s' or '4.2s'."""
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    minutes, secs = divmod(int(round(seconds)), 60)
+    if minutes < 60:
+        return f"{minutes}m {secs:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m"
+
+
+def _print_ingest_plan(plan) -> None:
+    """Print the projected work and cost of an ingestion from a dry run."""
+    print(f"\n🔎 Dry run: nothing was embedded or stored")
+    print(f"  • Files: {plan.files:,}")
+    for file_type, count in plan.files_by_type.items():
+        print(f"     {file_type:<8} {count:,}")
+    print(f"  • Chunks: {plan.chunks:,} ({plan.unchanged_chunks:,} already stored or repeated"
+          f", {plan.near_duplicate_chunks:,} near-duplicates, {plan.new_chunks:,} to embed)")
+    print(f"  • Estimated tokens: {plan.tokens:,}")
+    print(f"  • Estimated {plan.provider} embedding calls: {plan.provider_calls:,}"
+          + (f" (via {plan.embedding_backend})" if plan.embedding_backend != plan.provider else ""))
+    print(f"  • Projected wall time: {_format_duration(plan.wall_seconds)}"
+          f" (parsing {_format_duration(plan.parse_seconds)}, embedding {_format_duration(plan.embed_seconds)})")
+    print(f"  • Projected cost: ${plan.cost:,.4f} (set EMBEDDING_PRICE_PER_MILLION_TOKENS to override list prices)")
+
+
+async def plan_docs_async(path: str, collection_name: str, enhanced: bool = True, chunk_size: int = 1000,
+                          chunking: str | None = None, dedup: bool | None = None):
+    """Dry-run a document ingestion offline and print its estimate."""
+    from testteller.core.data_ingestion.ingest_planner import DryRunVectorStore
+
+    os.environ['ANONYMIZED_TELEMETRY'] = 'False'
+    check_settings()
+    agent = TestTellerRagAgent(
+        collection_name=collection_name, vector_store=DryRunVectorStore.for_collection(collection_name))
+    try:
+        plan = await with_spinner(
+            agent.plan_document_ingestion(
+                path, enhanced_parsing=enhanced, chunk_size=chunk_size, chunking_mode=chunking, dedup=dedup),
+            f"Planning ingestion: {os.path.basename(path.rstrip('/')) or path}")
+    finally:
+        agent.close()
+    _print_ingest_plan(plan)
+
+
+async def ingest_docs_async(path: str, collection_name: str, enhanced: bool = True, chunk_size: int = 1000,
+                            resume: bool = False, watch: bool = False, chunking: str | None = None,
+                            dedup: bool | None = None):
     # Disable ChromaDB telemetry to prevent hanging
     os.environ['ANONYMIZED_TELEMETRY'] = 'False'
     os.environ['CHROMA_CLIENT_AUTH_PROVIDER'] = ''
@@ -439,7 +547,9 @@ async def ingest_docs_async(path: str, collection_name: str, enhanced: bool = Tr
     agent = _get_agent(collection_name)
 
     async def _ingest_task():
-        await agent.ingest_documents_from_path(path, enhanced_parsing=enhanced, chunk_size=chunk_size)
+        await agent.ingest_documents_from_path(
+            path, enhanced_parsing=enhanced, chunk_size=chunk_size, resume=resume, chunking_mode=chunking,
+            dedup=dedup)
         # Force completion of all background operations by getting the count
         # This ensures the vector store has finished processing everything
         count = await agent.get_ingested_data_count()
@@ -451,7 +561,9 @@ async def ingest_docs_async(path: str, collection_name: str, enhanced: bool = Tr
             'count': count,
             'enhanced': enhanced,
             'chunk_size': chunk_size,
-            'collection_name': collection_name
+            'collection_name': collection_name,
+            'ingest_run': agent.ingest_run if resume else None,
+            'near_duplicates': agent.near_duplicate_stats if agent.near_duplicate_detection else None
         }
 
     # Keep message short to avoid terminal line wrapping
@@ -469,6 +581,11 @@ async def ingest_docs_async(path: str, collection_name: str, enhanced: bool = Tr
     if result['enhanced']:
         print(
             f"💡 Enhanced parsing enabled: Documents chunked ({result['chunk_size']} chars) with metadata extraction")
+    _print_resume_report(result['ingest_run'])
+    _print_near_duplicate_report(result['near_duplicates'])
+
+    if watch:
+        await _watch_docs(agent, path, enhanced, chunk_size)
     
     # Force cleanup to prevent hanging
     import gc
@@ -476,15 +593,20 @@ async def ingest_docs_async(path: str, collection_name: str, enhanced: bool = Tr
     await asyncio.sleep(0.1)  # Give time for cleanup
 
 
-async def ingest_code_async(source_path: str, collection_name: str, no_cleanup_github: bool):
+async def ingest_code_async(source_path: str, collection_name: str, cleanup_github: bool, clone_mode: str | None = None,
+                            resume: bool = False, dedup: bool | None = None):
     # Disable ChromaDB telemetry to prevent hanging
     os.environ['ANONYMIZED_TELEMETRY'] = 'False'
     os.environ['CHROMA_CLIENT_AUTH_PROVIDER'] = ''
     
     agent = _get_agent(collection_name)
+    if clone_mode:
+        from testteller.core.data_ingestion.code_loader import CodeLoader
+        agent.code_loader = CodeLoader(clone_mode=clone_mode)
 
     async def _ingest_task():
-        await agent.ingest_code_from_source(source_path, cleanup_github_after=not no_cleanup_github)
+        await agent.ingest_code_from_source(
+            source_path, cleanup_github_after=cleanup_github, resume=resume, dedup=dedup)
         # Force completion of all background operations by getting the count
         # This ensures the vector store has finished processing everything
         count = await agent.get_ingested_data_count()
@@ -495,7 +617,9 @@ async def ingest_code_async(source_path: str, collection_name: str, no_cleanup_g
         return {
             'count': count,
             'source_path': source_path,
-            'collection_name': collection_name
+            'collection_name': collection_name,
+            'ingest_run': agent.ingest_run if resume else None,
+            'near_duplicates': agent.near_duplicate_stats if agent.near_duplicate_detection else None
         }
 
     # Keep message short to avoid terminal line wrapping
@@ -506,6 +630,8 @@ async def ingest_code_async(source_path: str, collection_name: str, no_cleanup_g
     result = await with_spinner(_ingest_task(), f"Ingesting code: {source_name}...")
     print(
         f"Successfully ingested code from '{result['source_path']}'. Collection '{result['collection_name']}' now contains {result['count']} items.")
+    _print_resume_report(result['ingest_run'])
+    _print_near_duplicate_report(result['near_duplicates'])
     
     # Force cleanup to prevent hanging
     import gc
@@ -513,7 +639,93 @@ async def ingest_code_async(source_path: str, collection_name: str, no_cleanup_g
     await asyncio.sleep(0.1)  # Give time for cleanup
 
 
-async def generate_async(query: str, collection_name: str, num_retrieved: int, output_file: str | None, output_format: str = "md"):
+async def _store_generation_feedback(agent, test_cases: str, query: str, output_file: str | None, num_retrieved: int):
+    """Store generated test cases in the collection when feedback is enabled and generation succeeded."""
+    if "Error:" in test_cases[:20]:
+        return
+    enable_feedback = os.getenv('ENABLE_TEST_CASE_FEEDBACK', 'true').lower() == 'true'
+    if enable_feedback:
+        storage_metadata = {
+            "output_file": output_file if output_file else "none",
+            "num_retrieved_docs": num_retrieved
+        }
+        try:
+            await agent.store_generated_test_cases(test_cases, query, storage_metadata)
+        except Exception as e:
+            logger.error("Failed to store generated test cases: %s", e)
+
+
+def _print_bulk_generation_report(report) -> None:
+    """Print throughput and per-query latency of a bulk generation."""
+    print(f"\n📊 Generated test cases for {report.succeeded} of {len(report.results)} queries "
+          f"in {_format_duration(report.wall_seconds)} ({report.queries_per_minute:.1f} queries/min)")
+    print(f"   • Shared retrieval: {_format_duration(report.retrieval_seconds)} for all queries")
+    percentiles = report.latency_percentiles()
+    if percentiles:
+        print("   • Per-query latency: " + ", ".join(
+            f"p{p} {_format_duration(seconds)}" for p, seconds in percentiles.items()))
+    if report.cached:
+        print(f"   • Served from the generation cache: {report.cached}")
+    if report.failed:
+        print(f"   • Failed: {report.failed}")
+        for result in report.results:
+            if not result.ok:
+                print(f"     - {result.query[:60]}: {result.error}")
+
+
+async def generate_bulk_async(queries_file: str, collection_name: str, num_retrieved: int, output_dir: str,
+                              output_format: str, concurrency: int, use_cache: bool | None = None):
+    """Generate test cases for every query of a queries file, writing one output per query."""
+    try:
+        queries = read_queries_file(queries_file)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: Could not read queries file {queries_file}: {e}")
+        raise typer.Exit(code=1)
+    if not queries:
+        print(f"❌ Error: No queries found in {queries_file}")
+        raise typer.Exit(code=1)
+
+    agent = _get_agent(collection_name)
+    try:
+        if await agent.get_ingested_data_count() == 0:
+            print(f"Warning: Collection '{collection_name}' is empty. Generation will rely on LLM's general knowledge.")
+
+        print(f"Generating test cases for {len(queries)} queries with concurrency {concurrency}...")
+        finished = 0
+
+        async def write_result(index: int, result) -> None:
+            nonlocal finished
+            finished += 1
+            item = queries[index]
+            if not result.ok:
+                print(f"[{finished}/{len(queries)}] ❌ {item.name}: {result.error}")
+                return
+            output_file = str(Path(output_dir) / f"{item.name}.{output_format}")
+            try:
+                actual_file, _ = await save_test_cases_with_format(result.test_cases, output_file, output_format)
+            except Exception as e:
+                logger.error("Failed to save test cases to %s: %s", output_file, e, exc_info=True)
+                print(f"[{finished}/{len(queries)}] ❌ {item.name}: could not save: {e}")
+                return
+            if not result.cached:
+                await _store_generation_feedback(agent, result.test_cases, item.query, actual_file, num_retrieved)
+            print(f"[{finished}/{len(queries)}] {'♻️ ' if result.cached else '✅'} {actual_file} "
+                  f"({_format_duration(result.seconds)})")
+
+        report = await agent.generate_test_cases_bulk(
+            [item.query for item in queries], n_retrieved_docs=num_retrieved,
+            concurrency=concurrency, use_cache=use_cache, on_result=write_result)
+        _print_bulk_generation_report(report)
+        print(f"📁 Output directory: {Path(output_dir).absolute()}")
+        if report.failed:
+            raise typer.Exit(code=1)
+    finally:
+        if hasattr(agent, 'close'):
+            agent.close()
+
+
+async def generate_async(query: str, collection_name: str, num_retrieved: int, output_file: str | None, output_format: str = "md",
+                         use_cache: bool | None = None):
     agent = _get_agent(collection_name)
     
     try:
@@ -526,21 +738,15 @@ async def generate_async(query: str, collection_name: str, num_retrieved: int, o
                 return
 
         async def _generate_task():
-            test_cases = await agent.generate_test_cases(query, n_retrieved_docs=num_retrieved)
+            test_cases = await agent.generate_test_cases(
+                query, n_retrieved_docs=num_retrieved, use_cache=use_cache)
+            if agent.last_generation_cached:
+                # Stored when this result was first generated
+                print("♻️  Reused cached test cases: query, retrieved context and model are unchanged (--no-cache regenerates)")
+                return test_cases
             
             # If feedback is enabled, store the test cases as part of the generation task
-            if "Error:" not in test_cases[:20]:
-                enable_feedback = os.getenv('ENABLE_TEST_CASE_FEEDBACK', 'true').lower() == 'true'
-                if enable_feedback:
-                    storage_metadata = {
-                        "output_file": output_file if output_file else "none",
-                        "num_retrieved_docs": num_retrieved
-                    }
-                    try:
-                        await agent.store_generated_test_cases(test_cases, query, storage_metadata)
-                    except Exception as e:
-                        logger.error("Failed to store generated test cases: %s", e)
-            
+            await _store_generation_feedback(agent, test_cases, query, output_file, num_retrieved)
             return test_cases
 
         test_cases = await with_spinner(_generate_task(), f"Generating test cases for query...")
@@ -579,6 +785,8 @@ async def status_async(collection_name: str):
     agent = _get_agent(collection_name)
     count = await agent.get_ingested_data_count()
     print(f"\nCollection '{collection_name}' contains {count} ingested items.")
+    if agent.vector_store.index_name != collection_name:
+        print(f"Served from re-indexed version '{agent.vector_store.index_name}'.")
 
     # Print ChromaDB connection info
     if agent.vector_store.use_remote:
@@ -588,6 +796,173 @@ async def status_async(collection_name: str):
         print(f"ChromaDB persistent path: {agent.vector_store.db_path}")
 
 
+async def compact_feedback_async(collection_name: str, dry_run: bool, max_count: int | None = None,
+                                 max_age_days: float | None = None, max_per_query: int | None = None):
+    """Enforce retention on the generated test cases stored in a collection."""
+    agent = _get_agent(collection_name)
+    try:
+        policy = agent.feedback_retention
+        policy = FeedbackRetentionPolicy(
+            max_count=policy.max_count if max_count is None else max_count,
+            max_age_days=policy.max_age_days if max_age_days is None else max_age_days,
+            max_per_query=policy.max_per_query if max_per_query is None else max_per_query)
+        report = await with_spinner(
+            agent.compact_generated_test_cases(policy, dry_run=dry_run),
+            f"Compacting generated test cases in '{collection_name}'...")
+    finally:
+        agent.close()
+
+    def limit(value) -> str:
+        return f"{value:g}" if value else "no limit"
+
+    verb = "Would remove" if dry_run else "Removed"
+    print(f"\n🗜️  Generated test cases in '{collection_name}': {report.stored} stored")
+    print(f"   {verb} {report.expired} older than {limit(policy.max_age_days)} days")
+    print(f"   {verb} {report.over_query_cap} over the per-query cap ({limit(policy.max_per_query)})")
+    print(f"   {verb} {report.over_total_cap} over the total cap ({limit(policy.max_count)})")
+    print(f"   {'Would keep' if dry_run else 'Kept'} {report.kept}, best quality_score first")
+
+
+async def reindex_async(collection_name: str, batch_size: int, requests_per_minute: float, reuse_embeddings: bool,
+                        keep_versions: int, rollback: bool):
+    """Rebuild a collection as a new version and swap it in, or roll back to the previous version."""
+    from testteller.core.vector_store.reindex import CollectionReindexer
+
+    agent = _get_agent(collection_name)
+    try:
+        reindexer = CollectionReindexer(
+            agent.vector_store, batch_size=batch_size, requests_per_minute=requests_per_minute,
+            reuse_embeddings=reuse_embeddings)
+        if rollback:
+            current, previous = reindexer.rollback()
+            print(f"\n↩️  '{collection_name}' now served from '{previous}' (was '{current}').")
+            return
+
+        report = await with_spinner(
+            reindexer.reindex(keep_versions=keep_versions),
+            f"Building a new version of '{collection_name}' (the current one stays live)...")
+    finally:
+        agent.close()
+
+    print(f"\n🔁 '{collection_name}' now served from '{report.target}' (was '{report.source}').")
+    print(f"   {report.documents} documents, {report.embedded} embedded, "
+          f"{report.caught_up} caught up from writes during the build, in {_format_duration(report.seconds)}")
+    print(f"   Validated: document count and {report.validated} sampled self-lookups")
+    if report.removed_versions:
+        print(f"   Deleted old versions: {', '.join(report.removed_versions)}")
+    print(f"   Roll back with: testteller reindex -c {collection_name} --rollback")
+
+
+async def migrate_embeddings_async(collection_name: str, to_model: str, batch_size: int, requests_per_minute: float,
+                                   keep_versions: int, restart: bool):
+    """Re-embed a collection with another embedding model into a new version and swap it in."""
+    from testteller.core.vector_store.reindex import EmbeddingMigrator
+
+    agent = _get_agent(collection_name)
+    try:
+        migrator = EmbeddingMigrator(
+            agent.vector_store, to_model, batch_size=batch_size, requests_per_minute=requests_per_minute)
+        if migrator.to_model == agent.vector_store.llm_manager.embedding_spec:
+            print(f"\n'{collection_name}' is already embedded with {migrator.to_model}.")
+            return
+
+        progress = DeterminateProgressBar(f"Re-embedding '{collection_name}' with {migrator.to_model}")
+        report = await migrator.migrate(
+            keep_versions=keep_versions, restart=restart,
+            on_progress=lambda done, total: progress.update(done / total if total else 1.0))
+        progress.finish()
+    finally:
+        agent.close()
+
+    print(f"\n🔁 '{collection_name}' now embedded with {report.to_model} (was {report.from_model}), "
+          f"served from '{report.target}'.")
+    resumed = f", resumed after {report.resumed_from}" if report.resumed_from else ""
+    print(f"   {report.documents} documents, {report.embedded} embedded{resumed}, "
+          f"{report.caught_up} caught up from writes during the migration, in {_format_duration(report.seconds)}")
+    print(f"   Validated: document count and {report.validated} sampled self-lookups")
+    if report.removed_versions:
+        print(f"   Deleted old versions: {', '.join(report.removed_versions)}")
+    print(f"   Roll back with: testteller reindex -c {collection_name} --rollback")
+
+
+def _open_chroma_client():
+    """Open the configured vector store client directly, without an LLM, for commands that need no embeddings."""
+    import chromadb
+    from testteller.core.vector_store.numpy_store import get_vector_store_backend, open_local_client
+
+    # Get ChromaDB configuration from settings
+    if settings and settings.chromadb:
+        use_remote = settings.chromadb.__dict__.get('use_remote', False)
+        persist_directory = settings.chromadb.__dict__.get(
+            'persist_directory', 'chroma_db')
+        host = settings.chromadb.__dict__.get('host', 'localhost')
+        port = settings.chromadb.__dict__.get('port', 8000)
+    else:
+        use_remote = False
+        persist_directory = 'chroma_db'
+        host = 'localhost'
+        port = 8000
+
+    # Initialize ChromaDB client with telemetry disabled
+    if use_remote and get_vector_store_backend() not in NUMPY_STORE_BACKENDS:
+        client = chromadb.HttpClient(host=host, port=port)
+    else:
+        # Telemetry is disabled to prevent background threads from hanging the process
+        client = open_local_client(persist_directory)
+    return client, persist_directory
+
+
+def _format_size(size: int) -> str:
+    """Format a byte count as e.g. '512 B', '3.4 MB'."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+async def snapshot_export_async(collection_name: str, path: str, page_size: int, dtype: str):
+    """Write a collection, with its embeddings, to a snapshot file."""
+    from testteller.core.data_ingestion.ingest_state import get_collection_state_dir
+    from testteller.core.vector_store.snapshot import export_snapshot
+
+    agent = _get_agent(collection_name)
+    try:
+        store = agent.vector_store
+        progress = DeterminateProgressBar(f"Exporting '{collection_name}'")
+        report = await asyncio.to_thread(
+            export_snapshot, store.collection, path, name=collection_name,
+            embedding_model=store.llm_manager.embedding_spec,
+            state_dir=get_collection_state_dir(collection_name, store.persist_directory), page_size=page_size,
+            dtype=dtype, on_progress=lambda done, total: progress.update(done / total if total else 1.0))
+        progress.finish()
+    finally:
+        agent.close()
+
+    print(f"\n📦 Exported {report.documents} documents of '{collection_name}' to {report.path} "
+          f"({_format_size(report.bytes)}, {report.dtype}, in {_format_duration(report.seconds)})")
+    print(f"   Embedding model: {report.embedding_model}")
+    print(f"   Load it elsewhere with: testteller snapshot import {report.path} -c {collection_name}")
+
+
+async def snapshot_import_async(collection_name: str | None, path: str, replace: bool, batch_size: int):
+    """Load a snapshot file into a collection without calling an embedding provider."""
+    from testteller.core.vector_store.snapshot import import_snapshot
+
+    # Disable ChromaDB telemetry to prevent hanging
+    os.environ['ANONYMIZED_TELEMETRY'] = 'False'
+    client, persist_directory = _open_chroma_client()
+    progress = DeterminateProgressBar(f"Importing {path}")
+    report = await asyncio.to_thread(
+        import_snapshot, client, path, collection_name=collection_name, persist_directory=persist_directory,
+        replace=replace, batch_size=batch_size,
+        on_progress=lambda done, total: progress.update(done / total if total else 1.0))
+    progress.finish()
+
+    print(f"\n📥 Imported {report.documents} documents into '{report.collection}' "
+          f"in {_format_duration(report.seconds)}, with no embedding calls")
+    print(f"   Queries use the snapshot's embedding model: {report.embedding_model}")
+
+
 async def clear_data_async(collection_name: str, force: bool):
     if not force:
         confirm = typer.confirm(
@@ -602,45 +977,33 @@ async def clear_data_async(collection_name: str, force: bool):
 
     # Import here to avoid circular imports
     from testteller.core.data_ingestion.code_loader import CodeLoader
-    import chromadb
+    from testteller.core.data_ingestion.ingest_state import IngestStateStore
+    from testteller.core.vector_store.collection_aliases import CollectionAliases, collection_versions
+    from testteller.core.vector_store.chromadb_manager import collection_names
 
     try:
         # Directly clear the collection without initializing the full vector store
         # This avoids the need for LLM/embeddings just to delete data
+        client, persist_directory = _open_chroma_client()
 
-        # Get ChromaDB configuration from settings
-        if settings and settings.chromadb:
-            use_remote = settings.chromadb.__dict__.get('use_remote', False)
-            persist_directory = settings.chromadb.__dict__.get(
-                'persist_directory', 'chroma_db')
-            host = settings.chromadb.__dict__.get('host', 'localhost')
-            port = settings.chromadb.__dict__.get('port', 8000)
-        else:
-            use_remote = False
-            persist_directory = 'chroma_db'
-            host = 'localhost'
-            port = 8000
-
-        # Initialize ChromaDB client with telemetry disabled
-        if use_remote:
-            client = chromadb.HttpClient(host=host, port=port)
-        else:
-            # Disable telemetry to prevent background threads from hanging the process
-            client = chromadb.PersistentClient(
-                path=persist_directory,
-                settings=chromadb.config.Settings(
-                    anonymized_telemetry=False
-                )
-            )
-
-        # Clear the collection
+        # Clear the collection, with every re-indexed version kept for rollback
         async def _clear_task():
             try:
-                client.delete_collection(name=collection_name)
-                logger.info(f"Deleted collection '{collection_name}'")
+                existing = collection_names(client)
             except Exception as e:
-                logger.warning(
-                    f"Collection '{collection_name}' may not exist: {e}")
+                logger.warning("Could not list collections: %s", e)
+                existing = []
+            for name in collection_versions(collection_name, existing) or [collection_name]:
+                try:
+                    client.delete_collection(name=name)
+                    logger.info(f"Deleted collection '{name}'")
+                except Exception as e:
+                    logger.warning(
+                        f"Collection '{name}' may not exist: {e}")
+            CollectionAliases(persist_directory).remove(collection_name)
+
+            # Forget recorded ingestion state so the next ingest starts from scratch
+            IngestStateStore(collection_name).clear()
 
             # Also clean up cloned repositories
             code_loader = CodeLoader()
@@ -674,7 +1037,17 @@ def ingest_docs(
     enhanced: Annotated[bool, typer.Option(
         "--enhanced", "-e", help="Use enhanced parsing with chunking and metadata extraction")] = True,
     chunk_size: Annotated[int, typer.Option(
-        "--chunk-size", "-s", help="Text chunk size for better retrieval (100-5000)")] = 1000
+        "--chunk-size", "-s", help="Text chunk size for better retrieval (100-5000)")] = 1000,
+    resume: Annotated[bool, typer.Option(
+        "--resume", "-r", help="Continue an interrupted ingestion of the same path, skipping files and chunk batches it already stored.")] = False,
+    watch: Annotated[bool, typer.Option(
+        "--watch", "-w", help="After ingesting, keep watching the directory and re-ingest documents as they are created, modified or deleted.")] = False,
+    chunking: Annotated[str, typer.Option(
+        "--chunking", help="Chunking mode: fixed (size-based chunks) or content (content-defined chunks with content-hash ids, so re-ingesting an edited document only re-embeds the chunks that changed). Defaults to CHUNKING_MODE.")] = None,
+    dedup: Annotated[bool, typer.Option(
+        "--dedup/--no-dedup", help="Skip chunks that are near-duplicates (SimHash) of chunks already in the collection, e.g. repeated boilerplate. Defaults to NEAR_DUPLICATE_DETECTION.")] = None,
+    dry_run: Annotated[bool, typer.Option(
+        "--dry-run", help="Parse and chunk everything offline and report files, chunks, estimated tokens, provider calls, wall time and cost without embedding or storing anything. Needs no API key.")] = False
 ):
     """Ingests documents from a file or directory into a collection."""
     # Get collection name from settings if not provided
@@ -695,19 +1068,43 @@ def ingest_docs(
         print("❌ Error: chunk-size must be between 100 and 5000 characters")
         raise typer.Exit(code=1)
 
+    if watch and not os.path.isdir(path):
+        print("❌ Error: --watch requires a directory path")
+        raise typer.Exit(code=1)
+
+    if dry_run and (watch or resume):
+        print("❌ Error: --dry-run cannot be combined with --watch or --resume")
+        raise typer.Exit(code=1)
+
+    if chunking and chunking.lower() not in SUPPORTED_CHUNKING_MODES:
+        print(
+            f"❌ Error: Unsupported chunking mode '{chunking}'. Choose from: {', '.join(SUPPORTED_CHUNKING_MODES)}")
+        raise typer.Exit(code=1)
+
     # Show ingestion mode
     mode = "enhanced" if enhanced else "basic"
     print(f"\n📄 Document Ingestion ({mode} mode)")
     if enhanced:
         print(f"  • Chunk size: {chunk_size} characters")
+        if chunking:
+            print(f"  • Chunking: {chunking.lower()}")
         print(f"  • Metadata extraction: enabled")
         print(f"  • Supported formats: .md, .txt, .pdf, .docx, .xlsx")
     else:
         print(f"  • Basic parsing mode")
 
     try:
+        if dry_run:
+            asyncio.run(plan_docs_async(
+                path, collection_name, enhanced, chunk_size, chunking.lower() if chunking else None, dedup))
+            return
         asyncio.run(ingest_docs_async(
-            path, collection_name, enhanced, chunk_size))
+            path, collection_name, enhanced, chunk_size, resume, watch,
+            chunking.lower() if chunking else None, dedup))
+    except KeyboardInterrupt:
+        if not watch:
+            raise
+        print("\nStopped watching.")
     except EmbeddingGenerationError as e:
         logger.error(
             "CLI: Embedding generation failed during document ingestion. Error: %s", e, exc_info=True)
@@ -736,8 +1133,14 @@ def ingest_code(
     source_path: Annotated[str, typer.Argument(help="URL of the GitHub repository OR path to a local code folder.")],
     collection_name: Annotated[str, typer.Option(
         "--collection-name", "-c", help="ChromaDB collection name.")] = None,
-    no_cleanup_github: Annotated[bool, typer.Option(
-        "--no-cleanup-github", "-nc", help="Do not delete cloned GitHub repo after ingestion (no effect for local folders).")] = False
+    cleanup_github: Annotated[bool, typer.Option(
+        "--cleanup-github/--no-cleanup-github", " /-nc", help="Delete the cached clone of a GitHub repo after ingestion; by default it is kept so re-ingestion only pulls new commits (no effect for local folders).")] = False,
+    clone_mode: Annotated[str, typer.Option(
+        "--clone-mode", "-m", help="How to fetch repositories: full, shallow (depth 1, sparse code-only checkout) or blobs (read code from the object store without a checkout). Defaults to CODE_CLONE_MODE.")] = None,
+    resume: Annotated[bool, typer.Option(
+        "--resume", "-r", help="Continue an interrupted ingestion of the same source, skipping code files it already stored.")] = False,
+    dedup: Annotated[bool, typer.Option(
+        "--dedup/--no-dedup", help="Skip files that are near-duplicates (SimHash) of content already in the collection, e.g. vendored copies. Defaults to NEAR_DUPLICATE_DETECTION.")] = None
 ):
     """Ingests code from a GitHub repository or local folder into a collection."""
     # Get collection name from settings if not provided
@@ -746,6 +1149,11 @@ def ingest_code(
     logger.info("CLI: Ingesting code from '%s' into collection '%s'",
                 source_path, collection_name)
 
+    if clone_mode and clone_mode.lower() not in SUPPORTED_CODE_CLONE_MODES:
+        print(
+            f"Error: Unsupported clone mode '{clone_mode}'. Choose from: {', '.join(SUPPORTED_CODE_CLONE_MODES)}")
+        raise typer.Exit(code=1)
+
     # For local paths, check if they exist
     if not source_path.startswith(('http://', 'https://', 'git@')) and not os.path.exists(source_path):
         logger.error(
@@ -756,7 +1164,8 @@ def ingest_code(
 
     try:
         asyncio.run(ingest_code_async(
-            source_path, collection_name, no_cleanup_github))
+            source_path, collection_name, cleanup_github,
+            clone_mode.lower() if clone_mode else None, resume, dedup))
     except EmbeddingGenerationError as e:
         logger.error(
             "CLI: Embedding generation failed during code ingestion. Error: %s", e, exc_info=True)
@@ -782,7 +1191,7 @@ def ingest_code(
 @app.command()
 @requires_api_key
 def generate(
-    query: Annotated[str, typer.Argument(help="Query for test case generation.")],
+    query: Annotated[str, typer.Argument(help="Query for test case generation (omit with --queries-file).")] = None,
     collection_name: Annotated[str, typer.Option(
         "--collection-name", "-c", help="ChromaDB collection name.")] = None,
     num_retrieved: Annotated[int, typer.Option(
@@ -790,11 +1199,27 @@ def generate(
     output_file: Annotated[str, typer.Option(
         "--output-file", "-o", help=f"Optional: Save test cases to this file. If not provided, uses OUTPUT_FILE_PATH from .env or defaults to {DEFAULT_OUTPUT_FILE}")] = None,
     output_format: Annotated[str, typer.Option(
-        "--output-format", "-f", help="Output format for test cases: md, pdf, docx. Uses TEST_OUTPUT_FORMAT from .env if not specified.")] = None
+        "--output-format", "-f", help="Output format for test cases: md, pdf, docx. Uses TEST_OUTPUT_FORMAT from .env if not specified.")] = None,
+    no_cache: Annotated[bool, typer.Option(
+        "--no-cache", help="Always call the LLM instead of reusing a cached generation for the same query and context.")] = False,
+    queries_file: Annotated[str, typer.Option(
+        "--queries-file", "-q", help="Generate for every query in a .txt (one per line) or .jsonl ({\"query\", \"id\"}) file.")] = None,
+    concurrency: Annotated[int, typer.Option(
+        "--concurrency", min=1, max=MAX_GENERATION_CONCURRENCY,
+        help="Generations run at once with --queries-file.")] = DEFAULT_GENERATION_CONCURRENCY,
+    output_dir: Annotated[str, typer.Option(
+        "--output-dir", "-d", help="Directory for the per-query outputs of --queries-file (default: a timestamped directory).")] = None
 ):
     """Generates test cases based on query and knowledge base."""
+    if bool(query) == bool(queries_file):
+        print("❌ Error: Provide either a QUERY or --queries-file")
+        raise typer.Exit(code=1)
+    if queries_file and output_file:
+        print("❌ Error: --output-file applies to a single query; use --output-dir with --queries-file")
+        raise typer.Exit(code=1)
     logger.info(
-        "CLI: Generating test cases for query: '%s...', Collection: %s", query[:50], collection_name)
+        "CLI: Generating test cases for %s, Collection: %s",
+        f"queries in {queries_file}" if queries_file else f"query: '{query[:50]}...'", collection_name)
 
     # Get collection name from settings if not provided
     collection_name = get_collection_name(collection_name)
@@ -811,6 +1236,24 @@ def generate(
         print(f"Supported formats: {', '.join(SUPPORTED_TEST_OUTPUT_FORMATS)}")
         raise typer.Exit(code=1)
 
+    if queries_file:
+        if not output_dir:
+            from datetime import datetime
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_dir = str(Path(DEFAULT_TEST_GENERATION_DIR) / f"testteller-testcases-{timestamp}")
+        try:
+            asyncio.run(generate_bulk_async(
+                queries_file, collection_name, num_retrieved, output_dir, final_output_format, concurrency,
+                use_cache=False if no_cache else None))
+        except typer.Exit:
+            raise
+        except Exception as e:
+            logger.error(
+                "CLI: Unhandled error during bulk test case generation: %s", e, exc_info=True)
+            print(f"An unexpected error occurred: {e}")
+            raise typer.Exit(code=1)
+        return
+
     # Determine output file path with new directory structure and format
     final_output_file = output_file
     if not final_output_file:
@@ -843,7 +1286,7 @@ def generate(
 
     try:
         asyncio.run(generate_async(
-            query, collection_name, num_retrieved, final_output_file, final_output_format))
+            query, collection_name, num_retrieved, final_output_file, final_output_format, use_cache=False if no_cache else None))
     except typer.Exit:
         # Re-raise typer.Exit exceptions to avoid catching them
         raise
@@ -877,6 +1320,172 @@ def status(
         raise typer.Exit(code=1)
 
 
+@app.command()
+@requires_api_key
+def compact_feedback(
+    collection_name: Annotated[str, typer.Option(
+        "--collection-name", "-c", help="ChromaDB collection name.")] = None,
+    dry_run: Annotated[bool, typer.Option(
+        "--dry-run", help="Report what would be removed without deleting anything.")] = False,
+    max_count: Annotated[int, typer.Option(
+        "--max-count", min=0, help="Most generated test case chunks kept (0 for no limit). Defaults to MAX_GENERATED_TESTS_TO_STORE.")] = None,
+    max_age_days: Annotated[float, typer.Option(
+        "--max-age-days", min=0, help="Remove chunks generated longer ago (0 for no limit). Defaults to GENERATED_TEST_RETENTION_DAYS.")] = None,
+    max_per_query: Annotated[int, typer.Option(
+        "--max-per-query", min=0, help="Most chunks kept per generation query (0 for no limit). Defaults to MAX_GENERATED_TESTS_PER_QUERY.")] = None
+):
+    """Removes stored generated test cases beyond the retention limits."""
+    collection_name = get_collection_name(collection_name)
+
+    logger.info("CLI: Compacting generated test cases in collection: %s", collection_name)
+    try:
+        asyncio.run(compact_feedback_async(collection_name, dry_run, max_count, max_age_days, max_per_query))
+    except typer.Exit:
+        raise
+    except Exception as e:
+        logger.error(
+            "CLI: Unhandled error during feedback compaction: %s", e, exc_info=True)
+        print(f"An unexpected error occurred: {e}")
+        raise typer.Exit(code=1)
+
+
+@app.command()
+@requires_api_key
+def reindex(
+    collection_name: Annotated[str, typer.Option(
+        "--collection-name", "-c", help="ChromaDB collection name.")] = None,
+    batch_size: Annotated[int, typer.Option(
+        "--batch-size", min=1, help="Documents embedded and written per batch.")] = DEFAULT_REINDEX_BATCH_SIZE,
+    requests_per_minute: Annotated[float, typer.Option(
+        "--requests-per-minute", min=0, help="Most embedding requests per minute while rebuilding (0 for no throttling).")] = DEFAULT_REINDEX_REQUESTS_PER_MINUTE,
+    reuse_embeddings: Annotated[bool, typer.Option(
+        "--reuse-embeddings", help="Copy the stored embeddings instead of embedding the documents again (rebuilds the index only).")] = False,
+    keep_versions: Annotated[int, typer.Option(
+        "--keep-versions", min=0, help="Previous versions kept for rollback.")] = DEFAULT_REINDEX_KEEP_VERSIONS,
+    rollback: Annotated[bool, typer.Option(
+        "--rollback", help="Serve the collection from its previous version again.")] = False
+):
+    """Rebuilds a collection as a new version and atomically swaps it in."""
+    collection_name = get_collection_name(collection_name)
+
+    logger.info("CLI: Re-indexing collection: %s", collection_name)
+    try:
+        asyncio.run(reindex_async(collection_name, batch_size, requests_per_minute, reuse_embeddings,
+                                  keep_versions, rollback))
+    except typer.Exit:
+        raise
+    except ReindexError as e:
+        print(f"❌ Error: {e}")
+        raise typer.Exit(code=1)
+    except Exception as e:
+        logger.error(
+            "CLI: Unhandled error during re-indexing: %s", e, exc_info=True)
+        print(f"An unexpected error occurred: {e}")
+        raise typer.Exit(code=1)
+
+
+@app.command()
+@requires_api_key
+def migrate_embeddings(
+    to_model: Annotated[str, typer.Option(
+        "--to", help="Embedding model to migrate to, as 'provider' or 'provider/model' (e.g. openai/text-embedding-3-large).")],
+    collection_name: Annotated[str, typer.Option(
+        "--collection-name", "-c", help="ChromaDB collection name.")] = None,
+    batch_size: Annotated[int, typer.Option(
+        "--batch-size", min=1, help="Documents read, embedded and written per page.")] = DEFAULT_REINDEX_BATCH_SIZE,
+    requests_per_minute: Annotated[float, typer.Option(
+        "--requests-per-minute", min=0, help="Most embedding requests per minute while migrating (0 for no throttling).")] = DEFAULT_REINDEX_REQUESTS_PER_MINUTE,
+    keep_versions: Annotated[int, typer.Option(
+        "--keep-versions", min=0, help="Previous versions kept for rollback.")] = DEFAULT_REINDEX_KEEP_VERSIONS,
+    restart: Annotated[bool, typer.Option(
+        "--restart", help="Start over instead of resuming an interrupted migration.")] = False
+):
+    """Re-embeds a collection with another embedding model and switches over when complete."""
+    collection_name = get_collection_name(collection_name)
+
+    logger.info("CLI: Migrating embeddings of collection %s to %s", collection_name, to_model)
+    try:
+        asyncio.run(migrate_embeddings_async(collection_name, to_model, batch_size, requests_per_minute,
+                                             keep_versions, restart))
+    except typer.Exit:
+        raise
+    except (ReindexError, ValueError) as e:
+        print(f"\n❌ Error: {e}")
+        raise typer.Exit(code=1)
+    except EmbeddingGenerationError as e:
+        print(f"\n❌ Error: {e}")
+        print("   Progress is saved; run the same command again to resume.")
+        raise typer.Exit(code=1)
+    except KeyboardInterrupt:
+        print("\n⏸️  Interrupted; run the same command again to resume.")
+        raise typer.Exit(code=130)
+    except Exception as e:
+        logger.error(
+            "CLI: Unhandled error during embedding migration: %s", e, exc_info=True)
+        print(f"An unexpected error occurred: {e}")
+        raise typer.Exit(code=1)
+
+
+snapshot_app = typer.Typer(
+    help="Export a collection with its embeddings to a file, and import it without re-embedding.",
+    context_settings={"help_option_names": ["--help", "-h"]})
+app.add_typer(snapshot_app, name="snapshot")
+
+
+@snapshot_app.command("export")
+@requires_api_key
+def snapshot_export(
+    path: Annotated[str, typer.Argument(help="Snapshot file to write.")],
+    collection_name: Annotated[str, typer.Option(
+        "--collection-name", "-c", help="ChromaDB collection name.")] = None,
+    page_size: Annotated[int, typer.Option(
+        "--page-size", min=1, help="Documents read and written per page.")] = DEFAULT_SNAPSHOT_PAGE_SIZE,
+    dtype: Annotated[str, typer.Option(
+        "--dtype", help=f"Embedding precision: {', '.join(SNAPSHOT_EMBEDDING_DTYPES)} (float16 halves the size).")] = "float32"
+):
+    """Writes a collection, with its embeddings, to a portable snapshot file."""
+    collection_name = get_collection_name(collection_name)
+    if dtype not in SNAPSHOT_EMBEDDING_DTYPES:
+        print(f"❌ Error: --dtype must be one of: {', '.join(SNAPSHOT_EMBEDDING_DTYPES)}")
+        raise typer.Exit(code=1)
+
+    logger.info("CLI: Exporting collection %s to %s", collection_name, path)
+    try:
+        asyncio.run(snapshot_export_async(collection_name, path, page_size, dtype))
+    except typer.Exit:
+        raise
+    except Exception as e:
+        logger.error("CLI: Unhandled error during snapshot export: %s", e, exc_info=True)
+        print(f"An unexpected error occurred: {e}")
+        raise typer.Exit(code=1)
+
+
+@snapshot_app.command("import")
+def snapshot_import(
+    path: Annotated[str, typer.Argument(help="Snapshot file to load.")],
+    collection_name: Annotated[str, typer.Option(
+        "--collection-name", "-c", help="Collection to load into (defaults to the exported collection's name).")] = None,
+    replace: Annotated[bool, typer.Option(
+        "--replace", help="Replace the collection if it already holds documents.")] = False,
+    batch_size: Annotated[int, typer.Option(
+        "--batch-size", min=1, help="Documents written per ChromaDB call.")] = DEFAULT_SNAPSHOT_IMPORT_BATCH_SIZE
+):
+    """Loads a snapshot file into a collection without calling any embedding provider."""
+    logger.info("CLI: Importing snapshot %s", path)
+    if not os.path.isfile(path):
+        print(f"❌ Error: Snapshot file not found: {path}")
+        raise typer.Exit(code=1)
+    try:
+        asyncio.run(snapshot_import_async(collection_name, path, replace, batch_size))
+    except SnapshotError as e:
+        print(f"\n❌ Error: {e}")
+        raise typer.Exit(code=1)
+    except Exception as e:
+        logger.error("CLI: Unhandled error during snapshot import: %s", e, exc_info=True)
+        print(f"An unexpected error occurred: {e}")
+        raise typer.Exit(code=1)
+
+
 @app.command()
 def clear_data(
     collection_name: Annotated[str, typer.Option(